@@ -4,7 +4,7 @@ Provides access to monitoring data and system health
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import logging
@@ -13,6 +13,7 @@ from backend.services.comprehensive_monitoring_service import (
 )
 from backend.services.feature_flag_service import feature_flag_service
 from backend.core.database import get_db_session
+from backend.core.distributed_tracing import performance_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -1083,6 +1084,18 @@ async def export_metrics(
         logger.error(f"Error exporting metrics: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to export metrics")
 
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """Expose tracing performance metrics in the Prometheus text format"""
+    try:
+        return PlainTextResponse(
+            content=performance_metrics.to_prometheus(),
+            media_type="text/plain; version=0.0.4"
+        )
+    except Exception as e:
+        logger.error(f"Error rendering Prometheus metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to render metrics")
+
 # Middleware for automatic request tracking
 @router.middleware("http")
 async def track_api_requests(request: Request, call_next):
@@ -544,6 +544,11 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to start background tasks: {e}")
 
+@router.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared webhook delivery session"""
+    await webhook_service.close()
+
 # Enhanced endpoints for collaboration and voice shortcuts
 
 @router.post("/collaboration/notify", response_model=APIResponse)
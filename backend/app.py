@@ -577,6 +577,14 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Error during RAG services initialization: {e}", exc_info=True)
     
+    # Load feature flags and start their usage flusher and change listener
+    try:
+        logger.info("Starting feature flag service...")
+        from backend.services.feature_flag_service import feature_flag_service
+        feature_flag_service.start()
+    except Exception as e:
+        logger.error(f"Error during feature flag service startup: {e}", exc_info=True)
+    
     # Start health monitoring
     await service_manager.start_health_monitoring()
     
@@ -591,7 +599,22 @@ async def shutdown_event():
     
     # Stop health monitoring
     await service_manager.stop_health_monitoring()
-    
+
+    # Close pooled LLM connections
+    from services.llm_gateway import get_llm_gateway
+    await get_llm_gateway().close()
+
+    # Close pooled embedding connections
+    from services.embedding_client import close_embedding_clients
+    await close_embedding_clients()
+
+    # Stop feature flag workers and flush buffered usage
+    try:
+        from backend.services.feature_flag_service import feature_flag_service
+        feature_flag_service.close()
+    except Exception as e:
+        logger.error(f"Error stopping feature flag service: {e}")
+
     logger.info("Application shutdown complete")
 
 if __name__ == "__main__":
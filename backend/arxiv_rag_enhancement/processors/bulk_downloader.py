@@ -31,6 +31,7 @@ from ..shared import (
     StateManager, 
     ProgressTracker, 
     ErrorHandler,
+    ProcessedPaperLedger,
     ProcessingState,
     ArxivPaper,
     DownloadStats
@@ -438,20 +439,20 @@ class DuplicateDetector:
     
     def __init__(self, processed_papers_file: Path):
         self.processed_papers_file = processed_papers_file
-        self.processed_papers: Set[str] = set()
+        self.processed_papers = ProcessedPaperLedger(processed_papers_file.with_suffix('.ledger'))
         self._load_processed_papers()
     
     def _load_processed_papers(self):
-        """Load list of already processed papers."""
+        """Import papers from a legacy JSON processed papers file into the ledger."""
         try:
-            if self.processed_papers_file.exists():
+            if self.processed_papers_file.exists() and len(self.processed_papers) == 0:
                 with open(self.processed_papers_file, 'r') as f:
                     data = json.load(f)
-                    self.processed_papers = set(data.get('processed_papers', []))
-                logger.info(f"Loaded {len(self.processed_papers)} previously processed papers")
+                self.processed_papers.update(data.get('processed_papers', []))
+                self.processed_papers.compact()
+                logger.info(f"Imported {len(self.processed_papers)} previously processed papers into the ledger")
         except Exception as e:
             logger.warning(f"Could not load processed papers file: {e}")
-            self.processed_papers = set()
     
     def filter_new_papers(self, papers: List[ArxivPaper]) -> List[ArxivPaper]:
         """Filter out papers that have already been processed."""
@@ -465,26 +466,15 @@ class DuplicateDetector:
         return new_papers
     
     def mark_as_processed(self, paper_ids: List[str]):
-        """Mark papers as processed."""
-        self.processed_papers.update(paper_ids)
-        self._save_processed_papers()
-    
-    def _save_processed_papers(self):
-        """Save processed papers list to file."""
+        """Mark papers as processed (an append to the ledger, not a rewrite)."""
         try:
-            self.processed_papers_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            data = {
-                'processed_papers': list(self.processed_papers),
-                'last_updated': datetime.now().isoformat(),
-                'total_count': len(self.processed_papers)
-            }
-            
-            with open(self.processed_papers_file, 'w') as f:
-                json.dump(data, f, indent=2)
-                
+            self.processed_papers.update(paper_ids)
         except Exception as e:
-            logger.error(f"Failed to save processed papers file: {e}")
+            logger.error(f"Failed to record processed papers: {e}")
+    
+    def close(self):
+        """Compact the ledger and release its files."""
+        self.processed_papers.close()
 
 
 class ArxivBulkDownloader:
@@ -524,6 +514,7 @@ class ArxivBulkDownloader:
         self.category_filter = CategoryFilter(categories)
         self.date_filter = DateRangeFilter(start_date)
         self.duplicate_detector = DuplicateDetector(self.metadata_dir / "processed_papers.json")
+        self._paper_ids_by_file: Dict[str, str] = {}
         
         # Statistics
         self.discovered_papers = 0
@@ -597,11 +588,11 @@ class ArxivBulkDownloader:
             
             self.downloaded_papers = len(downloaded_files)
             
-            # Mark successfully downloaded papers as processed (for download tracking)
-            downloaded_paper_ids = []
-            for i, file_path in enumerate(downloaded_files):
-                if i < len(papers):
-                    downloaded_paper_ids.append(papers[i].arxiv_id)
+            # Remember which paper each file holds so processing can mark it done
+            ids_by_filename = {paper.get_filename(): paper.arxiv_id for paper in papers}
+            for file_path in downloaded_files:
+                if file_path.name in ids_by_filename:
+                    self._paper_ids_by_file[str(file_path)] = ids_by_filename[file_path.name]
             
             # Finish progress tracking
             self.progress_tracker.finish("Download complete")
@@ -652,6 +643,9 @@ class ArxivBulkDownloader:
                     
                     if success:
                         processed_count += 1
+                        paper_id = self._paper_ids_by_file.get(str(pdf_path))
+                        if paper_id:
+                            self.duplicate_detector.mark_as_processed([paper_id])
                     else:
                         failed_count += 1
                     
@@ -766,6 +760,10 @@ class ArxivBulkDownloader:
         except Exception as e:
             logger.error(f"Failed to save paper metadata: {e}")
     
+    def close(self):
+        """Release the processed papers ledger; call once the downloader is done."""
+        self.duplicate_detector.close()
+    
     def get_download_stats(self) -> Dict[str, Any]:
         """Get comprehensive download and processing statistics."""
         return {
@@ -204,6 +204,7 @@ class UpdateProcessor:
                                    output_dir: str) -> UpdateReport:
         """Process monthly update of new papers."""
         update_start = datetime.now()
+        downloader = None
         
         try:
             # Create downloader for this update
@@ -279,6 +280,10 @@ class UpdateProcessor:
                 summary=f"Update failed: {str(e)}",
                 categories_processed=categories
             )
+        
+        finally:
+            if downloader is not None:
+                downloader.close()
     
     def _extract_errors(self, error_handler: ErrorHandler) -> List[str]:
         """Extract error messages from error handler."""
@@ -6,12 +6,14 @@ processing scripts:
 - StateManager: Processing state persistence and resume functionality
 - ProgressTracker: Real-time progress monitoring and ETA calculation
 - ErrorHandler: Centralized error handling and logging
+- ProcessedPaperLedger: Append-only record of processed paper ids
 - DataModels: Common data structures and models
 """
 
 from .state_manager import StateManager, FileLock
 from .progress_tracker import ProgressTracker
 from .error_handler import ErrorHandler
+from .processed_ledger import ProcessedPaperLedger, BloomFilter
 from .data_models import (
     ProcessingState,
     ArxivPaper,
@@ -28,6 +30,8 @@ __all__ = [
     'FileLock',
     'ProgressTracker',
     'ErrorHandler',
+    'ProcessedPaperLedger',
+    'BloomFilter',
     'ProcessingState',
     'ArxivPaper',
     'ProcessingStats',
@@ -0,0 +1,184 @@
+"""
+Processed Paper Ledger for arXiv RAG Enhancement system.
+
+Records which papers have been processed without rewriting the whole list on
+every update. New ids are appended to a log file; the log is periodically
+compacted into a SQLite index, and a Bloom filter in front of both answers
+most membership checks for new papers without touching disk.
+"""
+
+import hashlib
+import logging
+import math
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, Set
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys."""
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.false_positive_rate = false_positive_rate
+
+        self.num_bits = max(8, int(-self.capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        # Double hashing: derive all k positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class ProcessedPaperLedger:
+    """
+    Append-only ledger of processed paper ids.
+
+    Marking a paper appends one line to ``<path>.log``. Once the log holds
+    ``compact_every`` ids they are moved into the sorted SQLite index at
+    ``<path>.db`` and the log is truncated. Replaying a log whose ids were
+    already compacted is harmless, so a crash at any point loses at most the
+    line being written.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        compact_every: int = 10000,
+        expected_items: int = 1_000_000,
+        false_positive_rate: float = 0.001
+    ):
+        self.path = Path(path)
+        self.log_file = self.path.with_suffix('.log')
+        self.db_file = self.path.with_suffix('.db')
+        self.compact_every = compact_every
+        self.false_positive_rate = false_positive_rate
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._db = sqlite3.connect(str(self.db_file))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS processed (paper_id TEXT PRIMARY KEY) WITHOUT ROWID"
+        )
+        self._db.commit()
+        self._indexed_count = self._db.execute("SELECT COUNT(*) FROM processed").fetchone()[0]
+
+        # Ids in the log that are not yet in the index
+        self._recent: Set[str] = set()
+        self._bloom = BloomFilter(max(expected_items, 2 * self._indexed_count), false_positive_rate)
+        for (paper_id,) in self._db.execute("SELECT paper_id FROM processed"):
+            self._bloom.add(paper_id)
+
+        self._replay_log()
+        self._log = open(self.log_file, 'a', encoding='utf-8')
+
+        logger.info(f"Opened processed paper ledger {self.path} with {len(self)} papers")
+
+    def _replay_log(self) -> None:
+        """Load ids appended since the last compaction, dropping a torn final line."""
+
+        if not self.log_file.exists():
+            return
+
+        with open(self.log_file, 'rb') as f:
+            data = f.read()
+
+        complete, _, torn = data.rpartition(b'\n')
+        if torn:
+            logger.warning(f"Discarding incomplete entry at the end of {self.log_file}")
+            with open(self.log_file, 'r+b') as f:
+                f.truncate(len(complete) + 1 if complete else 0)
+
+        for line in complete.decode('utf-8').splitlines():
+            paper_id = line.strip()
+            if paper_id and paper_id not in self:
+                self._recent.add(paper_id)
+                self._bloom.add(paper_id)
+
+    def __contains__(self, paper_id: str) -> bool:
+        if paper_id not in self._bloom:
+            return False
+        if paper_id in self._recent:
+            return True
+        return self._db.execute(
+            "SELECT 1 FROM processed WHERE paper_id = ?", (paper_id,)
+        ).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._indexed_count + len(self._recent)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from (row[0] for row in self._db.execute("SELECT paper_id FROM processed"))
+        yield from list(self._recent)
+
+    def add(self, paper_id: str) -> None:
+        """Mark a single paper as processed."""
+        self.update([paper_id])
+
+    def update(self, paper_ids: Iterable[str]) -> None:
+        """Mark papers as processed, appending only ids not seen before."""
+
+        new_ids = []
+        seen = set()
+        for paper_id in paper_ids:
+            if paper_id not in seen and paper_id not in self:
+                new_ids.append(paper_id)
+            seen.add(paper_id)
+
+        if not new_ids:
+            return
+
+        self._log.write(''.join(f"{paper_id}\n" for paper_id in new_ids))
+        self._log.flush()
+
+        for paper_id in new_ids:
+            self._recent.add(paper_id)
+            self._bloom.add(paper_id)
+
+        if len(self._recent) >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """Move logged ids into the SQLite index and truncate the log."""
+
+        if self._recent:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO processed (paper_id) VALUES (?)",
+                    ((paper_id,) for paper_id in self._recent)
+                )
+            self._indexed_count = self._db.execute("SELECT COUNT(*) FROM processed").fetchone()[0]
+            self._recent.clear()
+
+        self._log.truncate(0)
+        self._log.seek(0)
+
+        # Keep the false positive rate bounded as the ledger grows
+        if self._indexed_count > self._bloom.capacity:
+            self._bloom = BloomFilter(2 * self._indexed_count, self.false_positive_rate)
+            for (paper_id,) in self._db.execute("SELECT paper_id FROM processed"):
+                self._bloom.add(paper_id)
+
+    def close(self) -> None:
+        """Compact outstanding ids and release file handles."""
+
+        if self._log.closed:
+            return
+
+        self.compact()
+        self._log.close()
+        self._db.close()
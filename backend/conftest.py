@@ -3,12 +3,27 @@ Pytest configuration and fixtures for comprehensive testing suite.
 """
 import asyncio
 import os
+import shutil
 import tempfile
 import pytest
 import sqlite3
 from typing import AsyncGenerator, Generator
 from unittest.mock import AsyncMock, MagicMock
 
+def pytest_configure(config):
+    """Keep the persistent embedding store out of the working tree during tests"""
+    if "EMBEDDING_CACHE_DIR" not in os.environ:
+        config.embedding_cache_dir = tempfile.mkdtemp(prefix="embedding_cache_")
+        os.environ["EMBEDDING_CACHE_DIR"] = config.embedding_cache_dir
+
+
+def pytest_unconfigure(config):
+    """Remove the embedding store created for the test session"""
+    cache_dir = getattr(config, "embedding_cache_dir", None)
+    if cache_dir:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        del os.environ["EMBEDDING_CACHE_DIR"]
+
 
 # Simple test fixtures without complex dependencies
 @pytest.fixture(scope="function")
@@ -2,7 +2,7 @@
 Configuration settings for the application
 """
 import os
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -25,13 +25,32 @@ class Settings(BaseSettings):
     OLLAMA_URL: str = "http://localhost:11434"
     OLLAMA_MODEL: str = "mistral"
     EMBEDDING_MODEL: str = "nomic-embed-text"
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    EMBEDDING_MAX_PENDING: int = 1024
+    LLM_MAX_CONCURRENCY: int = 2  # parallel generations per model (OLLAMA_NUM_PARALLEL)
+    LLM_MODEL_CONCURRENCY: str = ""  # per-model overrides, e.g. "llama3.1:70b=1,mistral=4"
+    
+    @property
+    def llm_model_concurrency(self) -> Dict[str, int]:
+        """Convert LLM_MODEL_CONCURRENCY string to a model -> limit mapping"""
+        limits = {}
+        for entry in self.LLM_MODEL_CONCURRENCY.split(","):
+            model, _, limit = entry.strip().rpartition("=")
+            if model and limit.isdigit():
+                limits[model] = int(limit)
+        return limits
     
     # Vector Store
     CHROMA_PERSIST_DIR: str = "./chroma_db"
+    EMBEDDING_CACHE_DIR: str = "./embedding_cache"
+    EMBEDDING_CACHE_DTYPE: str = "float32"  # or float16 to halve stored vectors
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 10000
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_EXPIRE_TIME: int = 3600  # 1 hour default
+    MEMORY_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # in-process cache budget
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -3,6 +3,7 @@ Distributed Tracing System for AI Scholar
 Implements OpenTelemetry-based tracing for performance monitoring and debugging
 """
 
+import re
 import time
 import uuid
 import asyncio
@@ -13,6 +14,8 @@ from functools import wraps
 import logging
 import json
 
+from .quantile_sketch import WindowedSketch
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -227,24 +230,36 @@ class AIOperationTracer:
             yield span
 
 class PerformanceMetrics:
-    """Performance metrics collector"""
+    """
+    Performance metrics collector
+    Durations and histograms are kept as streaming quantile sketches, so
+    recording is O(1) with fixed memory per metric. Summaries cover a rolling
+    window, while Prometheus exposition uses the cumulative sketches.
+    """
+    
+    PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
     
-    def __init__(self):
-        self.metrics: Dict[str, List[float]] = {}
+    def __init__(self, relative_accuracy: float = 0.01, window_seconds: float = 300, window_intervals: int = 5):
+        self.relative_accuracy = relative_accuracy
+        self.interval_seconds = window_seconds / window_intervals
+        self.window_intervals = window_intervals
+        
+        self.metrics: Dict[str, WindowedSketch] = {}
         self.counters: Dict[str, int] = {}
         self.gauges: Dict[str, float] = {}
-        self.histograms: Dict[str, List[float]] = {}
+        self.histograms: Dict[str, WindowedSketch] = {}
+    
+    def _sketch(self, sketches: Dict[str, WindowedSketch], name: str) -> WindowedSketch:
+        sketch = sketches.get(name)
+        if sketch is None:
+            sketch = sketches[name] = WindowedSketch(
+                self.relative_accuracy, self.interval_seconds, self.window_intervals
+            )
+        return sketch
     
     def record_duration(self, metric_name: str, duration: float):
         """Record a duration metric"""
-        if metric_name not in self.metrics:
-            self.metrics[metric_name] = []
-        
-        self.metrics[metric_name].append(duration)
-        
-        # Keep only recent metrics
-        if len(self.metrics[metric_name]) > 1000:
-            self.metrics[metric_name] = self.metrics[metric_name][-1000:]
+        self._sketch(self.metrics, metric_name).add(duration)
     
     def increment_counter(self, counter_name: str, value: int = 1):
         """Increment a counter"""
@@ -258,17 +273,10 @@ class PerformanceMetrics:
     
     def record_histogram(self, histogram_name: str, value: float):
         """Record a histogram value"""
-        if histogram_name not in self.histograms:
-            self.histograms[histogram_name] = []
-        
-        self.histograms[histogram_name].append(value)
-        
-        # Keep only recent values
-        if len(self.histograms[histogram_name]) > 1000:
-            self.histograms[histogram_name] = self.histograms[histogram_name][-1000:]
+        self._sketch(self.histograms, histogram_name).add(value)
     
     def get_metrics_summary(self) -> Dict[str, Any]:
-        """Get summary of all metrics"""
+        """Get summary of all metrics over the rolling window"""
         summary = {
             "counters": self.counters.copy(),
             "gauges": self.gauges.copy(),
@@ -276,43 +284,78 @@ class PerformanceMetrics:
             "histograms": {}
         }
         
-        # Calculate duration statistics
-        for name, durations in self.metrics.items():
-            if durations:
-                summary["durations"][name] = {
-                    "count": len(durations),
-                    "avg": sum(durations) / len(durations),
-                    "min": min(durations),
-                    "max": max(durations),
-                    "p50": self._percentile(durations, 50),
-                    "p95": self._percentile(durations, 95),
-                    "p99": self._percentile(durations, 99)
-                }
-        
-        # Calculate histogram statistics
-        for name, values in self.histograms.items():
-            if values:
-                summary["histograms"][name] = {
-                    "count": len(values),
-                    "avg": sum(values) / len(values),
-                    "min": min(values),
-                    "max": max(values),
-                    "p50": self._percentile(values, 50),
-                    "p95": self._percentile(values, 95),
-                    "p99": self._percentile(values, 99)
-                }
+        for section, sketches in (("durations", self.metrics), ("histograms", self.histograms)):
+            for name, sketch in sketches.items():
+                recent = sketch.recent()
+                if recent.count:
+                    summary[section][name] = {**recent.summary(), "total_count": sketch.total.count}
         
         return summary
     
-    def _percentile(self, values: List[float], percentile: int) -> float:
-        """Calculate percentile of values"""
-        if not values:
-            return 0.0
-        
-        sorted_values = sorted(values)
-        index = int((percentile / 100.0) * len(sorted_values))
-        index = min(index, len(sorted_values) - 1)
-        return sorted_values[index]
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable state, for merging metrics from other worker processes"""
+        return {
+            "counters": self.counters.copy(),
+            "gauges": self.gauges.copy(),
+            "durations": {name: sketch.to_dict() for name, sketch in self.metrics.items()},
+            "histograms": {name: sketch.to_dict() for name, sketch in self.histograms.items()}
+        }
+    
+    def merge_snapshot(self, snapshot: Dict[str, Any]):
+        """Merge another process's snapshot into these metrics"""
+        for name, value in snapshot.get("counters", {}).items():
+            self.increment_counter(name, value)
+        self.gauges.update(snapshot.get("gauges", {}))
+        
+        for section, sketches in (("durations", self.metrics), ("histograms", self.histograms)):
+            for name, data in snapshot.get(section, {}).items():
+                other = WindowedSketch.from_dict(data)
+                if name in sketches:
+                    sketches[name].merge(other)
+                else:
+                    sketches[name] = other
+    
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        
+        for name, value in sorted(self.counters.items()):
+            metric = _prometheus_name(name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        
+        for name, value in sorted(self.gauges.items()):
+            metric = _prometheus_name(name)
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        
+        # Durations use fixed latency buckets so they aggregate across instances
+        for name, windowed in sorted(self.metrics.items()):
+            sketch = windowed.total
+            metric = _prometheus_name(name)
+            lines.append(f"# TYPE {metric} histogram")
+            for bound in self.PROMETHEUS_BUCKETS:
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {sketch.count_at_most(bound)}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {sketch.count}')
+            lines.append(f"{metric}_sum {sketch.sum}")
+            lines.append(f"{metric}_count {sketch.count}")
+        
+        # Other histograms have no known scale, so expose their quantiles
+        for name, windowed in sorted(self.histograms.items()):
+            sketch = windowed.total
+            metric = _prometheus_name(name)
+            lines.append(f"# TYPE {metric} summary")
+            for quantile in (0.5, 0.95, 0.99):
+                lines.append(f'{metric}{{quantile="{quantile}"}} {sketch.quantile(quantile)}')
+            lines.append(f"{metric}_sum {sketch.sum}")
+            lines.append(f"{metric}_count {sketch.count}")
+        
+        return "\n".join(lines) + "\n"
+
+def _prometheus_name(name: str) -> str:
+    """Convert a metric name like "span.rag.query.duration" into a valid Prometheus name"""
+    metric = re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+    return metric if not metric[0].isdigit() else "_" + metric
 
 class SpanProcessor:
     """Base span processor"""
@@ -57,16 +57,49 @@ class MultiLevelCache:
         # L3 Cache: Redis (persistent across restarts)
         # Redis client is L3
         
+        # Fetches in progress, shared by concurrent misses on the same key
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
         self.stats = {
             'l1_hits': 0,
             'l2_hits': 0,
             'l3_hits': 0,
             'misses': 0,
             'sets': 0,
-            'errors': 0
+            'errors': 0,
+            'coalesced_fetches': 0
         }
     
-    async def get(self, key: str, config: CacheConfig = None) -> Optional[Any]:
+    async def get(self, key: str, config: CacheConfig = None,
+                  fetch_function: Optional[Callable] = None) -> Optional[Any]:
+        """Get value from cache, calling fetch_function once per key on a miss"""
+        value = await self._get_cached(key, config)
+        if value is not None or fetch_function is None:
+            return value
+        
+        config = config or CacheConfig()
+        cache_key = f"{config.key_prefix}{key}"
+        task = self._inflight.get(cache_key)
+        if task is not None:
+            self.stats['coalesced_fetches'] += 1
+        else:
+            task = asyncio.ensure_future(self._fetch_and_set(key, fetch_function, config))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        
+        # Shield so a cancelled waiter does not cancel the fetch for the others
+        return await asyncio.shield(task)
+    
+    async def _fetch_and_set(self, key: str, fetch_function: Callable, config: CacheConfig) -> Any:
+        """Fetch a missing value and store it in all cache levels"""
+        value = fetch_function()
+        if asyncio.iscoroutine(value) or isinstance(value, asyncio.Future):
+            value = await value
+        if value is not None:
+            await self.set(key, value, config)
+        return value
+    
+    async def _get_cached(self, key: str, config: CacheConfig = None) -> Optional[Any]:
         """Get value from cache with fallback through levels"""
         config = config or CacheConfig()
         cache_key = f"{config.key_prefix}{key}"
@@ -263,6 +296,7 @@ class MultiLevelCache:
             'hit_rate': round(hit_rate, 3),
             'l1_size': len(self.l1_cache),
             'l2_size': len(self.l2_cache),
+            'inflight_fetches': len(self._inflight),
             'redis_available': self.redis is not None
         }
     
@@ -274,7 +308,8 @@ class MultiLevelCache:
             'l3_hits': 0,
             'misses': 0,
             'sets': 0,
-            'errors': 0
+            'errors': 0,
+            'coalesced_fetches': 0
         }
 
 # Cache decorators
@@ -295,19 +330,13 @@ def cached(config: CacheConfig = None):
             key_str = json.dumps(key_data, sort_keys=True, default=str)
             key_hash = hashlib.md5(key_str.encode()).hexdigest()
             
-            # Try to get from cache
-            if cache_instance:
-                cached_result = await cache_instance.get(key_hash, config)
-                if cached_result is not None:
-                    return cached_result
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            
+            # Serve from cache; concurrent misses share one call of func
             if cache_instance:
-                await cache_instance.set(key_hash, result, config)
+                return await cache_instance.get(
+                    key_hash, config, fetch_function=lambda: func(*args, **kwargs)
+                )
             
-            return result
+            return await func(*args, **kwargs)
         return wrapper
     return decorator
 
@@ -0,0 +1,304 @@
+"""
+Streaming quantile sketches for performance metrics
+Implements a DDSketch-style log-bucketed histogram: recording a value is O(1),
+memory is bounded by a fixed number of buckets, quantiles are accurate to a
+configurable relative error, and sketches merge exactly by adding bucket
+counts, so sketches from different worker processes or time windows can be
+combined.
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class _BucketStore:
+    """Dense bucket counts for a contiguous range of bucket keys"""
+
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        self.counts: List[int] = []
+        self.offset = 0
+        self.total = 0
+
+    def add(self, key: int, count: int = 1):
+        if not self.counts:
+            self.counts = [0]
+            self.offset = key
+        elif key < self.offset or key >= self.offset + len(self.counts):
+            self._extend(key)
+        # Keys below the kept range were collapsed into the lowest bucket
+        index = max(key - self.offset, 0)
+        self.counts[index] += count
+        self.total += count
+
+    def _extend(self, key: int):
+        low = min(key, self.offset)
+        high = max(key, self.offset + len(self.counts) - 1)
+        if high - low + 1 > self.max_buckets:
+            # Keep the highest buckets: upper quantiles matter most for latencies
+            low = high - self.max_buckets + 1
+        new_counts = [0] * (high - low + 1)
+        for index, count in enumerate(self.counts):
+            if count:
+                new_counts[max(self.offset + index - low, 0)] += count
+        self.counts = new_counts
+        self.offset = low
+
+    def merge(self, other: "_BucketStore"):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.add(other.offset + index, count)
+
+    def key_at_rank(self, rank: float) -> int:
+        """Key of the bucket holding the value of the given 0-based rank"""
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running > rank:
+                return self.offset + index
+        return self.offset + len(self.counts) - 1
+
+    def items(self) -> Iterable[Tuple[int, int]]:
+        for index, count in enumerate(self.counts):
+            if count:
+                yield self.offset + index, count
+
+    def clear(self):
+        self.counts = []
+        self.offset = 0
+        self.total = 0
+
+
+class QuantileSketch:
+    """
+    Quantile sketch with relative accuracy ``relative_accuracy``.
+
+    Positive and negative values are kept in logarithmically sized buckets;
+    values too close to zero to index are counted as zero. When more than
+    ``max_buckets`` buckets are needed, the lowest ones are collapsed, which
+    only affects quantiles near the minimum.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        # Magnitudes at or below this are counted as zero
+        self.min_indexable = 1e-9
+
+        self.positive = _BucketStore(max_buckets)
+        self.negative = _BucketStore(max_buckets)
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # Midpoint (in relative terms) of the bucket (gamma^(key-1), gamma^key]
+        return 2 * self.gamma ** key / (1 + self.gamma)
+
+    def add(self, value: float):
+        """Record a value"""
+        if value > self.min_indexable:
+            self.positive.add(self._key(value))
+        elif value < -self.min_indexable:
+            self.negative.add(self._key(-value))
+        else:
+            self.zero_count += 1
+
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "QuantileSketch"):
+        """Add another sketch's values to this one"""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if other.count == 0:
+            return
+
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile q (0 to 1), or 0.0 when empty"""
+        if self.count == 0:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        if rank < self.negative.total:
+            # Negative buckets are ordered by magnitude, so count from the top
+            key = self.negative.key_at_rank(self.negative.total - 1 - rank)
+            value = -self._value(key)
+        elif rank < self.negative.total + self.zero_count:
+            value = 0.0
+        else:
+            key = self.positive.key_at_rank(rank - self.negative.total - self.zero_count)
+            value = self._value(key)
+
+        return min(max(value, self.min), self.max)
+
+    def count_at_most(self, bound: float) -> int:
+        """Approximate number of recorded values <= bound"""
+        total = 0
+        for key, count in self.negative.items():
+            if -self._value(key) <= bound:
+                total += count
+        if bound >= 0:
+            total += self.zero_count
+        for key, count in self.positive.items():
+            if self._value(key) <= bound:
+                total += count
+        return total
+
+    @property
+    def avg(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Count, average, extremes and the usual percentiles"""
+        return {
+            "count": self.count,
+            "avg": self.avg,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, for merging sketches across processes"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "positive": [self.positive.offset, self.positive.counts],
+            "negative": [self.negative.offset, self.negative.counts],
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        for store, (offset, counts) in (
+            (sketch.positive, data["positive"]),
+            (sketch.negative, data["negative"])
+        ):
+            store.offset = offset
+            store.counts = list(counts)
+            store.total = sum(counts)
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+    def copy(self) -> "QuantileSketch":
+        return QuantileSketch.from_dict(self.to_dict())
+
+    def clear(self):
+        self.positive.clear()
+        self.negative.clear()
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+
+class WindowedSketch:
+    """
+    A cumulative sketch plus a rolling window of per-interval sketches.
+
+    The window covers the last ``window_intervals`` intervals of
+    ``interval_seconds`` each and is rotated lazily on record and read, so
+    recent quantiles are available without keeping raw values.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        interval_seconds: float = 60,
+        window_intervals: int = 5
+    ):
+        self.relative_accuracy = relative_accuracy
+        self.interval_seconds = interval_seconds
+        self.total = QuantileSketch(relative_accuracy)
+        self._intervals: List[Tuple[int, QuantileSketch]] = []
+        self._window_intervals = window_intervals
+
+    def _current_interval(self, now: Optional[float] = None) -> int:
+        return int((time.time() if now is None else now) // self.interval_seconds)
+
+    def _expire(self, interval: int):
+        oldest = interval - self._window_intervals + 1
+        while self._intervals and self._intervals[0][0] < oldest:
+            self._intervals.pop(0)
+
+    def add(self, value: float, now: Optional[float] = None):
+        interval = self._current_interval(now)
+        if not self._intervals or self._intervals[-1][0] != interval:
+            self._expire(interval)
+            self._intervals.append((interval, QuantileSketch(self.relative_accuracy)))
+        self._intervals[-1][1].add(value)
+        self.total.add(value)
+
+    def recent(self, now: Optional[float] = None) -> QuantileSketch:
+        """Values recorded within the rolling window, merged into one sketch"""
+        self._expire(self._current_interval(now))
+        merged = QuantileSketch(self.relative_accuracy)
+        for _, sketch in self._intervals:
+            merged.merge(sketch)
+        return merged
+
+    def merge(self, other: "WindowedSketch"):
+        """Add another windowed sketch's values, aligning intervals"""
+        self.total.merge(other.total)
+        intervals = dict(self._intervals)
+        for interval, sketch in other._intervals:
+            if interval in intervals:
+                intervals[interval].merge(sketch)
+            else:
+                intervals[interval] = sketch.copy()
+        self._intervals = sorted(intervals.items())[-self._window_intervals:]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "window_intervals": self._window_intervals,
+            "total": self.total.to_dict(),
+            "intervals": [[interval, sketch.to_dict()] for interval, sketch in self._intervals]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WindowedSketch":
+        total = QuantileSketch.from_dict(data["total"])
+        windowed = cls(total.relative_accuracy, data["interval_seconds"], data["window_intervals"])
+        windowed.total = total
+        windowed._intervals = [
+            (interval, QuantileSketch.from_dict(sketch)) for interval, sketch in data["intervals"]
+        ]
+        return windowed
@@ -11,6 +11,15 @@ from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Range-and-remove in one step, so concurrent consumers never pop the same member
+_ZPOPBYSCORE_SCRIPT = """
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #members > 0 then
+    redis.call('ZREM', KEYS[1], unpack(members))
+end
+return members
+"""
+
 class RedisClient:
     """Redis client for caching and session management"""
     
@@ -173,6 +182,18 @@ class RedisClient:
             logger.error(f"Error deleting Redis hash fields {name}: {e}")
             return False
     
+    async def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        """Atomically increment a hash field, returning its new value"""
+        if not self.redis_client:
+            return 0
+        
+        try:
+            result = await self.redis_client.hincrby(name, key, amount)
+            return result
+        except Exception as e:
+            logger.error(f"Error incrementing Redis hash field {name}:{key}: {e}")
+            return 0
+    
     async def lpush(self, key: str, *values: Any) -> int:
         """Push values to the left of a list"""
         if not self.redis_client:
@@ -256,6 +277,25 @@ class RedisClient:
             logger.error(f"Error blocking pop from Redis list {key}: {e}")
             return None
     
+    async def rpop(self, key: str, count: int = 1) -> List[Any]:
+        """Pop up to count values from the right of a list without blocking"""
+        if not self.redis_client:
+            return []
+        
+        try:
+            result = await self.redis_client.rpop(key, count)
+            # Try to deserialize JSON values
+            deserialized_result = []
+            for value in result or []:
+                try:
+                    deserialized_result.append(json.loads(value))
+                except json.JSONDecodeError:
+                    deserialized_result.append(value)
+            return deserialized_result
+        except Exception as e:
+            logger.error(f"Error popping from Redis list {key}: {e}")
+            return []
+    
     async def sadd(self, key: str, *values: Any) -> int:
         """Add members to a set"""
         if not self.redis_client:
@@ -315,6 +355,68 @@ class RedisClient:
             logger.error(f"Error removing from Redis set {key}: {e}")
             return 0
     
+    async def zadd(self, key: str, mapping: Dict[Any, float]) -> int:
+        """Add members with scores to a sorted set"""
+        if not self.redis_client:
+            return 0
+        
+        try:
+            # Serialize members that are not strings
+            serialized_mapping = {
+                member if isinstance(member, str) else json.dumps(member): score
+                for member, score in mapping.items()
+            }
+            result = await self.redis_client.zadd(key, serialized_mapping)
+            return result
+        except Exception as e:
+            logger.error(f"Error adding to Redis sorted set {key}: {e}")
+            return 0
+    
+    async def zrange(self, key: str, start: int, end: int, withscores: bool = False) -> List[Any]:
+        """Get a range of members from a sorted set, lowest score first"""
+        if not self.redis_client:
+            return []
+        
+        try:
+            result = await self.redis_client.zrange(key, start, end, withscores=withscores)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting Redis sorted set range {key}: {e}")
+            return []
+    
+    async def zcard(self, key: str) -> int:
+        """Get the number of members in a sorted set"""
+        if not self.redis_client:
+            return 0
+        
+        try:
+            result = await self.redis_client.zcard(key)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting Redis sorted set size {key}: {e}")
+            return 0
+    
+    async def zpopbyscore(self, key: str, max_score: float, count: int) -> List[Any]:
+        """Atomically remove and return up to count members scored at most max_score"""
+        if not self.redis_client:
+            return []
+        
+        try:
+            result = await self.redis_client.eval(
+                _ZPOPBYSCORE_SCRIPT, 1, key, max_score, count
+            )
+            # Try to deserialize JSON values
+            deserialized_result = []
+            for value in result:
+                try:
+                    deserialized_result.append(json.loads(value))
+                except json.JSONDecodeError:
+                    deserialized_result.append(value)
+            return deserialized_result
+        except Exception as e:
+            logger.error(f"Error popping by score from Redis sorted set {key}: {e}")
+            return []
+    
     async def keys(self, pattern: str) -> List[str]:
         """Get keys matching a pattern"""
         if not self.redis_client:
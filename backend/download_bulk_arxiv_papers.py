@@ -210,6 +210,7 @@ async def main():
     print(f"Mode: {'Dry Run' if args.dry_run else 'Full Processing'}")
     print("=" * 60)
     
+    downloader = None
     try:
         # Create downloader
         downloader = ArxivBulkDownloader(
@@ -333,6 +334,10 @@ async def main():
         logger.error(f"Unexpected error: {e}", exc_info=True)
         print(f"❌ Unexpected error: {e}")
         print("Check the logs for detailed error information")
+    
+    finally:
+        if downloader is not None:
+            downloader.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+-- Migration: Add full-text search index for Zotero items
+-- Description: Adds a weighted tsvector column kept current by trigger, a GIN index over it, and backfills existing items
+
+-- Add search vector column to zotero_items
+ALTER TABLE zotero.zotero_items
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+
+-- Build the weighted document for an item:
+--   A: title
+--   B: creator names, tags
+--   C: abstract, publication title
+--   D: publisher, DOI, URL
+-- DOI and URL punctuation is replaced by spaces so their parts match like words
+CREATE OR REPLACE FUNCTION zotero.zotero_item_search_vector(
+    p_title TEXT,
+    p_creators JSONB,
+    p_tags JSONB,
+    p_abstract_note TEXT,
+    p_publication_title TEXT,
+    p_publisher TEXT,
+    p_doi TEXT,
+    p_url TEXT
+) RETURNS TSVECTOR AS $$
+    SELECT
+        setweight(to_tsvector('english', coalesce(p_title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce((
+            SELECT string_agg(concat_ws(' ', creator->>'name', creator->>'first_name', creator->>'last_name'), ' ')
+            FROM jsonb_array_elements(
+                CASE WHEN jsonb_typeof(p_creators) = 'array' THEN p_creators ELSE '[]'::jsonb END
+            ) AS creator
+        ), '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce((
+            SELECT string_agg(tag, ' ')
+            FROM jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(p_tags) = 'array' THEN p_tags ELSE '[]'::jsonb END
+            ) AS tag
+        ), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(p_abstract_note, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(p_publication_title, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(p_publisher, '')), 'D') ||
+        setweight(to_tsvector('simple', regexp_replace(coalesce(p_doi, ''), '\W+', ' ', 'g')), 'D') ||
+        setweight(to_tsvector('simple', regexp_replace(coalesce(p_url, ''), '\W+', ' ', 'g')), 'D')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Keep search_vector current on every insert and on updates to searchable fields
+CREATE OR REPLACE FUNCTION zotero.update_zotero_item_search_vector()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector := zotero.zotero_item_search_vector(
+        NEW.title, NEW.creators, NEW.tags, NEW.abstract_note,
+        NEW.publication_title, NEW.publisher, NEW.doi, NEW.url
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_zotero_item_search_vector ON zotero.zotero_items;
+CREATE TRIGGER update_zotero_item_search_vector
+    BEFORE INSERT OR UPDATE OF title, creators, tags, abstract_note, publication_title, publisher, doi, url
+    ON zotero.zotero_items
+    FOR EACH ROW EXECUTE FUNCTION zotero.update_zotero_item_search_vector();
+
+-- Backfill items synced before this migration
+UPDATE zotero.zotero_items
+SET search_vector = zotero.zotero_item_search_vector(
+    title, creators, tags, abstract_note, publication_title, publisher, doi, url
+)
+WHERE search_vector IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_zotero_items_search_vector
+    ON zotero.zotero_items USING GIN (search_vector);
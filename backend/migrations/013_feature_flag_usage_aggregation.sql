@@ -0,0 +1,14 @@
+-- Migration: Aggregate feature flag usage per flush window
+-- Description: Usage rows now count every evaluation with the same flag, user, result, rule and environment
+-- since the last flush, instead of recording one row (with its request context) per check
+
+-- Number of evaluations a usage row stands for; rows written per check count once
+ALTER TABLE feature_flag_usage
+ADD COLUMN IF NOT EXISTS request_count INTEGER NOT NULL DEFAULT 1;
+
+-- Per-check request context is no longer recorded
+ALTER TABLE feature_flag_usage
+DROP COLUMN IF EXISTS session_id;
+
+ALTER TABLE feature_flag_usage
+DROP COLUMN IF EXISTS metadata;
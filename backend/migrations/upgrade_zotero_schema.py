@@ -167,7 +167,8 @@ class ZoteroMigrationManager:
             "007_zotero_annotation_sync_tables.sql",
             "008_zotero_monitoring_tables.sql",
             "009_zotero_performance_indexes.sql",
-            "010_zotero_security_enhancements.sql"
+            "010_zotero_security_enhancements.sql",
+            "012_zotero_item_search_index.sql"
         ]
         
         for migration_name in migration_names:
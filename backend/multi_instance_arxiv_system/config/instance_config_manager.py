@@ -100,7 +100,13 @@ class InstanceConfigManager(ConfigManager):
                 'max_concurrent_processing': 3,
                 'retry_attempts': 3,
                 'timeout_seconds': 300,
-                'memory_limit_mb': 4096
+                'memory_limit_mb': 4096,
+                'extraction_workers': 0,
+                'embedding_batch_size': 256,
+                'max_concurrent_embedding': 1,
+                'write_batch_size': 512,
+                'max_concurrent_writes': 1,
+                'pipeline_queue_size': 32
             },
             'vector_store': {
                 'collection_name': f'{instance_name}_papers',
@@ -157,6 +163,9 @@ class InstanceConfigManager(ConfigManager):
             f'{self.instance_name.upper()}_RETRY_ATTEMPTS': ['processing', 'retry_attempts'],
             f'{self.instance_name.upper()}_TIMEOUT': ['processing', 'timeout_seconds'],
             f'{self.instance_name.upper()}_MEMORY_LIMIT': ['processing', 'memory_limit_mb'],
+            f'{self.instance_name.upper()}_EXTRACTION_WORKERS': ['processing', 'extraction_workers'],
+            f'{self.instance_name.upper()}_EMBEDDING_BATCH_SIZE': ['processing', 'embedding_batch_size'],
+            f'{self.instance_name.upper()}_WRITE_BATCH_SIZE': ['processing', 'write_batch_size'],
             
             # Vector store settings
             f'{self.instance_name.upper()}_COLLECTION_NAME': ['vector_store', 'collection_name'],
@@ -229,7 +238,13 @@ class InstanceConfigManager(ConfigManager):
             max_concurrent_processing=processing_info.get('max_concurrent_processing', 3),
             retry_attempts=processing_info.get('retry_attempts', 3),
             timeout_seconds=processing_info.get('timeout_seconds', 300),
-            memory_limit_mb=processing_info.get('memory_limit_mb', 4096)
+            memory_limit_mb=processing_info.get('memory_limit_mb', 4096),
+            extraction_workers=processing_info.get('extraction_workers', 0),
+            embedding_batch_size=processing_info.get('embedding_batch_size', 256),
+            max_concurrent_embedding=processing_info.get('max_concurrent_embedding', 1),
+            write_batch_size=processing_info.get('write_batch_size', 512),
+            max_concurrent_writes=processing_info.get('max_concurrent_writes', 1),
+            pipeline_queue_size=processing_info.get('pipeline_queue_size', 32)
         )
         
         vector_store_config = VectorStoreConfig(
@@ -15,7 +15,7 @@ import time
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Union
 import requests
 import aiohttp
 import aiofiles
@@ -37,6 +37,7 @@ from ..processors.ai_scholar_processor import AIScholarProcessor
 from ..error_handling.ai_scholar_error_handler import (
     AIScholarErrorHandler, ErrorCategory, ErrorSeverity
 )
+from arxiv_rag_enhancement.shared.processed_ledger import ProcessedPaperLedger
 
 # Import existing services
 try:
@@ -430,8 +431,8 @@ class AIScholarDownloader(BaseScholarDownloader):
         # Initialize enhanced error handler
         self.ai_error_handler: Optional[AIScholarErrorHandler] = None
         
-        # Track processed papers for duplicate detection
-        self.processed_papers: Set[str] = set()
+        # Track processed papers for duplicate detection (a ledger once initialized)
+        self.processed_papers: Union[Set[str], ProcessedPaperLedger] = set()
         
         logger.info(f"AIScholarDownloader initialized for categories: {self.config.arxiv_categories}")
     
@@ -650,6 +651,12 @@ class AIScholarDownloader(BaseScholarDownloader):
             # Use the AI Scholar processor to process papers
             result = await self.processor.process_papers(pdf_paths)
             
+            # Record finished papers so later runs skip them
+            self.processed_papers.update(
+                arxiv_id for arxiv_id in map(self._extract_arxiv_id_from_path, result.processed_papers)
+                if arxiv_id
+            )
+            
             # Update progress tracker
             if self.progress_tracker:
                 self.progress_tracker.complete_operation("paper_processing")
@@ -708,26 +715,27 @@ class AIScholarDownloader(BaseScholarDownloader):
         return None
     
     async def load_processed_papers(self) -> None:
-        """Load list of already processed papers to avoid duplicates."""
+        """Open the processed paper ledger used to avoid duplicates."""
         try:
-            processed_list = []
+            self.processed_papers = ProcessedPaperLedger(
+                Path(self.config.storage_paths.state_directory) / "processed_papers.ledger"
+            )
             
-            # Load from state manager if available
-            if self.state_manager:
+            # Seed a new ledger from the state manager's processed files
+            if self.state_manager and len(self.processed_papers) == 0:
                 state = self.state_manager.load_instance_state(self.instance_name)
                 if state and hasattr(state, 'processed_files'):
                     # Extract arXiv IDs from processed files
-                    for file_path in state.processed_files:
-                        arxiv_id = self._extract_arxiv_id_from_path(file_path)
-                        if arxiv_id:
-                            self.processed_papers.add(arxiv_id)
-                            processed_list.append(arxiv_id)
-                    
-                    logger.info(f"Loaded {len(self.processed_papers)} processed papers from state")
+                    self.processed_papers.update(
+                        arxiv_id for arxiv_id in map(self._extract_arxiv_id_from_path, state.processed_files)
+                        if arxiv_id
+                    )
+            
+            logger.info(f"Loaded {len(self.processed_papers)} processed papers")
             
             # Load into processor if available
             if self.processor:
-                self.processor.load_processed_documents(processed_list)
+                self.processor.load_processed_documents(list(self.processed_papers))
             
             # Also check vector store for existing documents
             if self.processor and self.processor.vector_store:
@@ -749,6 +757,12 @@ class AIScholarDownloader(BaseScholarDownloader):
                 )
             logger.error(f"Failed to load processed papers: {e}")
     
+    def shutdown(self) -> None:
+        """Close the processed paper ledger, then shut the downloader down."""
+        if isinstance(self.processed_papers, ProcessedPaperLedger):
+            self.processed_papers.close()
+        super().shutdown()
+    
     def get_ai_scholar_stats(self) -> Dict[str, Any]:
         """Get comprehensive AI Scholar statistics."""
         base_stats = self.get_instance_stats()
@@ -5,9 +5,13 @@ Contains specialized processing pipelines for different scholar instances.
 """
 
 from .ai_scholar_processor import AIScholarProcessor, MultiInstanceVectorStoreService, ScientificChunker
+from .ingestion_pipeline import IngestionJob, IngestionPipeline, StageMetrics
 
 __all__ = [
     'AIScholarProcessor',
     'MultiInstanceVectorStoreService', 
-    'ScientificChunker'
+    'ScientificChunker',
+    'IngestionJob',
+    'IngestionPipeline',
+    'StageMetrics'
 ]
\ No newline at end of file
@@ -13,9 +13,10 @@ import logging
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple
 import json
 import hashlib
+from functools import partial
 
 # Add backend to path for imports
 sys.path.append(str(Path(__file__).parent.parent.parent))
@@ -23,6 +24,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from ..shared.multi_instance_data_models import (
     ArxivPaper, InstanceConfig, ProcessingResult
 )
+from .ingestion_pipeline import IngestionJob, IngestionPipeline
 
 # Import existing services
 try:
@@ -125,48 +127,7 @@ class MultiInstanceVectorStoreService:
             Dictionary with addition results
         """
         try:
-            # Enhance chunks with instance-specific metadata
-            enhanced_chunks = []
-            for chunk in chunks:
-                enhanced_chunk = chunk.copy()
-                
-                # Add instance metadata (handle both ArxivPaper and JournalPaper)
-                document_metadata = {
-                    'instance_name': self.instance_name,
-                    'paper_id': paper.paper_id,
-                    'title': paper.title,
-                    'authors': paper.authors,
-                    'published_date': paper.published_date.isoformat(),
-                    'source_type': paper.source_type,
-                    'pdf_url': getattr(paper, 'pdf_url', ''),
-                    'doi': getattr(paper, 'doi', None)
-                }
-                
-                # Add source-specific metadata
-                if hasattr(paper, 'arxiv_id'):  # ArxivPaper
-                    document_metadata.update({
-                        'arxiv_id': paper.arxiv_id,
-                        'categories': getattr(paper, 'categories', [])
-                    })
-                elif hasattr(paper, 'journal_name'):  # JournalPaper
-                    document_metadata.update({
-                        'journal_name': paper.journal_name,
-                        'volume': getattr(paper, 'volume', None),
-                        'issue': getattr(paper, 'issue', None),
-                        'pages': getattr(paper, 'pages', None),
-                        'journal_url': getattr(paper, 'journal_url', '')
-                    })
-                
-                enhanced_chunk['document_metadata'] = document_metadata
-                
-                # Add processing metadata
-                enhanced_chunk['processing_metadata'] = {
-                    'processed_at': datetime.now().isoformat(),
-                    'processor_version': '1.0.0',
-                    'instance_collection': self.collection_name
-                }
-                
-                enhanced_chunks.append(enhanced_chunk)
+            enhanced_chunks = self._enhance_chunks(paper, chunks)
             
             # Use base service to add chunks
             document_id = paper.get_document_id()
@@ -181,6 +142,79 @@ class MultiInstanceVectorStoreService:
             logger.error(f"Failed to add document to instance collection: {e}")
             raise
     
+    def _enhance_chunks(self, paper: Any, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach instance, paper and processing metadata to chunks."""
+        # Enhance chunks with instance-specific metadata
+        enhanced_chunks = []
+        for chunk in chunks:
+            enhanced_chunk = chunk.copy()
+
+            # Add instance metadata (handle both ArxivPaper and JournalPaper)
+            document_metadata = {
+                'instance_name': self.instance_name,
+                'paper_id': paper.paper_id,
+                'title': paper.title,
+                'authors': paper.authors,
+                'published_date': paper.published_date.isoformat(),
+                'source_type': paper.source_type,
+                'pdf_url': getattr(paper, 'pdf_url', ''),
+                'doi': getattr(paper, 'doi', None)
+            }
+
+            # Add source-specific metadata
+            if hasattr(paper, 'arxiv_id'):  # ArxivPaper
+                document_metadata.update({
+                    'arxiv_id': paper.arxiv_id,
+                    'categories': getattr(paper, 'categories', [])
+                })
+            elif hasattr(paper, 'journal_name'):  # JournalPaper
+                document_metadata.update({
+                    'journal_name': paper.journal_name,
+                    'volume': getattr(paper, 'volume', None),
+                    'issue': getattr(paper, 'issue', None),
+                    'pages': getattr(paper, 'pages', None),
+                    'journal_url': getattr(paper, 'journal_url', '')
+                })
+
+            enhanced_chunk['document_metadata'] = document_metadata
+
+            # Add processing metadata
+            enhanced_chunk['processing_metadata'] = {
+                'processed_at': datetime.now().isoformat(),
+                'processor_version': '1.0.0',
+                'instance_collection': self.collection_name
+            }
+
+            enhanced_chunks.append(enhanced_chunk)
+
+        return enhanced_chunks
+    
+    def prepare_instance_chunks(self,
+                                paper: Any,
+                                chunks: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """
+        Build the ChromaDB texts, metadatas and ids for a paper without writing them.
+        
+        Used by the ingestion pipeline to embed and write chunks of several
+        papers in one batch.
+        """
+        return self.base_service.prepare_document_chunks(
+            paper.get_document_id(),
+            self._enhance_chunks(paper, chunks)
+        )
+    
+    async def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with the instance collection's embedding model."""
+        return await self.base_service.encode_texts(texts)
+    
+    async def add_embedded_chunks(self,
+                                  texts: List[str],
+                                  metadatas: List[Dict[str, Any]],
+                                  ids: List[str],
+                                  embeddings: List[List[float]]) -> None:
+        """Write already embedded chunks to the instance collection."""
+        await self.base_service.add_embedded_chunks(texts, metadatas, ids, embeddings)
+    
     async def search_instance_papers(self, 
                                    query: str, 
                                    n_results: int = 10,
@@ -491,6 +525,9 @@ class AIScholarProcessor:
         # Track processed documents
         self.processed_documents: Set[str] = set()
         
+        # Per-stage metrics of the last ingestion pipeline run
+        self.last_pipeline_metrics: Dict[str, Dict[str, Any]] = {}
+        
         logger.info(f"AIScholarProcessor initialized for instance '{self.instance_name}'")
     
     async def initialize(self) -> bool:
@@ -551,140 +588,69 @@ class AIScholarProcessor:
         
         logger.info(f"Processing {len(pdf_paths)} PDFs for AI Scholar")
         
+        jobs = []
+        queued_ids: Set[str] = set()
         for pdf_path in pdf_paths:
-            try:
-                success = await self._process_single_pdf(pdf_path)
-                
-                if success:
-                    result.processed_papers.append(pdf_path)
-                else:
-                    result.failed_papers.append(pdf_path)
-                    
-            except Exception as e:
-                result.failed_papers.append(pdf_path)
-                logger.error(f"Failed to process {pdf_path}: {e}")
-        
-        logger.info(f"Processing completed: {result.success_count} successful, "
-                   f"{result.failure_count} failed")
-        
-        return result
-    
-    async def _process_single_pdf(self, pdf_path: str) -> bool:
-        """Process a single PDF file with comprehensive error handling."""
-        try:
-            pdf_file = Path(pdf_path)
-            if not pdf_file.exists():
-                error_msg = f"PDF file not found: {pdf_path}"
-                logger.error(error_msg)
+            if not Path(pdf_path).exists():
                 self._log_processing_error(
-                    Exception(error_msg),
+                    Exception(f"PDF file not found: {pdf_path}"),
                     {'pdf_path': pdf_path, 'operation': 'file_validation'},
                     'file_not_found'
                 )
-                return False
+                result.failed_papers.append(pdf_path)
+                continue
             
-            # Extract arXiv ID from filename
             arxiv_id = self._extract_arxiv_id_from_path(pdf_path)
             if not arxiv_id:
-                error_msg = f"Could not extract arXiv ID from {pdf_path}"
-                logger.error(error_msg)
                 self._log_processing_error(
-                    Exception(error_msg),
+                    Exception(f"Could not extract arXiv ID from {pdf_path}"),
                     {'pdf_path': pdf_path, 'operation': 'arxiv_id_extraction'},
                     'metadata_extraction_error'
                 )
-                return False
+                result.failed_papers.append(pdf_path)
+                continue
             
-            # Check if already processed
-            if arxiv_id in self.processed_documents:
+            # Check if already processed (or queued in this call)
+            if arxiv_id in self.processed_documents or arxiv_id in queued_ids:
                 logger.debug(f"Skipping already processed paper: {arxiv_id}")
-                return True
-            
-            # Extract content from PDF with error handling
-            logger.debug(f"Extracting content from {pdf_path}")
-            try:
-                content = self.pdf_processor.extract_comprehensive_content(pdf_path)
-            except Exception as e:
-                self._log_processing_error(
-                    e,
-                    {'pdf_path': pdf_path, 'arxiv_id': arxiv_id, 'operation': 'pdf_extraction'},
-                    'pdf_processing_error'
-                )
-                logger.error(f"Failed to extract content from {pdf_path}: {e}")
-                return False
-            
-            if not content or not content.get('full_text'):
-                error_msg = f"No text extracted from {pdf_path}"
-                logger.warning(error_msg)
-                self._log_processing_error(
-                    Exception(error_msg),
-                    {'pdf_path': pdf_path, 'arxiv_id': arxiv_id, 'operation': 'content_validation'},
-                    'empty_content_error'
-                )
-                return False
-            
-            # Create ArxivPaper object from extracted metadata
-            try:
-                paper = self._create_arxiv_paper_from_content(content, arxiv_id)
-            except Exception as e:
-                self._log_processing_error(
-                    e,
-                    {'pdf_path': pdf_path, 'arxiv_id': arxiv_id, 'operation': 'paper_object_creation'},
-                    'metadata_processing_error'
-                )
-                logger.error(f"Failed to create paper object for {arxiv_id}: {e}")
-                return False
-            
-            # Create document chunks with error handling
-            logger.debug(f"Creating chunks for {arxiv_id}")
-            try:
-                chunks = self.chunker.create_scientific_chunks(content, paper)
-            except Exception as e:
-                self._log_processing_error(
-                    e,
-                    {'pdf_path': pdf_path, 'arxiv_id': arxiv_id, 'operation': 'chunking'},
-                    'chunking_error'
-                )
-                logger.error(f"Failed to create chunks for {arxiv_id}: {e}")
-                return False
-            
-            if not chunks:
-                error_msg = f"No chunks created for {pdf_path}"
-                logger.warning(error_msg)
-                self._log_processing_error(
-                    Exception(error_msg),
-                    {'pdf_path': pdf_path, 'arxiv_id': arxiv_id, 'operation': 'chunk_validation'},
-                    'empty_chunks_error'
-                )
-                return False
-            
-            # Add to vector store with error handling
-            logger.debug(f"Adding {len(chunks)} chunks to vector store for {arxiv_id}")
-            try:
-                await self.vector_store.add_instance_document(paper, chunks)
-            except Exception as e:
-                self._log_processing_error(
-                    e,
-                    {'pdf_path': pdf_path, 'arxiv_id': arxiv_id, 'chunks_count': len(chunks), 'operation': 'vector_store_addition'},
-                    'vector_store_error'
-                )
-                logger.error(f"Failed to add {arxiv_id} to vector store: {e}")
-                return False
-            
-            # Mark as processed
-            self.processed_documents.add(arxiv_id)
-            
-            logger.info(f"Successfully processed {arxiv_id} with {len(chunks)} chunks")
-            return True
-            
-        except Exception as e:
+                result.processed_papers.append(pdf_path)
+                continue
+            
+            queued_ids.add(arxiv_id)
+            jobs.append(IngestionJob(
+                pdf_path=pdf_path,
+                paper_id=arxiv_id,
+                paper_builder=partial(self.build_paper_from_content, self.instance_name, arxiv_id=arxiv_id)
+            ))
+        
+        def on_success(job: IngestionJob, paper: ArxivPaper, chunks_written: int) -> None:
+            self.processed_documents.add(job.paper_id)
+            result.processed_papers.append(job.pdf_path)
+            logger.info(f"Successfully processed {job.paper_id} with {chunks_written} chunks")
+        
+        def on_failure(job: IngestionJob, error_type: str, operation: str, error: Exception) -> None:
             self._log_processing_error(
-                e,
-                {'pdf_path': pdf_path, 'operation': 'general_processing'},
-                'general_processing_error'
+                error,
+                {'pdf_path': job.pdf_path, 'arxiv_id': job.paper_id, 'operation': operation},
+                error_type
             )
-            logger.error(f"Unexpected error processing {pdf_path}: {e}")
-            return False
+            result.failed_papers.append(job.pdf_path)
+        
+        pipeline = IngestionPipeline(
+            vector_store=self.vector_store,
+            processing_config=self.config.processing_config,
+            chunk_size=self.chunker.chunk_size,
+            chunk_overlap=self.chunker.chunk_overlap,
+            on_success=on_success,
+            on_failure=on_failure
+        )
+        stage_metrics = await pipeline.run(jobs)
+        self.last_pipeline_metrics = {name: stage.to_dict() for name, stage in stage_metrics.items()}
+        
+        logger.info(f"Processing completed: {result.success_count} successful, "
+                   f"{result.failure_count} failed")
+        
+        return result
     
     def _log_processing_error(self, 
                             error: Exception, 
@@ -721,6 +687,18 @@ class AIScholarProcessor:
                                        content: Dict[str, Any], 
                                        arxiv_id: str) -> ArxivPaper:
         """Create ArxivPaper object from extracted content."""
+        return self.build_paper_from_content(self.instance_name, content, arxiv_id)
+    
+    @staticmethod
+    def build_paper_from_content(instance_name: str,
+                                 content: Dict[str, Any],
+                                 arxiv_id: str) -> ArxivPaper:
+        """
+        Create ArxivPaper object from extracted content.
+        
+        A staticmethod so ingestion pipeline workers can build papers
+        without a processor instance.
+        """
         metadata = content.get('metadata', {})
         sections = content.get('sections', {})
         
@@ -745,7 +723,7 @@ class AIScholarProcessor:
             abstract=abstract or 'No abstract available',
             published_date=datetime.now(),  # Would need to be extracted from metadata
             source_type='arxiv',
-            instance_name=self.instance_name,
+            instance_name=instance_name,
             arxiv_id=arxiv_id,
             categories=[],  # Would need to be extracted from metadata
             pdf_url=f"https://arxiv.org/pdf/{arxiv_id}.pdf",
@@ -764,6 +742,7 @@ class AIScholarProcessor:
         stats = {
             'instance_name': self.instance_name,
             'processed_documents': len(self.processed_documents),
+            'pipeline_stages': self.last_pipeline_metrics,
             'processor_initialized': all([
                 self.pdf_processor is not None,
                 self.vector_store is not None,
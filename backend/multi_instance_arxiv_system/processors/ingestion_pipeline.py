@@ -0,0 +1,419 @@
+"""
+Staged ingestion pipeline for the multi-instance ArXiv processors.
+
+Papers flow through three stages connected by bounded queues:
+- Extraction: PDF extraction and chunking in a process pool
+- Embedding: chunks of several papers embedded in one batch
+- Writing: embedded chunks of several papers written to the vector store in one call
+
+Each stage has its own concurrency setting and reports throughput metrics.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Per-process extraction components, created on first use in each worker
+_worker_components: Dict[str, Any] = {}
+
+
+@dataclass
+class IngestionJob:
+    """A PDF to ingest and the picklable callable that builds its paper object."""
+
+    pdf_path: str
+    paper_id: str
+    paper_builder: Callable[[Dict[str, Any]], Any]
+
+
+@dataclass
+class StageMetrics:
+    """Throughput metrics for one pipeline stage."""
+
+    name: str
+    concurrency: int
+    items_processed: int = 0
+    items_failed: int = 0
+    chunks_processed: int = 0
+    batches: int = 0
+    busy_seconds: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Wall-clock time the stage was running."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Papers per second of wall-clock time."""
+        elapsed = self.elapsed_seconds
+        return self.items_processed / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'name': self.name,
+            'concurrency': self.concurrency,
+            'items_processed': self.items_processed,
+            'items_failed': self.items_failed,
+            'chunks_processed': self.chunks_processed,
+            'batches': self.batches,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'papers_per_second': round(self.throughput, 3)
+        }
+
+
+@dataclass
+class _Document:
+    """A paper moving through the embedding and writing stages."""
+
+    job: IngestionJob
+    paper: Any
+    chunks: List[Dict[str, Any]]
+    texts: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+    ids: List[str] = field(default_factory=list)
+    embeddings: List[List[float]] = field(default_factory=list)
+
+
+def extract_and_chunk(pdf_path: str,
+                      paper_builder: Callable[[Dict[str, Any]], Any],
+                      chunk_size: int,
+                      chunk_overlap: int) -> Dict[str, Any]:
+    """
+    Extract and chunk a PDF. Runs in a process pool worker.
+
+    Returns:
+        Dictionary with 'paper' and 'chunks' on success, or 'error_type',
+        'operation' and 'error' describing the step that failed
+    """
+    from services.scientific_pdf_processor import ScientificPDFProcessor
+    from .ai_scholar_processor import ScientificChunker
+
+    pdf_processor = _worker_components.get('pdf_processor')
+    if pdf_processor is None:
+        pdf_processor = _worker_components['pdf_processor'] = ScientificPDFProcessor()
+    chunker_key = ('chunker', chunk_size, chunk_overlap)
+    chunker = _worker_components.get(chunker_key)
+    if chunker is None:
+        chunker = _worker_components[chunker_key] = ScientificChunker(chunk_size, chunk_overlap)
+
+    def failure(error_type: str, operation: str, error: Any) -> Dict[str, Any]:
+        return {'error_type': error_type, 'operation': operation, 'error': str(error)}
+
+    try:
+        content = pdf_processor.extract_comprehensive_content(pdf_path)
+    except Exception as e:
+        return failure('pdf_processing_error', 'pdf_extraction', e)
+
+    if not content or not content.get('full_text'):
+        return failure('empty_content_error', 'content_validation', f"No text extracted from {pdf_path}")
+
+    try:
+        paper = paper_builder(content)
+    except Exception as e:
+        return failure('metadata_processing_error', 'paper_object_creation', e)
+
+    try:
+        chunks = chunker.create_scientific_chunks(content, paper)
+    except Exception as e:
+        return failure('chunking_error', 'chunking', e)
+
+    if not chunks:
+        return failure('empty_chunks_error', 'chunk_validation', f"No chunks created for {pdf_path}")
+
+    return {'paper': paper, 'chunks': chunks}
+
+
+class IngestionPipeline:
+    """Process-pool extraction, batched embedding and batched vector store writes."""
+
+    def __init__(self,
+                 vector_store: Any,
+                 processing_config: Any,
+                 chunk_size: int,
+                 chunk_overlap: int,
+                 on_success: Callable[[IngestionJob, Any, int], None],
+                 on_failure: Callable[[IngestionJob, str, str, Exception], None]):
+        """
+        Initialize the ingestion pipeline.
+
+        Args:
+            vector_store: MultiInstanceVectorStoreService to embed and write with
+            processing_config: ProcessingConfig with the stage settings
+            chunk_size: Target chunk size in characters
+            chunk_overlap: Overlap between chunks in characters
+            on_success: Called with (job, paper, chunks_written) per stored paper
+            on_failure: Called with (job, error_type, operation, error) per failed paper
+        """
+        self.vector_store = vector_store
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.on_success = on_success
+        self.on_failure = on_failure
+
+        self.extraction_workers = processing_config.extraction_workers or os.cpu_count() or 1
+        self.embedding_concurrency = max(1, processing_config.max_concurrent_embedding)
+        self.write_concurrency = max(1, processing_config.max_concurrent_writes)
+        self.embedding_batch_size = max(1, processing_config.embedding_batch_size)
+        self.write_batch_size = max(1, processing_config.write_batch_size)
+        self.queue_size = max(1, processing_config.pipeline_queue_size)
+
+        self.metrics: Dict[str, StageMetrics] = {}
+
+    async def run(self, jobs: List[IngestionJob]) -> Dict[str, StageMetrics]:
+        """
+        Run all jobs through the pipeline.
+
+        Args:
+            jobs: Papers to ingest
+
+        Returns:
+            Metrics per stage
+        """
+        self.metrics = {
+            'extraction': StageMetrics('extraction', self.extraction_workers),
+            'embedding': StageMetrics('embedding', self.embedding_concurrency),
+            'writing': StageMetrics('writing', self.write_concurrency)
+        }
+        if not jobs:
+            return self.metrics
+
+        extraction_workers = min(self.extraction_workers, len(jobs))
+        job_queue: asyncio.Queue = asyncio.Queue()
+        for job in jobs:
+            job_queue.put_nowait(job)
+        for _ in range(extraction_workers):
+            job_queue.put_nowait(None)
+
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        logger.info(f"Ingesting {len(jobs)} papers with {extraction_workers} extraction workers, "
+                   f"{self.embedding_concurrency} embedding and {self.write_concurrency} writer tasks")
+
+        with ProcessPoolExecutor(max_workers=extraction_workers) as pool:
+            extract_tasks = [
+                asyncio.create_task(self._extraction_worker(pool, job_queue, embed_queue))
+                for _ in range(extraction_workers)
+            ]
+            embed_tasks = [
+                asyncio.create_task(self._embedding_worker(embed_queue, write_queue))
+                for _ in range(self.embedding_concurrency)
+            ]
+            write_tasks = [
+                asyncio.create_task(self._writer(write_queue))
+                for _ in range(self.write_concurrency)
+            ]
+
+            try:
+                await self._finish_stage('extraction', extract_tasks, embed_queue, len(embed_tasks))
+                await self._finish_stage('embedding', embed_tasks, write_queue, len(write_tasks))
+                await self._finish_stage('writing', write_tasks)
+            except BaseException:
+                for task in extract_tasks + embed_tasks + write_tasks:
+                    task.cancel()
+                raise
+
+        for stage in self.metrics.values():
+            logger.info(f"Stage '{stage.name}': {stage.to_dict()}")
+
+        return self.metrics
+
+    async def _finish_stage(self,
+                            name: str,
+                            tasks: List[asyncio.Task],
+                            next_queue: Optional[asyncio.Queue] = None,
+                            next_consumers: int = 0) -> None:
+        """Wait for a stage to drain, then signal the next stage's consumers."""
+        await asyncio.gather(*tasks)
+        self.metrics[name].finished_at = time.monotonic()
+        for _ in range(next_consumers):
+            await next_queue.put(None)
+
+    def _fail(self, metrics: StageMetrics, job: IngestionJob,
+              error_type: str, operation: str, error: Exception) -> None:
+        metrics.items_failed += 1
+        try:
+            self.on_failure(job, error_type, operation, error)
+        except Exception as e:
+            logger.error(f"Failure callback raised for {job.pdf_path}: {e}")
+
+    async def _extraction_worker(self,
+                                 pool: ProcessPoolExecutor,
+                                 job_queue: asyncio.Queue,
+                                 embed_queue: asyncio.Queue) -> None:
+        """Extract and chunk PDFs in the process pool."""
+        metrics = self.metrics['extraction']
+        if metrics.started_at is None:
+            metrics.started_at = time.monotonic()
+        loop = asyncio.get_running_loop()
+
+        while True:
+            job = await job_queue.get()
+            if job is None:
+                return
+
+            started = time.monotonic()
+            try:
+                outcome = await loop.run_in_executor(
+                    pool, extract_and_chunk,
+                    job.pdf_path, job.paper_builder, self.chunk_size, self.chunk_overlap
+                )
+            except Exception as e:
+                outcome = {'error_type': 'pdf_processing_error', 'operation': 'pdf_extraction', 'error': str(e)}
+            metrics.busy_seconds += time.monotonic() - started
+
+            if 'error_type' in outcome:
+                self._fail(metrics, job, outcome['error_type'], outcome['operation'],
+                           Exception(outcome['error']))
+                continue
+
+            metrics.items_processed += 1
+            metrics.chunks_processed += len(outcome['chunks'])
+            await embed_queue.put(_Document(job, outcome['paper'], outcome['chunks']))
+
+    async def _next_batch(self,
+                          queue: asyncio.Queue,
+                          max_chunks: int,
+                          chunk_count: Callable[['_Document'], int]) -> Tuple[List[_Document], bool]:
+        """
+        Wait for one document, then take whatever else is already queued.
+
+        Returns:
+            The batch and whether the end-of-stream marker was reached
+        """
+        document = await queue.get()
+        if document is None:
+            return [], True
+
+        batch = [document]
+        size = chunk_count(document)
+        while size < max_chunks:
+            try:
+                document = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if document is None:
+                return batch, True
+            batch.append(document)
+            size += chunk_count(document)
+
+        return batch, False
+
+    async def _embedding_worker(self, embed_queue: asyncio.Queue, write_queue: asyncio.Queue) -> None:
+        """Embed the chunks of several papers per model call."""
+        metrics = self.metrics['embedding']
+        if metrics.started_at is None:
+            metrics.started_at = time.monotonic()
+
+        done = False
+        while not done:
+            batch, done = await self._next_batch(
+                embed_queue, self.embedding_batch_size, lambda document: len(document.chunks)
+            )
+            if not batch:
+                continue
+
+            started = time.monotonic()
+            embedded = await self._embed_batch(batch, metrics)
+            metrics.busy_seconds += time.monotonic() - started
+            metrics.batches += 1
+
+            for document in embedded:
+                metrics.items_processed += 1
+                metrics.chunks_processed += len(document.texts)
+                await write_queue.put(document)
+
+    async def _embed_batch(self, batch: List[_Document], metrics: StageMetrics) -> List[_Document]:
+        """Embed a batch, retrying papers one by one if the batch fails."""
+        ready = []
+        for document in batch:
+            try:
+                document.texts, document.metadatas, document.ids = (
+                    self.vector_store.prepare_instance_chunks(document.paper, document.chunks)
+                )
+                ready.append(document)
+            except Exception as e:
+                self._fail(metrics, document.job, 'vector_store_error', 'chunk_preparation', e)
+
+        texts = [text for document in ready for text in document.texts]
+        if not texts:
+            return ready
+
+        try:
+            embeddings = await self.vector_store.embed_texts(texts)
+        except Exception as e:
+            if len(ready) == 1:
+                self._fail(metrics, ready[0].job, 'vector_store_error', 'embedding', e)
+                return []
+            logger.warning(f"Embedding batch of {len(ready)} papers failed, retrying individually: {e}")
+            embedded = []
+            for document in ready:
+                embedded.extend(await self._embed_batch([document], metrics))
+            return embedded
+
+        offset = 0
+        for document in ready:
+            document.embeddings = embeddings[offset:offset + len(document.texts)]
+            offset += len(document.texts)
+        return ready
+
+    async def _writer(self, write_queue: asyncio.Queue) -> None:
+        """Write embedded chunks of several papers per vector store call."""
+        metrics = self.metrics['writing']
+        if metrics.started_at is None:
+            metrics.started_at = time.monotonic()
+
+        done = False
+        while not done:
+            batch, done = await self._next_batch(
+                write_queue, self.write_batch_size, lambda document: len(document.texts)
+            )
+            if not batch:
+                continue
+
+            started = time.monotonic()
+            await self._write_batch(batch, metrics)
+            metrics.busy_seconds += time.monotonic() - started
+            metrics.batches += 1
+
+    async def _write_batch(self, batch: List[_Document], metrics: StageMetrics) -> None:
+        """Write a batch, retrying papers one by one if the batch fails."""
+        to_write = [document for document in batch if document.texts]
+
+        if to_write:
+            try:
+                await self.vector_store.add_embedded_chunks(
+                    [text for document in to_write for text in document.texts],
+                    [metadata for document in to_write for metadata in document.metadatas],
+                    [chunk_id for document in to_write for chunk_id in document.ids],
+                    [embedding for document in to_write for embedding in document.embeddings]
+                )
+            except Exception as e:
+                if len(batch) == 1:
+                    self._fail(metrics, batch[0].job, 'vector_store_error', 'vector_store_addition', e)
+                    return
+                logger.warning(f"Write batch of {len(batch)} papers failed, retrying individually: {e}")
+                for document in batch:
+                    await self._write_batch([document], metrics)
+                return
+
+        for document in batch:
+            metrics.items_processed += 1
+            metrics.chunks_processed += len(document.texts)
+            try:
+                self.on_success(document.job, document.paper, len(document.texts))
+            except Exception as e:
+                logger.error(f"Success callback raised for {document.job.pdf_path}: {e}")
@@ -16,6 +16,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any, Set
 import json
 import hashlib
+from functools import partial
 
 # Add backend to path for imports
 sys.path.append(str(Path(__file__).parent.parent.parent))
@@ -23,6 +24,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from ..shared.multi_instance_data_models import (
     ArxivPaper, JournalPaper, BasePaper, InstanceConfig, ProcessingResult
 )
+from .ingestion_pipeline import IngestionJob, IngestionPipeline
 
 # Import existing services
 try:
@@ -57,6 +59,9 @@ class QuantScholarProcessor:
         # Track processed documents
         self.processed_documents: Set[str] = set()
         
+        # Per-stage metrics of the last ingestion pipeline run
+        self.last_pipeline_metrics: Dict[str, Dict[str, Any]] = {}
+        
         logger.info(f"QuantScholarProcessor initialized for instance '{self.instance_name}'")
     
     async def initialize(self) -> bool:
@@ -134,145 +139,77 @@ class QuantScholarProcessor:
         
         logger.info(f"Processing breakdown: {len(arxiv_papers)} arXiv papers, {len(journal_papers)} journal papers")
         
-        # Process all papers
+        jobs = []
+        queued_ids: Set[str] = set()
         for pdf_path in pdf_paths:
-            try:
-                success = await self._process_single_pdf(pdf_path)
-                
-                if success:
-                    result.processed_papers.append(pdf_path)
-                else:
-                    result.failed_papers.append(pdf_path)
-                    
-            except Exception as e:
-                result.failed_papers.append(pdf_path)
-                logger.error(f"Failed to process {pdf_path}: {e}")
-        
-        logger.info(f"Quant Scholar processing completed: {result.success_count} successful, "
-                   f"{result.failure_count} failed")
-        
-        return result
-    
-    async def _process_single_pdf(self, pdf_path: str) -> bool:
-        """Process a single PDF file with comprehensive error handling for both arXiv and journal papers."""
-        try:
-            pdf_file = Path(pdf_path)
-            if not pdf_file.exists():
-                error_msg = f"PDF file not found: {pdf_path}"
-                logger.error(error_msg)
+            if not Path(pdf_path).exists():
                 self._log_processing_error(
-                    Exception(error_msg),
+                    Exception(f"PDF file not found: {pdf_path}"),
                     {'pdf_path': pdf_path, 'operation': 'file_validation'},
                     'file_not_found'
                 )
-                return False
+                result.failed_papers.append(pdf_path)
+                continue
             
             # Extract paper ID from filename (handles both arXiv and journal papers)
             paper_id = self._extract_paper_id_from_path(pdf_path)
             if not paper_id:
-                error_msg = f"Could not extract paper ID from {pdf_path}"
-                logger.error(error_msg)
                 self._log_processing_error(
-                    Exception(error_msg),
+                    Exception(f"Could not extract paper ID from {pdf_path}"),
                     {'pdf_path': pdf_path, 'operation': 'paper_id_extraction'},
                     'metadata_extraction_error'
                 )
-                return False
-            
-            # Determine source type
-            source_type = self._determine_source_type(pdf_path)
-            logger.debug(f"Processing {source_type} paper: {paper_id}")
+                result.failed_papers.append(pdf_path)
+                continue
             
             # Check if already processed (unified duplicate detection across sources)
-            if paper_id in self.processed_documents:
+            if paper_id in self.processed_documents or paper_id in queued_ids:
                 logger.debug(f"Skipping already processed paper: {paper_id}")
-                return True
+                result.processed_papers.append(pdf_path)
+                continue
             
-            # Extract content from PDF with error handling
-            logger.debug(f"Extracting content from {pdf_path}")
-            try:
-                content = self.pdf_processor.extract_comprehensive_content(pdf_path)
-            except Exception as e:
-                self._log_processing_error(
-                    e,
-                    {'pdf_path': pdf_path, 'paper_id': paper_id, 'operation': 'pdf_extraction'},
-                    'pdf_processing_error'
-                )
-                logger.error(f"Failed to extract content from {pdf_path}: {e}")
-                return False
-            
-            if not content or not content.get('full_text'):
-                error_msg = f"No text extracted from {pdf_path}"
-                logger.warning(error_msg)
-                self._log_processing_error(
-                    Exception(error_msg),
-                    {'pdf_path': pdf_path, 'paper_id': paper_id, 'operation': 'content_validation'},
-                    'empty_content_error'
-                )
-                return False
-            
-            # Create paper object from extracted metadata
-            try:
-                paper = self._create_paper_from_content(content, paper_id, pdf_path, source_type)
-            except Exception as e:
-                self._log_processing_error(
-                    e,
-                    {'pdf_path': pdf_path, 'paper_id': paper_id, 'operation': 'paper_object_creation'},
-                    'metadata_processing_error'
-                )
-                logger.error(f"Failed to create paper object for {paper_id}: {e}")
-                return False
-            
-            # Create document chunks with error handling
-            logger.debug(f"Creating chunks for {paper_id}")
-            try:
-                chunks = self.chunker.create_scientific_chunks(content, paper)
-            except Exception as e:
-                self._log_processing_error(
-                    e,
-                    {'pdf_path': pdf_path, 'paper_id': paper_id, 'operation': 'chunking'},
-                    'chunking_error'
-                )
-                logger.error(f"Failed to create chunks for {paper_id}: {e}")
-                return False
-            
-            if not chunks:
-                error_msg = f"No chunks created for {pdf_path}"
-                logger.warning(error_msg)
-                self._log_processing_error(
-                    Exception(error_msg),
-                    {'pdf_path': pdf_path, 'paper_id': paper_id, 'operation': 'chunk_validation'},
-                    'empty_chunks_error'
-                )
-                return False
-            
-            # Add to vector store with error handling
-            logger.debug(f"Adding {len(chunks)} chunks to vector store for {paper_id}")
-            try:
-                await self.vector_store.add_instance_document(paper, chunks)
-            except Exception as e:
-                self._log_processing_error(
-                    e,
-                    {'pdf_path': pdf_path, 'paper_id': paper_id, 'chunks_count': len(chunks), 'operation': 'vector_store_addition'},
-                    'vector_store_error'
+            queued_ids.add(paper_id)
+            jobs.append(IngestionJob(
+                pdf_path=pdf_path,
+                paper_id=paper_id,
+                paper_builder=partial(
+                    self.build_paper_from_content,
+                    self.instance_name,
+                    paper_id=paper_id,
+                    pdf_path=pdf_path,
+                    source_type=self._determine_source_type(pdf_path)
                 )
-                logger.error(f"Failed to add {paper_id} to vector store: {e}")
-                return False
-            
-            # Mark as processed
-            self.processed_documents.add(paper_id)
-            
-            logger.info(f"Successfully processed {paper_id} with {len(chunks)} chunks")
-            return True
-            
-        except Exception as e:
+            ))
+        
+        def on_success(job: IngestionJob, paper: BasePaper, chunks_written: int) -> None:
+            self.processed_documents.add(job.paper_id)
+            result.processed_papers.append(job.pdf_path)
+            logger.info(f"Successfully processed {job.paper_id} with {chunks_written} chunks")
+        
+        def on_failure(job: IngestionJob, error_type: str, operation: str, error: Exception) -> None:
             self._log_processing_error(
-                e,
-                {'pdf_path': pdf_path, 'operation': 'general_processing'},
-                'general_processing_error'
+                error,
+                {'pdf_path': job.pdf_path, 'paper_id': job.paper_id, 'operation': operation},
+                error_type
             )
-            logger.error(f"Unexpected error processing {pdf_path}: {e}")
-            return False
+            result.failed_papers.append(job.pdf_path)
+        
+        # Process all papers through the staged pipeline
+        pipeline = IngestionPipeline(
+            vector_store=self.vector_store,
+            processing_config=self.config.processing_config,
+            chunk_size=self.chunker.chunk_size,
+            chunk_overlap=self.chunker.chunk_overlap,
+            on_success=on_success,
+            on_failure=on_failure
+        )
+        stage_metrics = await pipeline.run(jobs)
+        self.last_pipeline_metrics = {name: stage.to_dict() for name, stage in stage_metrics.items()}
+        
+        logger.info(f"Quant Scholar processing completed: {result.success_count} successful, "
+                   f"{result.failure_count} failed")
+        
+        return result
     
     def _log_processing_error(self, 
                             error: Exception, 
@@ -326,6 +263,22 @@ class QuantScholarProcessor:
                                  pdf_path: str,
                                  source_type: str) -> Any:
         """Create paper object from extracted content (ArxivPaper or JournalPaper)."""
+        return self.build_paper_from_content(
+            self.instance_name, content, paper_id, pdf_path, source_type
+        )
+    
+    @staticmethod
+    def build_paper_from_content(instance_name: str,
+                                 content: Dict[str, Any],
+                                 paper_id: str,
+                                 pdf_path: str,
+                                 source_type: str) -> Any:
+        """
+        Create paper object from extracted content (ArxivPaper or JournalPaper).
+        
+        A staticmethod so ingestion pipeline workers can build papers
+        without a processor instance.
+        """
         metadata = content.get('metadata', {})
         sections = content.get('sections', {})
         
@@ -368,7 +321,7 @@ class QuantScholarProcessor:
                 abstract=abstract or 'No abstract available',
                 published_date=datetime.now(),  # Would need to be extracted from metadata
                 source_type='journal',
-                instance_name=self.instance_name,
+                instance_name=instance_name,
                 journal_name=journal_name,
                 volume=volume,
                 issue=issue,
@@ -390,7 +343,7 @@ class QuantScholarProcessor:
             categories = metadata.get('categories', [])
             if not categories:
                 # Try to infer from Quant Scholar categories
-                categories = self._infer_arxiv_categories(paper_id, content)
+                categories = QuantScholarProcessor._infer_arxiv_categories(paper_id, content)
             
             paper = ArxivPaper(
                 paper_id=paper_id,
@@ -399,7 +352,7 @@ class QuantScholarProcessor:
                 abstract=abstract or 'No abstract available',
                 published_date=datetime.now(),  # Would need to be extracted from metadata
                 source_type='arxiv',
-                instance_name=self.instance_name,
+                instance_name=instance_name,
                 arxiv_id=paper_id,
                 categories=categories,
                 pdf_url=f"https://arxiv.org/pdf/{paper_id}.pdf",
@@ -413,7 +366,8 @@ class QuantScholarProcessor:
         
         return paper
     
-    def _infer_arxiv_categories(self, paper_id: str, content: Dict[str, Any]) -> List[str]:
+    @staticmethod
+    def _infer_arxiv_categories(paper_id: str, content: Dict[str, Any]) -> List[str]:
         """Infer arXiv categories for Quant Scholar papers based on content analysis."""
         # Default Quant Scholar categories
         quant_categories = [
@@ -474,6 +428,7 @@ class QuantScholarProcessor:
         stats = {
             'instance_name': self.instance_name,
             'total_processed_documents': len(self.processed_documents),
+            'pipeline_stages': self.last_pipeline_metrics,
             'source_breakdown': {
                 'arxiv_papers': arxiv_count,
                 'journal_papers': journal_count,
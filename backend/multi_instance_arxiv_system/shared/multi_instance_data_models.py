@@ -160,6 +160,13 @@ class ProcessingConfig:
     retry_attempts: int = 3
     timeout_seconds: int = 300
     memory_limit_mb: int = 4096
+    # Ingestion pipeline stages (0 extraction workers = one per CPU core)
+    extraction_workers: int = 0
+    embedding_batch_size: int = 256
+    max_concurrent_embedding: int = 1
+    write_batch_size: int = 512
+    max_concurrent_writes: int = 1
+    pipeline_queue_size: int = 32
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -85,13 +85,14 @@ class MockCollection:
         """Mock document count."""
         return self._document_count
     
-    def get(self, limit=None, include=None):
+    def get(self, limit=None, offset=None, include=None):
         """Mock get method."""
-        actual_limit = min(limit or self._document_count, self._document_count)
+        start = min(offset or 0, self._document_count)
+        end = min(start + (limit or self._document_count), self._document_count)
         
         result = {
-            'ids': [f"doc_{i}" for i in range(actual_limit)],
-            'documents': [f"This is test document {i} content." for i in range(actual_limit)],
+            'ids': [f"doc_{i}" for i in range(start, end)],
+            'documents': [f"This is test document {i} content." for i in range(start, end)],
             'metadatas': [
                 {
                     'instance_name': self.instance_name,
@@ -100,7 +101,7 @@ class MockCollection:
                     'text_quality_score': 0.8 if i % 10 != 0 else 0.3,  # Some low quality
                     'section': 'abstract' if i % 3 == 0 else 'introduction'
                 }
-                for i in range(actual_limit)
+                for i in range(start, end)
             ]
         }
         
@@ -108,7 +109,7 @@ class MockCollection:
             # Mock embeddings (384 dimensions for MiniLM)
             import numpy as np
             result['embeddings'] = [
-                np.random.normal(0, 1, 384).tolist() for _ in range(actual_limit)
+                np.random.normal(0, 1, 384).tolist() for _ in range(start, end)
             ]
         
         return result
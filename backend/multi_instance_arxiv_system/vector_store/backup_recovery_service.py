@@ -18,6 +18,8 @@ import hashlib
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+import numpy as np
+
 # Add backend directory to path for imports
 backend_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(backend_dir))
@@ -31,6 +33,10 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Backups are written as a directory holding this manifest plus segment files
+BACKUP_FORMAT_VERSION = '2.0'
+MANIFEST_FILENAME = 'manifest.json'
+
 
 class BackupType(Enum):
     """Types of backup operations."""
@@ -79,6 +85,9 @@ class BackupMetadata:
     recovery_tested: bool
     recovery_time_estimate_minutes: int
     
+    # Incremental backups are restored on top of their parent backup
+    parent_backup_id: Optional[str] = None
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         data = asdict(self)
@@ -169,7 +178,11 @@ class BackupRecoveryService:
             'compression_enabled': True,
             'validation_enabled': True,
             'include_embeddings': True,
-            'backup_timeout_minutes': 60
+            'backup_timeout_minutes': 60,
+            'segment_size': 5000,  # documents read from Chroma and written per segment
+            'embedding_dtype': 'float32',  # or 'float16' to halve embedding storage
+            'restore_concurrency': 4,
+            'full_backup_interval_days': 7  # scheduled backups in between are incremental
         }
         
         # Load existing backup metadata
@@ -225,7 +238,20 @@ class BackupRecoveryService:
         include_embeddings: bool = True,
         compress: bool = True
     ) -> BackupMetadata:
-        """Create a backup for a specific instance."""
+        """
+        Create a backup for a specific instance.
+        
+        INCREMENTAL backups store only the records added or changed since the
+        instance's latest full or incremental backup, plus the ids deleted
+        since then. Without such a backup a FULL backup is taken instead.
+        """
+        
+        parent_backup = None
+        if backup_type == BackupType.INCREMENTAL:
+            parent_backup = self._latest_chain_backup(instance_name)
+            if not parent_backup:
+                logger.info(f"No previous backup to diff against for {instance_name}, creating a full backup")
+                backup_type = BackupType.FULL
         
         logger.info(f"Creating {backup_type.value} backup for {instance_name}")
         
@@ -258,33 +284,39 @@ class BackupRecoveryService:
             validated=False,
             validation_errors=[],
             recovery_tested=False,
-            recovery_time_estimate_minutes=0
+            recovery_time_estimate_minutes=0,
+            parent_backup_id=parent_backup.backup_id if parent_backup else None
         )
         
+        backup_dir = self.backup_directory / instance_name / backup_id
+        
         try:
             # Update status
             backup_metadata.status = BackupStatus.IN_PROGRESS
             
-            # Create backup data
-            backup_data = await self._create_backup_data(
+            # Content hashes of every record in the parent backup
+            parent_hashes = None
+            if parent_backup:
+                parent_hashes = await asyncio.to_thread(self._load_id_hashes, parent_backup)
+            
+            # Stream the collection into segment files
+            manifest = await self._write_backup_segments(
                 collection, 
+                backup_dir,
                 backup_type, 
-                include_embeddings
+                include_embeddings,
+                compress,
+                parent_hashes
             )
+            manifest['parent_backup_id'] = backup_metadata.parent_backup_id
             
-            # Save backup to file
-            backup_file_path = await self._save_backup_data(
-                backup_data, 
-                backup_id, 
-                compress
-            )
-            
-            # Calculate file size and checksum
-            backup_file = Path(backup_file_path)
-            backup_size_mb = backup_file.stat().st_size / (1024 * 1024)
+            # Save manifest; its checksum covers the segment checksums it lists
+            backup_file_path = self._write_manifest(backup_dir, manifest)
+            backup_size_mb = sum(f.stat().st_size for f in backup_dir.iterdir()) / (1024 * 1024)
             checksum = self._calculate_file_checksum(backup_file_path)
             
             # Update metadata
+            backup_metadata.document_count = manifest['document_count']
             backup_metadata.backup_file_path = backup_file_path
             backup_metadata.backup_size_mb = backup_size_mb
             backup_metadata.checksum = checksum
@@ -310,71 +342,303 @@ class BackupRecoveryService:
             logger.error(f"Backup {backup_id} failed: {e}")
             backup_metadata.status = BackupStatus.FAILED
             backup_metadata.validation_errors.append(f"Backup failed: {str(e)}")
+            shutil.rmtree(backup_dir, ignore_errors=True)
             self.backup_history.append(backup_metadata)
             self._save_backup_metadata()
             raise
         
         return backup_metadata
     
-    async def _create_backup_data(
+    async def _write_backup_segments(
         self, 
         collection: Any, 
+        backup_dir: Path,
         backup_type: BackupType,
-        include_embeddings: bool
+        include_embeddings: bool,
+        compress: bool,
+        parent_hashes: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        """Create backup data from collection."""
+        """
+        Page through the collection and write its records as backup segments.
+        
+        Only one page is held in memory at a time, so backups of large
+        collections run in bounded memory. Full and incremental backups also
+        record a content hash per id; given the parent backup's hashes, only
+        new or changed records are written and removed ids are listed in the
+        manifest.
         
-        # Determine what to include
-        include_fields = ['documents', 'metadatas', 'ids']
+        Returns:
+            Backup manifest describing the written segments
+        """
+        
+        # Determine what to include (ids are always returned)
+        include_fields = ['documents', 'metadatas']
         if include_embeddings and backup_type != BackupType.METADATA_ONLY:
             include_fields.append('embeddings')
         
         if backup_type == BackupType.METADATA_ONLY:
-            include_fields = ['metadatas', 'ids']
+            include_fields = ['metadatas']
         elif backup_type == BackupType.EMBEDDINGS_ONLY:
-            include_fields = ['embeddings', 'ids']
+            include_fields = ['embeddings']
+        
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        segment_size = self.backup_config['segment_size']
+        embedding_dtype = self.backup_config['embedding_dtype']
+        track_hashes = backup_type in (BackupType.FULL, BackupType.INCREMENTAL)
+        
+        columns = ['ids'] + include_fields
+        pending = {column: [] for column in columns}
+        segments = []
+        id_hashes: Dict[str, str] = {}
+        document_count = 0
+        
+        async def flush_segment(size: int) -> None:
+            segment_page = {column: pending[column][:size] for column in columns}
+            for column in columns:
+                del pending[column][:size]
+            segments.append(await asyncio.to_thread(
+                self._write_segment, backup_dir, len(segments), segment_page, compress, embedding_dtype
+            ))
         
-        # Get all data from collection
-        all_data = collection.get(include=include_fields)
+        while True:
+            page = await asyncio.to_thread(
+                collection.get,
+                include=include_fields,
+                limit=segment_size,
+                offset=document_count
+            )
+            page_ids = page.get('ids') or []
+            if not page_ids:
+                break
+            document_count += len(page_ids)
+            
+            rows = range(len(page_ids))
+            if track_hashes:
+                page_hashes = await asyncio.to_thread(self._hash_page, page)
+                id_hashes.update(zip(page_ids, page_hashes))
+                if parent_hashes is not None:
+                    rows = [
+                        i for i, (doc_id, content_hash) in enumerate(zip(page_ids, page_hashes))
+                        if parent_hashes.get(doc_id) != content_hash
+                    ]
+            
+            for column in columns:
+                values = page[column]
+                pending[column].extend(values[i] for i in rows)
+            
+            while len(pending['ids']) >= segment_size:
+                await flush_segment(segment_size)
+            
+            if len(page_ids) < segment_size:
+                break
         
-        # Create backup data structure
-        backup_data = {
-            'backup_version': '1.0',
+        if pending['ids']:
+            await flush_segment(len(pending['ids']))
+        
+        manifest = {
+            'backup_version': BACKUP_FORMAT_VERSION,
             'backup_timestamp': datetime.now().isoformat(),
             'collection_metadata': collection.metadata,
-            'document_count': collection.count(),
+            'document_count': document_count,
+            'record_count': sum(segment['count'] for segment in segments),
             'backup_type': backup_type.value,
-            'include_embeddings': include_embeddings,
-            'data': all_data
+            'include_embeddings': 'embeddings' in include_fields,
+            'embedding_dtype': embedding_dtype,
+            'embedding_dimension': next(
+                (s['embedding_dimension'] for s in segments if 'embedding_dimension' in s), None
+            ),
+            'segments': segments,
+            'deleted_ids': []
         }
         
-        return backup_data
+        if track_hashes:
+            manifest['id_hashes_file'], manifest['id_hashes_checksum'] = await asyncio.to_thread(
+                self._write_id_hashes, backup_dir, id_hashes
+            )
+        if parent_hashes is not None:
+            manifest['deleted_ids'] = sorted(parent_hashes.keys() - id_hashes.keys())
+        
+        return manifest
     
-    async def _save_backup_data(
-        self, 
-        backup_data: Dict[str, Any], 
-        backup_id: str,
-        compress: bool
-    ) -> str:
-        """Save backup data to file."""
-        
-        # Create instance backup directory
-        instance_dir = self.backup_directory / backup_data['data'].get('metadatas', [{}])[0].get('instance_name', 'unknown')
-        instance_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Determine file extension
-        extension = '.json.gz' if compress else '.json'
-        backup_file_path = instance_dir / f"{backup_id}{extension}"
-        
-        # Save data
-        if compress:
-            with gzip.open(backup_file_path, 'wt', encoding='utf-8') as f:
-                json.dump(backup_data, f, indent=2)
-        else:
-            with open(backup_file_path, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, indent=2)
+    def _hash_page(self, page: Dict[str, Any]) -> List[str]:
+        """Hash each record's document, metadata and embedding."""
+        
+        documents = page.get('documents')
+        metadatas = page.get('metadatas')
+        embeddings = page.get('embeddings')
+        
+        hashes = []
+        for i in range(len(page['ids'])):
+            digest = hashlib.blake2b(digest_size=16)
+            content = [
+                documents[i] if documents is not None else None,
+                metadatas[i] if metadatas is not None else None
+            ]
+            digest.update(json.dumps(content, sort_keys=True).encode('utf-8'))
+            if embeddings is not None:
+                digest.update(np.asarray(embeddings[i], dtype=np.float32).tobytes())
+            hashes.append(digest.hexdigest())
+        
+        return hashes
+    
+    def _write_id_hashes(self, backup_dir: Path, id_hashes: Dict[str, str]) -> Tuple[str, str]:
+        """Write the id to content hash index, returning its file name and checksum."""
+        
+        hashes_name = 'id_hashes.json.gz'
+        with gzip.open(backup_dir / hashes_name, 'wt', encoding='utf-8') as f:
+            json.dump(id_hashes, f)
+        
+        return hashes_name, self._calculate_file_checksum(str(backup_dir / hashes_name))
+    
+    def _load_id_hashes(self, backup_metadata: BackupMetadata) -> Dict[str, str]:
+        """Load the id to content hash index of a backup."""
         
-        return str(backup_file_path)
+        manifest = self._load_manifest(backup_metadata.backup_file_path)
+        hashes_path = Path(backup_metadata.backup_file_path).parent / manifest['id_hashes_file']
+        with gzip.open(hashes_path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _latest_chain_backup(self, instance_name: str) -> Optional[BackupMetadata]:
+        """Find the newest backup an incremental backup can be taken against."""
+        
+        candidates = sorted(
+            (
+                backup for backup in self.backup_history
+                if backup.instance_name == instance_name
+                and backup.status == BackupStatus.COMPLETED
+                and backup.backup_type in (BackupType.FULL, BackupType.INCREMENTAL)
+                and Path(backup.backup_file_path).name == MANIFEST_FILENAME
+            ),
+            key=lambda b: b.created_at,
+            reverse=True
+        )
+        
+        for backup in candidates:
+            try:
+                if 'id_hashes_file' in self._load_manifest(backup.backup_file_path):
+                    return backup
+            except Exception as e:
+                logger.warning(f"Skipping unreadable backup {backup.backup_id}: {e}")
+        
+        return None
+    
+    def _find_backup(self, backup_id: str) -> Optional[BackupMetadata]:
+        """Look up a backup in the history by id."""
+        
+        for backup in self.backup_history:
+            if backup.backup_id == backup_id:
+                return backup
+        return None
+    
+    def _backup_chain(self, backup_metadata: BackupMetadata) -> List[BackupMetadata]:
+        """Return the backups to replay, from the base full backup up to this one."""
+        
+        chain = [backup_metadata]
+        while chain[-1].parent_backup_id:
+            parent = self._find_backup(chain[-1].parent_backup_id)
+            if not parent:
+                raise ValueError(f"Parent backup {chain[-1].parent_backup_id} of {chain[-1].backup_id} not found")
+            chain.append(parent)
+        
+        return list(reversed(chain))
+    
+    def _write_segment(
+        self,
+        backup_dir: Path,
+        index: int,
+        page: Dict[str, Any],
+        compress: bool,
+        embedding_dtype: str
+    ) -> Dict[str, Any]:
+        """Write one page as newline-delimited records plus a binary embedding block."""
+        
+        ids = page['ids']
+        documents = page.get('documents')
+        metadatas = page.get('metadatas')
+        
+        records_name = f"segment_{index:05d}.jsonl" + ('.gz' if compress else '')
+        opener = gzip.open if compress else open
+        with opener(backup_dir / records_name, 'wt', encoding='utf-8') as f:
+            for i, doc_id in enumerate(ids):
+                record = {'id': doc_id}
+                if documents is not None:
+                    record['document'] = documents[i]
+                if metadatas is not None:
+                    record['metadata'] = metadatas[i]
+                f.write(json.dumps(record) + '\n')
+        
+        segment = {
+            'index': index,
+            'count': len(ids),
+            'records_file': records_name,
+            'records_checksum': self._calculate_file_checksum(str(backup_dir / records_name))
+        }
+        
+        embeddings = page.get('embeddings')
+        if embeddings is not None and len(embeddings) > 0:
+            embeddings_name = f"segment_{index:05d}.npy"
+            matrix = np.asarray(embeddings, dtype=embedding_dtype)
+            np.save(backup_dir / embeddings_name, matrix)
+            segment['embeddings_file'] = embeddings_name
+            segment['embeddings_checksum'] = self._calculate_file_checksum(str(backup_dir / embeddings_name))
+            segment['embedding_dimension'] = int(matrix.shape[1])
+        
+        return segment
+    
+    def _write_manifest(self, backup_dir: Path, manifest: Dict[str, Any]) -> str:
+        """Write the backup manifest and return its path."""
+        
+        manifest_path = backup_dir / MANIFEST_FILENAME
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        
+        return str(manifest_path)
+    
+    def _load_manifest(self, backup_file_path: str) -> Dict[str, Any]:
+        """Load a backup manifest."""
+        
+        with open(backup_file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _read_segment(self, backup_dir: Path, segment: Dict[str, Any]) -> Dict[str, Any]:
+        """Read a segment back into Chroma's column layout."""
+        
+        records_path = backup_dir / segment['records_file']
+        opener = gzip.open if records_path.suffix == '.gz' else open
+        
+        ids, documents, metadatas = [], [], []
+        with opener(records_path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                ids.append(record['id'])
+                if 'document' in record:
+                    documents.append(record['document'])
+                if 'metadata' in record:
+                    metadatas.append(record['metadata'])
+        
+        data = {'ids': ids, 'documents': documents, 'metadatas': metadatas}
+        
+        if segment.get('embeddings_file'):
+            embeddings = np.load(backup_dir / segment['embeddings_file'])
+            data['embeddings'] = embeddings.astype(np.float32).tolist()
+        
+        return data
+    
+    def _verify_segment(self, backup_dir: Path, segment: Dict[str, Any]) -> List[str]:
+        """Check a segment's files against the checksums in the manifest."""
+        
+        errors = []
+        for file_key, checksum_key in (('records_file', 'records_checksum'), ('embeddings_file', 'embeddings_checksum')):
+            if not segment.get(file_key):
+                continue
+            
+            segment_file = backup_dir / segment[file_key]
+            if not segment_file.exists():
+                errors.append(f"Segment {segment['index']} is missing {segment[file_key]}")
+            elif self._calculate_file_checksum(str(segment_file)) != segment[checksum_key]:
+                errors.append(f"Checksum mismatch in {segment[file_key]} - file may be corrupted")
+        
+        return errors
     
     def _calculate_file_checksum(self, file_path: str) -> str:
         """Calculate SHA-256 checksum of a file."""
@@ -411,6 +675,9 @@ class BackupRecoveryService:
                 validation_result['errors'].append("Checksum mismatch - file may be corrupted")
                 return validation_result
             
+            if backup_file.name == MANIFEST_FILENAME:
+                return await self._validate_segmented_backup(backup_metadata, validation_result)
+            
             # Load and validate backup data
             backup_data = self._load_backup_data(backup_metadata.backup_file_path)
             
@@ -451,8 +718,59 @@ class BackupRecoveryService:
         
         return validation_result
     
+    async def _validate_segmented_backup(
+        self,
+        backup_metadata: BackupMetadata,
+        validation_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Validate a manifest-based backup, checking every segment's checksums."""
+        
+        manifest = self._load_manifest(backup_metadata.backup_file_path)
+        backup_dir = Path(backup_metadata.backup_file_path).parent
+        segments = manifest.get('segments', [])
+        
+        for field in ('backup_version', 'backup_timestamp', 'segments'):
+            if field not in manifest:
+                validation_result['errors'].append(f"Missing required field: {field}")
+        
+        # An incremental backup with no changes legitimately has no segments
+        if not segments and backup_metadata.backup_type != BackupType.INCREMENTAL:
+            validation_result['errors'].append("No document IDs found in backup")
+        
+        if backup_metadata.parent_backup_id and not self._find_backup(backup_metadata.parent_backup_id):
+            validation_result['errors'].append(f"Parent backup {backup_metadata.parent_backup_id} not found")
+        
+        if manifest.get('id_hashes_file'):
+            hashes_path = backup_dir / manifest['id_hashes_file']
+            if not hashes_path.exists():
+                validation_result['errors'].append(f"Missing {manifest['id_hashes_file']}")
+            elif self._calculate_file_checksum(str(hashes_path)) != manifest['id_hashes_checksum']:
+                validation_result['errors'].append(f"Checksum mismatch in {manifest['id_hashes_file']} - file may be corrupted")
+        
+        segment_errors = await asyncio.gather(*(
+            asyncio.to_thread(self._verify_segment, backup_dir, segment)
+            for segment in segments
+        ))
+        for errors in segment_errors:
+            validation_result['errors'].extend(errors)
+        
+        if manifest.get('include_embeddings') and not any(s.get('embeddings_file') for s in segments):
+            validation_result['warnings'].append("No embeddings found in backup")
+        
+        # Check document count consistency
+        expected_count = manifest.get('record_count', backup_metadata.document_count)
+        actual_count = sum(segment['count'] for segment in segments)
+        
+        if actual_count != expected_count:
+            validation_result['errors'].append(
+                f"Document count mismatch: expected {expected_count}, found {actual_count}"
+            )
+        
+        validation_result['valid'] = len(validation_result['errors']) == 0
+        return validation_result
+    
     def _load_backup_data(self, backup_file_path: str) -> Dict[str, Any]:
-        """Load backup data from file."""
+        """Load backup data from a legacy single-file (v1.0) backup."""
         
         backup_file = Path(backup_file_path)
         
@@ -467,18 +785,23 @@ class BackupRecoveryService:
         self, 
         backup_id: str,
         target_instance_name: Optional[str] = None,
-        overwrite_existing: bool = False
+        overwrite_existing: bool = False,
+        resume: bool = False
     ) -> RecoveryResult:
-        """Restore an instance from backup."""
+        """
+        Restore an instance from backup.
+        
+        Segments are restored concurrently and recorded in a progress file as
+        they complete. With resume=True an interrupted restore continues into
+        the existing collection and skips the segments already restored.
+        Incremental backups are restored by replaying their base full backup
+        and every incremental backup after it, in order.
+        """
         
         logger.info(f"Starting restore from backup {backup_id}")
         
         # Find backup metadata
-        backup_metadata = None
-        for backup in self.backup_history:
-            if backup.backup_id == backup_id:
-                backup_metadata = backup
-                break
+        backup_metadata = self._find_backup(backup_id)
         
         if not backup_metadata:
             raise ValueError(f"Backup {backup_id} not found")
@@ -495,48 +818,79 @@ class BackupRecoveryService:
         documents_restored = 0
         
         try:
-            # Validate backup before restore
-            if not backup_metadata.validated:
-                validation_result = await self._validate_backup(backup_metadata)
-                if not validation_result['valid']:
-                    raise ValueError(f"Backup validation failed: {validation_result['errors']}")
+            chain = self._backup_chain(backup_metadata)
             
-            # Load backup data
-            backup_data = self._load_backup_data(backup_metadata.backup_file_path)
+            # Validate backups before restore
+            for backup in chain:
+                if not backup.validated:
+                    validation_result = await self._validate_backup(backup)
+                    if not validation_result['valid']:
+                        raise ValueError(f"Backup {backup.backup_id} validation failed: {validation_result['errors']}")
             
-            # Check if target instance exists
-            if instance_name in self.vector_store_service.initialized_instances:
-                if not overwrite_existing:
-                    raise ValueError(f"Instance {instance_name} already exists. Use overwrite_existing=True to replace it.")
-                
-                # Delete existing collection
-                collection_manager = CollectionManager()
-                await collection_manager.initialize()
-                await collection_manager.delete_instance_collection(instance_name)
-                warnings.append(f"Deleted existing collection for {instance_name}")
+            # Load backup manifests (or the whole file for legacy backups)
+            segmented = Path(backup_metadata.backup_file_path).name == MANIFEST_FILENAME
+            if segmented:
+                manifests = [self._load_manifest(backup.backup_file_path) for backup in chain]
+                collection_metadata = manifests[0].get('collection_metadata') or {}
+            else:
+                backup_data = self._load_backup_data(backup_metadata.backup_file_path)
+                collection_metadata = backup_data.get('collection_metadata') or {}
+            
+            progress_files = [
+                Path(backup.backup_file_path).parent / f"restore_{instance_name}.progress.json"
+                for backup in chain
+            ]
+            completed_segments = [
+                self._load_restore_progress(progress_file) if resume and segmented else set()
+                for progress_file in progress_files
+            ]
             
-            # Create new collection
             collection_manager = CollectionManager()
             await collection_manager.initialize()
             
-            creation_result = await collection_manager.create_instance_collection(
-                instance_name=instance_name,
-                embedding_model=backup_data.get('collection_metadata', {}).get('embedding_model', 'all-MiniLM-L6-v2'),
-                description=f"Restored from backup {backup_id}"
-            )
-            
-            if not creation_result['created']:
-                raise ValueError(f"Failed to create collection for {instance_name}")
+            if any(completed_segments):
+                warnings.append(
+                    f"Resuming restore, {sum(len(done) for done in completed_segments)} segments already restored"
+                )
+            else:
+                # Check if target instance exists
+                if instance_name in self.vector_store_service.initialized_instances:
+                    if not overwrite_existing:
+                        raise ValueError(f"Instance {instance_name} already exists. Use overwrite_existing=True to replace it.")
+                    
+                    # Delete existing collection
+                    await collection_manager.delete_instance_collection(instance_name)
+                    warnings.append(f"Deleted existing collection for {instance_name}")
+                
+                # Create new collection
+                creation_result = await collection_manager.create_instance_collection(
+                    instance_name=instance_name,
+                    embedding_model=collection_metadata.get('embedding_model', 'all-MiniLM-L6-v2'),
+                    description=f"Restored from backup {backup_id}"
+                )
+                
+                if not creation_result['created']:
+                    raise ValueError(f"Failed to create collection for {instance_name}")
             
-            # Get the new collection
+            # Get the target collection
             collection = await collection_manager.get_instance_collection(instance_name)
             if not collection:
                 raise ValueError(f"Failed to get collection for {instance_name}")
             
             # Restore data
-            data = backup_data['data']
+            if segmented:
+                for backup, manifest, done, progress_file in zip(chain, manifests, completed_segments, progress_files):
+                    documents_restored += await self._restore_segments(
+                        collection, Path(backup.backup_file_path).parent, manifest, done, progress_file
+                    )
+                    await self._apply_deletions(collection, manifest.get('deleted_ids', []))
+                
+                for progress_file in progress_files:
+                    progress_file.unlink(missing_ok=True)
             
-            if data.get('ids') and data.get('documents'):
+            elif backup_data['data'].get('ids') and backup_data['data'].get('documents'):
+                data = backup_data['data']
+
                 # Prepare data for restoration
                 restore_params = {
                     'ids': data['ids'],
@@ -591,6 +945,72 @@ class BackupRecoveryService:
         logger.info(f"Restore from backup {backup_id} {'completed' if success else 'failed'}")
         return recovery_result
     
+    async def _restore_segments(
+        self,
+        collection: Any,
+        backup_dir: Path,
+        manifest: Dict[str, Any],
+        completed_segments: set,
+        progress_file: Path
+    ) -> int:
+        """Restore backup segments concurrently, recording each finished segment."""
+        
+        semaphore = asyncio.Semaphore(self.backup_config['restore_concurrency'])
+        restore_embeddings = manifest.get('backup_type') != BackupType.METADATA_ONLY.value
+        
+        async def restore_segment(segment: Dict[str, Any]) -> None:
+            async with semaphore:
+                data = await asyncio.to_thread(self._read_segment, backup_dir, segment)
+                
+                restore_params = {'ids': data['ids']}
+                if data['documents']:
+                    restore_params['documents'] = data['documents']
+                if data['metadatas']:
+                    restore_params['metadatas'] = data['metadatas']
+                if data.get('embeddings') and restore_embeddings:
+                    restore_params['embeddings'] = data['embeddings']
+                
+                # Chroma needs documents or embeddings to store a record
+                if 'documents' in restore_params or 'embeddings' in restore_params:
+                    # Upsert keeps a resumed, partially written segment idempotent
+                    await asyncio.to_thread(collection.upsert, **restore_params)
+                
+                completed_segments.add(segment['index'])
+                self._save_restore_progress(progress_file, completed_segments)
+        
+        pending = [s for s in manifest['segments'] if s['index'] not in completed_segments]
+        await asyncio.gather(*(restore_segment(segment) for segment in pending))
+        
+        return sum(s['count'] for s in manifest['segments'] if s['index'] in completed_segments)
+    
+    async def _apply_deletions(self, collection: Any, deleted_ids: List[str]) -> None:
+        """Delete ids removed since an incremental backup's parent."""
+        
+        segment_size = self.backup_config['segment_size']
+        for start in range(0, len(deleted_ids), segment_size):
+            await asyncio.to_thread(collection.delete, ids=deleted_ids[start:start + segment_size])
+    
+    def _load_restore_progress(self, progress_file: Path) -> set:
+        """Load the indexes of segments already restored by an interrupted restore."""
+        
+        if not progress_file.exists():
+            return set()
+        
+        try:
+            with open(progress_file, 'r') as f:
+                return set(json.load(f).get('completed_segments', []))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable restore progress file {progress_file}: {e}")
+            return set()
+    
+    def _save_restore_progress(self, progress_file: Path, completed_segments: set) -> None:
+        """Persist restored segment indexes so an interrupted restore can resume."""
+        
+        temp_file = progress_file.with_suffix('.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump({'completed_segments': sorted(completed_segments)}, f)
+        temp_file.replace(progress_file)
+    
     async def _cleanup_old_backups(self, instance_name: str) -> None:
         """Clean up old backups based on retention policy."""
         
@@ -607,19 +1027,32 @@ class BackupRecoveryService:
         cutoff_date = datetime.now() - timedelta(days=self.backup_config['retention_days'])
         max_backups = self.backup_config['max_backups_per_instance']
         
-        backups_to_delete = []
+        retained = [
+            backup for backup in instance_backups[:max_backups]
+            if backup.created_at >= cutoff_date
+        ]
+        
+        # Incremental backups cannot be restored without their whole chain
+        required_ids = set()
+        for backup in retained:
+            try:
+                required_ids.update(b.backup_id for b in self._backup_chain(backup))
+            except ValueError:
+                required_ids.add(backup.backup_id)
         
-        # Mark old backups for deletion
-        for backup in instance_backups:
-            if backup.created_at < cutoff_date or len(instance_backups) > max_backups:
-                backups_to_delete.append(backup)
-                instance_backups.remove(backup)
+        backups_to_delete = [
+            backup for backup in instance_backups
+            if backup.backup_id not in required_ids
+        ]
         
         # Delete old backup files
         for backup in backups_to_delete:
             try:
                 backup_file = Path(backup.backup_file_path)
-                if backup_file.exists():
+                if backup_file.name == MANIFEST_FILENAME:
+                    shutil.rmtree(backup_file.parent, ignore_errors=True)
+                    logger.info(f"Deleted old backup directory: {backup_file.parent}")
+                elif backup_file.exists():
                     backup_file.unlink()
                     logger.info(f"Deleted old backup file: {backup.backup_file_path}")
                 
@@ -650,7 +1083,7 @@ class BackupRecoveryService:
                         try:
                             await self.create_backup(
                                 instance_name=instance_name,
-                                backup_type=BackupType.FULL,
+                                backup_type=self._scheduled_backup_type(instance_name),
                                 include_embeddings=self.backup_config['include_embeddings'],
                                 compress=self.backup_config['compression_enabled']
                             )
@@ -664,6 +1097,24 @@ class BackupRecoveryService:
                 logger.error(f"Error in automated backup scheduler: {e}")
                 await asyncio.sleep(3600)
     
+    def _scheduled_backup_type(self, instance_name: str) -> BackupType:
+        """Take a full backup once per interval and incremental backups in between."""
+        
+        full_backups = [
+            backup for backup in self.backup_history
+            if backup.instance_name == instance_name
+            and backup.backup_type == BackupType.FULL
+            and backup.status == BackupStatus.COMPLETED
+        ]
+        if not full_backups:
+            return BackupType.FULL
+        
+        last_full = max(backup.created_at for backup in full_backups)
+        if datetime.now() - last_full >= timedelta(days=self.backup_config['full_backup_interval_days']):
+            return BackupType.FULL
+        
+        return BackupType.INCREMENTAL
+    
     def get_backup_history(
         self, 
         instance_name: Optional[str] = None,
@@ -5,6 +5,7 @@ This module handles embedding generation, validation, and optimization
 for different scholar instances with configurable models and settings.
 """
 
+import sys
 import logging
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
@@ -14,6 +15,12 @@ import torch
 from pathlib import Path
 import json
 
+# Add backend directory to path for imports
+backend_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from services.embedding_store import get_embedding_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,9 +33,10 @@ class EmbeddingService:
     def __init__(self):
         self.models: Dict[str, SentenceTransformer] = {}
         self.model_configs: Dict[str, Dict[str, Any]] = {}
-        self.embedding_cache: Dict[str, np.ndarray] = {}
+        # Shared content-addressed store, so embeddings computed for one
+        # instance (or a previous run) are reused by every other one
+        self.embedding_store = get_embedding_store()
         self.cache_enabled = True
-        self.max_cache_size = 10000
         
         # Supported embedding models with their characteristics
         self.supported_models = {
@@ -106,12 +114,6 @@ class EmbeddingService:
         """Generate model key for instance-model combination."""
         return f"{instance_name}_{model_name}"
     
-    def _get_cache_key(self, text: str, model_name: str) -> str:
-        """Generate cache key for text-model combination."""
-        import hashlib
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        return f"{model_name}_{text_hash}"
-    
     async def generate_embeddings(
         self, 
         texts: List[str], 
@@ -124,34 +126,19 @@ class EmbeddingService:
         
         model_key = self._get_model_key(instance_name, model_name)
         
-        if model_key not in self.models:
-            # Try to initialize the model
-            if not await self.initialize_model(model_name, instance_name):
-                raise RuntimeError(f"Model {model_name} not available for {instance_name}")
-        
-        model = self.models[model_key]
-        
         try:
-            # Check cache for existing embeddings
-            cached_embeddings = {}
-            uncached_texts = []
-            uncached_indices = []
+            encoded_count = 0
             
-            if self.cache_enabled:
-                for i, text in enumerate(texts):
-                    cache_key = self._get_cache_key(text, model_name)
-                    if cache_key in self.embedding_cache:
-                        cached_embeddings[i] = self.embedding_cache[cache_key]
-                    else:
-                        uncached_texts.append(text)
-                        uncached_indices.append(i)
-            else:
-                uncached_texts = texts
-                uncached_indices = list(range(len(texts)))
-            
-            # Generate embeddings for uncached texts
-            new_embeddings = []
-            if uncached_texts:
+            async def encode(uncached_texts: List[str]) -> List[List[float]]:
+                nonlocal encoded_count
+                encoded_count = len(uncached_texts)
+                
+                # Only load the model when something actually needs encoding
+                if model_key not in self.models:
+                    if not await self.initialize_model(model_name, instance_name):
+                        raise RuntimeError(f"Model {model_name} not available for {instance_name}")
+                model = self.models[model_key]
+                
                 logger.info(f"Generating embeddings for {len(uncached_texts)} texts using {model_name}")
                 
                 # Generate embeddings in batches
@@ -161,33 +148,17 @@ class EmbeddingService:
                     show_progress_bar=show_progress,
                     convert_to_tensor=False
                 )
-                
-                new_embeddings = embeddings.tolist()
-                
-                # Cache new embeddings
-                if self.cache_enabled:
-                    for text, embedding in zip(uncached_texts, new_embeddings):
-                        cache_key = self._get_cache_key(text, model_name)
-                        self.embedding_cache[cache_key] = np.array(embedding)
-                        
-                        # Manage cache size
-                        if len(self.embedding_cache) > self.max_cache_size:
-                            # Remove oldest entries (simple FIFO)
-                            oldest_key = next(iter(self.embedding_cache))
-                            del self.embedding_cache[oldest_key]
-            
-            # Combine cached and new embeddings
-            final_embeddings = [None] * len(texts)
-            
-            # Add cached embeddings
-            for i, embedding in cached_embeddings.items():
-                final_embeddings[i] = embedding.tolist()
-            
-            # Add new embeddings
-            for i, embedding in zip(uncached_indices, new_embeddings):
-                final_embeddings[i] = embedding
-            
-            logger.info(f"Generated embeddings for {len(texts)} texts ({len(cached_embeddings)} from cache)")
+                return embeddings.tolist()
+            
+            if self.cache_enabled:
+                final_embeddings = await self.embedding_store.get_or_compute(
+                    model_name, texts, encode
+                )
+            else:
+                final_embeddings = await encode(list(texts))
+            cache_hits = len(texts) - encoded_count
+            
+            logger.info(f"Generated embeddings for {len(texts)} texts ({cache_hits} from cache)")
             return final_embeddings
             
         except Exception as e:
@@ -398,19 +369,23 @@ class EmbeddingService:
         return False
     
     def clear_cache(self) -> int:
-        """Clear the embedding cache and return number of cleared entries."""
-        cache_size = len(self.embedding_cache)
-        self.embedding_cache.clear()
+        """Clear the in-memory embedding cache and return number of cleared entries.
+        
+        Persisted embeddings are kept; they are content-addressed and never stale.
+        """
+        cache_size = self.embedding_store.clear_memory()
         logger.info(f"Cleared embedding cache ({cache_size} entries)")
         return cache_size
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get statistics about the embedding cache."""
+        store_stats = self.embedding_store.get_stats()
         return {
             'cache_enabled': self.cache_enabled,
-            'cache_size': len(self.embedding_cache),
-            'max_cache_size': self.max_cache_size,
-            'cache_hit_ratio': getattr(self, '_cache_hits', 0) / max(1, getattr(self, '_cache_requests', 1))
+            'cache_size': sum(m['vectors'] for m in store_stats['models'].values()),
+            'memory_cache_size': store_stats['memory_items'],
+            'max_cache_size': self.embedding_store.memory_items,
+            'cache_hit_ratio': store_stats['hit_rate']
         }
     
     async def benchmark_model(
@@ -500,7 +475,7 @@ class EmbeddingService:
         health_status = {
             'status': 'healthy',
             'loaded_models': len(self.models),
-            'cache_size': len(self.embedding_cache),
+            'cache_size': self.embedding_store.get_stats()['memory_items'],
             'supported_models': len(self.supported_models),
             'cuda_available': torch.cuda.is_available(),
             'issues': [],
@@ -525,11 +500,6 @@ class EmbeddingService:
                     health_status['issues'].append(f"Model {model_key} failed health check: {str(e)}")
                     health_status['status'] = 'degraded'
             
-            # Check cache health
-            if self.cache_enabled and len(self.embedding_cache) > self.max_cache_size * 1.1:
-                health_status['issues'].append("Embedding cache size exceeded maximum")
-                health_status['status'] = 'warning'
-            
         except Exception as e:
             health_status['status'] = 'error'
             health_status['issues'].append(f"Health check failed: {str(e)}")
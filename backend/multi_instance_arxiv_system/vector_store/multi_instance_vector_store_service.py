@@ -7,10 +7,13 @@ with complete separation, instance-specific metadata, and unified search capabil
 
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime
+from itertools import islice
+import heapq
 import logging
 import asyncio
+import time
 import uuid
 
 # Add backend directory to path for imports
@@ -28,6 +31,9 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Seconds one instance may take before search_all_instances returns without it
+DEFAULT_INSTANCE_SEARCH_TIMEOUT = 5.0
+
 
 class MultiInstanceVectorStoreService:
     """
@@ -192,7 +198,8 @@ class MultiInstanceVectorStoreService:
         
         try:
             # Add instance filter to ensure we only get results from this instance
-            instance_filters = filters or {}
+            # (copied, the caller's dict is shared between concurrent searches)
+            instance_filters = dict(filters or {})
             instance_filters['instance_name'] = instance_name
             
             results = await service.semantic_search(
@@ -219,58 +226,127 @@ class MultiInstanceVectorStoreService:
         query: str, 
         n_results: int = 10,
         instance_weights: Optional[Dict[str, float]] = None,
-        filters: Optional[Dict] = None
+        filters: Optional[Dict] = None,
+        instance_timeout: float = DEFAULT_INSTANCE_SEARCH_TIMEOUT
     ) -> List[Dict[str, Any]]:
         """Search across all initialized instances with optional weighting."""
+        report = await self.search_all_instances_with_report(
+            query=query,
+            n_results=n_results,
+            instance_weights=instance_weights,
+            filters=filters,
+            instance_timeout=instance_timeout
+        )
+        return report['results']
+    
+    async def search_all_instances_with_report(
+        self, 
+        query: str, 
+        n_results: int = 10,
+        instance_weights: Optional[Dict[str, float]] = None,
+        filters: Optional[Dict] = None,
+        instance_timeout: float = DEFAULT_INSTANCE_SEARCH_TIMEOUT
+    ) -> Dict[str, Any]:
+        """
+        Search all instances concurrently and report per-instance outcomes.
+        
+        Every instance is searched at the same time with its own timeout. An
+        instance that fails or times out is reported and left out, so a slow
+        instance yields partial results instead of delaying the whole search.
+        
+        Returns:
+            Dictionary with the merged 'results', per-instance 'instances'
+            reports (status, latency_ms, result_count) and 'partial'
+        """
+        report = {'results': [], 'instances': {}, 'partial': False}
         
         if not self.initialized_instances:
             logger.warning("No instances initialized for search")
-            return []
+            return report
         
         try:
             # Default equal weighting
             weights = instance_weights or {name: 1.0 for name in self.initialized_instances}
+            instance_names = list(self.initialized_instances)
             
-            # Search each instance
-            all_results = []
-            search_tasks = []
-            
-            for instance_name in self.initialized_instances:
+            searches = []
+            for instance_name in instance_names:
                 # Calculate results per instance based on weight
                 instance_weight = weights.get(instance_name, 1.0)
                 instance_results = max(1, int(n_results * instance_weight))
-                
-                task = self.search_instance_papers(
-                    instance_name=instance_name,
-                    query=query,
-                    n_results=instance_results,
-                    filters=filters
-                )
-                search_tasks.append((instance_name, task))
+                searches.append(self._timed_instance_search(
+                    instance_name, query, instance_results, filters, instance_timeout
+                ))
             
             # Execute searches concurrently
-            for instance_name, task in search_tasks:
-                try:
-                    results = await task
-                    all_results.extend(results)
-                except Exception as e:
-                    logger.error(f"Search failed for instance {instance_name}: {e}")
+            outcomes = await asyncio.gather(*searches)
+            
+            ranked_lists = []
+            for instance_name, (status, latency_ms, results) in zip(instance_names, outcomes):
+                report['instances'][instance_name] = {
+                    'status': status,
+                    'latency_ms': round(latency_ms, 2),
+                    'result_count': len(results)
+                }
+                if status != 'ok':
+                    report['partial'] = True
                     continue
-            
-            # Sort by relevance score and limit results
-            all_results.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
-            final_results = all_results[:n_results]
+                
+                for result in results:
+                    result['instance_latency_ms'] = round(latency_ms, 2)
+                # Each instance returns results best-first; keep that order for the merge
+                ranked_lists.append(sorted(
+                    results, key=lambda x: x.get('relevance_score', 0), reverse=True
+                ))
+            
+            # Streaming k-way merge, stopping as soon as the top n are known
+            merged = heapq.merge(
+                *ranked_lists, key=lambda x: x.get('relevance_score', 0), reverse=True
+            )
+            final_results = list(islice(merged, n_results))
             
             # Re-rank results
             for i, result in enumerate(final_results):
                 result['global_rank'] = i + 1
             
-            logger.info(f"Found {len(final_results)} total results across {len(self.initialized_instances)} instances")
-            return final_results
+            report['results'] = final_results
+            logger.info(f"Found {len(final_results)} total results across {len(instance_names)} instances"
+                        f"{' (partial)' if report['partial'] else ''}")
+            return report
             
         except Exception as e:
             logger.error(f"Error searching all instances: {e}")
-            return []
+            return report
+    
+    async def _timed_instance_search(
+        self,
+        instance_name: str,
+        query: str,
+        n_results: int,
+        filters: Optional[Dict],
+        timeout: float
+    ) -> Tuple[str, float, List[Dict[str, Any]]]:
+        """Search one instance, returning (status, latency in ms, results)."""
+        started = time.monotonic()
+        try:
+            results = await asyncio.wait_for(
+                self.search_instance_papers(
+                    instance_name=instance_name,
+                    query=query,
+                    n_results=n_results,
+                    filters=filters
+                ),
+                timeout=timeout
+            )
+            status = 'ok'
+        except asyncio.TimeoutError:
+            logger.warning(f"Search timed out for instance {instance_name} after {timeout}s")
+            results, status = [], 'timeout'
+        except Exception as e:
+            logger.error(f"Search failed for instance {instance_name}: {e}")
+            results, status = [], 'error'
+        
+        return status, (time.monotonic() - started) * 1000, results
     
     async def get_instance_stats(self, instance_name: str) -> Dict[str, Any]:
         """Get statistics for a specific instance."""
@@ -27,6 +27,7 @@ from ..feedback.reward_system import MultiObjectiveRewardCalculator
 from ..safety.constitutional_ai import ConstitutionalAI
 from ..safety.safety_monitor import SafetyMonitor
 from ..memory.memory_manager import MemoryManager
+from ..training.batch_collation import STRATEGIES, domain_feature_index
 
 logger = logging.getLogger(__name__)
 
@@ -169,6 +170,16 @@ class RLAgentController:
             # Sample action from policy
             action_type_idx, strategy_idx, parameters = self.policy_network.sample_action(policy_output)
             
+            # Record what was sampled so training can encode the action and
+            # compute PPO ratios against the acting policy
+            parameters["strategy"] = STRATEGIES[strategy_idx]
+            with torch.no_grad():
+                parameters["log_prob"] = self.policy_network.get_action_log_probs(
+                    policy_output,
+                    torch.tensor([action_type_idx], device=policy_output.action_logits.device),
+                    torch.tensor([strategy_idx], device=policy_output.action_logits.device)
+                ).item()
+            
             # Create action
             action = Action(
                 action_type=list(ActionType)[action_type_idx],
@@ -326,8 +337,7 @@ class RLAgentController:
         domain_features = torch.zeros(32).to(device)  # Placeholder
         if conversation_state.domain_context:
             # Simple domain encoding (would be more sophisticated in practice)
-            domain_hash = hash(conversation_state.domain_context) % 32
-            domain_features[domain_hash] = 1.0
+            domain_features[domain_feature_index(conversation_state.domain_context)] = 1.0
         
         # Create personalization features
         personalization_features = torch.zeros(16).to(device)  # Placeholder
@@ -8,6 +8,7 @@ from .experience_buffer import (
     PrioritizedExperienceBuffer,
     ConversationExperienceBuffer
 )
+from .experience_store import ExperienceStore
 from .memory_manager import (
     MemoryManager,
     PrivacyManager,
@@ -18,6 +19,7 @@ __all__ = [
     "ExperienceBuffer",
     "PrioritizedExperienceBuffer",
     "ConversationExperienceBuffer",
+    "ExperienceStore",
     "MemoryManager",
     "PrivacyManager",
     "DataRetentionManager"
@@ -4,46 +4,73 @@ Experience buffer implementation for the RL system.
 
 import asyncio
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple, Iterator
 import numpy as np
 import random
 from collections import deque
 import heapq
-from dataclasses import asdict
-import pickle
 import json
 
 from ..models.conversation_models import ConversationExperience, ConversationState, Action
 from ..models.reward_models import MultiObjectiveReward
 from ..core.config import RLConfig
+from .experience_store import ExperienceStore, StoredExperienceList
+from .segment_tree import MinTree, SumTree
 
 logger = logging.getLogger(__name__)
 
 
 class ExperienceBuffer:
-    """Basic experience buffer for storing conversation experiences."""
+    """
+    Basic experience buffer for storing conversation experiences.
+    
+    Experiences live in a ring of max_size slots: once the buffer is full,
+    each new experience overwrites the oldest one in place, so a slot index
+    keeps referring to the same experience until it is evicted.
+    """
     
     def __init__(self, config: RLConfig, max_size: int = 10000):
         self.config = config
         self.max_size = max_size
         self.experiences: List[ConversationExperience] = []
         self.current_size = 0
+        self.next_index = 0  # Slot the next experience is written to
+        
+        # Persistence state: experiences stored since the last save, and
+        # whether the saved copy no longer matches (after a clear)
+        self.unsaved_count = 0
+        self.needs_full_save = False
         
     async def store_experience(self, experience: ConversationExperience) -> None:
         """Store a new experience in the buffer."""
         
-        # Add experience
-        self.experiences.append(experience)
-        self.current_size += 1
+        self._insert(experience)
         
-        # Remove oldest if buffer is full
-        if self.current_size > self.max_size:
-            removed = self.experiences.pop(0)
-            self.current_size -= 1
+        logger.debug(f"Stored experience: {experience.experience_id}")
+    
+    def _insert(self, experience: ConversationExperience) -> int:
+        """Write an experience to the next slot, evicting the oldest if full, and return the slot."""
+        
+        slot = self.next_index
+        if self.current_size < self.max_size:
+            self.experiences.append(experience)
+            self.current_size += 1
+        else:
+            # Remove oldest by overwriting its slot
+            removed = self.experiences[slot]
+            self._evict(slot, removed)
+            self.experiences[slot] = experience
             logger.debug(f"Removed oldest experience: {removed.experience_id}")
         
-        logger.debug(f"Stored experience: {experience.experience_id}")
+        self.next_index = (slot + 1) % self.max_size
+        self.unsaved_count += 1
+        return slot
+    
+    def _evict(self, slot: int, experience: ConversationExperience) -> None:
+        """Called before the experience in a slot is overwritten."""
+        pass
     
     async def sample_batch(self, batch_size: int) -> List[ConversationExperience]:
         """Sample a random batch of experiences."""
@@ -52,12 +79,18 @@ class ExperienceBuffer:
             return []
         
         sample_size = min(batch_size, self.current_size)
-        return random.sample(self.experiences, sample_size)
+        # Sample slots so a lazily loaded buffer only reads what is drawn
+        slots = random.sample(range(self.current_size), sample_size)
+        return [self.experiences[slot] for slot in slots]
     
     async def get_recent_experiences(self, num_experiences: int) -> List[ConversationExperience]:
         """Get the most recent experiences."""
         
-        return self.experiences[-num_experiences:] if self.experiences else []
+        count = min(num_experiences, self.current_size)
+        return [
+            self.experiences[(self.next_index - offset) % self.max_size]
+            for offset in range(count, 0, -1)
+        ]
     
     def get_size(self) -> int:
         """Get current buffer size."""
@@ -71,17 +104,82 @@ class ExperienceBuffer:
         """Clear all experiences from buffer."""
         self.experiences.clear()
         self.current_size = 0
+        self.next_index = 0
+        self.unsaved_count = 0
+        self.needs_full_save = True
         logger.info("Experience buffer cleared")
+    
+    def chronological_slots(self) -> np.ndarray:
+        """Slots of the stored experiences, oldest first."""
+        slots = np.arange(self.current_size)
+        if self.current_size == self.max_size:
+            slots = np.roll(slots, -self.next_index)
+        return slots
+    
+    def _slot_priorities(self, slots: np.ndarray) -> np.ndarray:
+        """Replay priorities of the given slots (uniform for this buffer)."""
+        return np.ones(len(slots))
+    
+    def save_to(self, store: ExperienceStore) -> None:
+        """
+        Persist the buffer to a columnar store, appending only experiences
+        stored since the last save. The store is rewritten when the saved
+        copy cannot be extended, and compacted once superseded experiences
+        outnumber live ones.
+        """
+        slots = self.chronological_slots()
+        appendable = (
+            not self.needs_full_save and
+            self.unsaved_count <= self.current_size and
+            len(store) >= self.current_size - self.unsaved_count
+        )
+        if appendable:
+            new_slots = slots[len(slots) - self.unsaved_count:]
+        else:
+            store.reset()
+            new_slots = slots
+        
+        store.append([self.experiences[slot] for slot in new_slots])
+        if len(store) > 2 * self.current_size:
+            store.compact(self.current_size)
+        store.set_priorities(store.end - self.current_size, self._slot_priorities(slots))
+        
+        self.unsaved_count = 0
+        self.needs_full_save = False
+    
+    def load_from(self, store: ExperienceStore) -> None:
+        """
+        Restore the newest experiences of a store. Experiences are read from
+        disk when first accessed, not when loaded.
+        """
+        count = min(len(store), self.max_size)
+        self.experiences = StoredExperienceList(store, store.end - count, count)
+        self.current_size = count
+        self.next_index = count % self.max_size
+        self.unsaved_count = 0
+        self.needs_full_save = False
 
 
 class PrioritizedExperienceBuffer(ExperienceBuffer):
-    """Prioritized experience replay buffer."""
+    """
+    Prioritized experience replay buffer.
+    
+    Priorities are kept in a sum tree and a min tree indexed by buffer slot,
+    so storing an experience, updating priorities and drawing a batch each
+    take O(log n) per experience regardless of the buffer size.
+    """
     
     def __init__(self, config: RLConfig, max_size: int = 10000, alpha: float = 0.6):
         super().__init__(config, max_size)
         self.alpha = alpha  # Prioritization exponent
-        self.priorities = []
+        self.sum_tree = SumTree(max_size)
+        self.min_tree = MinTree(max_size)
         self.max_priority = 1.0
+    
+    @property
+    def priorities(self) -> np.ndarray:
+        """Priorities of the stored experiences, by slot."""
+        return self.sum_tree[np.arange(self.current_size)]
         
     async def store_experience(self, experience: ConversationExperience) -> None:
         """Store experience with initial priority."""
@@ -90,16 +188,12 @@ class PrioritizedExperienceBuffer(ExperienceBuffer):
         initial_priority = abs(experience.reward.total_reward) + 1e-6
         initial_priority = initial_priority ** self.alpha
         
-        # Store experience
+        # Store experience and its priority in the same slot
         await super().store_experience(experience)
-        
-        # Store priority
-        self.priorities.append(initial_priority)
+        slot = (self.next_index - 1) % self.max_size
+        self.sum_tree[slot] = initial_priority
+        self.min_tree[slot] = initial_priority
         self.max_priority = max(self.max_priority, initial_priority)
-        
-        # Remove oldest priority if buffer is full
-        if len(self.priorities) > self.max_size:
-            self.priorities.pop(0)
     
     async def sample_batch(
         self, 
@@ -109,6 +203,10 @@ class PrioritizedExperienceBuffer(ExperienceBuffer):
         """
         Sample batch with prioritized replay.
         
+        The total priority is split into batch_size equal segments and one
+        experience is drawn from each, so the batch is stratified across the
+        priority distribution (an experience can be drawn more than once).
+        
         Returns:
             experiences: Sampled experiences
             indices: Indices of sampled experiences
@@ -119,22 +217,18 @@ class PrioritizedExperienceBuffer(ExperienceBuffer):
             return [], np.array([]), np.array([])
         
         sample_size = min(batch_size, self.current_size)
+        total_priority = self.sum_tree.reduce()
         
-        # Calculate sampling probabilities
-        priorities = np.array(self.priorities[:self.current_size])
-        probabilities = priorities / priorities.sum()
+        # Sample indices, one from each priority segment
+        segment = total_priority / sample_size
+        targets = (np.arange(sample_size) + np.random.random_sample(sample_size)) * segment
+        indices = np.minimum(self.sum_tree.find_prefix_sum(targets), self.current_size - 1)
         
-        # Sample indices
-        indices = np.random.choice(
-            self.current_size, 
-            size=sample_size, 
-            p=probabilities,
-            replace=False
-        )
-        
-        # Calculate importance sampling weights
-        weights = (self.current_size * probabilities[indices]) ** (-beta)
-        weights = weights / weights.max()  # Normalize
+        # Calculate importance sampling weights, normalized by the largest
+        # possible weight (that of the lowest-priority experience)
+        probabilities = self.sum_tree[indices] / total_priority
+        min_probability = self.min_tree.reduce() / total_priority
+        weights = (probabilities / min_probability) ** (-beta)
         
         # Get sampled experiences
         sampled_experiences = [self.experiences[i] for i in indices]
@@ -144,17 +238,38 @@ class PrioritizedExperienceBuffer(ExperienceBuffer):
     async def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray) -> None:
         """Update priorities based on TD errors."""
         
-        for idx, td_error in zip(indices, td_errors):
-            if 0 <= idx < len(self.priorities):
-                priority = (abs(td_error) + 1e-6) ** self.alpha
-                self.priorities[idx] = priority
-                self.max_priority = max(self.max_priority, priority)
+        indices = np.asarray(indices, dtype=np.int64)
+        valid = (indices >= 0) & (indices < self.current_size)
+        if not np.any(valid):
+            return
+        
+        priorities = (np.abs(np.asarray(td_errors, dtype=np.float64)[valid]) + 1e-6) ** self.alpha
+        self.sum_tree.update(indices[valid], priorities)
+        self.min_tree.update(indices[valid], priorities)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
     
     def clear(self) -> None:
         """Clear buffer and priorities."""
         super().clear()
-        self.priorities.clear()
+        self.sum_tree.clear()
+        self.min_tree.clear()
         self.max_priority = 1.0
+    
+    def _slot_priorities(self, slots: np.ndarray) -> np.ndarray:
+        """Replay priorities of the given slots."""
+        return self.sum_tree[slots]
+    
+    def load_from(self, store: ExperienceStore) -> None:
+        """Restore experiences and their priorities from a store."""
+        super().load_from(store)
+        self.sum_tree.clear()
+        self.min_tree.clear()
+        if self.current_size:
+            priorities = np.asarray(store.column("priority", store.end - self.current_size), dtype=np.float64)
+            slots = np.arange(self.current_size)
+            self.sum_tree.update(slots, priorities)
+            self.min_tree.update(slots, priorities)
+            self.max_priority = max(1.0, float(priorities.max()))
 
 
 class ConversationExperienceBuffer(PrioritizedExperienceBuffer):
@@ -162,8 +277,9 @@ class ConversationExperienceBuffer(PrioritizedExperienceBuffer):
     
     def __init__(self, config: RLConfig, max_size: int = 10000):
         super().__init__(config, max_size)
-        self.conversation_groups: Dict[str, List[int]] = {}  # conversation_id -> experience indices
-        self.user_experiences: Dict[str, List[int]] = {}     # user_id -> experience indices
+        # Slots in insertion order, so the slot evicted next is always leftmost
+        self.conversation_groups: Dict[str, deque] = {}  # conversation_id -> experience indices
+        self.user_experiences: Dict[str, deque] = {}     # user_id -> experience indices
         
     async def store_experience(self, experience: ConversationExperience) -> None:
         """Store experience with conversation grouping."""
@@ -174,18 +290,33 @@ class ConversationExperienceBuffer(PrioritizedExperienceBuffer):
         # Update conversation grouping
         conv_id = experience.state.conversation_id
         user_id = experience.state.user_id
-        experience_idx = self.current_size - 1
+        experience_idx = (self.next_index - 1) % self.max_size
         
         if conv_id not in self.conversation_groups:
-            self.conversation_groups[conv_id] = []
+            self.conversation_groups[conv_id] = deque()
         self.conversation_groups[conv_id].append(experience_idx)
         
         if user_id not in self.user_experiences:
-            self.user_experiences[user_id] = []
+            self.user_experiences[user_id] = deque()
         self.user_experiences[user_id].append(experience_idx)
-        
-        # Clean up old conversation groups
-        await self._cleanup_conversation_groups()
+    
+    def _evict(self, slot: int, experience: ConversationExperience) -> None:
+        """Drop an overwritten slot from its conversation and user groups."""
+        
+        super()._evict(slot, experience)
+        
+        for groups, key in (
+            (self.conversation_groups, experience.state.conversation_id),
+            (self.user_experiences, experience.state.user_id)
+        ):
+            indices = groups.get(key)
+            if indices is None:
+                continue
+            # Slots are evicted oldest first, so the evicted slot is the group's oldest entry
+            if indices and indices[0] == slot:
+                indices.popleft()
+            if not indices:
+                del groups[key]
     
     async def sample_conversation_batch(self, num_conversations: int) -> List[List[ConversationExperience]]:
         """Sample complete conversations."""
@@ -246,33 +377,6 @@ class ConversationExperienceBuffer(PrioritizedExperienceBuffer):
         valid_experiences.sort(key=lambda x: x.timestamp)
         return valid_experiences
     
-    async def _cleanup_conversation_groups(self) -> None:
-        """Clean up conversation groups with invalid indices."""
-        
-        # Remove conversation groups with no valid indices
-        to_remove = []
-        for conv_id, indices in self.conversation_groups.items():
-            valid_indices = [idx for idx in indices if idx < self.current_size]
-            if not valid_indices:
-                to_remove.append(conv_id)
-            else:
-                self.conversation_groups[conv_id] = valid_indices
-        
-        for conv_id in to_remove:
-            del self.conversation_groups[conv_id]
-        
-        # Clean up user experiences
-        to_remove_users = []
-        for user_id, indices in self.user_experiences.items():
-            valid_indices = [idx for idx in indices if idx < self.current_size]
-            if not valid_indices:
-                to_remove_users.append(user_id)
-            else:
-                self.user_experiences[user_id] = valid_indices
-        
-        for user_id in to_remove_users:
-            del self.user_experiences[user_id]
-    
     def get_conversation_statistics(self) -> Dict[str, Any]:
         """Get statistics about stored conversations."""
         
@@ -308,6 +412,19 @@ class ConversationExperienceBuffer(PrioritizedExperienceBuffer):
         super().clear()
         self.conversation_groups.clear()
         self.user_experiences.clear()
+    
+    def load_from(self, store: ExperienceStore) -> None:
+        """Restore experiences and rebuild conversation groups from the stored id columns."""
+        super().load_from(store)
+        self.conversation_groups.clear()
+        self.user_experiences.clear()
+        
+        start = store.end - self.current_size
+        conversation_ids = store.texts("conversation_id", start)
+        user_ids = store.texts("user_id", start)
+        for slot, (conv_id, user_id) in enumerate(zip(conversation_ids, user_ids)):
+            self.conversation_groups.setdefault(conv_id, deque()).append(slot)
+            self.user_experiences.setdefault(user_id, deque()).append(slot)
 
 
 class ExperienceBufferManager:
@@ -336,6 +453,9 @@ class ExperienceBufferManager:
         
         self.quality_threshold = 0.7  # Threshold for high-quality experiences
         self.safety_threshold = 0.5   # Threshold for safety violations
+        
+        # Open experience stores by directory
+        self._stores: Dict[str, ExperienceStore] = {}
     
     async def store_experience(self, experience: ConversationExperience) -> None:
         """Store experience in appropriate buffers."""
@@ -451,34 +571,44 @@ class ExperienceBufferManager:
             )
         }
     
-    async def save_buffer_state(self, filepath: str) -> None:
-        """Save buffer state to disk."""
-        
-        buffer_state = {
-            "main_buffer_experiences": [asdict(exp) for exp in self.main_buffer.experiences],
-            "main_buffer_priorities": self.main_buffer.priorities,
-            "high_quality_experiences": [asdict(exp) for exp in self.high_quality_buffer.experiences],
-            "high_quality_priorities": self.high_quality_buffer.priorities,
-            "safety_experiences": [asdict(exp) for exp in self.safety_buffer.experiences],
-            "conversation_groups": self.main_buffer.conversation_groups,
-            "user_experiences": self.main_buffer.user_experiences,
-            "timestamp": datetime.now().isoformat()
+    def _buffers(self) -> Dict[str, ExperienceBuffer]:
+        return {
+            "main": self.main_buffer,
+            "high_quality": self.high_quality_buffer,
+            "safety": self.safety_buffer
         }
+    
+    def _store(self, directory: str, name: str) -> ExperienceStore:
+        """Open a buffer's store, reusing it across saves."""
+        path = os.path.join(directory, name)
+        store = self._stores.get(path)
+        if store is None:
+            store = self._stores[path] = ExperienceStore(path)
+        return store
+    
+    async def save_buffer_state(self, filepath: str) -> None:
+        """
+        Save buffer state to disk, as one columnar store per buffer under
+        the filepath directory. Saves after the first only append what
+        changed.
+        """
         
-        with open(filepath, 'wb') as f:
-            pickle.dump(buffer_state, f)
+        for name, buffer in self._buffers().items():
+            buffer.save_to(self._store(filepath, name))
         
         logger.info(f"Buffer state saved to {filepath}")
     
     async def load_buffer_state(self, filepath: str) -> None:
-        """Load buffer state from disk."""
+        """Load buffer state from disk, reading experiences lazily."""
         
         try:
-            with open(filepath, 'rb') as f:
-                buffer_state = pickle.load(f)
+            for name, buffer in self._buffers().items():
+                buffer.load_from(self._store(filepath, name))
             
-            # Reconstruct experiences (simplified - would need proper deserialization)
-            logger.info(f"Buffer state loaded from {filepath}")
+            logger.info(
+                f"Buffer state loaded from {filepath}: "
+                f"{self.get_buffer_statistics()['total_experiences']} experiences"
+            )
             
         except Exception as e:
             logger.error(f"Failed to load buffer state: {e}")
@@ -0,0 +1,395 @@
+"""
+Columnar on-disk storage for RL experiences.
+
+A store is a directory of append-only files, one per field:
+
+- fixed-width columns (``<name>.col``): rewards, dones, priorities, action
+  ids and timestamps, one value per experience
+- variable-length fields (``<name>.off`` + ``<name>.bin``): the end offset
+  of every value and the concatenated UTF-8 / pickle bytes
+- feature matrices (``<name>.feat``): float32 rows of a fixed width, such as
+  the encoded conversation state
+
+All of them are read through memory maps, so opening a store costs nothing
+and only the rows that are touched are paged in. ``meta.json`` records how
+many experiences are committed; it is rewritten last, so bytes appended by
+an interrupted write are ignored (and truncated on the next open).
+"""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+from collections.abc import Sequence as SequenceABC
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from ..models.conversation_models import ActionType, ConversationExperience
+
+logger = logging.getLogger(__name__)
+
+# Fixed-width columns and their dtypes
+COLUMNS: Dict[str, Any] = {
+    "reward": np.float32,
+    "safety": np.float32,
+    "done": np.uint8,
+    "action_id": np.int16,
+    "priority": np.float64,
+    "timestamp": np.float64,
+}
+
+# Variable-length fields; "record" holds the pickled experience itself
+VARIABLE_FIELDS = ("experience_id", "conversation_id", "user_id", "response_text", "record")
+
+# Feature matrices, from the states' tensor encodings
+FEATURE_FIELDS = ("state", "next_state")
+
+ACTION_TYPES = list(ActionType)
+
+STORE_VERSION = 1
+
+
+def action_id(action: Any) -> int:
+    """Position of an action's type in ActionType, or -1 if it has none."""
+    try:
+        return ACTION_TYPES.index(getattr(action, "action_type", None))
+    except ValueError:
+        return -1
+
+
+def state_features(state: Any) -> Optional[np.ndarray]:
+    """A state's tensor encoding as a flat float32 vector, if it has one."""
+    if state is None or not hasattr(state, "to_tensor"):
+        return None
+    try:
+        tensor = state.to_tensor()
+    except Exception as e:
+        logger.debug(f"Could not encode state: {e}")
+        return None
+    if hasattr(tensor, "detach"):
+        tensor = tensor.detach().cpu().numpy()
+    return np.asarray(tensor, dtype=np.float32).ravel()
+
+
+def _timestamp(experience: ConversationExperience) -> float:
+    timestamp = getattr(experience, "timestamp", None)
+    return timestamp.timestamp() if hasattr(timestamp, "timestamp") else 0.0
+
+
+def _variable_value(experience: ConversationExperience, field: str) -> bytes:
+    if field == "record":
+        return pickle.dumps(experience, protocol=pickle.HIGHEST_PROTOCOL)
+    if field == "experience_id":
+        value = experience.experience_id
+    elif field in ("conversation_id", "user_id"):
+        value = getattr(experience.state, field, None)
+    else:
+        value = getattr(experience.action, field, None)
+    return (value or "").encode("utf-8")
+
+
+class ExperienceStore:
+    """
+    Append-only columnar experience storage in ``directory``.
+
+    Experiences are addressed by logical index: the i-th experience ever
+    appended keeps index i. ``compact`` drops the oldest experiences from
+    disk and advances ``start``, without renumbering the ones it keeps.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._recover()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        meta = self._read_meta()
+        self.start: int = meta.get("start", 0)
+        self.end: int = meta.get("end", 0)
+        self.feature_dims: Dict[str, int] = meta.get("feature_dims", {})
+
+        self._maps: Dict[str, np.ndarray] = {}
+        self._truncate_uncommitted()
+
+    def __len__(self) -> int:
+        """Number of experiences on disk."""
+        return self.end - self.start
+
+    # Files and metadata
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _read_meta(self) -> Dict[str, Any]:
+        try:
+            with open(self._path("meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_meta(self, directory: Optional[Path] = None) -> None:
+        path = (directory or self.directory) / "meta.json"
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": STORE_VERSION,
+                "start": self.start,
+                "end": self.end,
+                "feature_dims": self.feature_dims
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+
+    def _recover(self) -> None:
+        """Finish or roll back a compaction that was interrupted."""
+        compacted = self.directory.with_name(self.directory.name + ".compact")
+        previous = self.directory.with_name(self.directory.name + ".old")
+        if not self.directory.exists() and previous.exists():
+            previous.rename(self.directory)
+        shutil.rmtree(compacted, ignore_errors=True)
+        shutil.rmtree(previous, ignore_errors=True)
+
+    def _file_sizes(self, count: int) -> Dict[str, int]:
+        sizes = {f"{name}.col": count * np.dtype(dtype).itemsize for name, dtype in COLUMNS.items()}
+        for field in VARIABLE_FIELDS:
+            sizes[f"{field}.off"] = count * 8
+        for field, dim in self.feature_dims.items():
+            sizes[f"{field}.feat"] = count * dim * 4
+        return sizes
+
+    def _truncate_uncommitted(self) -> None:
+        """Drop bytes past the committed count left by an interrupted append."""
+        count = len(self)
+        for name, size in self._file_sizes(count).items():
+            path = self._path(name)
+            if path.exists() and path.stat().st_size > size:
+                os.truncate(path, size)
+        for field in VARIABLE_FIELDS:
+            path = self._path(f"{field}.bin")
+            arena_size = int(self._offsets(field)[-1]) if count else 0
+            if path.exists() and path.stat().st_size > arena_size:
+                os.truncate(path, arena_size)
+        self._maps.clear()
+
+    def _map(self, name: str, dtype: Any, shape: tuple, writable: bool = False) -> np.ndarray:
+        array = self._maps.get(name)
+        if array is None:
+            if not shape[0] or not self._path(name).exists():
+                array = np.zeros(shape, dtype=dtype)
+            else:
+                array = np.memmap(self._path(name), dtype=dtype, mode="r+" if writable else "r", shape=shape)
+            self._maps[name] = array
+        return array
+
+    # Reading
+
+    def _local(self, index: int) -> int:
+        if not self.start <= index < self.end:
+            raise IndexError(f"Experience {index} is not stored (stored: {self.start}..{self.end - 1})")
+        return index - self.start
+
+    def column(self, name: str, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """A fixed-width column over logical indices [start, end), memory-mapped."""
+        array = self._map(f"{name}.col", COLUMNS[name], (len(self),), writable=name == "priority")
+        return array[(start if start is not None else self.start) - self.start:
+                     (end if end is not None else self.end) - self.start]
+
+    def features(self, field: str, start: Optional[int] = None, end: Optional[int] = None) -> Optional[np.ndarray]:
+        """A feature matrix over logical indices [start, end), memory-mapped, if any was stored."""
+        dim = self.feature_dims.get(field)
+        if dim is None:
+            return None
+        array = self._map(f"{field}.feat", np.float32, (len(self), dim))
+        return array[(start if start is not None else self.start) - self.start:
+                     (end if end is not None else self.end) - self.start]
+
+    def _offsets(self, field: str) -> np.ndarray:
+        # End offsets, with a leading zero so value i spans offsets[i]:offsets[i + 1]
+        ends = self._map(f"{field}.off", np.int64, (len(self),))
+        offsets = self._maps.get(f"{field}.offsets")
+        if offsets is None:
+            offsets = self._maps[f"{field}.offsets"] = np.concatenate([[0], ends])
+        return offsets
+
+    def _arena(self, field: str) -> np.ndarray:
+        return self._map(f"{field}.bin", np.uint8, (int(self._offsets(field)[-1]),))
+
+    def value(self, field: str, index: int) -> bytes:
+        """Raw bytes of a variable-length field."""
+        local = self._local(index)
+        offsets = self._offsets(field)
+        return self._arena(field)[offsets[local]:offsets[local + 1]].tobytes()
+
+    def texts(self, field: str, start: Optional[int] = None, end: Optional[int] = None) -> List[str]:
+        """A text field decoded over logical indices [start, end)."""
+        first = (start if start is not None else self.start) - self.start
+        last = (end if end is not None else self.end) - self.start
+        offsets = self._offsets(field)[first:last + 1]
+        if len(offsets) < 2:
+            return []
+        data = self._arena(field)[offsets[0]:offsets[-1]].tobytes()
+        bounds = (offsets - offsets[0]).tolist()
+        return [data[a:b].decode("utf-8") for a, b in zip(bounds, bounds[1:])]
+
+    def read(self, index: int) -> ConversationExperience:
+        """Reconstruct a stored experience."""
+        return pickle.loads(self.value("record", index))
+
+    # Writing
+
+    def append(self, experiences: Sequence[ConversationExperience], priorities: Optional[Sequence[float]] = None) -> None:
+        """Append experiences, committing them all at once."""
+        if not experiences:
+            return
+
+        count = len(experiences)
+        columns = {
+            "reward": [experience.reward.total_reward for experience in experiences],
+            "safety": [getattr(experience.reward, "safety", 0.0) for experience in experiences],
+            "done": [bool(getattr(experience, "done", False)) for experience in experiences],
+            "action_id": [action_id(experience.action) for experience in experiences],
+            "priority": priorities if priorities is not None else np.zeros(count),
+            "timestamp": [_timestamp(experience) for experience in experiences],
+        }
+        for name, values in columns.items():
+            with open(self._path(f"{name}.col"), "ab") as f:
+                f.write(np.asarray(values, dtype=COLUMNS[name]).tobytes())
+
+        arena_ends = {}
+        for field in VARIABLE_FIELDS:
+            values = [_variable_value(experience, field) for experience in experiences]
+            base = int(self._offsets(field)[-1]) if len(self) else 0
+            ends = base + np.cumsum([len(value) for value in values], dtype=np.int64)
+            with open(self._path(f"{field}.bin"), "ab") as f:
+                f.write(b"".join(values))
+            with open(self._path(f"{field}.off"), "ab") as f:
+                f.write(ends.tobytes())
+            arena_ends[field] = ends
+
+        for field in FEATURE_FIELDS:
+            vectors = [state_features(getattr(experience, field, None)) for experience in experiences]
+            dim = self.feature_dims.get(field)
+            if dim is None:
+                dim = next((len(vector) for vector in vectors if vector is not None), None)
+                if dim is None:
+                    continue
+                if len(self):
+                    # Rows stored before this field appeared are zeros
+                    with open(self._path(f"{field}.feat"), "wb") as f:
+                        f.write(np.zeros((len(self), dim), dtype=np.float32).tobytes())
+                self.feature_dims[field] = dim
+            rows = np.zeros((count, dim), dtype=np.float32)
+            for row, vector in zip(rows, vectors):
+                if vector is not None and len(vector) == dim:
+                    row[:] = vector
+            with open(self._path(f"{field}.feat"), "ab") as f:
+                f.write(rows.tobytes())
+
+        self.end += count
+        self._maps.clear()
+        self._write_meta()
+
+    def set_priorities(self, start: int, priorities: Sequence[float]) -> None:
+        """Overwrite stored priorities from logical index start."""
+        if len(priorities) == 0:
+            return
+        column = self.column("priority", start, start + len(priorities))
+        column[:] = priorities
+        if isinstance(column, np.memmap):
+            column.flush()
+
+    def reset(self) -> None:
+        """Remove every stored experience, continuing the logical numbering."""
+        for path in self.directory.iterdir():
+            if path.name != "meta.json":
+                path.unlink()
+        self._maps.clear()
+        self.start = self.end
+        self.feature_dims = {}
+        self._write_meta()
+
+    def compact(self, keep_last: int) -> None:
+        """Drop all but the newest keep_last experiences from disk."""
+        keep_from = max(self.start, self.end - keep_last)
+        if keep_from == self.start:
+            return
+
+        compacted = self.directory.with_name(self.directory.name + ".compact")
+        previous = self.directory.with_name(self.directory.name + ".old")
+        shutil.rmtree(compacted, ignore_errors=True)
+        compacted.mkdir(parents=True)
+
+        for name in COLUMNS:
+            self.column(name, keep_from).tofile(compacted / f"{name}.col")
+        for field in self.feature_dims:
+            self.features(field, keep_from).tofile(compacted / f"{field}.feat")
+        first = keep_from - self.start
+        for field in VARIABLE_FIELDS:
+            offsets = self._offsets(field)
+            self._arena(field)[offsets[first]:].tofile(compacted / f"{field}.bin")
+            (offsets[first + 1:] - offsets[first]).tofile(compacted / f"{field}.off")
+
+        self._maps.clear()
+        dropped = keep_from - self.start
+        self.start = keep_from
+        self._write_meta(compacted)
+
+        self.directory.rename(previous)
+        compacted.rename(self.directory)
+        shutil.rmtree(previous, ignore_errors=True)
+        logger.info(f"Compacted experience store {self.directory}: dropped {dropped} experiences")
+
+
+class StoredExperienceList(SequenceABC):
+    """
+    A list of experiences whose first ``count`` entries are read from a store
+    on access, rather than loaded up front. Entries written after loading
+    are kept in memory.
+    """
+
+    def __init__(self, store: ExperienceStore, start: int, count: int):
+        self.store = store
+        self.start = start
+        self.count = count
+        self._overrides: Dict[int, ConversationExperience] = {}
+        self._appended: List[ConversationExperience] = []
+
+    def __len__(self) -> int:
+        return self.count + len(self._appended)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index >= self.count:
+            return self._appended[index - self.count]
+        if index < 0:
+            raise IndexError(index)
+        experience = self._overrides.get(index)
+        if experience is None:
+            experience = self.store.read(self.start + index)
+        return experience
+
+    def __setitem__(self, index: int, experience: ConversationExperience) -> None:
+        if index < 0:
+            index += len(self)
+        if index >= self.count:
+            self._appended[index - self.count] = experience
+        else:
+            self._overrides[index] = experience
+
+    def __iter__(self) -> Iterator[ConversationExperience]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, experience: ConversationExperience) -> None:
+        self._appended.append(experience)
+
+    def clear(self) -> None:
+        self.count = 0
+        self._overrides.clear()
+        self._appended.clear()
@@ -4,6 +4,7 @@ Memory management and privacy protection for the RL system.
 
 import asyncio
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Set
 import hashlib
@@ -333,13 +334,24 @@ class MemoryManager:
         # Background cleanup task
         self.cleanup_task: Optional[asyncio.Task] = None
         self.cleanup_interval = timedelta(hours=24)  # Daily cleanup
+        
+        # Background checkpointing of the experience buffers
+        self.checkpoint_task: Optional[asyncio.Task] = None
+        self.checkpoint_interval = timedelta(minutes=5)
     
     async def initialize(self) -> None:
         """Initialize memory management system."""
         
+        # Restore the replay buffers saved by the previous run
+        if os.path.isdir(self.config.experience_storage_path):
+            await self.experience_buffer.load_buffer_state(self.config.experience_storage_path)
+        
         # Start background cleanup task
         self.cleanup_task = asyncio.create_task(self._background_cleanup())
         
+        # Start background checkpoint task
+        self.checkpoint_task = asyncio.create_task(self._background_checkpoint())
+        
         logger.info("Memory management system initialized")
     
     async def store_experience_with_privacy(
@@ -431,6 +443,19 @@ class MemoryManager:
             except Exception as e:
                 logger.error(f"Error in background cleanup: {e}")
     
+    async def _background_checkpoint(self) -> None:
+        """Background task for periodically saving the experience buffers."""
+        
+        while True:
+            try:
+                await asyncio.sleep(self.checkpoint_interval.total_seconds())
+                await self.experience_buffer.save_buffer_state(self.config.experience_storage_path)
+                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in background checkpoint: {e}")
+    
     def get_privacy_statistics(self) -> Dict[str, Any]:
         """Get privacy and data management statistics."""
         
@@ -463,11 +488,18 @@ class MemoryManager:
     async def shutdown(self) -> None:
         """Shutdown memory management system."""
         
-        if self.cleanup_task:
-            self.cleanup_task.cancel()
-            try:
-                await self.cleanup_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self.cleanup_task, self.checkpoint_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        
+        # Save the replay buffers for the next run
+        try:
+            await self.experience_buffer.save_buffer_state(self.config.experience_storage_path)
+        except Exception as e:
+            logger.error(f"Failed to save experience buffers: {e}")
         
         logger.info("Memory management system shutdown")
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Segment trees over experience priorities for prioritized replay.
+"""
+
+import operator
+from typing import Callable, Union
+
+import numpy as np
+
+
+class SegmentTree:
+    """
+    Array-backed binary segment tree over a fixed number of slots.
+
+    Node i has children 2i and 2i + 1; the leaves for slots 0..capacity-1
+    sit at positions capacity..2*capacity-1, with capacity rounded up to a
+    power of two (at least 2). Unused leaves hold the identity element.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        operation: np.ufunc,
+        scalar_operation: Callable[[float, float], float],
+        identity: float
+    ):
+        self.capacity = 2
+        while self.capacity < capacity:
+            self.capacity *= 2
+        self.depth = self.capacity.bit_length() - 1
+        self.operation = operation
+        self.scalar_operation = scalar_operation
+        self.identity = identity
+        self.tree = np.full(2 * self.capacity, identity, dtype=np.float64)
+
+    def __getitem__(self, index: Union[int, np.ndarray]) -> Union[float, np.ndarray]:
+        return self.tree[np.asarray(index) + self.capacity]
+
+    def __setitem__(self, index: int, value: float) -> None:
+        """Set one leaf and recompute its ancestors in O(log n)"""
+        position = index + self.capacity
+        tree = self.tree
+        combine = self.scalar_operation
+        tree[position] = value
+        position //= 2
+        while position >= 1:
+            tree[position] = combine(tree[2 * position], tree[2 * position + 1])
+            position //= 2
+
+    def update(self, indices: np.ndarray, values: np.ndarray) -> None:
+        """
+        Set many leaves, recomputing each level's touched nodes at once.
+        Repeated indices are fine: a parent reached twice is given the same
+        value both times.
+        """
+        positions = np.asarray(indices, dtype=np.int64) + self.capacity
+        tree = self.tree
+        tree[positions] = values
+        for _ in range(self.depth):
+            positions >>= 1
+            children = positions << 1
+            tree[positions] = self.operation(tree[children], tree[children + 1])
+
+    def reduce(self) -> float:
+        """The operation applied over all slots"""
+        return float(self.tree[1])
+
+    def clear(self) -> None:
+        self.tree.fill(self.identity)
+
+
+class SumTree(SegmentTree):
+    """Segment tree of priority sums supporting prefix-sum search."""
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity, np.add, operator.add, 0.0)
+
+    def find_prefix_sum(self, values: np.ndarray) -> np.ndarray:
+        """
+        For each value, the slot whose cumulative-priority interval contains
+        it, descending all values through the tree together in O(log n).
+        """
+        values = np.array(values, dtype=np.float64)
+        positions = np.ones(len(values), dtype=np.int64)
+        tree = self.tree
+        for _ in range(self.depth):
+            positions <<= 1
+            left_sums = tree[positions]
+            go_right = values > left_sums
+            values -= left_sums * go_right
+            positions += go_right
+        return positions - self.capacity
+
+
+class MinTree(SegmentTree):
+    """Segment tree of priority minimums."""
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity, np.minimum, min, float("inf"))
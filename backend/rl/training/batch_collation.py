@@ -0,0 +1,151 @@
+"""
+Batch collation for RL training.
+
+Turns sampled experiences into the tensors the policy and value networks
+take: every field is gathered into one contiguous NumPy array and moved to
+the training device with a single copy. On CUDA the host arrays live in
+pinned staging buffers that are reused across steps, so the copies run
+asynchronously.
+"""
+
+import logging
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from ..core.config import NetworkConfig
+from ..memory.experience_store import action_id, state_features
+from ..models.conversation_models import ConversationExperience
+from ..user_modeling.personalization_engine import ResponseStrategy
+
+logger = logging.getLogger(__name__)
+
+USER_PROFILE_DIM = 64
+DOMAIN_DIM = 32
+PERSONALIZATION_DIM = 16
+
+STRATEGIES = [strategy.value for strategy in ResponseStrategy]
+DEFAULT_STRATEGY = STRATEGIES.index(ResponseStrategy.BALANCED_APPROACH.value)
+
+
+def domain_feature_index(domain_context: Optional[str]) -> Optional[int]:
+    """Slot of a domain in the one-hot domain features, stable across processes."""
+    if not domain_context:
+        return None
+    return zlib.crc32(domain_context.encode("utf-8")) % DOMAIN_DIM
+
+
+def strategy_id(action: Any) -> int:
+    """Position of an action's response strategy in ResponseStrategy."""
+    parameters = getattr(action, "strategy_parameters", None) or {}
+    strategy = parameters.get("strategy", ResponseStrategy.BALANCED_APPROACH.value)
+    strategy = getattr(strategy, "value", strategy)
+    return STRATEGIES.index(strategy) if strategy in STRATEGIES else DEFAULT_STRATEGY
+
+
+def behavior_log_prob(action: Any) -> float:
+    """Log probability the acting policy gave the action, or NaN if it was not recorded."""
+    parameters = getattr(action, "strategy_parameters", None) or {}
+    log_prob = parameters.get("log_prob")
+    return float(log_prob) if log_prob is not None else float("nan")
+
+
+class BatchCollator:
+    """
+    Builds training batches from experiences.
+
+    States are encoded with ``state.to_tensor()`` (truncated or zero-padded to
+    ``state_dim``) and one-hot domain features; actions with their ActionType
+    and ResponseStrategy positions. User profile and personalization features
+    are not part of an experience and stay zero.
+    """
+
+    def __init__(self, config: NetworkConfig, device: torch.device):
+        self.state_dim = config.state_dim
+        self.device = device
+        self.pin_memory = device.type == "cuda" and torch.cuda.is_available()
+
+        self._staging: Dict[str, torch.Tensor] = {}
+        self._copies_done: Optional[torch.cuda.Event] = None
+
+    def _host_array(self, name: str, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+        """A zeroed host array for one field, backed by a reused pinned buffer on CUDA."""
+        if not self.pin_memory:
+            return np.zeros(shape, dtype=dtype)
+
+        staging = self._staging.get(name)
+        if staging is None or staging.shape[0] < shape[0]:
+            staging = self._staging[name] = torch.from_numpy(np.zeros(shape, dtype=dtype)).pin_memory()
+        array = staging.numpy()[:shape[0]]
+        array.fill(0)
+        return array
+
+    def _to_device(self, array: np.ndarray) -> torch.Tensor:
+        tensor = torch.from_numpy(array)
+        if self.pin_memory:
+            return tensor.to(self.device, non_blocking=True)
+        return tensor.to(self.device)
+
+    def _encode_states(self, states: Sequence[Any], prefix: str) -> Dict[str, torch.Tensor]:
+        size = len(states)
+        features = self._host_array(f"{prefix}_states", (size, self.state_dim), np.float32)
+        domains = self._host_array(f"{prefix}_domains", (size, DOMAIN_DIM), np.float32)
+
+        for row, state in enumerate(states):
+            vector = state_features(state)
+            if vector is not None:
+                width = min(len(vector), self.state_dim)
+                features[row, :width] = vector[:width]
+            domain = domain_feature_index(getattr(state, "domain_context", None))
+            if domain is not None:
+                domains[row, domain] = 1.0
+
+        return {
+            "conversation_states": self._to_device(features).unsqueeze(1),  # Add sequence dimension
+            "user_profile_features": torch.zeros(size, USER_PROFILE_DIM, device=self.device),
+            "domain_features": self._to_device(domains),
+            "personalization_features": torch.zeros(size, PERSONALIZATION_DIM, device=self.device)
+        }
+
+    def collate(
+        self,
+        experiences: List[ConversationExperience]
+    ) -> Tuple[Dict[str, torch.Tensor], Dict[str, torch.Tensor], torch.Tensor, Dict[str, torch.Tensor], torch.Tensor]:
+        """Build (states, actions, rewards, next_states, dones) for a batch."""
+
+        # Staging buffers are rewritten below, so the previous batch's
+        # copies out of them must have finished
+        if self._copies_done is not None:
+            self._copies_done.synchronize()
+
+        size = len(experiences)
+        rewards = self._host_array("rewards", (size,), np.float32)
+        dones = self._host_array("dones", (size,), np.float32)
+        action_types = self._host_array("action_types", (size,), np.int64)
+        strategies = self._host_array("strategies", (size,), np.int64)
+        old_log_probs = self._host_array("old_log_probs", (size,), np.float32)
+
+        rewards[:] = [experience.reward.total_reward for experience in experiences]
+        dones[:] = [bool(getattr(experience, "done", False)) for experience in experiences]
+        # Unknown action types fall back to the first type
+        action_types[:] = [max(action_id(experience.action), 0) for experience in experiences]
+        strategies[:] = [strategy_id(experience.action) for experience in experiences]
+        old_log_probs[:] = [behavior_log_prob(experience.action) for experience in experiences]
+
+        states = self._encode_states([experience.state for experience in experiences], "state")
+        next_states = self._encode_states(
+            [getattr(experience, "next_state", None) for experience in experiences], "next_state"
+        )
+        actions = {
+            "action_types": self._to_device(action_types),
+            "strategies": self._to_device(strategies),
+            "old_log_probs": self._to_device(old_log_probs)
+        }
+        batch = (states, actions, self._to_device(rewards), next_states, self._to_device(dones))
+
+        if self.pin_memory:
+            self._copies_done = torch.cuda.Event()
+            self._copies_done.record()
+        return batch
@@ -17,6 +17,7 @@ from ..networks.policy_network import PolicyNetwork
 from ..networks.value_network import ValueNetwork
 from ..memory.experience_buffer import ExperienceBufferManager
 from ..models.conversation_models import ConversationExperience
+from .batch_collation import BatchCollator
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +51,7 @@ class PPOTrainer:
         self.policy_network = policy_network
         self.value_network = value_network
         self.experience_buffer = experience_buffer
+        self.collator = BatchCollator(config.network, torch.device(config.network.device))
         
         # Optimizers
         self.policy_optimizer = optim.Adam(
@@ -83,6 +85,17 @@ class PPOTrainer:
         
         # Calculate advantages
         with torch.no_grad():
+            # Experiences without a recorded behavior log probability use the
+            # current policy's, so their first-epoch ratio is 1
+            missing_log_probs = torch.isnan(actions['old_log_probs'])
+            if missing_log_probs.any():
+                current_log_probs = self.policy_network.get_action_log_probs(
+                    self.policy_network(**states), actions['action_types'], actions['strategies']
+                )
+                actions['old_log_probs'] = torch.where(
+                    missing_log_probs, current_log_probs, actions['old_log_probs']
+                )
+            
             values = self.value_network.estimate_value(**states)
             next_values = self.value_network.estimate_value(**next_states)
             
@@ -193,49 +206,7 @@ class PPOTrainer:
     ) -> Tuple[Dict[str, torch.Tensor], Dict[str, torch.Tensor], torch.Tensor, Dict[str, torch.Tensor], torch.Tensor]:
         """Prepare training data from experiences."""
         
-        device = torch.device(self.config.network.device)
-        batch_size = len(experiences)
-        
-        # Prepare states (simplified)
-        states = {
-            "conversation_states": torch.zeros(batch_size, 1, self.config.network.state_dim).to(device),
-            "user_profile_features": torch.zeros(batch_size, 64).to(device),
-            "domain_features": torch.zeros(batch_size, 32).to(device),
-            "personalization_features": torch.zeros(batch_size, 16).to(device)
-        }
-        
-        # Prepare next states
-        next_states = {
-            "conversation_states": torch.zeros(batch_size, 1, self.config.network.state_dim).to(device),
-            "user_profile_features": torch.zeros(batch_size, 64).to(device),
-            "domain_features": torch.zeros(batch_size, 32).to(device),
-            "personalization_features": torch.zeros(batch_size, 16).to(device)
-        }
-        
-        # Prepare actions and rewards
-        action_types = torch.zeros(batch_size, dtype=torch.long).to(device)
-        strategies = torch.zeros(batch_size, dtype=torch.long).to(device)
-        old_log_probs = torch.zeros(batch_size).to(device)
-        rewards = torch.zeros(batch_size).to(device)
-        dones = torch.zeros(batch_size).to(device)
-        
-        for i, exp in enumerate(experiences):
-            # Fill in actual data (simplified)
-            rewards[i] = exp.reward.total_reward
-            dones[i] = 1.0 if exp.done else 0.0
-            
-            # Action data (would need proper encoding)
-            action_types[i] = 0  # Placeholder
-            strategies[i] = 0    # Placeholder
-            old_log_probs[i] = -1.0  # Placeholder
-        
-        actions = {
-            "action_types": action_types,
-            "strategies": strategies,
-            "old_log_probs": old_log_probs
-        }
-        
-        return states, actions, rewards, next_states, dones
+        return self.collator.collate(experiences)
     
     def _create_empty_metrics(self) -> TrainingMetrics:
         """Create empty metrics when no training data available."""
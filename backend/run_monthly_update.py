@@ -260,7 +260,10 @@ async def main():
             temp_downloader.date_filter.end_date = end_date
             
             print("📡 Discovering papers...")
-            papers = await temp_downloader.discover_papers()
+            try:
+                papers = await temp_downloader.discover_papers()
+            finally:
+                temp_downloader.close()
             
             if papers:
                 print(f"📊 Would process {len(papers)} new papers:")
@@ -15,8 +15,6 @@ from enum import Enum
 import uuid
 from collections import defaultdict, Counter
 import networkx as nx
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.cluster import KMeans, DBSCAN
 from sklearn.decomposition import PCA, LatentDirichletAllocation
 from sklearn.manifold import TSNE
@@ -35,6 +33,7 @@ from core.database import (
 )
 # from services.topic_modeling_service import TopicModelingService
 from services.knowledge_graph import KnowledgeGraphService
+from services.document_vector_store import get_document_vector_store
 
 logger = logging.getLogger(__name__)
 
@@ -133,6 +132,7 @@ class AdvancedAnalyticsService:
         self.db = db
         # self.topic_service = TopicModelingService(db)
         self.kg_service = KnowledgeGraphService(db)
+        self.document_vectors = get_document_vector_store()
         
         # Analytics configurations
         self.timeframe_deltas = {
@@ -206,70 +206,40 @@ class AdvancedAnalyticsService:
         try:
             logger.info(f"Analyzing document relationships for user {user_id}")
             
-            # Get user's documents
-            documents = self.db.query(Document).filter(
-                Document.user_id == user_id,
-                Document.status == "completed"
-            ).all()
+            # Get the user's document vectors, indexing any documents not stored yet
+            index, documents = self.document_vectors.sync(self.db, user_id)
             
-            if len(documents) < 2:
+            if len(index) < 2:
                 return []
             
-            # Get document embeddings and content
-            doc_data = []
-            for doc in documents:
-                chunks = self.db.query(DocumentChunk).filter(
-                    DocumentChunk.document_id == doc.id
-                ).all()
-                
-                content = " ".join([chunk.content for chunk in chunks])
-                doc_data.append({
-                    'id': doc.id,
-                    'name': doc.name,
-                    'content': content,
-                    'created_at': doc.created_at
-                })
-            
-            # Calculate document similarities
-            relationships = []
-            
-            # Create TF-IDF vectors
-            texts = [doc['content'] for doc in doc_data]
-            vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-            tfidf_matrix = vectorizer.fit_transform(texts)
+            doc_data = {
+                doc.id: {'id': doc.id, 'name': doc.name, 'created_at': doc.created_at}
+                for doc in documents
+            }
             
-            # Calculate pairwise similarities
-            similarity_matrix = cosine_similarity(tfidf_matrix)
+            # Most similar pairs first, from a sparse top-k search
+            relationships = []
+            pairs = index.similar_pairs(min_similarity, max_relationships)
             
-            for i in range(len(doc_data)):
-                for j in range(i + 1, len(doc_data)):
-                    similarity = similarity_matrix[i][j]
-                    
-                    if similarity >= min_similarity:
-                        # Find shared concepts
-                        shared_concepts = await self._find_shared_concepts(
-                            doc_data[i]['content'], doc_data[j]['content']
-                        )
-                        
-                        # Determine relationship type
-                        relationship_type = self._classify_relationship_type(
-                            doc_data[i], doc_data[j], similarity, shared_concepts
-                        )
-                        
-                        relationship = DocumentRelationship(
-                            source_doc_id=doc_data[i]['id'],
-                            target_doc_id=doc_data[j]['id'],
-                            relationship_type=relationship_type,
-                            strength=similarity,
-                            shared_concepts=shared_concepts,
-                            similarity_score=similarity
-                        )
-                        
-                        relationships.append(relationship)
+            for source_id, target_id, similarity in pairs:
+                # Shared concepts are only needed for the returned pairs
+                shared_concepts = index.shared_terms(source_id, target_id)
+                
+                # Determine relationship type
+                relationship_type = self._classify_relationship_type(
+                    doc_data[source_id], doc_data[target_id], similarity, shared_concepts
+                )
+                
+                relationships.append(DocumentRelationship(
+                    source_doc_id=source_id,
+                    target_doc_id=target_id,
+                    relationship_type=relationship_type,
+                    strength=similarity,
+                    shared_concepts=shared_concepts,
+                    similarity_score=similarity
+                ))
             
-            # Sort by strength and limit results
-            relationships.sort(key=lambda x: x.strength, reverse=True)
-            return relationships[:max_relationships]
+            return relationships
             
         except Exception as e:
             logger.error(f"Error analyzing document relationships: {str(e)}")
@@ -1143,31 +1113,6 @@ class AdvancedAnalyticsService:
             logger.error(f"Error storing report: {str(e)}")
 
     # Additional helper methods for pattern discovery and analysis
-    async def _find_shared_concepts(self, content1: str, content2: str) -> List[str]:
-        """Find shared concepts between two pieces of content"""
-        try:
-            # Simple approach using TF-IDF
-            vectorizer = TfidfVectorizer(max_features=100, stop_words='english')
-            tfidf_matrix = vectorizer.fit_transform([content1, content2])
-            
-            feature_names = vectorizer.get_feature_names_out()
-            
-            # Get top terms for each document
-            doc1_scores = tfidf_matrix[0].toarray()[0]
-            doc2_scores = tfidf_matrix[1].toarray()[0]
-            
-            # Find terms that appear in both with significant scores
-            shared_concepts = []
-            for i, (score1, score2) in enumerate(zip(doc1_scores, doc2_scores)):
-                if score1 > 0.1 and score2 > 0.1:  # Both documents have this term
-                    shared_concepts.append(feature_names[i])
-            
-            return shared_concepts[:10]  # Return top 10
-            
-        except Exception as e:
-            logger.warning(f"Error finding shared concepts: {str(e)}")
-            return []
-
     def _classify_relationship_type(
         self, doc1: Dict, doc2: Dict, similarity: float, shared_concepts: List[str]
     ) -> str:
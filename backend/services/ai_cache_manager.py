@@ -12,6 +12,7 @@ from dataclasses import dataclass
 import logging
 
 from core.enhanced_caching import cache_with_tags, CacheConfig, get_cache
+from services.embedding_store import get_embedding_store
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,7 @@ class AICacheManager:
     
     def __init__(self):
         self.cache = get_cache()
+        self.embedding_store = get_embedding_store()
         self.metrics = []
         self.model_versions = {
             "embedding": "sentence-transformers/all-MiniLM-L6-v2",
@@ -50,14 +52,35 @@ class AICacheManager:
         key_str = json.dumps(key_data, sort_keys=True, default=str)
         return hashlib.sha256(key_str.encode()).hexdigest()
     
+    def _resolve_embedding_model(self, model: str) -> str:
+        """Map a model alias to the name used as the embedding store key"""
+        if model == "default":
+            model = self.model_versions["embedding"]
+        return model.split("/")[-1]
+    
     @cache_with_tags("embeddings", "ai_operations", ttl=7200)
     async def get_smart_embeddings(self, text: str, model: str = "default") -> List[float]:
         """Cache embeddings with model-specific keys"""
         start_time = time.time()
         
         try:
+            # Reuse vectors already computed by the real embedding call sites
+            store_model = self._resolve_embedding_model(model)
+            stored = self.embedding_store.get(store_model, text)
+            if stored is not None:
+                self._record_metrics(AIOperationMetrics(
+                    operation_type="embedding_generation",
+                    execution_time=time.time() - start_time,
+                    cache_hit=True,
+                    model_used=model,
+                    input_size=len(text),
+                    timestamp=time.time()
+                ))
+                return stored
+            
             # This would be your actual embedding generation
-            # For now, we'll simulate it
+            # For now, we'll simulate it. Simulated vectors are deliberately
+            # not written to the persistent embedding store.
             await asyncio.sleep(0.1)  # Simulate processing time
             
             # Mock embeddings - replace with actual embedding generation
@@ -5,12 +5,12 @@ import json
 import logging
 import re
 from typing import List, Dict, Any, Optional, Tuple
-import requests
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from core.config import settings
 from core.database import get_db, Document, DocumentTag
+from services.llm_gateway import LLMPriority, get_llm_gateway
 from models.schemas import (
     DocumentTagCreate, 
     DocumentTagResponse, 
@@ -309,21 +309,17 @@ class AutoTaggingService:
     async def _call_llm(self, prompt: str) -> str:
         """Call the LLM with the given prompt"""
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "top_p": 0.9
-                    }
+            return await get_llm_gateway().generate(
+                prompt,
+                model=self.model,
+                options={
+                    "temperature": 0.3,
+                    "top_p": 0.9
                 },
-                timeout=60
+                priority=LLMPriority.BATCH,
+                timeout=60,
+                base_url=self.ollama_url
             )
-            response.raise_for_status()
-            return response.json()["response"]
             
         except Exception as e:
             logger.error(f"Error calling LLM: {str(e)}")
@@ -3,7 +3,12 @@ Advanced caching service for improved performance.
 Implements multi-level caching with intelligent cache management.
 """
 import hashlib
+import heapq
+import inspect
 import json
+import math
+import random
+import sys
 import time
 import logging
 from typing import Any, Dict, List, Optional, Union, Callable
@@ -30,120 +35,293 @@ class CacheStrategy:
     TTL = "ttl"  # Time To Live
     ADAPTIVE = "adaptive"  # Adaptive based on usage patterns
 
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """Estimate the in-memory footprint of a cached value in bytes."""
+    size = sys.getsizeof(value)
+    if _depth >= 8 or value is None or isinstance(value, (str, bytes, bytearray, int, float, bool)):
+        return size
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if not value:
+            return size
+        first = next(iter(value))
+        if isinstance(first, (int, float)) and not isinstance(first, bool):
+            # Numeric vectors (embeddings) - every element has the same footprint
+            return size + len(value) * sys.getsizeof(first)
+        return size + sum(_estimate_size(item, _depth + 1) for item in value)
+
+    if isinstance(value, dict):
+        return size + sum(
+            _estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+
+    # numpy arrays and similar buffers report their payload size
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return size + nbytes
+    return size
+
+class _CacheEntry:
+    """Cached value plus the bookkeeping needed by the eviction policies."""
+
+    __slots__ = ('value', 'size', 'timestamp', 'expires_at', 'pattern', 'freq', 'fetch_time')
+
+    def __init__(self, value: Any, size: int, ttl: Optional[int], pattern: str,
+                 freq: int = 1, fetch_time: float = 0.0):
+        self.value = value
+        self.size = size
+        self.timestamp = time.time()
+        self.expires_at = self.timestamp + ttl if ttl else None
+        self.pattern = pattern
+        self.freq = freq
+        # Seconds it took to produce the value, used for early refresh
+        self.fetch_time = fetch_time
+
+    def is_expired(self, now: float, grace: float = 0.0) -> bool:
+        return self.expires_at is not None and self.expires_at + grace <= now
+
 class MemoryCache:
-    """In-memory cache with configurable eviction strategies."""
+    """In-memory cache with configurable eviction strategies.
+
+    Every strategy evicts in O(1) (TTL in O(log n) for expired entries):
+
+    - LRU: a single recency-ordered queue.
+    - LFU: frequency buckets, each an LRU-ordered queue, plus the minimum
+      frequency currently in use.
+    - TTL: insertion-ordered queue with a min-heap of expiry times so expired
+      entries are evicted first.
+    - ADAPTIVE: segmented LRU - new keys enter a probation segment and are
+      promoted to a protected segment on their second use, so one-off keys
+      cannot flush frequently used ones.
+
+    Expired entries are dropped lazily on read. Capacity is bounded both by
+    entry count (``max_size``) and, optionally, by the estimated size of the
+    cached values (``max_bytes``). Hits, misses, evictions and expirations are
+    also tracked per key pattern (the key prefix before the first ``:``).
+    """
+
+    PROTECTED_RATIO = 0.8
     
-    def __init__(self, max_size: int = 1000, strategy: str = CacheStrategy.LRU):
+    def __init__(self, max_size: int = 1000, strategy: str = CacheStrategy.LRU,
+                 max_bytes: Optional[int] = None):
         self.max_size = max_size
+        self.max_bytes = max_bytes
         self.strategy = strategy
-        self.cache = OrderedDict()
-        self.access_counts = {}
-        self.access_times = {}
+        self.cache: Dict[str, _CacheEntry] = {}
+        self.total_bytes = 0
+
+        # LRU / TTL ordering
+        self._queue: OrderedDict = OrderedDict()
+        # LFU ordering
+        self._freq_buckets: Dict[int, OrderedDict] = {}
+        self._min_freq = 0
+        # ADAPTIVE ordering
+        self._probation: OrderedDict = OrderedDict()
+        self._protected: OrderedDict = OrderedDict()
+        self._protected_limit = max(1, int(max_size * self.PROTECTED_RATIO))
+        # TTL expiry heap of (expires_at, key); stale items are skipped lazily
+        self._expiry_heap: List[tuple] = []
+
         self.hit_count = 0
         self.miss_count = 0
+        self.eviction_count = 0
+        self.expiration_count = 0
+        self.pattern_stats: Dict[str, Dict[str, int]] = {}
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from memory cache."""
-        if key in self.cache:
-            self.hit_count += 1
-            self._update_access_stats(key)
-            
-            if self.strategy == CacheStrategy.LRU:
-                # Move to end (most recently used)
-                self.cache.move_to_end(key)
-            
-            return self.cache[key]['value']
-        
-        self.miss_count += 1
-        return None
+        entry = self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    def get_entry(self, key: str, stale_for: float = 0.0) -> Optional[_CacheEntry]:
+        """Get the cache entry for key, including entries expired less than
+        ``stale_for`` seconds ago (for stale-while-revalidate callers)."""
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_expired(time.time(), stale_for):
+            self._remove(key)
+            self._record_stat(entry.pattern, 'expirations')
+            self.expiration_count += 1
+            entry = None
+
+        if entry is None:
+            self.miss_count += 1
+            self._record_stat(self._pattern_of(key), 'misses')
+            return None
+
+        self.hit_count += 1
+        self._record_stat(entry.pattern, 'hits')
+        self._touch(key, entry)
+        return entry
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, fetch_time: float = 0.0):
         """Set value in memory cache."""
-        if key in self.cache:
-            # Update existing key
-            self.cache[key] = {
-                'value': value,
-                'timestamp': time.time(),
-                'ttl': ttl
-            }
-            if self.strategy == CacheStrategy.LRU:
-                self.cache.move_to_end(key)
-        else:
-            # Add new key
-            if len(self.cache) >= self.max_size:
-                self._evict()
-            
-            self.cache[key] = {
-                'value': value,
-                'timestamp': time.time(),
-                'ttl': ttl
-            }
-        
-        self._update_access_stats(key)
+        size = _estimate_size(value)
+        previous = self._remove(key)
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"Value for key {key} ({size} bytes) exceeds memory cache budget")
+            return
+
+        while self.cache and (
+            len(self.cache) >= self.max_size
+            or (self.max_bytes is not None and self.total_bytes + size > self.max_bytes)
+        ):
+            self._evict()
+
+        entry = _CacheEntry(
+            value, size, ttl, self._pattern_of(key),
+            freq=previous.freq if previous is not None else 1,
+            fetch_time=fetch_time
+        )
+        self.cache[key] = entry
+        self.total_bytes += size
+        self._insert(key, entry)
+
+        if previous is not None:
+            # Overwriting a key counts as a use of it
+            self._touch(key, entry)
     
     def delete(self, key: str) -> bool:
         """Delete key from memory cache."""
-        if key in self.cache:
-            del self.cache[key]
-            if key in self.access_counts:
-                del self.access_counts[key]
-            if key in self.access_times:
-                del self.access_times[key]
-            return True
-        return False
+        return self._remove(key) is not None
     
     def clear(self):
         """Clear all cache entries."""
         self.cache.clear()
-        self.access_counts.clear()
-        self.access_times.clear()
+        self.total_bytes = 0
+        self._queue.clear()
+        self._freq_buckets.clear()
+        self._min_freq = 0
+        self._probation.clear()
+        self._protected.clear()
+        self._expiry_heap.clear()
         self.hit_count = 0
         self.miss_count = 0
-    
-    def _update_access_stats(self, key: str):
-        """Update access statistics for the key."""
-        self.access_counts[key] = self.access_counts.get(key, 0) + 1
-        self.access_times[key] = time.time()
+        self.eviction_count = 0
+        self.expiration_count = 0
+        self.pattern_stats.clear()
+
+    @staticmethod
+    def _pattern_of(key: str) -> str:
+        """Key pattern used for per-pattern statistics."""
+        return key.split(':', 1)[0] if ':' in key else 'default'
+
+    def _record_stat(self, pattern: str, counter: str):
+        stats = self.pattern_stats.get(pattern)
+        if stats is None:
+            stats = self.pattern_stats[pattern] = {
+                'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0
+            }
+        stats[counter] += 1
+
+    def _insert(self, key: str, entry: _CacheEntry):
+        """Register a newly stored key with the eviction policy."""
+        if self.strategy == CacheStrategy.LFU:
+            bucket = self._freq_buckets.get(entry.freq)
+            if bucket is None:
+                bucket = self._freq_buckets[entry.freq] = OrderedDict()
+            bucket[key] = None
+            if len(self._freq_buckets) == 1 or entry.freq < self._min_freq:
+                self._min_freq = entry.freq
+        elif self.strategy == CacheStrategy.ADAPTIVE:
+            self._probation[key] = None
+        else:
+            self._queue[key] = None
+            if self.strategy == CacheStrategy.TTL and entry.expires_at is not None:
+                heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+                if len(self._expiry_heap) > 2 * len(self.cache) + 64:
+                    self._compact_expiry_heap()
+
+    def _touch(self, key: str, entry: _CacheEntry):
+        """Update the eviction policy after a use of the key."""
+        if self.strategy == CacheStrategy.LRU:
+            self._queue.move_to_end(key)
+        elif self.strategy == CacheStrategy.LFU:
+            freq = entry.freq
+            bucket = self._freq_buckets[freq]
+            del bucket[key]
+            if not bucket:
+                del self._freq_buckets[freq]
+                if self._min_freq == freq:
+                    self._min_freq = freq + 1
+            entry.freq = freq + 1
+            self._freq_buckets.setdefault(freq + 1, OrderedDict())[key] = None
+        elif self.strategy == CacheStrategy.ADAPTIVE:
+            if key in self._protected:
+                self._protected.move_to_end(key)
+            else:
+                del self._probation[key]
+                self._protected[key] = None
+                if len(self._protected) > self._protected_limit:
+                    demoted, _ = self._protected.popitem(last=False)
+                    self._probation[demoted] = None
+        # TTL keeps insertion order, reads do not change it
+
+    def _remove(self, key: str) -> Optional[_CacheEntry]:
+        """Remove key from storage and from the eviction policy."""
+        entry = self.cache.pop(key, None)
+        if entry is None:
+            return None
+
+        self.total_bytes -= entry.size
+        if self.strategy == CacheStrategy.LFU:
+            bucket = self._freq_buckets[entry.freq]
+            del bucket[key]
+            if not bucket:
+                del self._freq_buckets[entry.freq]
+        elif self.strategy == CacheStrategy.ADAPTIVE:
+            if key in self._probation:
+                del self._probation[key]
+            else:
+                del self._protected[key]
+        else:
+            del self._queue[key]
+        return entry
+
+    def _compact_expiry_heap(self):
+        """Drop heap items that no longer match a live entry."""
+        self._expiry_heap = [
+            (expires_at, key) for expires_at, key in self._expiry_heap
+            if key in self.cache and self.cache[key].expires_at == expires_at
+        ]
+        heapq.heapify(self._expiry_heap)
+
+    def _select_victim(self) -> str:
+        """Pick the key to evict according to the strategy."""
+        if self.strategy == CacheStrategy.LFU:
+            if self._min_freq not in self._freq_buckets:
+                # Only stale after an explicit delete or expiry
+                self._min_freq = min(self._freq_buckets)
+            return next(iter(self._freq_buckets[self._min_freq]))
+
+        if self.strategy == CacheStrategy.ADAPTIVE:
+            return next(iter(self._probation or self._protected))
+
+        if self.strategy == CacheStrategy.TTL:
+            # Remove expired entries first, then oldest
+            now = time.time()
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expires_at, key = heapq.heappop(self._expiry_heap)
+                entry = self.cache.get(key)
+                if entry is not None and entry.expires_at == expires_at:
+                    return key
+
+        return next(iter(self._queue))
     
     def _evict(self):
-        """Evict entries based on strategy."""
+        """Evict one entry based on strategy."""
         if not self.cache:
             return
-        
-        if self.strategy == CacheStrategy.LRU:
-            # Remove least recently used (first item)
-            key_to_remove = next(iter(self.cache))
-        elif self.strategy == CacheStrategy.LFU:
-            # Remove least frequently used
-            key_to_remove = min(self.access_counts.keys(), 
-                              key=lambda k: self.access_counts.get(k, 0))
-        elif self.strategy == CacheStrategy.TTL:
-            # Remove expired entries first, then oldest
-            current_time = time.time()
-            expired_keys = [
-                key for key, data in self.cache.items()
-                if data.get('ttl') and (current_time - data['timestamp']) > data['ttl']
-            ]
-            if expired_keys:
-                key_to_remove = expired_keys[0]
-            else:
-                key_to_remove = min(self.cache.keys(), 
-                                  key=lambda k: self.cache[k]['timestamp'])
-        else:  # ADAPTIVE
-            # Adaptive strategy based on access patterns
-            current_time = time.time()
-            scores = {}
-            for key in self.cache.keys():
-                access_count = self.access_counts.get(key, 1)
-                last_access = self.access_times.get(key, current_time)
-                time_since_access = current_time - last_access
-                
-                # Score combines frequency and recency
-                scores[key] = access_count / (1 + time_since_access)
-            
-            key_to_remove = min(scores.keys(), key=lambda k: scores[k])
-        
-        self.delete(key_to_remove)
+
+        key = self._select_victim()
+        entry = self._remove(key)
+        if entry.is_expired(time.time()):
+            self.expiration_count += 1
+            self._record_stat(entry.pattern, 'expirations')
+        else:
+            self.eviction_count += 1
+            self._record_stat(entry.pattern, 'evictions')
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
@@ -153,42 +331,109 @@ class MemoryCache:
         return {
             'size': len(self.cache),
             'max_size': self.max_size,
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
             'hit_count': self.hit_count,
             'miss_count': self.miss_count,
+            'eviction_count': self.eviction_count,
+            'expiration_count': self.expiration_count,
             'hit_rate': hit_rate,
-            'strategy': self.strategy
+            'strategy': self.strategy,
+            'patterns': {pattern: dict(stats) for pattern, stats in self.pattern_stats.items()}
         }
 
 class MultiLevelCache:
-    """Multi-level cache with memory, Redis, and database layers."""
-    
-    def __init__(self, redis_client: Optional[RedisClient] = None):
-        self.memory_cache = MemoryCache(max_size=500, strategy=CacheStrategy.ADAPTIVE)
+    """Multi-level cache with memory, Redis, and database layers.
+
+    Concurrent misses for the same key share a single load (Redis lookup and
+    fetch function). Hot memory entries are refreshed in the background shortly
+    before they expire (probabilistic early expiration, weighted by how long the
+    value took to fetch), and entries that expired less than
+    ``stale_while_revalidate`` seconds ago are served while a refresh runs.
+    Early refresh and stale serving only apply when a fetch function is given.
+    """
+    
+    def __init__(self, redis_client: Optional[RedisClient] = None,
+                 stale_while_revalidate: int = 60, early_refresh_beta: float = 1.0):
+        self.memory_cache = MemoryCache(
+            max_size=500,
+            strategy=CacheStrategy.ADAPTIVE,
+            max_bytes=settings.MEMORY_CACHE_MAX_BYTES
+        )
         self.redis_client = redis_client or get_redis_client()
+        self.stale_while_revalidate = stale_while_revalidate
+        self.early_refresh_beta = early_refresh_beta
+        self._inflight: Dict[str, asyncio.Task] = {}
         self.cache_stats = {
             'memory_hits': 0,
             'redis_hits': 0,
             'database_hits': 0,
-            'total_requests': 0
+            'total_requests': 0,
+            'coalesced_fetches': 0,
+            'stale_hits': 0,
+            'background_refreshes': 0
         }
     
-    async def get(self, key: str, fetch_function: Optional[Callable] = None) -> Optional[Any]:
+    async def get(self, key: str, fetch_function: Optional[Callable] = None,
+                  ttl: Optional[int] = None) -> Optional[Any]:
         """Get value from multi-level cache."""
         self.cache_stats['total_requests'] += 1
         
         # Level 1: Memory cache
-        value = self.memory_cache.get(key)
-        if value is not None:
+        stale_for = self.stale_while_revalidate if fetch_function else 0
+        entry = self.memory_cache.get_entry(key, stale_for=stale_for)
+        if entry is not None:
             self.cache_stats['memory_hits'] += 1
-            return value
+            if fetch_function and self._should_refresh(entry):
+                if entry.is_expired(time.time()):
+                    self.cache_stats['stale_hits'] += 1
+                if key not in self._inflight:
+                    self.cache_stats['background_refreshes'] += 1
+                    self._start_load(key, fetch_function, ttl)
+            return entry.value
         
+        if not fetch_function:
+            return await self._load(key, None, ttl)
+        
+        # Levels 2 and 3 are loaded once per key, concurrent callers wait on it
+        task = self._inflight.get(key)
+        if task is not None:
+            self.cache_stats['coalesced_fetches'] += 1
+        else:
+            task = self._start_load(key, fetch_function, ttl)
+        return await asyncio.shield(task)
+
+    def _should_refresh(self, entry: _CacheEntry) -> bool:
+        """Decide whether a memory entry should be refreshed ahead of expiry."""
+        if entry.expires_at is None:
+            return False
+        # XFetch: refresh with a probability that grows as expiry approaches
+        # and with the time the value took to fetch
+        random_value = 1.0 - random.random()
+        early_by = -entry.fetch_time * self.early_refresh_beta * math.log(random_value)
+        return time.time() + early_by >= entry.expires_at
+
+    def _start_load(self, key: str, fetch_function: Optional[Callable],
+                    ttl: Optional[int]) -> asyncio.Task:
+        """Start loading key in a task shared by all waiters."""
+        task = asyncio.ensure_future(self._load(key, fetch_function, ttl))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _load(self, key: str, fetch_function: Optional[Callable],
+                    ttl: Optional[int]) -> Optional[Any]:
+        """Load key from Redis, falling back to the fetch function."""
+        started = time.monotonic()
+
         # Level 2: Redis cache
         try:
             value = await self.redis_client.get(key)
             if value is not None:
                 self.cache_stats['redis_hits'] += 1
                 # Promote to memory cache
-                self.memory_cache.set(key, value, ttl=300)  # 5 minutes in memory
+                self.memory_cache.set(key, value, ttl=300,  # 5 minutes in memory
+                                      fetch_time=time.monotonic() - started)
                 return value
         except Exception as e:
             logger.warning(f"Redis cache error for key {key}: {e}")
@@ -196,21 +441,24 @@ class MultiLevelCache:
         # Level 3: Database/fetch function
         if fetch_function:
             try:
-                value = await fetch_function() if asyncio.iscoroutinefunction(fetch_function) else fetch_function()
+                value = fetch_function()
+                if inspect.isawaitable(value):
+                    value = await value
                 if value is not None:
                     self.cache_stats['database_hits'] += 1
                     # Store in all cache levels
-                    await self.set(key, value)
+                    await self.set(key, value, ttl, fetch_time=time.monotonic() - started)
                     return value
             except Exception as e:
                 logger.error(f"Fetch function error for key {key}: {e}")
         
         return None
     
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, fetch_time: float = 0.0):
         """Set value in multi-level cache."""
         # Set in memory cache
-        self.memory_cache.set(key, value, ttl=min(ttl or 300, 300))  # Max 5 minutes in memory
+        self.memory_cache.set(key, value, ttl=min(ttl or 300, 300),  # Max 5 minutes in memory
+                              fetch_time=fetch_time)
         
         # Set in Redis cache
         try:
@@ -253,7 +501,11 @@ class MultiLevelCache:
             'memory_hit_rate': memory_hit_rate,
             'redis_hit_rate': redis_hit_rate,
             'database_hit_rate': database_hit_rate,
-            'overall_cache_hit_rate': overall_cache_hit_rate
+            'overall_cache_hit_rate': overall_cache_hit_rate,
+            'coalesced_fetches': self.cache_stats['coalesced_fetches'],
+            'stale_hits': self.cache_stats['stale_hits'],
+            'background_refreshes': self.cache_stats['background_refreshes'],
+            'inflight_fetches': len(self._inflight)
         }
 
 class CachingService:
@@ -288,7 +540,7 @@ class CachingService:
     async def get_user_profile(self, user_id: str, fetch_function: Optional[Callable] = None) -> Optional[Dict[str, Any]]:
         """Get user profile with caching."""
         key = self._generate_cache_key('user_profile', user_id)
-        return await self.cache.get(key, fetch_function)
+        return await self.cache.get(key, fetch_function, self._get_cache_ttl('user_profile'))
     
     async def set_user_profile(self, user_id: str, profile: Dict[str, Any]):
         """Set user profile in cache."""
@@ -299,7 +551,7 @@ class CachingService:
     async def get_document_chunks(self, document_id: str, fetch_function: Optional[Callable] = None) -> Optional[List[Dict[str, Any]]]:
         """Get document chunks with caching."""
         key = self._generate_cache_key('document_chunks', document_id)
-        return await self.cache.get(key, fetch_function)
+        return await self.cache.get(key, fetch_function, self._get_cache_ttl('document_chunks'))
     
     async def set_document_chunks(self, document_id: str, chunks: List[Dict[str, Any]]):
         """Set document chunks in cache."""
@@ -328,7 +580,7 @@ class CachingService:
     async def get_knowledge_graph_data(self, entity_id: str, depth: int = 1, fetch_function: Optional[Callable] = None) -> Optional[Dict[str, Any]]:
         """Get knowledge graph data with caching."""
         key = self._generate_cache_key('knowledge_graph', entity_id, depth=depth)
-        return await self.cache.get(key, fetch_function)
+        return await self.cache.get(key, fetch_function, self._get_cache_ttl('knowledge_graph'))
     
     async def set_knowledge_graph_data(self, entity_id: str, data: Dict[str, Any], depth: int = 1):
         """Set knowledge graph data in cache."""
@@ -339,7 +591,7 @@ class CachingService:
     async def get_analytics_data(self, user_id: str, metric: str, time_range: str, fetch_function: Optional[Callable] = None) -> Optional[Dict[str, Any]]:
         """Get analytics data with caching."""
         key = self._generate_cache_key('analytics', user_id, metric=metric, range=time_range)
-        return await self.cache.get(key, fetch_function)
+        return await self.cache.get(key, fetch_function, self._get_cache_ttl('analytics'))
     
     async def set_analytics_data(self, user_id: str, metric: str, time_range: str, data: Dict[str, Any]):
         """Set analytics data in cache."""
@@ -350,7 +602,7 @@ class CachingService:
     async def get_embeddings(self, content_hash: str, fetch_function: Optional[Callable] = None) -> Optional[List[float]]:
         """Get embeddings with caching."""
         key = self._generate_cache_key('embeddings', content_hash)
-        return await self.cache.get(key, fetch_function)
+        return await self.cache.get(key, fetch_function, self._get_cache_ttl('embeddings'))
     
     async def set_embeddings(self, content_hash: str, embeddings: List[float]):
         """Set embeddings in cache."""
@@ -77,6 +77,9 @@ class DocumentProcessor:
             document.embeddings_count = result['embeddings_count']
             db.commit()
             
+            # Store term vectors for document relationship analysis
+            self._index_document_vectors(db, document)
+            
             # Integrate with vector store for hierarchical chunks
             await self._integrate_with_vector_store({
                 "id": file_id,
@@ -663,6 +666,17 @@ class DocumentProcessor:
         finally:
             db.close()
     
+    def _index_document_vectors(self, db: Session, document: Document):
+        """Store a completed document's term vectors for relationship analysis"""
+        try:
+            from services.document_vector_store import get_document_vector_store
+            
+            get_document_vector_store().index_document(db, document)
+            
+        except Exception as e:
+            logger.error(f"Error indexing term vectors for document {document.id}: {str(e)}")
+            # Relationship analysis indexes the document itself when it is next run
+    
     async def _integrate_with_vector_store(self, document_data: Dict[str, Any]):
         """Integrate processed document with vector store"""
         try:
@@ -717,6 +731,9 @@ class DocumentProcessor:
             document.embeddings_count = result['embeddings_count']
             db.commit()
             
+            # Store term vectors for document relationship analysis
+            self._index_document_vectors(db, document)
+            
             return {
                 "document_id": document_id,
                 "status": "reprocessed",
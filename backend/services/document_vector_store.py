@@ -0,0 +1,324 @@
+"""
+Persistent per-user document term vectors
+Each completed document is tokenized once, when it finishes processing, and
+its term counts are kept on disk. Per-user TF-IDF matrices are assembled from
+the stored counts, so relationship analysis never re-reads chunk text or
+refits a vectorizer, and similar pairs come from a sparse top-k search.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sqlalchemy.orm import Session
+
+from core.database import Document, DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+# Same tokenization as TfidfVectorizer(stop_words='english')
+_analyze = CountVectorizer(stop_words="english").build_analyzer()
+
+CHUNK_QUERY_BATCH = 500
+
+
+def term_counts(text: str) -> Dict[str, int]:
+    """Count the terms of a document"""
+    return dict(Counter(_analyze(text)))
+
+
+def _timestamp(value: Any) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+class DocumentVectorIndex:
+    """
+    TF-IDF vectors for one user's documents.
+
+    Documents are stored as raw term counts. The L2-normalized TF-IDF matrix
+    (smoothed idf, as TfidfVectorizer computes it) is rebuilt lazily from the
+    counts after documents change.
+    """
+
+    def __init__(self):
+        self.document_ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.counts: List[Dict[str, int]] = []
+        self.versions: List[Optional[str]] = []
+
+        self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self.document_ids)
+
+    def __contains__(self, document_id: str) -> bool:
+        return document_id in self.positions
+
+    def version(self, document_id: str) -> Optional[str]:
+        """The document updated_at the stored counts were computed from"""
+        return self.versions[self.positions[document_id]]
+
+    def upsert(self, document_id: str, counts: Dict[str, int], version: Optional[str] = None) -> None:
+        """Add or replace a document's term counts"""
+        position = self.positions.get(document_id)
+        if position is None:
+            self.positions[document_id] = len(self.document_ids)
+            self.document_ids.append(document_id)
+            self.counts.append(counts)
+            self.versions.append(version)
+        else:
+            self.counts[position] = counts
+            self.versions[position] = version
+        self._dirty = True
+
+    def remove(self, document_id: str) -> None:
+        """Remove a document, moving the last document into its slot"""
+        position = self.positions.pop(document_id, None)
+        if position is None:
+            return
+
+        last_id = self.document_ids.pop()
+        last_counts = self.counts.pop()
+        last_version = self.versions.pop()
+        if last_id != document_id:
+            self.document_ids[position] = last_id
+            self.counts[position] = last_counts
+            self.versions[position] = last_version
+            self.positions[last_id] = position
+        self._dirty = True
+
+    def _build(self) -> None:
+        """Rebuild the normalized TF-IDF matrix from the stored counts"""
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        values: List[int] = []
+        for counts in self.counts:
+            for term, count in counts.items():
+                indices.append(vocabulary.setdefault(term, len(vocabulary)))
+                values.append(count)
+            indptr.append(len(indices))
+
+        n = len(self.counts)
+        matrix = sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(n, max(1, len(vocabulary)))
+        )
+
+        document_frequencies = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        idf = np.log((1 + n) / (1 + document_frequencies)) + 1
+        matrix.data *= idf[matrix.indices]
+
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        row_norms = np.repeat(norms, np.diff(matrix.indptr))
+        np.divide(matrix.data, row_norms, out=matrix.data, where=row_norms > 0)
+
+        self._matrix = matrix
+        self._terms = list(vocabulary)
+        self._dirty = False
+
+    def similar_pairs(
+        self,
+        min_similarity: float,
+        max_pairs: int,
+        block_size: int = 256
+    ) -> List[Tuple[str, str, float]]:
+        """
+        The max_pairs most similar document pairs with cosine similarity of at
+        least min_similarity, as (source id, target id, similarity), most
+        similar first. Each pair appears once, with the earlier-added document
+        as the source.
+
+        Similarities are computed a block of rows at a time as sparse
+        products, keeping only the best max_pairs candidates between blocks.
+        """
+        if self._dirty:
+            self._build()
+
+        n = len(self.document_ids)
+        if n < 2 or max_pairs <= 0:
+            return []
+
+        rows = np.empty(0, dtype=np.int64)
+        cols = np.empty(0, dtype=np.int64)
+        scores = np.empty(0, dtype=np.float64)
+        transposed = self._matrix.T.tocsc()
+
+        for start in range(0, n, block_size):
+            block = (self._matrix[start:start + block_size] @ transposed).tocoo()
+            block_rows = block.row.astype(np.int64) + start
+            keep = (block.col > block_rows) & (block.data >= min_similarity)
+
+            rows = np.concatenate([rows, block_rows[keep]])
+            cols = np.concatenate([cols, block.col[keep].astype(np.int64)])
+            scores = np.concatenate([scores, block.data[keep]])
+            if scores.size > max_pairs:
+                best = np.argpartition(-scores, max_pairs - 1)[:max_pairs]
+                rows, cols, scores = rows[best], cols[best], scores[best]
+
+        order = np.lexsort((cols, rows, -scores))
+        return [
+            (self.document_ids[rows[i]], self.document_ids[cols[i]], float(scores[i]))
+            for i in order
+        ]
+
+    def shared_terms(
+        self,
+        first_id: str,
+        second_id: str,
+        limit: int = 10,
+        min_weight: float = 0.1
+    ) -> List[str]:
+        """Terms weighted above min_weight in both documents, strongest first"""
+        if self._dirty:
+            self._build()
+
+        first = self._matrix.getrow(self.positions[first_id])
+        second = self._matrix.getrow(self.positions[second_id])
+        first_weights = dict(zip(first.indices, first.data))
+
+        shared = [
+            (min(first_weights[term], weight), term)
+            for term, weight in zip(second.indices, second.data)
+            if weight > min_weight and first_weights.get(term, 0) > min_weight
+        ]
+        shared.sort(key=lambda entry: (-entry[0], self._terms[entry[1]]))
+        return [self._terms[term] for _, term in shared[:limit]]
+
+
+class DocumentVectorStore:
+    """
+    Document term counts on disk under ``root``, one JSON file per document,
+    with an LRU of per-user DocumentVectorIndex objects in memory.
+
+    ``index_document`` is called when a document finishes processing.
+    ``sync`` brings a user's index in line with their completed documents,
+    loading counts other processes wrote and indexing documents that were
+    never stored (all of their chunks are read in batched queries).
+    """
+
+    def __init__(self, root: str, max_cached_users: int = 64):
+        self.root = Path(root)
+        self.max_cached_users = max_cached_users
+        self._indexes: "OrderedDict[str, DocumentVectorIndex]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _digest(value: str) -> str:
+        return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+    def _path(self, user_id: str, document_id: str) -> Path:
+        return self.root / self._digest(user_id) / f"{self._digest(document_id)}.json"
+
+    def _write(self, user_id: str, document_id: str, version: Optional[str], counts: Dict[str, int]) -> None:
+        path = self._path(user_id, document_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"document_id": document_id, "version": version, "terms": counts}, f)
+        os.replace(temporary, path)
+
+    def _read(self, user_id: str, document_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(user_id, document_id), encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable document vector for {document_id}: {e}")
+            return None
+        return stored if stored.get("document_id") == document_id else None
+
+    def _cached_index(self, user_id: str) -> Optional[DocumentVectorIndex]:
+        index = self._indexes.get(user_id)
+        if index is not None:
+            self._indexes.move_to_end(user_id)
+        return index
+
+    def index_document(self, db: Session, document: Document) -> None:
+        """Store the term counts of a processed document"""
+        chunks = db.query(DocumentChunk.content).filter(
+            DocumentChunk.document_id == document.id
+        ).order_by(DocumentChunk.chunk_index).all()
+        counts = term_counts(" ".join(chunk.content for chunk in chunks))
+        version = _timestamp(document.updated_at)
+
+        with self._lock:
+            self._write(document.user_id, document.id, version, counts)
+            index = self._cached_index(document.user_id)
+            if index is not None:
+                index.upsert(document.id, counts, version)
+
+    def sync(self, db: Session, user_id: str) -> Tuple[DocumentVectorIndex, List[Any]]:
+        """
+        Return the user's index, current with their completed documents, and
+        those documents as (id, name, created_at, updated_at) rows.
+        """
+        documents = db.query(
+            Document.id, Document.name, Document.created_at, Document.updated_at
+        ).filter(
+            Document.user_id == user_id,
+            Document.status == "completed"
+        ).all()
+
+        with self._lock:
+            index = self._cached_index(user_id)
+            if index is None:
+                index = self._indexes[user_id] = DocumentVectorIndex()
+                if len(self._indexes) > self.max_cached_users:
+                    self._indexes.popitem(last=False)
+
+            current = {document.id for document in documents}
+            for document_id in [d for d in index.document_ids if d not in current]:
+                index.remove(document_id)
+                self._path(user_id, document_id).unlink(missing_ok=True)
+
+            missing = {}
+            for document in documents:
+                version = _timestamp(document.updated_at)
+                if document.id in index and index.version(document.id) == version:
+                    continue
+                stored = self._read(user_id, document.id)
+                if stored is not None and stored.get("version") == version:
+                    index.upsert(document.id, stored["terms"], version)
+                else:
+                    missing[document.id] = version
+
+            for document_id, counts in self._count_chunks(db, list(missing)).items():
+                self._write(user_id, document_id, missing[document_id], counts)
+                index.upsert(document_id, counts, missing[document_id])
+
+        return index, documents
+
+    def _count_chunks(self, db: Session, document_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """Term counts for documents read straight from their chunks"""
+        texts: Dict[str, List[str]] = {document_id: [] for document_id in document_ids}
+        for start in range(0, len(document_ids), CHUNK_QUERY_BATCH):
+            rows = db.query(DocumentChunk.document_id, DocumentChunk.content).filter(
+                DocumentChunk.document_id.in_(document_ids[start:start + CHUNK_QUERY_BATCH])
+            ).order_by(DocumentChunk.document_id, DocumentChunk.chunk_index).all()
+            for row in rows:
+                texts[row.document_id].append(row.content)
+
+        return {document_id: term_counts(" ".join(parts)) for document_id, parts in texts.items()}
+
+
+_store: Optional[DocumentVectorStore] = None
+
+
+def get_document_vector_store() -> DocumentVectorStore:
+    """Get the process-wide document vector store"""
+    global _store
+    if _store is None:
+        _store = DocumentVectorStore(
+            root=os.getenv("DOCUMENT_VECTOR_DIR", "./document_vectors"),
+            max_cached_users=int(os.getenv("DOCUMENT_VECTOR_CACHED_USERS", "64")),
+        )
+    return _store
@@ -0,0 +1,268 @@
+"""
+Async embedding client for Ollama
+Shares one pooled HTTP session per server, coalesces single-text requests
+into multi-text batches and bounds the number of in-flight requests
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingError(Exception):
+    """Raised when the embedding server cannot produce embeddings"""
+
+
+class EmbeddingClient:
+    """Batched, non-blocking client for the Ollama embedding API.
+
+    ``embed()`` calls issued concurrently are queued and flushed as a single
+    ``/api/embed`` request once ``max_batch_size`` texts are waiting or
+    ``max_batch_delay`` seconds have passed. ``embed_many()`` splits a bulk
+    request into batches directly. At most ``max_concurrency`` HTTP requests
+    are in flight; when they are all busy the pending queue fills up and
+    further ``embed()`` callers wait (backpressure).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        max_batch_size: int = 64,
+        max_batch_delay: float = 0.01,
+        max_concurrency: int = 4,
+        max_pending: int = 1024,
+        timeout: float = 60.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_delay = max_batch_delay
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatch_tasks: set = set()
+        self._batch_endpoint_supported = True
+
+        self.stats = {
+            "texts_requested": 0,
+            "texts_sent": 0,
+            "http_requests": 0,
+            "batches": 0,
+            "errors": 0,
+        }
+
+    async def _bind_loop(self):
+        """(Re)create loop-bound primitives when used from a new event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        await self._release_session()
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._worker = None
+        self._dispatch_tasks = set()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency, keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _release_session(self):
+        """Close the session bound to the previous event loop before switching loops"""
+        session, loop = self._session, self._loop
+        self._session = None
+        if session is None or session.closed:
+            return
+        if loop is not None and loop.is_running():
+            # The loop is still serving another thread; close the session there
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        try:
+            # A closed loop has already dropped its connections, so this only
+            # marks the session and its connector closed
+            await session.close()
+        except Exception as e:
+            logger.debug(f"Error closing HTTP session of a previous event loop: {e}")
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single text, coalesced with other concurrent callers"""
+        await self._bind_loop()
+        self.stats["texts_requested"] += 1
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        if self._worker is None or self._worker.done():
+            self._worker = self._loop.create_task(self._batch_worker())
+        return await future
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of texts in as few round trips as possible"""
+        if not texts:
+            return []
+        await self._bind_loop()
+        self.stats["texts_requested"] += len(texts)
+
+        async def run(batch: List[str]) -> List[List[float]]:
+            async with self._semaphore:
+                return await self._embed_batch(batch)
+
+        batches = [
+            texts[i:i + self.max_batch_size]
+            for i in range(0, len(texts), self.max_batch_size)
+        ]
+        results = await asyncio.gather(*(run(batch) for batch in batches))
+        return [embedding for batch in results for embedding in batch]
+
+    async def _batch_worker(self):
+        """Drain the pending queue into batches and dispatch them"""
+        while True:
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=1.0)
+            except asyncio.TimeoutError:
+                if self._queue.empty():
+                    return
+                continue
+
+            batch = [item]
+            deadline = self._loop.time() + self.max_batch_delay
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            # Holding a slot before dispatch stops the worker from draining the
+            # queue while every connection is busy, which is what makes
+            # producers block on a full queue.
+            await self._semaphore.acquire()
+            task = self._loop.create_task(self._dispatch(batch))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            embeddings = await self._embed_batch([text for text, _ in batch])
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._semaphore.release()
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch, sending each distinct text only once"""
+        unique: Dict[str, int] = {}
+        for text in texts:
+            unique.setdefault(text, len(unique))
+        unique_texts = list(unique)
+
+        try:
+            embeddings = await self._request_embeddings(unique_texts)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+        if len(embeddings) != len(unique_texts):
+            self.stats["errors"] += 1
+            raise EmbeddingError(
+                f"Expected {len(unique_texts)} embeddings, got {len(embeddings)}"
+            )
+
+        self.stats["batches"] += 1
+        self.stats["texts_sent"] += len(unique_texts)
+        return [embeddings[unique[text]] for text in texts]
+
+    async def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Call Ollama, falling back to the single-prompt API on old servers"""
+        session = await self._get_session()
+
+        if self._batch_endpoint_supported:
+            self.stats["http_requests"] += 1
+            async with session.post(
+                f"{self.base_url}/api/embed",
+                json={"model": self.model, "input": texts},
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data["embeddings"]
+                if response.status != 404:
+                    raise EmbeddingError(
+                        f"Embedding request failed: {response.status}"
+                    )
+            logger.info("Ollama /api/embed not available, using /api/embeddings")
+            self._batch_endpoint_supported = False
+
+        async def embed_one(text: str) -> List[float]:
+            self.stats["http_requests"] += 1
+            async with session.post(
+                f"{self.base_url}/api/embeddings",
+                json={"model": self.model, "prompt": text},
+            ) as response:
+                if response.status != 200:
+                    raise EmbeddingError(
+                        f"Embedding request failed: {response.status}"
+                    )
+                data = await response.json()
+                return data["embedding"]
+
+        return list(await asyncio.gather(*(embed_one(text) for text in texts)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get client statistics"""
+        stats = dict(self.stats)
+        stats["pending"] = self._queue.qsize() if self._queue else 0
+        stats["texts_per_request"] = (
+            stats["texts_sent"] / stats["http_requests"]
+            if stats["http_requests"] else 0.0
+        )
+        return stats
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_clients: Dict[Tuple[str, str], EmbeddingClient] = {}
+
+
+def get_embedding_client(base_url: str, model: str, **kwargs) -> EmbeddingClient:
+    """Get the shared embedding client for a server and model"""
+    key = (base_url.rstrip("/"), model)
+    if key not in _clients:
+        _clients[key] = EmbeddingClient(base_url, model, **kwargs)
+    return _clients[key]
+
+
+async def close_embedding_clients():
+    """Close the HTTP sessions of all shared embedding clients"""
+    for client in list(_clients.values()):
+        await client.close()
@@ -0,0 +1,307 @@
+"""
+Content-addressed persistent embedding store
+Embeddings are keyed by (model, hash of normalized text) and kept on disk as
+memory-mapped vector files, with an in-process LRU in front, so the same
+text is never embedded twice by the same model - across services, scholar
+instances and restarts.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SIZE = 32
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies share one embedding"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def content_hash(text: str) -> bytes:
+    """SHA-256 digest of the normalized text"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+class _ModelSegment:
+    """On-disk vectors for a single model.
+
+    ``vectors.bin`` holds fixed-width rows of ``dtype`` values and
+    ``index.bin`` holds one 32-byte content digest per row, in the same
+    order. Vectors are appended before their digest, so a crash can only
+    leave an orphan vector row, which is ignored on the next load.
+    """
+
+    def __init__(self, directory: Path, dimension: int, dtype: np.dtype):
+        self.directory = directory
+        self.dimension = dimension
+        self.dtype = dtype
+        self.vectors_path = directory / "vectors.bin"
+        self.index_path = directory / "index.bin"
+        self.rows: Dict[bytes, int] = {}
+        self._index_offset = 0
+        self._mmap: Optional[np.memmap] = None
+
+        directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path.touch(exist_ok=True)
+        self.index_path.touch(exist_ok=True)
+        self.refresh()
+
+    @property
+    def row_count(self) -> int:
+        """Rows in the index file, including any repeated digests"""
+        return self._index_offset // DIGEST_SIZE
+
+    @property
+    def row_bytes(self) -> int:
+        return self.dimension * self.dtype.itemsize
+
+    def refresh(self):
+        """Pick up rows appended by other processes since the last load"""
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        usable = len(data) - len(data) % DIGEST_SIZE
+        # Row numbers follow file position, so a repeated digest keeps its
+        # first row without shifting the rows after it
+        row = self.row_count
+        for start in range(0, usable, DIGEST_SIZE):
+            self.rows.setdefault(data[start:start + DIGEST_SIZE], row)
+            row += 1
+        self._index_offset += usable
+
+    def read(self, row: int) -> np.ndarray:
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            rows = os.path.getsize(self.vectors_path) // self.row_bytes
+            self._mmap = np.memmap(
+                self.vectors_path, dtype=self.dtype, mode="r",
+                shape=(rows, self.dimension)
+            )
+        return np.asarray(self._mmap[row], dtype=np.float32)
+
+    def append(self, digests: List[bytes], vectors: np.ndarray):
+        """Append rows under an exclusive file lock"""
+        with open(self.index_path, "ab") as index_file, \
+                open(self.vectors_path, "r+b") as vector_file:
+            if fcntl is not None:
+                fcntl.flock(index_file.fileno(), fcntl.LOCK_EX)
+            try:
+                # Another process may have appended meanwhile
+                self.refresh()
+                new = {}
+                for digest, vector in zip(digests, vectors):
+                    if digest not in self.rows and digest not in new:
+                        new[digest] = vector
+                if not new:
+                    return
+                # Align to the index so orphan rows from a crash are overwritten
+                vector_file.seek(self.row_count * self.row_bytes)
+                vector_file.write(
+                    np.stack(list(new.values())).astype(self.dtype).tobytes()
+                )
+                vector_file.flush()
+                index_file.write(b"".join(new))
+                index_file.flush()
+                self.refresh()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(index_file.fileno(), fcntl.LOCK_UN)
+
+
+class EmbeddingStore:
+    """Persistent embedding cache shared by every embedding call site"""
+
+    def __init__(
+        self,
+        root: str,
+        dtype: str = "float32",
+        memory_items: int = 10000,
+    ):
+        self.root = Path(root)
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.dtype("float32"), np.dtype("float16")):
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+        self.memory_items = memory_items
+
+        self._segments: Dict[str, _ModelSegment] = {}
+        self._lru: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def _model_dir(self, model: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        return self.root / f"{safe}-{hashlib.sha1(model.encode()).hexdigest()[:8]}"
+
+    def _segment(self, model: str, dimension: Optional[int] = None) -> Optional[_ModelSegment]:
+        segment = self._segments.get(model)
+        if segment is not None:
+            return segment
+
+        directory = self._model_dir(model)
+        dim_path = directory / "dimension"
+        if dim_path.exists():
+            stored = dim_path.read_text().split()
+            segment = _ModelSegment(directory, int(stored[0]), np.dtype(stored[1]))
+        elif dimension is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+            dim_path.write_text(f"{dimension} {self.dtype.name}")
+            segment = _ModelSegment(directory, dimension, self.dtype)
+        else:
+            return None
+
+        self._segments[model] = segment
+        return segment
+
+    def _remember(self, key: tuple, vector: np.ndarray):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.memory_items:
+            self._lru.popitem(last=False)
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Look up embeddings; missing entries are returned as None"""
+        results: List[Optional[List[float]]] = []
+        with self._lock:
+            segment = self._segment(model)
+            refreshed = False
+            for text in texts:
+                digest = content_hash(text)
+                key = (model, digest)
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    results.append(vector.tolist())
+                    continue
+
+                row = segment.rows.get(digest) if segment else None
+                if row is None and segment is not None and not refreshed:
+                    # Another process may have stored it since we last looked
+                    segment.refresh()
+                    refreshed = True
+                    row = segment.rows.get(digest)
+
+                if row is None:
+                    self.stats["misses"] += 1
+                    results.append(None)
+                    continue
+
+                vector = segment.read(row)
+                self._remember(key, vector)
+                self.stats["disk_hits"] += 1
+                results.append(vector.tolist())
+        return results
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Look up a single embedding"""
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Store embeddings for texts"""
+        if not texts:
+            return
+        array = np.asarray(vectors, dtype=np.float32)
+        if array.ndim != 2 or array.shape[0] != len(texts):
+            logger.warning(f"Not caching malformed embeddings for model {model}")
+            return
+
+        with self._lock:
+            segment = self._segment(model, dimension=array.shape[1])
+            if segment.dimension != array.shape[1]:
+                logger.warning(
+                    f"Not caching {array.shape[1]}-dim embeddings for model {model}; "
+                    f"store holds {segment.dimension}-dim vectors"
+                )
+                return
+            digests = [content_hash(text) for text in texts]
+            try:
+                segment.append(digests, array)
+            except OSError as e:
+                logger.error(f"Failed to persist embeddings for model {model}: {e}")
+            # Cache the values as stored, so reads match after a restart
+            stored = array.astype(segment.dtype).astype(np.float32)
+            for digest, vector in zip(digests, stored):
+                self._remember((model, digest), vector)
+            self.stats["writes"] += len(texts)
+
+    def put(self, model: str, text: str, vector: Sequence[float]):
+        """Store a single embedding"""
+        self.put_many(model, [text], [vector])
+
+    async def get_or_compute(
+        self,
+        model: str,
+        texts: Sequence[str],
+        compute: Callable[[List[str]], Awaitable[List[List[float]]]],
+    ) -> List[List[float]]:
+        """Return embeddings for texts, computing and storing only the misses"""
+        results = self.get_many(model, texts)
+        missing = {}
+        for i, (text, vector) in enumerate(zip(texts, results)):
+            if vector is None:
+                missing.setdefault(text, []).append(i)
+
+        if missing:
+            missing_texts = list(missing)
+            computed = await compute(missing_texts)
+            self.put_many(model, missing_texts, computed)
+            for text, vector in zip(missing_texts, computed):
+                vector = list(vector)
+                for i in missing[text]:
+                    results[i] = vector
+        return results
+
+    def clear_memory(self) -> int:
+        """Drop the in-process LRU; on-disk vectors are kept"""
+        with self._lock:
+            size = len(self._lru)
+            self._lru.clear()
+            return size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_items": len(self._lru),
+                "models": {
+                    model: {"vectors": len(segment.rows), "dimension": segment.dimension}
+                    for model, segment in self._segments.items()
+                },
+                "root": str(self.root),
+            }
+
+
+_store: Optional[EmbeddingStore] = None
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """Get the process-wide embedding store"""
+    global _store
+    if _store is None:
+        _store = EmbeddingStore(
+            root=settings.EMBEDDING_CACHE_DIR,
+            dtype=settings.EMBEDDING_CACHE_DTYPE,
+            memory_items=settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+        )
+    return _store
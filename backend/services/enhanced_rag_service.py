@@ -5,7 +5,6 @@ import json
 import time
 import logging
 from typing import List, Dict, Any, Optional, Tuple
-import requests
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 
@@ -13,6 +12,7 @@ from core.config import settings
 from core.database import get_db, Conversation, Message, Document
 from services.vector_store import VectorStoreService
 from services.knowledge_graph import KnowledgeGraphService
+from services.llm_gateway import LLMGatewayError, LLMPriority, get_llm_gateway
 from services.memory_service import (
     conversation_memory_manager,
     context_compressor,
@@ -616,27 +616,21 @@ Answer:"""
     async def _generate_standard_response(self, prompt: str) -> str:
         """Generate standard response using LLM"""
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.7,
-                        "top_p": 0.9,
-                        "max_tokens": 1024
-                    }
+            return await get_llm_gateway().generate(
+                prompt,
+                model=self.model,
+                options={
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "max_tokens": 1024
                 },
-                timeout=60
+                priority=LLMPriority.INTERACTIVE,
+                timeout=60,
+                base_url=self.ollama_url
             )
-            
-            if response.status_code == 200:
-                return response.json()["response"]
-            else:
-                logger.error(f"Ollama API error: {response.status_code}")
-                return "I apologize, but I'm having trouble generating a response right now."
-                
+        except LLMGatewayError as e:
+            logger.error(f"Ollama API error: {str(e)}")
+            return "I apologize, but I'm having trouble generating a response right now."
         except Exception as e:
             logger.error(f"Response generation error: {str(e)}")
             return "I apologize, but I'm having trouble connecting to the language model."
@@ -668,45 +662,39 @@ Therefore, the answer is...
 Final Answer:"""
         
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": cot_prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.7,
-                        "top_p": 0.9,
-                        "max_tokens": 1500
-                    }
+            full_response = await get_llm_gateway().generate(
+                cot_prompt,
+                model=self.model,
+                options={
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "max_tokens": 1500
                 },
-                timeout=60
+                priority=LLMPriority.INTERACTIVE,
+                timeout=60,
+                base_url=self.ollama_url
             )
             
-            if response.status_code == 200:
-                full_response = response.json()["response"]
-                
-                # Extract final answer and reasoning steps
-                if "Final Answer:" in full_response:
-                    parts = full_response.split("Final Answer:")
-                    reasoning = parts[0].strip()
-                    final_answer = parts[1].strip()
-                else:
-                    reasoning = full_response
-                    final_answer = full_response
-                
-                chain_of_thought = {
-                    "reasoning_steps": reasoning,
-                    "final_answer": final_answer,
-                    "total_steps": reasoning.count("Step"),
-                    "confidence": 0.8
-                }
-                
-                return final_answer, chain_of_thought
+            # Extract final answer and reasoning steps
+            if "Final Answer:" in full_response:
+                parts = full_response.split("Final Answer:")
+                reasoning = parts[0].strip()
+                final_answer = parts[1].strip()
             else:
-                logger.error(f"Chain of thought generation error: {response.status_code}")
-                return "I apologize, but I'm having trouble with the reasoning process.", None
-                
+                reasoning = full_response
+                final_answer = full_response
+            
+            chain_of_thought = {
+                "reasoning_steps": reasoning,
+                "final_answer": final_answer,
+                "total_steps": reasoning.count("Step"),
+                "confidence": 0.8
+            }
+            
+            return final_answer, chain_of_thought
+        except LLMGatewayError as e:
+            logger.error(f"Chain of thought generation error: {str(e)}")
+            return "I apologize, but I'm having trouble with the reasoning process.", None
         except Exception as e:
             logger.error(f"Chain of thought generation error: {str(e)}")
             return "I apologize, but I'm having trouble with the reasoning process.", None
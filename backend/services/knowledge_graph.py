@@ -8,9 +8,10 @@ import logging
 from typing import Dict, Any, List, Optional, Tuple, Set
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from bisect import bisect_left
 import networkx as nx
 import numpy as np
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, deque, OrderedDict
 import re
 import spacy
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -18,6 +19,13 @@ from sklearn.metrics.pairwise import cosine_similarity
 
 logger = logging.getLogger(__name__)
 
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+')
+SENTENCE_TEXT = re.compile(r'[^.!?]+')
+WORD = re.compile(r'\w+')
+
+# Bounded-hop shortest-path trees kept by KnowledgeGraphBuilder
+NEIGHBORHOOD_CACHE_SIZE = 1024
+
 @dataclass
 class Entity:
     """Knowledge graph entity"""
@@ -50,6 +58,92 @@ class ResearchConnection:
     supporting_evidence: List[str]
     potential_impact: str
 
+@dataclass
+class EntityMention:
+    """Occurrence of an entity name in a text"""
+    entity_index: int
+    start: int
+    end: int
+
+class EntityMentions:
+    """Entity mentions found in one text, ordered by position"""
+    
+    def __init__(self, entities: List[Entity], mentions: List[EntityMention]):
+        self.entities = entities
+        self.mentions = mentions
+        self._starts = [mention.start for mention in mentions]
+    
+    def entities_in(self, start: int, end: int) -> List[Entity]:
+        """Entities mentioned entirely within text[start:end], once each, in entity order"""
+        found = set()
+        for i in range(bisect_left(self._starts, start), bisect_left(self._starts, end)):
+            if self.mentions[i].end <= end:
+                found.add(self.mentions[i].entity_index)
+        return [self.entities[index] for index in sorted(found)]
+
+class EntityMatcher:
+    """
+    Aho-Corasick automaton over the lowercased names of an entity set.
+    
+    Built once per entity set, it finds every case-insensitive occurrence of
+    every entity name in a single pass over a text, instead of one substring
+    scan per entity and sentence.
+    """
+    
+    def __init__(self, entities: List[Entity]):
+        self.entities = entities
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, int]]] = [[]]  # (entity index, name length) per state
+        
+        for index, entity in enumerate(entities):
+            name = entity.name.lower()
+            if name:
+                self._add_name(name, index)
+        self._build_failure_links()
+    
+    def _add_name(self, name: str, entity_index: int):
+        state = 0
+        for char in name:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((entity_index, len(name)))
+    
+    def _build_failure_links(self):
+        """Breadth-first, so each state's fallback is complete before its children use it"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def find_mentions(self, text: str) -> EntityMentions:
+        """Find all entity mentions in text, including overlapping ones"""
+        goto, fail, output = self._goto, self._fail, self._output
+        mentions = []
+        state = 0
+        
+        for position, char in enumerate(text.lower()):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for entity_index, length in output[state]:
+                mentions.append(EntityMention(entity_index, position + 1 - length, position + 1))
+        
+        mentions.sort(key=lambda mention: (mention.start, mention.end))
+        return EntityMentions(self.entities, mentions)
+
 class EntityExtractor:
     """Extract entities from research documents"""
     
@@ -242,19 +336,22 @@ class RelationshipExtractor:
         """Extract relationships between entities"""
         relationships = []
         
+        # Locate every entity mention once; all extractors work from these spans
+        mentions = EntityMatcher(entities).find_mentions(text)
+        
         # Extract pattern-based relationships
         relationships.extend(
-            await self._extract_pattern_relationships(text, entities, document_id)
+            await self._extract_pattern_relationships(text, entities, document_id, mentions)
         )
         
         # Extract co-occurrence relationships
         relationships.extend(
-            await self._extract_cooccurrence_relationships(text, entities, document_id)
+            await self._extract_cooccurrence_relationships(text, entities, document_id, mentions)
         )
         
         # Extract citation relationships
         relationships.extend(
-            await self._extract_citation_relationships(text, entities, document_id)
+            await self._extract_citation_relationships(text, entities, document_id, mentions)
         )
         
         return relationships
@@ -263,7 +360,8 @@ class RelationshipExtractor:
         self, 
         text: str, 
         entities: List[Entity], 
-        document_id: str
+        document_id: str,
+        mentions: EntityMentions
     ) -> List[Relationship]:
         """Extract relationships using linguistic patterns"""
         relationships = []
@@ -276,12 +374,18 @@ class RelationshipExtractor:
                 matches = re.finditer(pattern, text, re.IGNORECASE)
                 
                 for match in matches:
-                    source_text = match.group(1).strip()
-                    target_text = match.group(3).strip() if len(match.groups()) >= 3 else ""
+                    # The lazy target group matches nothing, so the target is
+                    # the rest of the sentence after the relation phrase
+                    sentence_end = SENTENCE_BOUNDARY.search(text, match.end(2))
+                    target_end = sentence_end.start() if sentence_end else len(text)
                     
                     # Find matching entities
-                    source_entity = self._find_matching_entity(source_text, entity_map)
-                    target_entity = self._find_matching_entity(target_text, entity_map)
+                    source_entity = self._find_matching_entity(
+                        text, match.start(1), match.end(1), entity_map, mentions
+                    )
+                    target_entity = self._find_matching_entity(
+                        text, match.end(2), target_end, entity_map, mentions
+                    )
                     
                     if source_entity and target_entity:
                         relationship = Relationship(
@@ -302,39 +406,41 @@ class RelationshipExtractor:
         
         return relationships
     
-    def _find_matching_entity(self, text: str, entity_map: Dict[str, Entity]) -> Optional[Entity]:
-        """Find entity that matches the given text"""
-        text_lower = text.lower().strip()
+    def _find_matching_entity(
+        self,
+        text: str,
+        start: int,
+        end: int,
+        entity_map: Dict[str, Entity],
+        mentions: EntityMentions
+    ) -> Optional[Entity]:
+        """Find entity that matches text[start:end]"""
+        text_lower = text[start:end].lower().strip()
         
         # Exact match
         if text_lower in entity_map:
             return entity_map[text_lower]
         
-        # Partial match
-        for entity_name, entity in entity_map.items():
-            if entity_name in text_lower or text_lower in entity_name:
-                return entity
-        
-        return None
+        # Partial match: first entity mentioned inside the span
+        mentioned = mentions.entities_in(start, end)
+        return mentioned[0] if mentioned else None
     
     async def _extract_cooccurrence_relationships(
         self, 
         text: str, 
         entities: List[Entity], 
-        document_id: str
+        document_id: str,
+        mentions: EntityMentions
     ) -> List[Relationship]:
         """Extract relationships based on entity co-occurrence"""
         relationships = []
         
-        # Split text into sentences
-        sentences = re.split(r'[.!?]+', text)
-        
-        for sentence in sentences:
+        # Walk the sentences between boundaries
+        for sentence_match in SENTENCE_TEXT.finditer(text):
+            sentence = sentence_match.group()
+            
             # Find entities in this sentence
-            sentence_entities = []
-            for entity in entities:
-                if entity.name.lower() in sentence.lower():
-                    sentence_entities.append(entity)
+            sentence_entities = mentions.entities_in(sentence_match.start(), sentence_match.end())
             
             # Create co-occurrence relationships
             for i, entity1 in enumerate(sentence_entities):
@@ -359,7 +465,8 @@ class RelationshipExtractor:
         self, 
         text: str, 
         entities: List[Entity], 
-        document_id: str
+        document_id: str,
+        mentions: EntityMentions
     ) -> List[Relationship]:
         """Extract citation relationships"""
         relationships = []
@@ -375,10 +482,7 @@ class RelationshipExtractor:
             context = text[start:end]
             
             # Find entities in citation context
-            context_entities = []
-            for entity in entities:
-                if entity.name.lower() in context.lower():
-                    context_entities.append(entity)
+            context_entities = mentions.entities_in(start, end)
             
             # Create citation relationships
             for entity in context_entities:
@@ -407,6 +511,72 @@ class KnowledgeGraphBuilder:
         self.graph = nx.MultiDiGraph()
         self.entities = {}
         self.relationships = {}
+        
+        # Query indexes, kept current by add_entity and add_relationship
+        self._entity_order: Dict[str, int] = {}
+        self._search_text: Dict[str, Tuple[str, List[str]]] = {}  # lowercased name, property strings
+        self._token_entities: Dict[str, Set[str]] = {}
+        self._sorted_tokens: Optional[List[str]] = None  # rebuilt after new tokens appear
+        self._edge_relationships: Dict[Tuple[str, str], List[Relationship]] = defaultdict(list)
+        self._neighborhoods: "OrderedDict[Tuple[str, int], Dict[str, List[str]]]" = OrderedDict()
+    
+    def add_entity(self, entity: Entity):
+        """Add or replace an entity in the graph and the lookup indexes"""
+        if entity.id in self._search_text:
+            self._unindex_entity(entity.id)
+        
+        self.entities[entity.id] = entity
+        self._entity_order.setdefault(entity.id, len(self._entity_order))
+        self.graph.add_node(
+            entity.id,
+            name=entity.name,
+            type=entity.type,
+            confidence=entity.confidence,
+            **entity.properties
+        )
+        
+        name = entity.name.lower()
+        properties = [str(prop).lower() for prop in entity.properties.values()]
+        self._search_text[entity.id] = (name, properties)
+        for token in set(WORD.findall(" ".join([name, *properties]))):
+            if token not in self._token_entities:
+                self._token_entities[token] = set()
+                self._sorted_tokens = None
+            self._token_entities[token].add(entity.id)
+        # A node without edges changes no neighborhood, so the cache stays valid
+    
+    def _unindex_entity(self, entity_id: str):
+        name, properties = self._search_text.pop(entity_id)
+        for token in set(WORD.findall(" ".join([name, *properties]))):
+            entity_ids = self._token_entities.get(token)
+            if entity_ids is not None:
+                entity_ids.discard(entity_id)
+                if not entity_ids:
+                    del self._token_entities[token]
+                    self._sorted_tokens = None
+    
+    def add_relationship(self, relationship: Relationship) -> bool:
+        """Add a relationship between known entities, returning whether it was added"""
+        if (relationship.source_entity not in self.entities or
+                relationship.target_entity not in self.entities):
+            return False
+        
+        previous = self.relationships.get(relationship.id)
+        if previous is not None:
+            self._edge_relationships[(previous.source_entity, previous.target_entity)].remove(previous)
+        
+        self.relationships[relationship.id] = relationship
+        self._edge_relationships[(relationship.source_entity, relationship.target_entity)].append(relationship)
+        self.graph.add_edge(
+            relationship.source_entity,
+            relationship.target_entity,
+            relationship_id=relationship.id,
+            type=relationship.relationship_type,
+            confidence=relationship.confidence,
+            **relationship.properties
+        )
+        self._neighborhoods.clear()
+        return True
     
     async def build_research_ontology(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Build knowledge graph from research documents"""
@@ -451,29 +621,11 @@ class KnowledgeGraphBuilder:
         
         # Add entities to graph and storage
         for entity in entities:
-            self.entities[entity.id] = entity
-            self.graph.add_node(
-                entity.id,
-                name=entity.name,
-                type=entity.type,
-                confidence=entity.confidence,
-                **entity.properties
-            )
+            self.add_entity(entity)
         
-        # Add relationships to graph and storage
+        # Add relationships between known entities to graph and storage
         for relationship in relationships:
-            if (relationship.source_entity in self.entities and 
-                relationship.target_entity in self.entities):
-                
-                self.relationships[relationship.id] = relationship
-                self.graph.add_edge(
-                    relationship.source_entity,
-                    relationship.target_entity,
-                    relationship_id=relationship.id,
-                    type=relationship.relationship_type,
-                    confidence=relationship.confidence,
-                    **relationship.properties
-                )
+            self.add_relationship(relationship)
     
     async def _analyze_graph_structure(self) -> Dict[str, Any]:
         """Analyze knowledge graph structure"""
@@ -538,24 +690,17 @@ class KnowledgeGraphBuilder:
         
         # Find paths between query entities and other entities
         for query_entity in query_entities:
-            # Find entities within 2-3 hops
-            nearby_entities = await self._find_nearby_entities(query_entity.id, max_distance=3)
+            # Shortest paths to every entity within 3 hops, from one cached search
+            paths = self._shortest_paths(query_entity.id, max_distance=3)
             
-            for target_entity_id in nearby_entities:
+            for target_entity_id, path in paths.items():
                 if target_entity_id == query_entity.id:
                     continue
                 
-                # Find shortest path
-                try:
-                    path = nx.shortest_path(self.graph, query_entity.id, target_entity_id)
-                    
-                    if len(path) > 1:  # There's a connection
-                        connection = await self._analyze_connection_path(path, query)
-                        if connection:
-                            connections.append(connection)
-                
-                except nx.NetworkXNoPath:
-                    continue
+                if len(path) > 1:  # There's a connection
+                    connection = await self._analyze_connection_path(path, query)
+                    if connection:
+                        connections.append(connection)
         
         # Sort by connection strength
         connections.sort(key=lambda x: x.strength, reverse=True)
@@ -567,30 +712,59 @@ class KnowledgeGraphBuilder:
         query_lower = query.lower()
         matching_entities = []
         
-        for entity in self.entities.values():
-            # Exact match
-            if query_lower in entity.name.lower():
-                matching_entities.append(entity)
-            # Partial match in properties
-            elif any(query_lower in str(prop).lower() for prop in entity.properties.values()):
-                matching_entities.append(entity)
+        for entity_id in self._candidate_entities(query_lower):
+            name, properties = self._search_text[entity_id]
+            # Exact match, or partial match in properties
+            if query_lower in name or any(query_lower in prop for prop in properties):
+                matching_entities.append(self.entities[entity_id])
         
         return matching_entities
     
-    async def _find_nearby_entities(self, entity_id: str, max_distance: int = 3) -> Set[str]:
-        """Find entities within max_distance hops"""
-        nearby = set()
+    def _candidate_entities(self, query_lower: str) -> List[str]:
+        """Entities with a word starting with each query word, in insertion order"""
+        tokens = set(WORD.findall(query_lower))
+        if not tokens:
+            return list(self.entities)
+        
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._token_entities)
+        
+        candidates: Optional[Set[str]] = None
+        # Longest words first, they usually narrow the candidates most
+        for token in sorted(tokens, key=len, reverse=True):
+            token_candidates = set()
+            i = bisect_left(self._sorted_tokens, token)
+            while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(token):
+                token_candidates |= self._token_entities[self._sorted_tokens[i]]
+                i += 1
+            
+            candidates = token_candidates if candidates is None else candidates & token_candidates
+            if not candidates:
+                return []
         
-        try:
-            # Use BFS to find entities within distance
-            distances = nx.single_source_shortest_path_length(
-                self.graph, entity_id, cutoff=max_distance
-            )
-            nearby.update(distances.keys())
-        except:
-            pass
+        return sorted(candidates, key=self._entity_order.__getitem__)
+    
+    def _shortest_paths(self, entity_id: str, max_distance: int) -> Dict[str, List[str]]:
+        """Shortest paths from an entity to everything within max_distance hops, cached until the next edge is added"""
+        key = (entity_id, max_distance)
+        paths = self._neighborhoods.get(key)
+        if paths is not None:
+            self._neighborhoods.move_to_end(key)
+            return paths
         
-        return nearby
+        try:
+            paths = nx.single_source_shortest_path(self.graph, entity_id, cutoff=max_distance)
+        except nx.NodeNotFound:
+            paths = {}
+        
+        self._neighborhoods[key] = paths
+        if len(self._neighborhoods) > NEIGHBORHOOD_CACHE_SIZE:
+            self._neighborhoods.popitem(last=False)
+        return paths
+    
+    async def _find_nearby_entities(self, entity_id: str, max_distance: int = 3) -> Set[str]:
+        """Find entities within max_distance hops"""
+        return set(self._shortest_paths(entity_id, max_distance))
     
     async def _analyze_connection_path(self, path: List[str], query: str) -> Optional[ResearchConnection]:
         """Analyze a connection path and create ResearchConnection"""
@@ -669,11 +843,13 @@ class KnowledgeGraphBuilder:
             source_id = path[i]
             target_id = path[i + 1]
             
-            # Find relationships between these entities
-            for rel in self.relationships.values():
-                if ((rel.source_entity == source_id and rel.target_entity == target_id) or
-                    (rel.source_entity == target_id and rel.target_entity == source_id)):
-                    evidence.extend(rel.evidence)
+            # Relationships between these entities, in either direction
+            for rel in (self._edge_relationships.get((source_id, target_id), []) +
+                        self._edge_relationships.get((target_id, source_id), [])):
+                evidence.extend(rel.evidence)
+            
+            if len(evidence) >= 5:
+                break
         
         return evidence[:5]  # Limit to top 5 pieces of evidence
     
@@ -716,13 +892,11 @@ class KnowledgeGraphBuilder:
         
         try:
             # Get all entities within distance 3
-            all_reachable = nx.single_source_shortest_path_length(
-                self.graph, entity_id, cutoff=3
-            )
+            all_reachable = self._shortest_paths(entity_id, max_distance=3)
             
             # Filter for entities at distance 2-3 with few direct connections
-            for target_id, distance in all_reachable.items():
-                if distance >= 2:
+            for target_id, path in all_reachable.items():
+                if len(path) - 1 >= 2:
                     # Check if there are few direct relationships
                     direct_connections = len(list(self.graph.neighbors(target_id)))
                     if direct_connections < 3:  # Underconnected
@@ -50,18 +50,9 @@ class KnowledgeGraphService:
             source_documents=[document_id] if document_id else []
         )
         
-        # Store entity
+        # Store entity and add it to the graph
         self.entities_store[entity_id] = entity
-        self.builder.entities[entity_id] = entity
-        
-        # Add to graph
-        self.builder.graph.add_node(
-            entity_id,
-            name=name,
-            type=entity_type,
-            confidence=importance_score,
-            **entity.properties
-        )
+        self.builder.add_entity(entity)
         
         return {
             "id": entity_id,
@@ -146,19 +137,9 @@ class KnowledgeGraphService:
             evidence=[context] if context else []
         )
         
-        # Store relationship
+        # Store relationship and add it to the graph
         self.relationships_store[relationship_id] = relationship
-        self.builder.relationships[relationship_id] = relationship
-        
-        # Add to graph
-        self.builder.graph.add_edge(
-            source_entity_id,
-            target_entity_id,
-            relationship_id=relationship_id,
-            type=relationship_type,
-            confidence=confidence_score,
-            **relationship.properties
-        )
+        self.builder.add_relationship(relationship)
         
         return {
             "id": relationship_id,
@@ -0,0 +1,292 @@
+"""
+Async LLM gateway for Ollama
+All text generation goes through one pooled HTTP session. Requests queue per
+server and model behind a concurrency cap matching what Ollama can serve in
+parallel, and are admitted by priority, so interactive chat is not stuck
+behind batch tagging. Deadlines bound both queueing and generation, and
+queue-wait and generation times are recorded as performance metrics.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+from core.config import settings
+from core.distributed_tracing import performance_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LLMPriority(IntEnum):
+    """Admission order for queued requests; lower values go first"""
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BATCH = 2
+
+
+class LLMGatewayError(Exception):
+    """Raised when the LLM server cannot produce a response"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class LLMTimeoutError(LLMGatewayError):
+    """Raised when a request's deadline passes while queued or generating"""
+
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def llm_deadline(seconds: float) -> Iterator[float]:
+    """
+    Bound every LLM call made inside the block (including from nested
+    services) to finish within ``seconds``. Nested scopes can only tighten
+    an enclosing deadline.
+    """
+    deadline = time.monotonic() + seconds
+    enclosing = _deadline.get()
+    if enclosing is not None:
+        deadline = min(deadline, enclosing)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+class _ModelQueue:
+    """Concurrency slots for one server and model, handed out by priority"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+
+    def release(self):
+        # Hand the slot straight to the next live waiter, if any
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self.waiters if not future.done())
+
+
+class LLMGateway:
+    """Shared, non-blocking client for Ollama's ``/api/generate``.
+
+    At most ``model_concurrency.get(model, default_concurrency)`` requests run
+    against a model on a server at once; further requests wait in a priority
+    queue (FIFO within a priority). A request's deadline is the earliest of
+    its ``timeout`` and any enclosing ``llm_deadline()`` scope and covers the
+    time spent queued. Cancelling the calling task withdraws a queued request
+    or aborts a running one and frees its slot.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        default_concurrency: int = 2,
+        model_concurrency: Optional[Dict[str, int]] = None,
+        max_connections: int = 100,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.default_concurrency = max(1, default_concurrency)
+        self.model_concurrency = dict(model_concurrency or {})
+        self.max_connections = max_connections
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: Dict[Tuple[str, str], _ModelQueue] = {}
+        self._sequence = itertools.count()
+
+        self.stats = {
+            "requests": 0,
+            "completed": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "cancelled": 0,
+        }
+
+    async def _bind_loop(self):
+        """(Re)create loop-bound state when used from a new event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        await self._release_session()
+        self._loop = loop
+        self._queues = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def _release_session(self):
+        """Close the previous loop's session before binding to a new loop"""
+        session, loop = self._session, self._loop
+        self._session = None
+        if session is None or session.closed:
+            return
+        if loop is not None and loop.is_running():
+            # The loop is still serving another thread; close the session there
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        try:
+            # A closed loop has already dropped its connections, so this only
+            # marks the session and its connector closed
+            await session.close()
+        except Exception as e:
+            logger.debug(f"Error closing HTTP session of a previous event loop: {e}")
+
+    def _queue(self, base_url: str, model: str) -> _ModelQueue:
+        key = (base_url, model)
+        queue = self._queues.get(key)
+        if queue is None:
+            limit = self.model_concurrency.get(model, self.default_concurrency)
+            queue = self._queues[key] = _ModelQueue(limit)
+        return queue
+
+    async def _acquire(self, queue: _ModelQueue, priority: int, deadline: float):
+        if queue.active < queue.limit and not queue.queued:
+            queue.active += 1
+            return
+
+        future = self._loop.create_future()
+        heapq.heappush(queue.waiters, (priority, next(self._sequence), future))
+        try:
+            await asyncio.wait_for(future, max(deadline - time.monotonic(), 0))
+        except BaseException:
+            # A slot handed over just as the wait ended is passed on
+            if future.done() and not future.cancelled():
+                queue.release()
+            raise
+
+    async def generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        priority: LLMPriority = LLMPriority.DEFAULT,
+        timeout: float = 60.0,
+        base_url: Optional[str] = None,
+    ) -> str:
+        """Generate a completion for ``prompt`` and return the response text"""
+        await self._bind_loop()
+        model = model or self.model
+        base_url = (base_url or self.base_url).rstrip("/")
+
+        deadline = time.monotonic() + timeout
+        enclosing = _deadline.get()
+        if enclosing is not None:
+            deadline = min(deadline, enclosing)
+
+        queue = self._queue(base_url, model)
+        self.stats["requests"] += 1
+        performance_metrics.increment_counter(f"llm.{model}.requests")
+
+        queued_at = time.monotonic()
+        try:
+            await self._acquire(queue, priority, deadline)
+        except asyncio.TimeoutError:
+            self._record_failure(model, "timeouts")
+            raise LLMTimeoutError(f"Deadline passed while queued for {model}")
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+
+        started_at = time.monotonic()
+        performance_metrics.record_duration(f"llm.{model}.queue_wait", started_at - queued_at)
+        try:
+            text = await asyncio.wait_for(
+                self._request_generation(base_url, model, prompt, options or {}),
+                max(deadline - started_at, 0)
+            )
+        except asyncio.TimeoutError:
+            self._record_failure(model, "timeouts")
+            raise LLMTimeoutError(f"Deadline passed while generating with {model}")
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+        except Exception:
+            self._record_failure(model, "errors")
+            raise
+        finally:
+            queue.release()
+
+        performance_metrics.record_duration(f"llm.{model}.generation", time.monotonic() - started_at)
+        self.stats["completed"] += 1
+        return text
+
+    def _record_failure(self, model: str, kind: str):
+        self.stats[kind] += 1
+        performance_metrics.increment_counter(f"llm.{model}.{kind}")
+
+    async def _request_generation(
+        self, base_url: str, model: str, prompt: str, options: Dict[str, Any]
+    ) -> str:
+        """Call Ollama's non-streaming generate API"""
+        payload = {"model": model, "prompt": prompt, "stream": False}
+        if options:
+            payload["options"] = options
+
+        async with self._get_session().post(f"{base_url}/api/generate", json=payload) as response:
+            if response.status != 200:
+                body = await response.text()
+                raise LLMGatewayError(
+                    f"Ollama API error: {response.status} - {body[:200]}", status=response.status
+                )
+            data = await response.json()
+            return data.get("response", "")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get gateway statistics, including per-model queue state"""
+        stats = dict(self.stats)
+        stats["models"] = {
+            f"{base_url} {model}": {
+                "limit": queue.limit,
+                "active": queue.active,
+                "queued": queue.queued,
+            }
+            for (base_url, model), queue in self._queues.items()
+        }
+        return stats
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the shared LLM gateway"""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway(
+            settings.OLLAMA_URL,
+            settings.OLLAMA_MODEL,
+            default_concurrency=settings.LLM_MAX_CONCURRENCY,
+            model_concurrency=settings.llm_model_concurrency,
+        )
+    return _gateway
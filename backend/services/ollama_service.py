@@ -10,6 +10,8 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
+from services.llm_gateway import LLMGatewayError, LLMPriority, get_llm_gateway
+
 logger = logging.getLogger(__name__)
 
 class OllamaService:
@@ -279,39 +281,32 @@ class OllamaService:
         try:
             start_time = datetime.now()
             
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": scientific_prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                        "top_p": 0.9,
-                        "max_tokens": max_tokens,
-                        "stop": ["Human:", "Assistant:", "Query:"]
-                    }
+            response_text = await get_llm_gateway().generate(
+                scientific_prompt,
+                model=model,
+                options={
+                    "temperature": temperature,
+                    "top_p": 0.9,
+                    "max_tokens": max_tokens,
+                    "stop": ["Human:", "Assistant:", "Query:"]
                 },
-                timeout=120  # 2 minutes timeout
+                priority=LLMPriority.INTERACTIVE,
+                timeout=120,  # 2 minutes timeout
+                base_url=self.base_url
             )
             
             processing_time = (datetime.now() - start_time).total_seconds()
             
-            if response.status_code == 200:
-                result = response.json()
-                
-                return {
-                    'response': result['response'].strip(),
-                    'model': model,
-                    'context_chunks_used': len(context_chunks),
-                    'prompt_tokens': len(scientific_prompt.split()),
-                    'processing_time': processing_time,
-                    'citations': self._extract_citations_from_context(context_chunks),
-                    'confidence_score': self._calculate_confidence_score(result.get('response', '')),
-                    'timestamp': datetime.now().isoformat()
-                }
-            else:
-                raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
+            return {
+                'response': response_text.strip(),
+                'model': model,
+                'context_chunks_used': len(context_chunks),
+                'prompt_tokens': len(scientific_prompt.split()),
+                'processing_time': processing_time,
+                'citations': self._extract_citations_from_context(context_chunks),
+                'confidence_score': self._calculate_confidence_score(response_text),
+                'timestamp': datetime.now().isoformat()
+            }
                 
         except Exception as e:
             logger.error(f"Error generating response: {e}")
@@ -460,30 +455,19 @@ RESPONSE:"""
             model = self.current_model
         
         try:
-            # Prepare the request
-            data = {
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
+            return await get_llm_gateway().generate(
+                prompt,
+                model=model,
+                options={
                     "num_predict": max_tokens,
                     "temperature": temperature
-                }
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json=data,
-                timeout=60
+                },
+                timeout=60,
+                base_url=self.base_url
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('response', '')
-            else:
-                logger.error(f"Generation failed: {response.status_code} - {response.text}")
-                return f"Error: Failed to generate response (status: {response.status_code})"
-                
+        except LLMGatewayError as e:
+            logger.error(f"Generation failed: {e}")
+            return f"Error: Failed to generate response (status: {e.status})"
         except Exception as e:
             logger.error(f"Error generating response: {e}")
             return f"Error: {str(e)}"
@@ -5,13 +5,13 @@ import json
 import time
 import logging
 from typing import List, Dict, Any, Optional
-import requests
 from sqlalchemy.orm import Session
 
 from core.config import settings
 from core.database import get_db, Conversation, Message, Document
 from services.vector_store import VectorStoreService
 from services.knowledge_graph import KnowledgeGraphService
+from services.llm_gateway import LLMGatewayError, LLMPriority, get_llm_gateway
 from models.schemas import ChatResponse, Source
 
 logger = logging.getLogger(__name__)
@@ -135,27 +135,21 @@ Question: {query}
 Answer:"""
         
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.7,
-                        "top_p": 0.9,
-                        "max_tokens": 1024
-                    }
+            return await get_llm_gateway().generate(
+                prompt,
+                model=self.model,
+                options={
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "max_tokens": 1024
                 },
-                timeout=60
+                priority=LLMPriority.INTERACTIVE,
+                timeout=60,
+                base_url=self.ollama_url
             )
-            
-            if response.status_code == 200:
-                return response.json()["response"]
-            else:
-                logger.error(f"Ollama API error: {response.status_code}")
-                return "I apologize, but I'm having trouble generating a response right now. Please try again."
-                
+        except LLMGatewayError as e:
+            logger.error(f"Ollama API error: {str(e)}")
+            return "I apologize, but I'm having trouble generating a response right now. Please try again."
         except Exception as e:
             logger.error(f"Ollama request error: {str(e)}")
             return "I apologize, but I'm having trouble connecting to the language model. Please try again."
@@ -185,45 +179,39 @@ Therefore, the answer is...
 Final Answer:"""
         
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": cot_prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.7,
-                        "top_p": 0.9,
-                        "max_tokens": 1500
-                    }
+            full_response = await get_llm_gateway().generate(
+                cot_prompt,
+                model=self.model,
+                options={
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "max_tokens": 1500
                 },
-                timeout=60
+                priority=LLMPriority.INTERACTIVE,
+                timeout=60,
+                base_url=self.ollama_url
             )
             
-            if response.status_code == 200:
-                full_response = response.json()["response"]
-                
-                # Extract final answer and reasoning steps
-                if "Final Answer:" in full_response:
-                    parts = full_response.split("Final Answer:")
-                    reasoning = parts[0].strip()
-                    final_answer = parts[1].strip()
-                else:
-                    reasoning = full_response
-                    final_answer = full_response
-                
-                chain_of_thought = {
-                    "reasoning_steps": reasoning,
-                    "final_answer": final_answer,
-                    "total_steps": reasoning.count("Step"),
-                    "confidence": 0.8  # Mock confidence
-                }
-                
-                return final_answer, chain_of_thought
+            # Extract final answer and reasoning steps
+            if "Final Answer:" in full_response:
+                parts = full_response.split("Final Answer:")
+                reasoning = parts[0].strip()
+                final_answer = parts[1].strip()
             else:
-                logger.error(f"Ollama API error: {response.status_code}")
-                return "I apologize, but I'm having trouble generating a response right now.", None
-                
+                reasoning = full_response
+                final_answer = full_response
+            
+            chain_of_thought = {
+                "reasoning_steps": reasoning,
+                "final_answer": final_answer,
+                "total_steps": reasoning.count("Step"),
+                "confidence": 0.8  # Mock confidence
+            }
+            
+            return final_answer, chain_of_thought
+        except LLMGatewayError as e:
+            logger.error(f"Ollama API error: {str(e)}")
+            return "I apologize, but I'm having trouble generating a response right now.", None
         except Exception as e:
             logger.error(f"Chain of thought generation error: {str(e)}")
             return "I apologize, but I'm having trouble with the reasoning process.", None
@@ -306,17 +294,17 @@ Please provide a detailed comparison focusing on:
 
 Comparison:"""
             
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": comparison_prompt,
-                    "stream": False
-                },
-                timeout=60
-            )
-            
-            comparison_text = response.json()["response"] if response.status_code == 200 else "Comparison failed"
+            try:
+                comparison_text = await get_llm_gateway().generate(
+                    comparison_prompt,
+                    model=self.model,
+                    priority=LLMPriority.INTERACTIVE,
+                    timeout=60,
+                    base_url=self.ollama_url
+                )
+            except LLMGatewayError as e:
+                logger.error(f"Ollama API error: {str(e)}")
+                comparison_text = "Comparison failed"
             
             return {
                 "documents": document_ids,
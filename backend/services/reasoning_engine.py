@@ -7,12 +7,12 @@ import json
 import logging
 import time
 from typing import List, Dict, Any, Optional, Tuple
-import requests
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
 
 from core.config import settings
+from services.llm_gateway import LLMGatewayError, LLMPriority, get_llm_gateway
 from models.schemas import ReasoningResult, UncertaintyScore
 
 logger = logging.getLogger(__name__)
@@ -55,27 +55,21 @@ class BaseReasoningAgent(ABC):
     async def _call_llm(self, prompt: str, temperature: float = 0.3, max_tokens: int = 1024) -> str:
         """Helper method to call the LLM"""
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                        "top_p": 0.9,
-                        "max_tokens": max_tokens
-                    }
+            return await get_llm_gateway().generate(
+                prompt,
+                model=self.model,
+                options={
+                    "temperature": temperature,
+                    "top_p": 0.9,
+                    "max_tokens": max_tokens
                 },
-                timeout=60
+                priority=LLMPriority.INTERACTIVE,
+                timeout=60,
+                base_url=self.ollama_url
             )
-            
-            if response.status_code == 200:
-                return response.json()["response"]
-            else:
-                logger.error(f"LLM API error: {response.status_code}")
-                return "Error: Unable to generate response"
-                
+        except LLMGatewayError as e:
+            logger.error(f"LLM API error: {str(e)}")
+            return "Error: Unable to generate response"
         except Exception as e:
             logger.error(f"LLM request error: {str(e)}")
             return "Error: Connection failed"
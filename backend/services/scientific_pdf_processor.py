@@ -5,6 +5,7 @@ Specialized for processing scientific journal articles and research papers
 
 import fitz  # PyMuPDF
 import pdfplumber
+import io
 import re
 import logging
 from typing import Dict, List, Optional, Tuple, Any
@@ -17,6 +18,8 @@ logger = logging.getLogger(__name__)
 class ScientificPDFProcessor:
     """Enhanced PDF processor for scientific literature"""
     
+    READ_CHUNK_SIZE = 1024 * 1024
+    
     def __init__(self):
         self.section_patterns = {
             'title': r'^(.{1,200}?)(?:\n|$)',
@@ -35,6 +38,8 @@ class ScientificPDFProcessor:
         self.citation_pattern = r'\[(\d+(?:[-,]\d+)*)\]|\(([^)]+\d{4}[^)]*)\)'
         self.author_pattern = r'([A-Z][a-z]+(?:\s+[A-Z]\.)*(?:\s+[A-Z][a-z]+)*)'
         self.journal_pattern = r'(?:published\s+in|journal\s*:?\s*|in\s+)([A-Z][^.]+?)(?:\s*,|\s*\d{4}|\s*vol)'
+        self.figure_ref_pattern = re.compile(r'(?:Figure|Fig\.?)\s*(\d+)', re.IGNORECASE)
+        self.table_caption_pattern = re.compile(r'\bTable\s+\d+', re.IGNORECASE)
         
     def extract_comprehensive_content(self, pdf_path: str) -> Dict[str, Any]:
         """Extract comprehensive structured content from scientific PDF"""
@@ -43,43 +48,31 @@ class ScientificPDFProcessor:
             if not pdf_path.exists():
                 raise FileNotFoundError(f"PDF file not found: {pdf_path}")
             
-            # Generate unique document ID
-            doc_id = self._generate_document_id(pdf_path)
-            
-            # Extract content using both PyMuPDF and pdfplumber
-            pymupdf_content = self._extract_with_pymupdf(pdf_path)
-            pdfplumber_content = self._extract_with_pdfplumber(pdf_path)
-            
-            # Combine and enhance extracted content
-            combined_content = self._combine_extraction_results(
-                pymupdf_content, 
-                pdfplumber_content
-            )
+            # Open the document once: hash, text, layout, tables and figures
+            extraction = self._extract_single_pass(pdf_path)
+            doc_id = extraction['document_id']
+            full_text = extraction['full_text']
             
             # Extract structured sections
-            sections = self._identify_sections(combined_content['full_text'])
+            sections = self._identify_sections(full_text)
             
             # Extract scientific metadata
-            metadata = self._extract_scientific_metadata(
-                combined_content['full_text'], 
-                sections
-            )
+            metadata = self._extract_scientific_metadata(full_text, sections)
             
             # Extract citations and references
-            citations = self._extract_citations(combined_content['full_text'])
+            citations = self._extract_citations(full_text)
             references = self._extract_references(sections.get('references', ''))
             
-            # Extract figures and tables
-            figures_tables = self._extract_figures_tables(pdf_path)
+            figures_tables = extraction['figures_tables']
             
             # Calculate document statistics
-            stats = self._calculate_document_stats(combined_content['full_text'])
+            stats = self._calculate_document_stats(full_text)
             
             return {
                 'document_id': doc_id,
                 'file_path': str(pdf_path),
                 'metadata': metadata,
-                'full_text': combined_content['full_text'],
+                'full_text': full_text,
                 'sections': sections,
                 'citations': citations,
                 'references': references,
@@ -93,110 +86,148 @@ class ScientificPDFProcessor:
             logger.error(f"Error processing PDF {pdf_path}: {e}")
             raise
     
-    def _generate_document_id(self, pdf_path: Path) -> str:
-        """Generate unique document ID based on file content"""
+    def _read_with_hash(self, pdf_path: Path) -> Tuple[bytes, str]:
+        """Read the file once, hashing it incrementally while reading"""
+        hasher = hashlib.md5()
+        buffer = bytearray()
         with open(pdf_path, 'rb') as f:
-            file_hash = hashlib.md5(f.read()).hexdigest()
-        return f"doc_{file_hash[:16]}"
+            for chunk in iter(lambda: f.read(self.READ_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+                buffer.extend(chunk)
+        return bytes(buffer), hasher.hexdigest()
     
-    def _extract_with_pymupdf(self, pdf_path: Path) -> Dict[str, Any]:
-        """Extract content using PyMuPDF (better for text extraction)"""
+    def _extract_single_pass(self, pdf_path: Path) -> Dict[str, Any]:
+        """Extract text, layout, tables and figure regions in one pass.
+        
+        PyMuPDF handles every page. pdfplumber is opened lazily, from the same
+        in-memory bytes, only for pages where PyMuPDF's table detection looks
+        unreliable.
+        """
+        data, file_hash = self._read_with_hash(pdf_path)
         content = {
+            'document_id': f"doc_{file_hash[:16]}",
             'full_text': '',
             'pages': [],
             'metadata': {},
-            'toc': []
+            'toc': [],
+            'figures_tables': {'figures': [], 'tables': [], 'figure_regions': []}
         }
+        page_texts = []
+        plumber = None
+        
+        try:
+            doc = fitz.open(stream=data, filetype='pdf')
+        except Exception as e:
+            logger.error(f"PyMuPDF could not open {pdf_path}: {e}")
+            return content
         
         try:
-            doc = fitz.open(pdf_path)
-            
-            # Extract metadata
             content['metadata'] = doc.metadata or {}
-            
-            # Extract table of contents
             content['toc'] = doc.get_toc()
             
-            # Extract text from each page
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_text = page.get_text()
+            for page_index, page in enumerate(doc):
+                page_number = page_index + 1
+                blocks = page.get_text('blocks')
+                page_text = ''.join(block[4] for block in blocks if block[6] == 0)
+                
+                tables, confident = self._find_tables_pymupdf(page, page_text)
+                if not confident:
+                    if plumber is None:
+                        plumber = self._open_pdfplumber(data)
+                    if plumber is not None:
+                        plumber_text, plumber_tables = self._extract_page_pdfplumber(plumber, page_index)
+                        tables = plumber_tables
+                        # Keep the longer text (usually more complete)
+                        if len(plumber_text) > len(page_text):
+                            page_text = plumber_text
+                
+                self._collect_figures_tables(
+                    content['figures_tables'], page_number, page_text, tables, blocks
+                )
                 content['pages'].append({
-                    'page_number': page_num + 1,
-                    'text': page_text,
-                    'word_count': len(page_text.split())
+                    'page_number': page_number,
+                    'word_count': len(page_text.split()),
+                    'block_count': len(blocks),
+                    'table_count': len(tables),
+                    'pdfplumber_fallback': not confident
                 })
-                content['full_text'] += page_text + '\n'
-            
-            doc.close()
-            
+                page_texts.append(page_text)
+        
         except Exception as e:
-            logger.error(f"PyMuPDF extraction failed: {e}")
-            
+            logger.error(f"PDF extraction failed for {pdf_path}: {e}")
+        
+        finally:
+            doc.close()
+            if plumber is not None:
+                plumber.close()
+        
+        content['full_text'] = ''.join(f"{text}\n" for text in page_texts)
         return content
     
-    def _extract_with_pdfplumber(self, pdf_path: Path) -> Dict[str, Any]:
-        """Extract content using pdfplumber (better for tables and layout)"""
-        content = {
-            'full_text': '',
-            'pages': [],
-            'tables': [],
-            'metadata': {}
-        }
+    def _find_tables_pymupdf(self, page, page_text: str) -> Tuple[List[List], bool]:
+        """Detect tables with PyMuPDF and report whether the result is trustworthy"""
+        try:
+            tables = [table.extract() for table in page.find_tables().tables]
+        except Exception:
+            # Older PyMuPDF without find_tables, or detection failed
+            return [], False
+        
+        tables = [table for table in tables if table]
+        if any(len(table) < 2 or len(table[0]) < 2 for table in tables):
+            return tables, False
+        
+        # The text refers to a table on this page but none was detected
+        if not tables and self.table_caption_pattern.search(page_text):
+            return tables, False
         
+        return tables, True
+    
+    def _open_pdfplumber(self, data: bytes):
+        """Open pdfplumber on the already loaded PDF bytes"""
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                # Extract metadata
-                content['metadata'] = pdf.metadata or {}
-                
-                # Extract content from each page
-                for page_num, page in enumerate(pdf.pages):
-                    page_text = page.extract_text() or ''
-                    
-                    # Extract tables from this page
-                    tables = page.extract_tables()
-                    page_tables = []
-                    for table in tables:
-                        if table:  # Skip empty tables
-                            page_tables.append({
-                                'page': page_num + 1,
-                                'data': table,
-                                'rows': len(table),
-                                'cols': len(table[0]) if table else 0
-                            })
-                    
-                    content['pages'].append({
-                        'page_number': page_num + 1,
-                        'text': page_text,
-                        'tables': page_tables,
-                        'word_count': len(page_text.split())
-                    })
-                    
-                    content['full_text'] += page_text + '\n'
-                    content['tables'].extend(page_tables)
-                    
+            return pdfplumber.open(io.BytesIO(data))
         except Exception as e:
-            logger.error(f"pdfplumber extraction failed: {e}")
-            
-        return content
+            logger.error(f"pdfplumber fallback unavailable: {e}")
+            return None
     
-    def _combine_extraction_results(self, pymupdf_content: Dict, pdfplumber_content: Dict) -> Dict:
-        """Combine results from both extraction methods"""
-        # Use the longer text extraction (usually more complete)
-        if len(pymupdf_content['full_text']) > len(pdfplumber_content['full_text']):
-            full_text = pymupdf_content['full_text']
-        else:
-            full_text = pdfplumber_content['full_text']
+    def _extract_page_pdfplumber(self, pdf, page_index: int) -> Tuple[str, List[List]]:
+        """Extract text and tables of a single page with pdfplumber"""
+        try:
+            page = pdf.pages[page_index]
+            tables = [table for table in page.extract_tables() if table]
+            return page.extract_text() or '', tables
+        except Exception as e:
+            logger.error(f"pdfplumber extraction failed on page {page_index + 1}: {e}")
+            return '', []
+    
+    def _collect_figures_tables(self, figures_tables: Dict[str, List], page_number: int,
+                                page_text: str, tables: List[List], blocks: List[tuple]):
+        """Record tables, figure references and image regions of a page"""
+        for i, table in enumerate(tables):
+            if len(table) > 1:  # Skip single-row tables
+                figures_tables['tables'].append({
+                    'page': page_number,
+                    'table_id': f"table_{page_number}_{i + 1}",
+                    'rows': len(table),
+                    'columns': len(table[0]) if table else 0,
+                    'data_preview': table[:3] if len(table) > 3 else table  # First 3 rows
+                })
         
-        # Combine metadata
-        metadata = {**pymupdf_content.get('metadata', {}), **pdfplumber_content.get('metadata', {})}
+        # Look for figure references in text
+        for fig_num in self.figure_ref_pattern.findall(page_text):
+            figures_tables['figures'].append({
+                'page': page_number,
+                'figure_id': f"figure_{fig_num}",
+                'reference': f"Figure {fig_num}"
+            })
         
-        return {
-            'full_text': full_text,
-            'metadata': metadata,
-            'tables': pdfplumber_content.get('tables', []),
-            'toc': pymupdf_content.get('toc', [])
-        }
+        # Image blocks give the figure regions on the page
+        for block in blocks:
+            if block[6] == 1:
+                figures_tables['figure_regions'].append({
+                    'page': page_number,
+                    'bbox': [round(coord, 2) for coord in block[:4]]
+                })
     
     def _identify_sections(self, text: str) -> Dict[str, str]:
         """Identify and extract scientific paper sections"""
@@ -331,43 +362,6 @@ class ScientificPDFProcessor:
         
         return references
     
-    def _extract_figures_tables(self, pdf_path: Path) -> Dict[str, List]:
-        """Extract information about figures and tables"""
-        figures_tables = {
-            'figures': [],
-            'tables': []
-        }
-        
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    # Extract tables
-                    tables = page.extract_tables()
-                    for i, table in enumerate(tables):
-                        if table and len(table) > 1:  # Skip empty or single-row tables
-                            figures_tables['tables'].append({
-                                'page': page_num + 1,
-                                'table_id': f"table_{page_num + 1}_{i + 1}",
-                                'rows': len(table),
-                                'columns': len(table[0]) if table else 0,
-                                'data_preview': table[:3] if len(table) > 3 else table  # First 3 rows
-                            })
-                    
-                    # Look for figure references in text
-                    page_text = page.extract_text() or ''
-                    figure_refs = re.findall(r'(?:Figure|Fig\.?)\s*(\d+)', page_text, re.IGNORECASE)
-                    for fig_num in figure_refs:
-                        figures_tables['figures'].append({
-                            'page': page_num + 1,
-                            'figure_id': f"figure_{fig_num}",
-                            'reference': f"Figure {fig_num}"
-                        })
-        
-        except Exception as e:
-            logger.error(f"Error extracting figures/tables: {e}")
-        
-        return figures_tables
-    
     def _calculate_document_stats(self, text: str) -> Dict[str, Any]:
         """Calculate document statistics"""
         words = text.split()
@@ -6,12 +6,13 @@ from chromadb.config import Settings
 import numpy as np
 import logging
 from typing import List, Dict, Any, Optional
-import requests
 import json
 import asyncio
 
 from core.config import settings
 from core.database import get_db, DocumentChunk, DocumentChunkEnhanced
+from services.embedding_client import get_embedding_client
+from services.embedding_store import get_embedding_store
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,14 @@ class VectorStoreService:
         self.collection = None
         self.ollama_url = settings.OLLAMA_URL
         self.embedding_model = settings.EMBEDDING_MODEL
+        self.embedding_client = get_embedding_client(
+            self.ollama_url,
+            self.embedding_model,
+            max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+            max_pending=settings.EMBEDDING_MAX_PENDING
+        )
+        self.embedding_store = get_embedding_store()
     
     async def initialize(self):
         """Initialize ChromaDB client and collection"""
@@ -44,27 +53,28 @@ class VectorStoreService:
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding using Ollama"""
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/embeddings",
-                json={
-                    "model": self.embedding_model,
-                    "prompt": text
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return response.json()["embedding"]
-            else:
-                logger.error(f"Embedding generation failed: {response.status_code}")
-                # Fallback to random embedding for development
-                return np.random.rand(384).tolist()
-                
+            cached = self.embedding_store.get(self.embedding_model, text)
+            if cached is not None:
+                return cached
+            embedding = await self.embedding_client.embed(text)
+            self.embedding_store.put(self.embedding_model, text, embedding)
+            return embedding
         except Exception as e:
             logger.error(f"Embedding generation error: {str(e)}")
             # Fallback to random embedding for development
             return np.random.rand(384).tolist()
     
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts in batched requests"""
+        try:
+            return await self.embedding_store.get_or_compute(
+                self.embedding_model, texts, self.embedding_client.embed_many
+            )
+        except Exception as e:
+            logger.error(f"Batch embedding generation error: {str(e)}")
+            # Fallback to random embeddings for development
+            return [np.random.rand(384).tolist() for _ in texts]
+    
     async def add_document(self, document_data: Dict[str, Any]):
         """Add document chunks to vector store with hierarchical support"""
         try:
@@ -101,16 +111,14 @@ class VectorStoreService:
     async def _add_legacy_chunks(self, document_data: Dict[str, Any], chunks: List[DocumentChunk]):
         """Add legacy chunks to vector store"""
         ids = []
-        embeddings = []
         documents = []
         metadatas = []
         
+        # Generate all embeddings in a few batched round trips
+        embeddings = await self.generate_embeddings([chunk.content for chunk in chunks])
+        
         for chunk in chunks:
-            # Generate embedding
-            embedding = await self.generate_embedding(chunk.content)
-            
             ids.append(f"{document_data['id']}_{chunk.chunk_index}")
-            embeddings.append(embedding)
             documents.append(chunk.content)
             metadatas.append({
                 "document_id": document_data["id"],
@@ -134,19 +142,17 @@ class VectorStoreService:
     async def _add_hierarchical_chunks(self, document_data: Dict[str, Any], chunks: List[DocumentChunkEnhanced]):
         """Add hierarchical chunks to vector store"""
         ids = []
-        embeddings = []
         documents = []
         metadatas = []
         
+        # Generate all embeddings in a few batched round trips
+        embeddings = await self.generate_embeddings([chunk.content for chunk in chunks])
+        
         for chunk in chunks:
-            # Generate embedding
-            embedding = await self.generate_embedding(chunk.content)
-            
             # Create unique ID that includes level information
             chunk_id = f"{document_data['id']}_L{chunk.chunk_level}_{chunk.chunk_index}"
             
             ids.append(chunk_id)
-            embeddings.append(embedding)
             documents.append(chunk.content)
             
             # Enhanced metadata for hierarchical chunks
@@ -475,7 +481,9 @@ class VectorStoreService:
                 "legacy_chunks": legacy_count,
                 "level_distribution": level_distribution,
                 "collection_name": self.collection.name,
-                "embedding_model": self.embedding_model
+                "embedding_model": self.embedding_model,
+                "embedding_client": self.embedding_client.get_stats(),
+                "embedding_store": self.embedding_store.get_stats()
             }
             
         except Exception as e:
@@ -3,14 +3,17 @@ Vector Store Service for AI Scholar Scientific RAG
 Handles document embeddings and semantic search using ChromaDB
 """
 
+import asyncio
 import chromadb
 from sentence_transformers import SentenceTransformer
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import uuid
 import numpy as np
 
+from services.embedding_store import get_embedding_store
+
 logger = logging.getLogger(__name__)
 
 class VectorStoreService:
@@ -22,6 +25,7 @@ class VectorStoreService:
         self.client = None
         self.collection = None
         self.embedding_model = None
+        self.embedding_store = get_embedding_store()
         self.collection_name = "scientific_papers"
         
         # Embedding model configuration
@@ -64,6 +68,95 @@ class VectorStoreService:
             logger.error(f"Failed to initialize vector store: {e}")
             raise
     
+    async def _encode(self, texts: List[str], show_progress_bar: bool = False) -> List[List[float]]:
+        """Encode texts, reusing embeddings already in the shared store"""
+        
+        async def encode_missing(missing: List[str]) -> List[List[float]]:
+            embeddings = await asyncio.to_thread(
+                self.embedding_model.encode,
+                missing,
+                convert_to_tensor=False,
+                show_progress_bar=show_progress_bar
+            )
+            return embeddings.tolist()
+        
+        return await self.embedding_store.get_or_compute(
+            self.embedding_model_name, texts, encode_missing
+        )
+    
+    def prepare_document_chunks(
+        self,
+        document_id: str,
+        chunks: List[Dict[str, Any]]
+    ) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """Build the texts, metadatas and ids ChromaDB needs for a document"""
+        texts = []
+        metadatas = []
+        ids = []
+        
+        for i, chunk in enumerate(chunks):
+            chunk_id = f"{document_id}_chunk_{i}"
+            chunk_text = chunk.get('text', '')
+            
+            if not chunk_text.strip():
+                continue  # Skip empty chunks
+            
+            texts.append(chunk_text)
+            ids.append(chunk_id)
+            
+            # Prepare metadata
+            metadata = {
+                'document_id': document_id,
+                'chunk_index': i,
+                'section': chunk.get('section', 'unknown'),
+                'chunk_type': chunk.get('chunk_type', 'standard'),
+                'word_count': len(chunk_text.split()),
+                'character_count': len(chunk_text),
+                'created_at': datetime.now().isoformat()
+            }
+            
+            # Add document metadata if available
+            doc_metadata = chunk.get('document_metadata', {})
+            if doc_metadata:
+                metadata.update({
+                    'title': doc_metadata.get('title', ''),
+                    'authors': str(doc_metadata.get('authors', [])),
+                    'journal': doc_metadata.get('journal', ''),
+                    'publication_year': str(doc_metadata.get('publication_year', '')),
+                    'doi': str(doc_metadata.get('doi', '')),
+                    'keywords': str(doc_metadata.get('keywords', []))
+                })
+            
+            metadatas.append(metadata)
+        
+        return texts, metadatas, ids
+    
+    async def encode_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with the collection's embedding model"""
+        if not self.embedding_model:
+            raise RuntimeError("Vector store not initialized")
+        return await self._encode(texts)
+    
+    async def add_embedded_chunks(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str],
+        embeddings: List[List[float]]
+    ) -> None:
+        """Write already embedded chunks, possibly from several documents, in one call"""
+        if not self.collection:
+            raise RuntimeError("Vector store not initialized")
+        
+        # The ChromaDB client is synchronous, keep it off the event loop
+        await asyncio.to_thread(
+            self.collection.add,
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=metadatas,
+            ids=ids
+        )
+    
     async def add_document_chunks(
         self, 
         document_id: str, 
@@ -76,44 +169,7 @@ class VectorStoreService:
         
         try:
             # Prepare data for ChromaDB
-            texts = []
-            metadatas = []
-            ids = []
-            
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{document_id}_chunk_{i}"
-                chunk_text = chunk.get('text', '')
-                
-                if not chunk_text.strip():
-                    continue  # Skip empty chunks
-                
-                texts.append(chunk_text)
-                ids.append(chunk_id)
-                
-                # Prepare metadata
-                metadata = {
-                    'document_id': document_id,
-                    'chunk_index': i,
-                    'section': chunk.get('section', 'unknown'),
-                    'chunk_type': chunk.get('chunk_type', 'standard'),
-                    'word_count': len(chunk_text.split()),
-                    'character_count': len(chunk_text),
-                    'created_at': datetime.now().isoformat()
-                }
-                
-                # Add document metadata if available
-                doc_metadata = chunk.get('document_metadata', {})
-                if doc_metadata:
-                    metadata.update({
-                        'title': doc_metadata.get('title', ''),
-                        'authors': str(doc_metadata.get('authors', [])),
-                        'journal': doc_metadata.get('journal', ''),
-                        'publication_year': str(doc_metadata.get('publication_year', '')),
-                        'doi': str(doc_metadata.get('doi', '')),
-                        'keywords': str(doc_metadata.get('keywords', []))
-                    })
-                
-                metadatas.append(metadata)
+            texts, metadatas, ids = self.prepare_document_chunks(document_id, chunks)
             
             if not texts:
                 logger.warning(f"No valid chunks found for document {document_id}")
@@ -121,19 +177,10 @@ class VectorStoreService:
             
             # Generate embeddings
             logger.info(f"Generating embeddings for {len(texts)} chunks")
-            embeddings = self.embedding_model.encode(
-                texts, 
-                convert_to_tensor=False,
-                show_progress_bar=True
-            ).tolist()
+            embeddings = await self._encode(texts, show_progress_bar=True)
             
             # Add to ChromaDB
-            self.collection.add(
-                embeddings=embeddings,
-                documents=texts,
-                metadatas=metadatas,
-                ids=ids
-            )
+            await self.add_embedded_chunks(texts, metadatas, ids, embeddings)
             
             logger.info(f"Added {len(texts)} chunks for document {document_id}")
             
@@ -162,7 +209,7 @@ class VectorStoreService:
         
         try:
             # Generate query embedding
-            query_embedding = self.embedding_model.encode([query]).tolist()
+            query_embedding = await self._encode([query])
             
             # Prepare query parameters
             query_params = {
@@ -180,8 +227,8 @@ class VectorStoreService:
                 if where_clause:
                     query_params['where'] = where_clause
             
-            # Perform search
-            results = self.collection.query(**query_params)
+            # Perform search off the event loop so concurrent searches overlap
+            results = await asyncio.to_thread(self.collection.query, **query_params)
             
             # Format results
             formatted_results = self._format_search_results(results)
@@ -534,7 +581,7 @@ class VectorStoreService:
         
         try:
             # Generate embedding for the query
-            query_embedding = self.embedding_model.encode([query]).tolist()[0]
+            query_embedding = (await self._encode([query]))[0]
             
             # Search in ChromaDB
             results = self.collection.query(
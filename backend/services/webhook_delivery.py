@@ -0,0 +1,153 @@
+"""
+Pooled HTTP delivery and endpoint caching for webhooks
+All deliveries share one aiohttp session, so connections to a destination are
+kept alive and reused instead of being opened (and TLS-negotiated) per request.
+Concurrency is limited per destination host, so one slow receiver cannot take
+every connection, and endpoint configurations are cached in memory with
+explicit invalidation instead of being re-read from Redis for every delivery.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryPool:
+    """
+    A shared keep-alive HTTP session for webhook deliveries.
+
+    At most ``per_host_limit`` requests run against one host at a time.
+    Waiting for a host slot happens before the request starts, so ``timeout``
+    only covers the request itself.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 500,
+        per_host_limit: int = 20,
+        timeout: float = 30,
+        keepalive_timeout: float = 60
+    ):
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.per_host_limit,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return slot
+
+    async def post(self, url: str, data: str, headers: Dict[str, str]) -> Tuple[int, str]:
+        """POST a payload and return the response status and body"""
+        async with self._host_slot(url):
+            async with self._get_session().post(url, data=data, headers=headers) as response:
+                return response.status, await response.text()
+
+    async def close(self):
+        """Close the shared session and its connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class EndpointCache:
+    """
+    Parsed webhook endpoints by id, loaded through ``loader`` and kept for
+    ``ttl`` seconds or until invalidated.
+
+    Concurrent misses for the same endpoint share a single load, so a burst of
+    deliveries to one endpoint reads it from Redis once. Missing endpoints are
+    cached as None.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[Optional[Any]]],
+        ttl: float = 30,
+        max_entries: int = 10000
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._entries: Dict[str, Tuple[float, Optional[Any]]] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    async def get(self, endpoint_id: str) -> Optional[Any]:
+        """Get an endpoint, loading it if it is not cached"""
+        entry = self._entries.get(endpoint_id)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        loading = self._loading.get(endpoint_id)
+        if loading is not None:
+            return await asyncio.shield(loading)
+
+        loading = self._loading[endpoint_id] = asyncio.get_running_loop().create_future()
+        try:
+            endpoint = await self.loader(endpoint_id)
+        except Exception as e:
+            loading.set_exception(e)
+            # Retrieve the exception so an unawaited future does not log it
+            loading.exception()
+            raise
+        else:
+            # Skip caching if the endpoint was invalidated while it loaded
+            if self._loading.get(endpoint_id) is loading:
+                self._store(endpoint_id, endpoint)
+            loading.set_result(endpoint)
+            return endpoint
+        finally:
+            if self._loading.get(endpoint_id) is loading:
+                del self._loading[endpoint_id]
+
+    async def get_many(self, endpoint_ids: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """Get several endpoints, loading the uncached ones concurrently"""
+        endpoint_ids = list(dict.fromkeys(endpoint_ids))
+        endpoints = await asyncio.gather(*(self.get(endpoint_id) for endpoint_id in endpoint_ids))
+        return dict(zip(endpoint_ids, endpoints))
+
+    def _store(self, endpoint_id: str, endpoint: Optional[Any]):
+        if len(self._entries) >= self.max_entries and endpoint_id not in self._entries:
+            now = time.monotonic()
+            self._entries = {
+                key: entry for key, entry in self._entries.items() if entry[0] > now
+            }
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[endpoint_id] = (time.monotonic() + self.ttl, endpoint)
+
+    def invalidate(self, endpoint_id: str):
+        """Forget an endpoint so the next lookup reloads it"""
+        self._entries.pop(endpoint_id, None)
+        self._loading.pop(endpoint_id, None)
+
+    def clear(self):
+        """Forget all endpoints"""
+        self._entries.clear()
+        self._loading.clear()
@@ -7,15 +7,17 @@ import hashlib
 import hmac
 import json
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union, Callable
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 import aiohttp
 # from sqlalchemy import select, update, delete
 # from sqlalchemy.ext.asyncio import AsyncSession  # Not needed for Redis-based implementation
 
 # from core.database import get_async_session  # Not needed for Redis-based implementation
 from core.redis_client import redis_client
+from services.webhook_delivery import DeliveryPool, EndpointCache
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +67,8 @@ class WebhookService:
         self.max_retry_attempts = 5
         self.retry_delays = [60, 300, 900, 3600, 7200]  # seconds
         self.timeout = 30  # seconds
+        self.retry_schedule_key = f"{self.delivery_prefix}retry_schedule"
+        self.retry_poll_interval = 1  # seconds
         
         # Event handlers registry
         self.event_handlers: Dict[str, List[Callable]] = {}
@@ -72,6 +76,7 @@ class WebhookService:
         # Event-driven architecture components
         self.event_bus_channel = "webhook_events"
         self.system_events_channel = "system_events"
+        self.endpoint_changes_channel = "webhook_endpoint_changes"
         self.delivery_optimization_enabled = True
         
         # Enhanced event-driven features
@@ -80,11 +85,20 @@ class WebhookService:
         self.mobile_sync_channel = "mobile_sync_events"
         
         # Delivery optimization settings
-        self.batch_size = 10
-        self.batch_timeout = 5  # seconds
+        self.batch_size = 100
+        self.max_concurrent_deliveries = 500
+        self.last_triggered_interval = 60  # seconds between last_triggered writes
+        self.last_triggered_writes: Dict[str, float] = {}
         self.circuit_breaker_threshold = 5
         self.circuit_breaker_timeout = 300  # 5 minutes
         
+        # Shared delivery session and cached endpoint configurations
+        self.delivery_pool = DeliveryPool(
+            max_connections=self.max_concurrent_deliveries,
+            timeout=self.timeout
+        )
+        self.endpoint_cache = EndpointCache(self._load_endpoint, ttl=30)
+        
     async def health_check(self) -> Dict[str, Any]:
         """Health check for webhook service"""
         try:
@@ -107,6 +121,7 @@ class WebhookService:
             
             # Count pending deliveries
             pending_deliveries = await redis_client.llen(f"{self.delivery_prefix}queue")
+            scheduled_retries = await redis_client.zcard(self.retry_schedule_key)
             
             return {
                 "status": "healthy",
@@ -114,6 +129,7 @@ class WebhookService:
                 "total_webhooks": len(webhook_keys),
                 "active_webhooks": active_webhooks,
                 "pending_deliveries": pending_deliveries,
+                "scheduled_retries": scheduled_retries,
                 "registered_events": list(self.event_handlers.keys())
             }
         except Exception as e:
@@ -122,6 +138,80 @@ class WebhookService:
                 "error": str(e)
             }
 
+    @staticmethod
+    def _parse_endpoint(webhook_data: Union[str, Dict[str, Any]]) -> WebhookEndpoint:
+        """Build a webhook endpoint from its stored JSON"""
+        if isinstance(webhook_data, str):
+            webhook_dict = json.loads(webhook_data)
+        else:
+            webhook_dict = dict(webhook_data)
+        
+        # Convert datetime strings back to datetime objects
+        if 'created_at' in webhook_dict and isinstance(webhook_dict['created_at'], str):
+            webhook_dict['created_at'] = datetime.fromisoformat(webhook_dict['created_at'])
+        if 'last_triggered' in webhook_dict and webhook_dict['last_triggered'] and isinstance(webhook_dict['last_triggered'], str):
+            webhook_dict['last_triggered'] = datetime.fromisoformat(webhook_dict['last_triggered'])
+        
+        return WebhookEndpoint(**webhook_dict)
+
+    def _state_key(self, webhook_id: str) -> str:
+        """Hash holding an endpoint's failure count and last trigger time"""
+        return f"{self.redis_prefix}state:{webhook_id}"
+
+    async def _delivery_state(self, webhook_id: str) -> Dict[str, Any]:
+        """
+        Read the delivery bookkeeping of an endpoint. Deliveries update it
+        with atomic hash writes, so it is kept apart from the endpoint JSON.
+        """
+        state = await redis_client.hgetall(self._state_key(webhook_id))
+        return {
+            "failure_count": int(state.get("failure_count", 0)),
+            "last_triggered": state.get("last_triggered")
+        }
+
+    async def _read_endpoint(self, webhook_data: Union[str, Dict[str, Any]]) -> WebhookEndpoint:
+        """Build a webhook endpoint from its stored JSON and delivery state"""
+        if isinstance(webhook_data, str):
+            webhook_dict = json.loads(webhook_data)
+        else:
+            webhook_dict = dict(webhook_data)
+        webhook_dict.update(await self._delivery_state(webhook_dict["id"]))
+        return self._parse_endpoint(webhook_dict)
+
+    async def _load_endpoint(self, webhook_id: str) -> Optional[WebhookEndpoint]:
+        """Read a webhook endpoint from Redis"""
+        webhook_data = await redis_client.get(f"{self.redis_prefix}endpoints:{webhook_id}")
+        if not webhook_data:
+            return None
+        return await self._read_endpoint(webhook_data)
+
+    async def _save_endpoint(self, webhook: WebhookEndpoint):
+        """
+        Store a webhook endpoint's configuration and invalidate cached copies
+        in every worker. The failure count and last trigger time live in the
+        endpoint's delivery state and are not written here.
+        """
+        webhook_dict = asdict(webhook)
+        del webhook_dict["failure_count"], webhook_dict["last_triggered"]
+        await redis_client.set(
+            f"{self.redis_prefix}endpoints:{webhook.id}",
+            json.dumps(webhook_dict, default=str)
+        )
+        await self._endpoint_changed(webhook.id)
+
+    async def _reset_failures(self, webhook_id: str):
+        """Clear the failure count of an endpoint"""
+        await redis_client.hset(self._state_key(webhook_id), {"failure_count": 0})
+
+    async def _endpoint_changed(self, webhook_id: str):
+        """Invalidate a cached endpoint here and in other workers"""
+        self.endpoint_cache.invalidate(webhook_id)
+        await redis_client.publish(self.endpoint_changes_channel, webhook_id)
+
+    async def close(self):
+        """Close the shared delivery session"""
+        await self.delivery_pool.close()
+
     async def register_webhook(
         self,
         user_id: str,
@@ -148,10 +238,7 @@ class WebhookService:
             )
             
             # Store webhook
-            await redis_client.set(
-                f"{self.redis_prefix}endpoints:{webhook_id}",
-                json.dumps(asdict(webhook), default=str)
-            )
+            await self._save_endpoint(webhook)
             
             # Add to user's webhook list
             await redis_client.sadd(f"{self.redis_prefix}user:{user_id}", webhook_id)
@@ -191,6 +278,8 @@ class WebhookService:
             
             # Delete webhook
             await redis_client.delete(f"{self.redis_prefix}endpoints:{webhook_id}")
+            await redis_client.delete(self._state_key(webhook_id))
+            await self._endpoint_changed(webhook_id)
             
             logger.info(f"Unregistered webhook {webhook_id}")
             return True
@@ -231,9 +320,17 @@ class WebhookService:
             # Find webhooks subscribed to this event
             webhook_ids = await redis_client.smembers(f"{self.redis_prefix}events:{event_type}")
             
-            # Create deliveries for each webhook
-            for webhook_id in webhook_ids:
-                await self._create_delivery(webhook_id, event)
+            # Create deliveries for each webhook and queue them together
+            webhooks = await self.endpoint_cache.get_many(webhook_ids)
+            deliveries = []
+            for webhook in webhooks.values():
+                if webhook is not None:
+                    delivery = await self._create_delivery(webhook, event)
+                    if delivery:
+                        deliveries.append(delivery)
+            
+            if deliveries:
+                await redis_client.lpush(f"{self.delivery_prefix}queue", *deliveries)
             
             # Call registered event handlers
             if event_type in self.event_handlers:
@@ -243,7 +340,7 @@ class WebhookService:
                     except Exception as handler_error:
                         logger.error(f"Event handler failed: {handler_error}")
             
-            logger.info(f"Emitted event {event_id} to {len(webhook_ids)} webhooks")
+            logger.info(f"Emitted event {event_id} to {len(deliveries)} webhooks")
             return event_id
             
         except Exception as e:
@@ -252,60 +349,55 @@ class WebhookService:
 
     async def process_deliveries(self):
         """Process pending webhook deliveries"""
+        queue_key = f"{self.delivery_prefix}queue"
+        delivery_slots = asyncio.Semaphore(self.max_concurrent_deliveries)
+        running = set()
+        
         try:
             while True:
-                # Get next delivery from queue
-                delivery_data = await redis_client.brpop(f"{self.delivery_prefix}queue", timeout=1)
+                # Take a batch of queued deliveries, blocking only when the queue is empty
+                deliveries = await redis_client.rpop(queue_key, self.batch_size)
+                if not deliveries:
+                    delivery_data = await redis_client.brpop(queue_key, timeout=1)
+                    if not delivery_data:
+                        continue
+                    deliveries = [delivery_data[1]]
                 
-                if not delivery_data:
-                    continue
-                
-                delivery_dict = json.loads(delivery_data[1])
-                delivery = WebhookDelivery(**delivery_dict)
-                
-                # Process delivery
-                await self._process_delivery(delivery)
+                for delivery_data in deliveries:
+                    await delivery_slots.acquire()
+                    task = asyncio.create_task(self._run_delivery(delivery_data, delivery_slots))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
                 
         except Exception as e:
             logger.error(f"Delivery processing failed: {e}")
 
-    async def _create_delivery(self, webhook_id: str, event: WebhookEvent):
-        """Create a webhook delivery"""
+    async def _run_delivery(self, delivery_data: Union[str, Dict[str, Any]], delivery_slots: asyncio.Semaphore):
+        """Process one queued delivery and release its slot"""
+        try:
+            if isinstance(delivery_data, str):
+                delivery_data = json.loads(delivery_data)
+            await self._process_delivery(WebhookDelivery(**delivery_data))
+        except Exception as e:
+            logger.error(f"Delivery processing failed: {e}")
+        finally:
+            delivery_slots.release()
+
+    async def _create_delivery(self, webhook: WebhookEndpoint, event: WebhookEvent) -> Optional[str]:
+        """Create a serialized webhook delivery, or None if the webhook should not receive it"""
         try:
-            # Get webhook details
-            webhook_data = await redis_client.get(f"{self.redis_prefix}endpoints:{webhook_id}")
-            if not webhook_data:
-                return
-            
-            if isinstance(webhook_data, str):
-                webhook_dict = json.loads(webhook_data)
-            else:
-                webhook_dict = webhook_data
-            
-            # Convert datetime strings back to datetime objects
-            if 'created_at' in webhook_dict and isinstance(webhook_dict['created_at'], str):
-                webhook_dict['created_at'] = datetime.fromisoformat(webhook_dict['created_at'])
-            if 'last_triggered' in webhook_dict and webhook_dict['last_triggered'] and isinstance(webhook_dict['last_triggered'], str):
-                webhook_dict['last_triggered'] = datetime.fromisoformat(webhook_dict['last_triggered'])
-            
-            webhook = WebhookEndpoint(**webhook_dict)
-            
             # Check if webhook is active
             if not webhook.is_active:
-                return
+                return None
             
             # Check if webhook has exceeded failure limit
             if webhook.failure_count >= webhook.max_failures:
-                logger.warning(f"Webhook {webhook_id} disabled due to failures")
-                webhook.is_active = False
-                await redis_client.set(
-                    f"{self.redis_prefix}endpoints:{webhook_id}",
-                    json.dumps(asdict(webhook), default=str)
-                )
-                return
+                logger.warning(f"Webhook {webhook.id} disabled due to failures")
+                await self._save_endpoint(replace(webhook, is_active=False))
+                return None
             
             # Create delivery
-            delivery_id = f"delivery_{datetime.now().timestamp()}_{webhook_id}"
+            delivery_id = f"delivery_{datetime.now().timestamp()}_{webhook.id}"
             payload = {
                 "event": asdict(event),
                 "webhook": {
@@ -317,7 +409,7 @@ class WebhookService:
             
             delivery = WebhookDelivery(
                 id=delivery_id,
-                webhook_id=webhook_id,
+                webhook_id=webhook.id,
                 event_id=event.id,
                 url=webhook.url,
                 payload=payload,
@@ -325,35 +417,22 @@ class WebhookService:
                 attempts=0
             )
             
-            # Add to delivery queue
-            await redis_client.lpush(
-                f"{self.delivery_prefix}queue",
-                json.dumps(asdict(delivery), default=str)
-            )
+            return json.dumps(asdict(delivery), default=str)
             
         except Exception as e:
             logger.error(f"Delivery creation failed: {e}")
+            return None
 
     async def _process_delivery(self, delivery: WebhookDelivery):
         """Process a single webhook delivery"""
         try:
-            # Get webhook for signature
-            webhook_data = await redis_client.get(f"{self.redis_prefix}endpoints:{delivery.webhook_id}")
-            if not webhook_data:
+            # Get webhook for signature; the cached endpoint is shared by
+            # concurrent deliveries, so it is never modified here
+            webhook = await self.endpoint_cache.get(delivery.webhook_id)
+            if webhook is None:
                 logger.error(f"Webhook {delivery.webhook_id} not found")
                 return
-            
-            if isinstance(webhook_data, str):
-                webhook_dict = json.loads(webhook_data)
-            else:
-                webhook_dict = webhook_data
-            
-            # Convert datetime strings back to datetime objects
-            if 'created_at' in webhook_dict and isinstance(webhook_dict['created_at'], str):
-                webhook_dict['created_at'] = datetime.fromisoformat(webhook_dict['created_at'])
-            if 'last_triggered' in webhook_dict and webhook_dict['last_triggered'] and isinstance(webhook_dict['last_triggered'], str):
-                webhook_dict['last_triggered'] = datetime.fromisoformat(webhook_dict['last_triggered'])
-            webhook = WebhookEndpoint(**webhook_dict)
+            webhook = replace(webhook)
             
             # Prepare payload
             payload_json = json.dumps(delivery.payload, default=str)
@@ -379,46 +458,38 @@ class WebhookService:
             delivery.last_attempt = datetime.now()
             delivery.status = "delivering"
             
-            # Make HTTP request
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
-                try:
-                    async with session.post(
-                        delivery.url,
-                        data=payload_json,
-                        headers=headers
-                    ) as response:
-                        delivery.response_status = response.status
-                        delivery.response_body = await response.text()
-                        
-                        if 200 <= response.status < 300:
-                            # Success
-                            delivery.status = "delivered"
-                            webhook.last_triggered = datetime.now()
-                            webhook.failure_count = 0  # Reset failure count on success
-                            
-                            logger.info(f"Webhook delivery {delivery.id} successful")
-                            
-                        else:
-                            # HTTP error
-                            delivery.status = "failed"
-                            delivery.error_message = f"HTTP {response.status}: {delivery.response_body}"
-                            webhook.failure_count += 1
-                            
-                            logger.warning(f"Webhook delivery {delivery.id} failed: HTTP {response.status}")
-                            
-                except asyncio.TimeoutError:
-                    delivery.status = "failed"
-                    delivery.error_message = "Request timeout"
-                    webhook.failure_count += 1
+            # Make HTTP request over the shared connection pool
+            try:
+                delivery.response_status, delivery.response_body = await self.delivery_pool.post(
+                    delivery.url,
+                    payload_json,
+                    headers
+                )
+                
+                if 200 <= delivery.response_status < 300:
+                    # Success
+                    delivery.status = "delivered"
                     
-                    logger.warning(f"Webhook delivery {delivery.id} timed out")
+                    logger.info(f"Webhook delivery {delivery.id} successful")
                     
-                except Exception as request_error:
+                else:
+                    # HTTP error
                     delivery.status = "failed"
-                    delivery.error_message = str(request_error)
-                    webhook.failure_count += 1
+                    delivery.error_message = f"HTTP {delivery.response_status}: {delivery.response_body}"
+                    
+                    logger.warning(f"Webhook delivery {delivery.id} failed: HTTP {delivery.response_status}")
                     
-                    logger.error(f"Webhook delivery {delivery.id} failed: {request_error}")
+            except asyncio.TimeoutError:
+                delivery.status = "failed"
+                delivery.error_message = "Request timeout"
+                
+                logger.warning(f"Webhook delivery {delivery.id} timed out")
+                
+            except Exception as request_error:
+                delivery.status = "failed"
+                delivery.error_message = str(request_error)
+                
+                logger.error(f"Webhook delivery {delivery.id} failed: {request_error}")
             
             # Handle retry logic
             if delivery.status == "failed" and delivery.attempts < self.max_retry_attempts:
@@ -427,20 +498,28 @@ class WebhookService:
                 delivery.next_retry = datetime.now() + timedelta(seconds=retry_delay)
                 delivery.status = "retrying"
                 
-                # Add back to queue with delay
-                await asyncio.sleep(1)  # Small delay before re-queuing
-                await redis_client.lpush(
-                    f"{self.delivery_prefix}retry_queue",
-                    json.dumps(asdict(delivery), default=str)
+                # Add to the retry schedule, scored by when it is due
+                await redis_client.zadd(
+                    self.retry_schedule_key,
+                    {json.dumps(asdict(delivery), default=str): time.time() + retry_delay}
                 )
                 
                 logger.info(f"Webhook delivery {delivery.id} scheduled for retry in {retry_delay} seconds")
             
-            # Update webhook
-            await redis_client.set(
-                f"{self.redis_prefix}endpoints:{webhook.id}",
-                json.dumps(asdict(webhook), default=str)
-            )
+            # Update the endpoint's delivery state atomically: count failures,
+            # reset the count on success and record last_triggered at most
+            # once per interval
+            state_key = self._state_key(webhook.id)
+            if delivery.status == "delivered":
+                state = {"failure_count": 0}
+                now = time.monotonic()
+                last_write = self.last_triggered_writes.get(webhook.id)
+                if last_write is None or now - last_write >= self.last_triggered_interval:
+                    self.last_triggered_writes[webhook.id] = now
+                    state["last_triggered"] = datetime.now().isoformat()
+                await redis_client.hset(state_key, state)
+            else:
+                await redis_client.hincrby(state_key, "failure_count")
             
             # Store delivery record
             await redis_client.setex(
@@ -453,36 +532,43 @@ class WebhookService:
             logger.error(f"Delivery processing failed: {e}")
 
     async def process_retries(self):
-        """Process retry queue for failed deliveries"""
+        """Move deliveries whose retry is due back to the delivery queue"""
         try:
+            await self._migrate_retry_queue()
+            
             while True:
-                # Get next retry from queue
-                retry_data = await redis_client.brpop(f"{self.delivery_prefix}retry_queue", timeout=1)
-                
-                if not retry_data:
+                due = await redis_client.zpopbyscore(self.retry_schedule_key, time.time(), self.batch_size)
+                if due:
+                    await redis_client.lpush(f"{self.delivery_prefix}queue", *due)
                     continue
                 
-                delivery_dict = json.loads(retry_data[1])
-                delivery = WebhookDelivery(**delivery_dict)
-                
-                # Check if it's time to retry
-                if delivery.next_retry and datetime.now() >= delivery.next_retry:
-                    # Add back to main queue
-                    await redis_client.lpush(
-                        f"{self.delivery_prefix}queue",
-                        json.dumps(asdict(delivery), default=str)
-                    )
-                else:
-                    # Put back in retry queue
-                    await redis_client.lpush(
-                        f"{self.delivery_prefix}retry_queue",
-                        json.dumps(asdict(delivery), default=str)
-                    )
-                    await asyncio.sleep(10)  # Wait before checking again
+                # Sleep until the next retry is due, waking periodically for newly scheduled ones
+                delay = self.retry_poll_interval
+                upcoming = await redis_client.zrange(self.retry_schedule_key, 0, 0, withscores=True)
+                if upcoming:
+                    delay = min(delay, max(upcoming[0][1] - time.time(), 0))
+                await asyncio.sleep(delay)
                 
         except Exception as e:
             logger.error(f"Retry processing failed: {e}")
 
+    async def _migrate_retry_queue(self):
+        """Move deliveries left in the old retry list into the retry schedule"""
+        retry_queue_key = f"{self.delivery_prefix}retry_queue"
+        while True:
+            deliveries = await redis_client.rpop(retry_queue_key, self.batch_size)
+            if not deliveries:
+                return
+            
+            schedule = {}
+            for delivery_dict in deliveries:
+                if isinstance(delivery_dict, str):
+                    delivery_dict = json.loads(delivery_dict)
+                next_retry = delivery_dict.get("next_retry")
+                due = datetime.fromisoformat(next_retry).timestamp() if next_retry else time.time()
+                schedule[json.dumps(delivery_dict, default=str)] = due
+            await redis_client.zadd(self.retry_schedule_key, schedule)
+
     async def get_user_webhooks(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all webhooks for a user"""
         try:
@@ -497,6 +583,8 @@ class WebhookService:
                     else:
                         webhook_dict = webhook_data
                     
+                    webhook_dict.update(await self._delivery_state(webhook_id))
+                    
                     # Get delivery statistics
                     stats = await self._get_webhook_stats(webhook_id)
                     webhook_dict["stats"] = stats
@@ -598,9 +686,6 @@ class WebhookService:
             # Start event bus listener
             asyncio.create_task(self.listen_to_event_bus())
             
-            # Start batch delivery processor
-            asyncio.create_task(self.process_batch_deliveries())
-            
             # Start circuit breaker monitor
             asyncio.create_task(self.monitor_circuit_breakers())
             
@@ -613,10 +698,17 @@ class WebhookService:
         """Listen to system-wide events for webhook triggers"""
         try:
             pubsub = redis_client.pubsub()
-            await pubsub.subscribe(self.event_bus_channel, self.system_events_channel)
+            await pubsub.subscribe(
+                self.event_bus_channel,
+                self.system_events_channel,
+                self.endpoint_changes_channel
+            )
             
             async for message in pubsub.listen():
                 if message['type'] == 'message':
+                    if message['channel'] == self.endpoint_changes_channel:
+                        self.endpoint_cache.invalidate(message['data'])
+                        continue
                     try:
                         event_data = json.loads(message['data'])
                         await self._handle_system_event(event_data)
@@ -648,58 +740,6 @@ class WebhookService:
         except Exception as e:
             logger.error(f"System event handling failed: {e}")
 
-    async def process_batch_deliveries(self):
-        """Process webhook deliveries in batches for optimization"""
-        try:
-            batch = []
-            last_batch_time = datetime.now()
-            
-            while True:
-                try:
-                    # Get delivery from queue with timeout
-                    delivery_data = await redis_client.brpop(
-                        f"{self.delivery_prefix}batch_queue", 
-                        timeout=1
-                    )
-                    
-                    if delivery_data:
-                        delivery_dict = json.loads(delivery_data[1])
-                        batch.append(delivery_dict)
-                    
-                    # Process batch if it's full or timeout reached
-                    current_time = datetime.now()
-                    time_since_last_batch = (current_time - last_batch_time).total_seconds()
-                    
-                    if (len(batch) >= self.batch_size or 
-                        (batch and time_since_last_batch >= self.batch_timeout)):
-                        
-                        await self._process_delivery_batch(batch)
-                        batch = []
-                        last_batch_time = current_time
-                        
-                except Exception as e:
-                    logger.error(f"Batch delivery processing error: {e}")
-                    await asyncio.sleep(1)
-                    
-        except Exception as e:
-            logger.error(f"Batch delivery processor failed: {e}")
-
-    async def _process_delivery_batch(self, batch: List[Dict[str, Any]]):
-        """Process a batch of deliveries concurrently"""
-        try:
-            tasks = []
-            for delivery_dict in batch:
-                delivery = WebhookDelivery(**delivery_dict)
-                tasks.append(self._process_delivery(delivery))
-            
-            # Process deliveries concurrently
-            await asyncio.gather(*tasks, return_exceptions=True)
-            
-            logger.info(f"Processed batch of {len(batch)} deliveries")
-            
-        except Exception as e:
-            logger.error(f"Batch processing failed: {e}")
-
     async def monitor_circuit_breakers(self):
         """Monitor and manage circuit breakers for webhook endpoints"""
         try:
@@ -710,18 +750,7 @@ class WebhookService:
                 for key in webhook_keys:
                     webhook_data = await redis_client.get(key)
                     if webhook_data:
-                        if isinstance(webhook_data, str):
-                            webhook_dict = json.loads(webhook_data)
-                        else:
-                            webhook_dict = webhook_data
-                        
-                        # Convert datetime strings back to datetime objects
-                        if 'created_at' in webhook_dict and isinstance(webhook_dict['created_at'], str):
-                            webhook_dict['created_at'] = datetime.fromisoformat(webhook_dict['created_at'])
-                        if 'last_triggered' in webhook_dict and webhook_dict['last_triggered'] and isinstance(webhook_dict['last_triggered'], str):
-                            webhook_dict['last_triggered'] = datetime.fromisoformat(webhook_dict['last_triggered'])
-                        
-                        webhook = WebhookEndpoint(**webhook_dict)
+                        webhook = await self._read_endpoint(webhook_data)
                         
                         # Check if circuit breaker should be triggered
                         if webhook.failure_count >= self.circuit_breaker_threshold:
@@ -750,10 +779,7 @@ class WebhookService:
                 )
                 
                 # Update webhook
-                await redis_client.set(
-                    f"{self.redis_prefix}endpoints:{webhook.id}",
-                    json.dumps(asdict(webhook), default=str)
-                )
+                await self._save_endpoint(webhook)
                 
                 logger.warning(f"Circuit breaker triggered for webhook {webhook.id}")
                 
@@ -778,10 +804,8 @@ class WebhookService:
                 webhook.is_active = True
                 webhook.failure_count = 0
                 
-                await redis_client.set(
-                    f"{self.redis_prefix}endpoints:{webhook.id}",
-                    json.dumps(asdict(webhook), default=str)
-                )
+                await self._reset_failures(webhook.id)
+                await self._save_endpoint(webhook)
                 
                 logger.info(f"Circuit breaker reset for webhook {webhook.id}")
                 
@@ -6,7 +6,7 @@ import logging
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
-import requests
+import aiohttp
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 
@@ -14,6 +14,7 @@ from core.config import settings
 from core.database import get_db
 from models.zotero_models import ZoteroItem, ZoteroLibrary, ZoteroConnection
 from models.zotero_schemas import ZoteroItemResponse
+from services.llm_gateway import LLMGatewayError, LLMPriority, get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -327,25 +328,19 @@ class ZoteroAIAnalysisService:
     async def _call_llm(self, prompt: str) -> str:
         """Call the LLM with the given prompt"""
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": self.temperature,
-                        "num_predict": self.max_tokens
-                    }
+            return await get_llm_gateway().generate(
+                prompt,
+                model=self.model,
+                options={
+                    "temperature": self.temperature,
+                    "num_predict": self.max_tokens
                 },
-                timeout=60
+                priority=LLMPriority.BATCH,
+                timeout=60,
+                base_url=self.ollama_url
             )
-            response.raise_for_status()
             
-            result = response.json()
-            return result.get("response", "")
-            
-        except requests.exceptions.RequestException as e:
+        except (LLMGatewayError, aiohttp.ClientError) as e:
             logger.error(f"Error calling LLM: {e}")
             raise Exception(f"LLM service unavailable: {e}")
         except Exception as e:
@@ -0,0 +1,345 @@
+"""
+Zotero bulk item import: pipelined page fetching and set-based item writes
+"""
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from models.zotero_models import ZoteroCollection, ZoteroItem, ZoteroItemCollection, ZoteroLibrary
+from services.zotero.zotero_client import ZoteroAPIClient
+
+logger = logging.getLogger(__name__)
+
+ITEM_PAGE_SIZE = 100
+MAX_PREFETCH_PAGES = 4
+ITEM_KEYS_PER_REQUEST = 50  # Zotero accepts at most 50 keys per itemKey filter
+
+
+async def iter_item_pages(
+    api_client: ZoteroAPIClient,
+    auth_token: str,
+    library_type: str,
+    library_id: str,
+    page_size: int = ITEM_PAGE_SIZE,
+    max_prefetch: int = MAX_PREFETCH_PAGES,
+    **params: Any
+) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Yield (start, items) pages of a library in order, requesting the next
+    pages while the caller processes the current one.
+
+    The number of requests in flight follows the client's rate-limit budget,
+    so prefetching drops to one page at a time when the budget runs low or
+    the client is backing off after errors.
+    """
+    pending: Deque[Tuple[int, asyncio.Task]] = deque()
+    next_start = 0
+    exhausted = False
+
+    def request_next_page():
+        nonlocal next_start
+        task = asyncio.ensure_future(api_client.get_items(
+            auth_token,
+            library_type,
+            library_id,
+            limit=page_size,
+            start=next_start,
+            **params
+        ))
+        pending.append((next_start, task))
+        next_start += page_size
+
+    try:
+        request_next_page()
+        while pending:
+            depth = max(1, min(max_prefetch, api_client.available_request_budget()))
+            while not exhausted and len(pending) < depth:
+                request_next_page()
+
+            start, task = pending.popleft()
+            items = await task
+
+            # A short page is the last one; later requests can only be empty
+            if len(items) < page_size:
+                exhausted = True
+                while pending:
+                    pending.pop()[1].cancel()
+
+            if items:
+                yield start, items
+            if not exhausted and not pending:
+                request_next_page()
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+async def iter_items_by_key(
+    api_client: ZoteroAPIClient,
+    auth_token: str,
+    library_type: str,
+    library_id: str,
+    item_keys: List[str],
+    max_prefetch: int = MAX_PREFETCH_PAGES
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield the items for the given keys, fetched ITEM_KEYS_PER_REQUEST at a
+    time with the same budget-limited prefetching as iter_item_pages.
+    Trashed items are included so their deleted flag can be stored.
+    """
+    batches = deque(
+        item_keys[i:i + ITEM_KEYS_PER_REQUEST]
+        for i in range(0, len(item_keys), ITEM_KEYS_PER_REQUEST)
+    )
+    pending: Deque[asyncio.Task] = deque()
+
+    try:
+        while batches or pending:
+            depth = max(1, min(max_prefetch, api_client.available_request_budget()))
+            while batches and len(pending) < depth:
+                keys = batches.popleft()
+                pending.append(asyncio.ensure_future(api_client.get_items(
+                    auth_token,
+                    library_type,
+                    library_id,
+                    limit=len(keys),
+                    item_keys=keys,
+                    include_trashed=True
+                )))
+
+            items = await pending.popleft()
+            if items:
+                yield items
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+@dataclass
+class BulkWriteResult:
+    """Outcome of writing one page of items"""
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: List[Tuple[Optional[str], str]] = field(default_factory=list)  # (item key, error)
+
+    def add(self, added: int, updated: int, unchanged: int) -> None:
+        self.added += added
+        self.updated += updated
+        self.unchanged += unchanged
+
+
+class ZoteroItemBulkWriter:
+    """
+    Writes pages of Zotero API items for one library.
+
+    Each page is transformed in one pass and stored with a single
+    ``INSERT ... ON CONFLICT (library_id, zotero_item_key) DO UPDATE`` that
+    only overwrites rows with an older item version, followed by a single
+    ``INSERT ... ON CONFLICT DO NOTHING`` for the page's collection links.
+    If a page fails, its items are retried one by one so a bad item does not
+    drop the rest of the page.
+
+    Delta sync also uses it to compare stored item versions against Zotero's
+    and to apply the deletion feed, each as a single set-based statement.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        library: ZoteroLibrary,
+        transform: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ):
+        self.db = db
+        self.library_id = library.id
+        self.transform = transform
+        self.dialect = db.get_bind().dialect.name
+        self._collection_ids: Optional[Dict[str, Any]] = None
+
+    def write_page(self, items_data: List[Dict[str, Any]]) -> BulkWriteResult:
+        """Upsert a page of items and their collection links, then commit"""
+        result = BulkWriteResult()
+        rows: Dict[str, Dict[str, Any]] = {}
+        collections: Dict[str, List[str]] = {}
+
+        for item_data in items_data:
+            item_key = item_data.get("key")
+            try:
+                data = item_data["data"]
+                row = {
+                    "library_id": self.library_id,
+                    "zotero_item_key": item_key,
+                    "item_version": item_data["version"],
+                    **self.transform(data)
+                }
+            except Exception as e:
+                result.failed.append((item_key, str(e)))
+                continue
+
+            # A key may only appear once per upsert statement
+            if item_key in rows and rows[item_key]["item_version"] >= row["item_version"]:
+                result.unchanged += 1
+                continue
+            rows[item_key] = row
+            collections[item_key] = data.get("collections", [])
+
+        if not rows:
+            return result
+
+        try:
+            counts = self._write(list(rows.values()), collections)
+            self.db.commit()
+            result.add(*counts)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            if len(rows) == 1:
+                result.failed.append((next(iter(rows)), str(e)))
+                return result
+
+            logger.warning(f"Bulk write of {len(rows)} items failed, retrying individually: {e}")
+            for item_key, row in rows.items():
+                try:
+                    counts = self._write([row], collections)
+                    self.db.commit()
+                    result.add(*counts)
+                except SQLAlchemyError as item_error:
+                    self.db.rollback()
+                    result.failed.append((item_key, str(item_error)))
+
+        return result
+
+    def _insert(self, table):
+        if self.dialect == "sqlite":
+            return sqlite.insert(table)
+        return postgresql.insert(table)
+
+    def _write(
+        self,
+        rows: List[Dict[str, Any]],
+        collections: Dict[str, List[str]]
+    ) -> Tuple[int, int, int]:
+        """Upsert rows and link their collections, returning (added, updated, unchanged)"""
+        items = ZoteroItem.__table__
+        item_keys = [row["zotero_item_key"] for row in rows]
+
+        existing_keys = set(self.db.execute(
+            select(items.c.zotero_item_key).where(
+                items.c.library_id == self.library_id,
+                items.c.zotero_item_key.in_(item_keys)
+            )
+        ).scalars())
+
+        insert = self._insert(items).values(rows)
+        updated_columns = {
+            name: insert.excluded[name]
+            for name in rows[0]
+            if name not in ("library_id", "zotero_item_key")
+        }
+        updated_columns["updated_at"] = func.now()
+        upsert = insert.on_conflict_do_update(
+            index_elements=[items.c.library_id, items.c.zotero_item_key],
+            set_=updated_columns,
+            where=items.c.item_version < insert.excluded.item_version
+        ).returning(items.c.id, items.c.zotero_item_key)
+
+        written = {item_key: item_id for item_id, item_key in self.db.execute(upsert).all()}
+        self._link_collections(written, collections)
+
+        added = sum(1 for item_key in written if item_key not in existing_keys)
+        return added, len(written) - added, len(rows) - len(written)
+
+    def _link_collections(self, written: Dict[str, Any], collections: Dict[str, List[str]]) -> None:
+        """Replace the collection links of written items: one delete, one insert"""
+        if not written:
+            return
+
+        if self._collection_ids is None:
+            self._collection_ids = dict(self.db.execute(
+                select(ZoteroCollection.zotero_collection_key, ZoteroCollection.id).where(
+                    ZoteroCollection.library_id == self.library_id
+                )
+            ).all())
+
+        links = [
+            {"item_id": item_id, "collection_id": self._collection_ids[collection_key]}
+            for item_key, item_id in written.items()
+            for collection_key in dict.fromkeys(collections.get(item_key) or [])
+            if collection_key in self._collection_ids
+        ]
+
+        # Drop links to collections the items have been moved out of
+        link_table = ZoteroItemCollection.__table__
+        stale_links = delete(link_table).where(link_table.c.item_id.in_(list(written.values())))
+        if links:
+            stale_links = stale_links.where(
+                tuple_(link_table.c.item_id, link_table.c.collection_id).not_in(
+                    [(link["item_id"], link["collection_id"]) for link in links]
+                )
+            )
+        self.db.execute(stale_links)
+
+        if not links:
+            return
+
+        self.db.execute(
+            self._insert(link_table).values(links).on_conflict_do_nothing(
+                index_elements=[link_table.c.item_id, link_table.c.collection_id]
+            )
+        )
+
+    def local_versions(self, item_keys: Iterable[str]) -> Dict[str, int]:
+        """Stored item versions for the given keys, read in one query"""
+        item_keys = list(item_keys)
+        if not item_keys:
+            return {}
+
+        items = ZoteroItem.__table__
+        return dict(self.db.execute(
+            select(items.c.zotero_item_key, items.c.item_version).where(
+                items.c.library_id == self.library_id,
+                items.c.zotero_item_key.in_(item_keys)
+            )
+        ).all())
+
+    def mark_deleted(self, item_keys: List[str]) -> int:
+        """Flag items removed from Zotero as deleted, returning how many changed"""
+        if not item_keys:
+            return 0
+
+        items = ZoteroItem.__table__
+        result = self.db.execute(
+            update(items)
+            .where(
+                items.c.library_id == self.library_id,
+                items.c.zotero_item_key.in_(item_keys),
+                items.c.is_deleted.is_not(True)
+            )
+            .values(is_deleted=True, updated_at=func.now())
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def delete_collections(self, collection_keys: List[str]) -> int:
+        """Delete collections removed from Zotero with their item links"""
+        if not collection_keys:
+            return 0
+
+        collections = ZoteroCollection.__table__
+        link_table = ZoteroItemCollection.__table__
+        collection_ids = select(collections.c.id).where(
+            collections.c.library_id == self.library_id,
+            collections.c.zotero_collection_key.in_(collection_keys)
+        )
+        self.db.execute(delete(link_table).where(link_table.c.collection_id.in_(collection_ids)))
+        result = self.db.execute(delete(collections).where(collections.c.id.in_(collection_ids)))
+        self.db.commit()
+
+        self._collection_ids = None
+        return result.rowcount
@@ -5,7 +5,7 @@ import asyncio
 import aiohttp
 import logging
 import secrets
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime, timedelta
 import json
 
@@ -115,6 +115,28 @@ class ZoteroAPIClient:
         # Add current request timestamp
         self._request_timestamps.append(now)
     
+    def available_request_budget(self) -> int:
+        """
+        Number of requests that can be issued now without _check_rate_limit
+        slowing them down, used to size concurrent prefetching
+        """
+        now = datetime.now()
+        cutoff_time = now - self._rate_limit_window
+        recent_requests = sum(1 for ts in self._request_timestamps if ts > cutoff_time)
+
+        # Stay below the 70% threshold where _check_rate_limit starts delaying
+        budget = int(self._max_requests_per_window * 0.7) - recent_requests
+
+        # Respect the server-reported budget until it resets
+        if now < self._rate_limit_reset:
+            budget = min(budget, self._rate_limit_remaining)
+
+        # Back off to one request at a time while errors are being retried
+        if self._consecutive_errors > 0 or self._adaptive_delay > 0:
+            budget = min(budget, 1)
+
+        return max(0, budget)
+
     def _update_rate_limit(self, headers: Dict[str, str]):
         """Update rate limit information from response headers"""
         try:
@@ -183,8 +205,9 @@ class ZoteroAPIClient:
         auth_token: str,
         params: Optional[Dict[str, Any]] = None,
         data: Optional[Dict[str, Any]] = None,
-        headers: Optional[Dict[str, str]] = None
-    ) -> Dict[str, Any]:
+        headers: Optional[Dict[str, str]] = None,
+        return_headers: bool = False
+    ) -> Any:
         """
         Make authenticated request to Zotero API
         
@@ -195,9 +218,10 @@ class ZoteroAPIClient:
             params: Query parameters
             data: Request body data
             headers: Additional headers
+            return_headers: Also return the response headers
             
         Returns:
-            Response data as dictionary
+            Response data as dictionary, or (data, headers) if return_headers is set
             
         Raises:
             ZoteroAPIError: If request fails
@@ -252,14 +276,16 @@ class ZoteroAPIClient:
                 
                 if response.status == 200:
                     try:
-                        return json.loads(response_text) if response_text else {}
+                        result = json.loads(response_text) if response_text else {}
                     except json.JSONDecodeError as e:
                         logger.warning(f"Failed to parse JSON response: {e}")
-                        return {"raw_response": response_text}
+                        result = {"raw_response": response_text}
+                    return (result, dict(response.headers)) if return_headers else result
                 elif response.status == 204:
-                    return {}  # No content
+                    return ({}, dict(response.headers)) if return_headers else {}  # No content
                 elif response.status == 304:
-                    return {"not_modified": True}
+                    result = {"not_modified": True}
+                    return (result, dict(response.headers)) if return_headers else result
                 elif response.status == 429:
                     # Rate limit exceeded - implement exponential backoff
                     retry_after = int(response.headers.get("Retry-After", 60))
@@ -269,7 +295,9 @@ class ZoteroAPIClient:
                     await asyncio.sleep(backoff_time)
                     
                     # Retry the request once
-                    return await self._make_request(method, endpoint, auth_token, params, data, headers)
+                    return await self._make_request(
+                        method, endpoint, auth_token, params, data, headers, return_headers
+                    )
                 elif response.status == 401:
                     # Unauthorized - token may be invalid
                     raise ZoteroAPIError(
@@ -396,7 +424,9 @@ class ZoteroAPIClient:
         start: int = 0,
         item_type: Optional[str] = None,
         tag: Optional[str] = None,
-        q: Optional[str] = None
+        q: Optional[str] = None,
+        item_keys: Optional[List[str]] = None,
+        include_trashed: bool = False
     ) -> List[Dict[str, Any]]:
         """Get items from a library or collection"""
         if collection_key:
@@ -417,6 +447,10 @@ class ZoteroAPIClient:
             params["tag"] = tag
         if q:
             params["q"] = q
+        if item_keys:
+            params["itemKey"] = ",".join(item_keys)
+        if include_trashed:
+            params["includeTrashed"] = 1
         
         response = await self._make_request("GET", endpoint, auth_token, params=params)
         return response if isinstance(response, list) else []
@@ -521,6 +555,14 @@ class ZoteroAPIClient:
             raise ZoteroAPIError(f"HTTP client error during file download: {e}")
     
     # Version Information
+    @staticmethod
+    def _parse_library_version(headers: Dict[str, str], default: int = 0) -> int:
+        """Read the library version from a Last-Modified-Version header"""
+        try:
+            return int(headers.get("Last-Modified-Version", default))
+        except (TypeError, ValueError):
+            return default
+    
     async def get_library_version(
         self,
         auth_token: str,
@@ -531,19 +573,64 @@ class ZoteroAPIClient:
         endpoint = f"/{library_type}s/{library_id}/items"
         params = {"limit": 1, "format": "versions"}
         
-        response = await self._make_request("GET", endpoint, auth_token, params=params)
+        _, headers = await self._make_request(
+            "GET", endpoint, auth_token, params=params, return_headers=True
+        )
+        return self._parse_library_version(headers)
+    
+    async def get_modified_versions(
+        self,
+        auth_token: str,
+        library_type: str,
+        library_id: str,
+        object_type: str,
+        since_version: int,
+        include_trashed: bool = False
+    ) -> Tuple[Optional[Dict[str, int]], int]:
+        """
+        Get the versions of objects modified since a library version
         
-        # Extract version from Last-Modified-Version header or response
-        if isinstance(response, dict) and "version" in response:
-            return response["version"]
+        The request is conditional on If-Modified-Since-Version, so an
+        unchanged library is answered with an empty 304 response.
         
-        # Fallback: make a simple request and check headers
-        try:
-            await self._make_request("HEAD", endpoint, auth_token, params={"limit": 1})
-            # Version would be in headers, but we need to modify _make_request to return headers
-            return 0  # Fallback
-        except Exception:
-            return 0
+        Args:
+            object_type: "items", "collections" or "searches"
+            since_version: Library version of the last successful sync
+            include_trashed: Also report items moved to the trash
+            
+        Returns:
+            ({object key: version}, current library version), or
+            (None, since_version) if nothing changed
+        """
+        endpoint = f"/{library_type}s/{library_id}/{object_type}"
+        params = {"since": since_version, "format": "versions"}
+        if include_trashed:
+            params["includeTrashed"] = 1
+        
+        response, headers = await self._make_request(
+            "GET", endpoint, auth_token,
+            params=params,
+            headers={"If-Modified-Since-Version": str(since_version)},
+            return_headers=True
+        )
+        
+        if response.get("not_modified"):
+            return None, since_version
+        return response, self._parse_library_version(headers, since_version)
+    
+    async def get_deleted(
+        self,
+        auth_token: str,
+        library_type: str,
+        library_id: str,
+        since_version: int
+    ) -> Dict[str, List[str]]:
+        """Get keys of objects deleted since a library version, grouped by object type"""
+        endpoint = f"/{library_type}s/{library_id}/deleted"
+        params = {"since": since_version}
+        
+        response = await self._make_request("GET", endpoint, auth_token, params=params)
+        return response if isinstance(response, dict) else {}
     
     # Utility Methods
     async def test_connection(self, auth_token: str, user_id: str) -> Dict[str, Any]:
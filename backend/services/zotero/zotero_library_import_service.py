@@ -17,6 +17,7 @@ from models.zotero_models import (
 )
 from models.zotero_schemas import SyncType, SyncStatus
 from services.zotero.zotero_client import ZoteroAPIClient, ZoteroAPIError
+from services.zotero.zotero_bulk_import import ZoteroItemBulkWriter, iter_item_pages
 
 logger = logging.getLogger(__name__)
 
@@ -474,61 +475,40 @@ class ZoteroLibraryImportService:
         progress.current_operation = "importing_items"
         
         try:
-            batch_size = 100
-            start = 0
+            writer = ZoteroItemBulkWriter(db, library, self.transform_item_data)
             total_items = 0
-            batch_number = 1
+            batch_number = 0
             
-            while True:
+            # Next pages are fetched while the current page is written
+            async for start, items_data in iter_item_pages(
+                api_client,
+                connection.access_token,
+                library.library_type,
+                library.zotero_library_id
+            ):
+                batch_number += 1
                 progress.current_batch = batch_number
                 
-                items_data = await api_client.get_items(
-                    connection.access_token,
-                    library.library_type,
-                    library.zotero_library_id,
-                    limit=batch_size,
-                    start=start
-                )
-                
-                if not items_data:
-                    break
-                
                 logger.info(f"Processing batch {batch_number} of {len(items_data)} items (start: {start})")
                 
-                # Process items in current batch
-                for item_data in items_data:
-                    try:
-                        await self._import_single_item(
-                            db, connection, library, item_data, progress
-                        )
-                        progress.items_processed += 1
-                        total_items += 1
-                        
-                        # Call progress callback periodically
-                        if progress_callback and progress.items_processed % 10 == 0:
-                            await progress_callback(progress.get_progress_dict())
-                        
-                    except Exception as e:
-                        progress.add_error(
-                            f"Failed to import item: {str(e)}",
-                            {"item_key": item_data.get("key")}
-                        )
-                        progress.items_skipped += 1
-                        continue
+                # The write runs on a worker thread so the event loop keeps
+                # receiving prefetched pages; the session is not used elsewhere
+                # until it returns
+                result = await asyncio.to_thread(writer.write_page, items_data)
                 
-                # Check if we got fewer items than requested (end of results)
-                if len(items_data) < batch_size:
-                    break
+                processed = len(items_data) - len(result.failed)
+                progress.items_processed += processed
+                progress.items_added += result.added
+                progress.items_updated += result.updated
+                progress.items_skipped += result.unchanged + len(result.failed)
+                total_items += processed
                 
-                start += batch_size
-                batch_number += 1
+                for item_key, error in result.failed:
+                    progress.add_error(f"Failed to import item: {error}", {"item_key": item_key})
                 
-                # Commit periodically to avoid large transactions
-                if total_items % 500 == 0:
-                    db.commit()
-                    logger.info(f"Committed {total_items} items so far")
+                if progress_callback:
+                    await progress_callback(progress.get_progress_dict())
             
-            db.commit()
             logger.info(f"Imported {total_items} items for library {library.library_name}")
             return total_items
             
@@ -536,54 +516,6 @@ class ZoteroLibraryImportService:
             progress.add_error(f"Failed to import items: {str(e)}")
             return 0
     
-    async def _import_single_item(
-        self,
-        db: Session,
-        connection: ZoteroConnection,
-        library: ZoteroLibrary,
-        item_data: Dict[str, Any],
-        progress: LibraryImportProgress
-    ):
-        """Import a single item with its metadata"""
-        item_key = item_data["key"]
-        item_version = item_data["version"]
-        data = item_data["data"]
-        
-        # Check if item already exists
-        existing_item = db.query(ZoteroItem).filter(
-            and_(
-                ZoteroItem.library_id == library.id,
-                ZoteroItem.zotero_item_key == item_key
-            )
-        ).first()
-        
-        # Transform Zotero data to our format
-        transformed_data = self.transform_item_data(data)
-        
-        if existing_item:
-            # Update existing item if version is newer
-            if existing_item.item_version < item_version:
-                self._update_item_from_data(existing_item, transformed_data, item_version)
-                progress.items_updated += 1
-            else:
-                progress.items_skipped += 1
-        else:
-            # Create new item
-            new_item = ZoteroItem(
-                library_id=library.id,
-                zotero_item_key=item_key,
-                item_version=item_version,
-                **transformed_data
-            )
-            db.add(new_item)
-            db.flush()  # Get the ID
-            progress.items_added += 1
-            
-            # Handle collections
-            collections = data.get("collections", [])
-            if collections:
-                await self._link_item_to_collections(db, new_item, collections, library)
-    
     def transform_item_data(self, zotero_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Transform Zotero item data to our internal format
@@ -654,53 +586,6 @@ class ZoteroLibraryImportService:
             if k not in mapped_fields and v is not None
         }
     
-    def _update_item_from_data(
-        self,
-        item: ZoteroItem,
-        transformed_data: Dict[str, Any],
-        version: int
-    ):
-        """Update existing item with new data"""
-        for field, value in transformed_data.items():
-            if hasattr(item, field):
-                setattr(item, field, value)
-        
-        item.item_version = version
-        item.updated_at = datetime.now()
-    
-    async def _link_item_to_collections(
-        self,
-        db: Session,
-        item: ZoteroItem,
-        collection_keys: List[str],
-        library: ZoteroLibrary
-    ):
-        """Link an item to its collections"""
-        for collection_key in collection_keys:
-            # Find the collection
-            collection = db.query(ZoteroCollection).filter(
-                and_(
-                    ZoteroCollection.library_id == library.id,
-                    ZoteroCollection.zotero_collection_key == collection_key
-                )
-            ).first()
-            
-            if collection:
-                # Check if link already exists
-                existing_link = db.query(ZoteroItemCollection).filter(
-                    and_(
-                        ZoteroItemCollection.item_id == item.id,
-                        ZoteroItemCollection.collection_id == collection.id
-                    )
-                ).first()
-                
-                if not existing_link:
-                    link = ZoteroItemCollection(
-                        item_id=item.id,
-                        collection_id=collection.id
-                    )
-                    db.add(link)
-    
     def _parse_zotero_date(self, date_str: Optional[str]) -> Optional[datetime]:
         """Parse Zotero date string to datetime"""
         if not date_str:
@@ -8,7 +8,6 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from collections import Counter, defaultdict
-import requests
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func, text
 from sklearn.cluster import KMeans, DBSCAN
@@ -19,6 +18,7 @@ import networkx as nx
 from core.config import settings
 from core.database import get_db
 from models.zotero_models import ZoteroItem, ZoteroLibrary, ZoteroConnection
+from services.llm_gateway import LLMPriority, get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -588,23 +588,17 @@ class ZoteroResearchInsightsService:
     async def _call_llm(self, prompt: str) -> str:
         """Call the LLM with the given prompt"""
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "num_predict": 512
-                    }
+            return await get_llm_gateway().generate(
+                prompt,
+                model=self.model,
+                options={
+                    "temperature": 0.3,
+                    "num_predict": 512
                 },
-                timeout=30
+                priority=LLMPriority.BATCH,
+                timeout=30,
+                base_url=self.ollama_url
             )
-            response.raise_for_status()
-            
-            result = response.json()
-            return result.get("response", "")
             
         except Exception as e:
             logger.warning(f"Error calling LLM: {e}")
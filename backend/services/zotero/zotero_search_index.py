@@ -0,0 +1,179 @@
+"""
+Zotero Search Index
+Full-text matching and ranking of Zotero items through the database's text index
+"""
+import logging
+import re
+import weakref
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Table, column, func, literal_column, select, table
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+MAX_SEARCH_TERMS = 32
+
+# Postgres keeps a weighted ``search_vector`` column on zotero_items (see
+# migrations/012_zotero_item_search_index.sql), ranked by ts_rank_cd with its
+# default label weights (A 1.0, B 0.4, C 0.2, D 0.1). Normalization 1 divides
+# by 1 + log(length) so long abstracts do not dominate, in the spirit of BM25
+# length normalization.
+POSTGRES_RANK_NORMALIZATION = 1
+
+# SQLite mirrors the same document in an FTS5 table scored with bm25().
+SQLITE_FTS_TABLE = "zotero_items_fts"
+SQLITE_FTS_COLUMNS = (
+    ("item_id", 0.0),
+    ("title", 10.0),
+    ("creators", 4.0),
+    ("tags", 4.0),
+    ("abstract_note", 2.0),
+    ("publication_title", 2.0),
+    ("publisher", 1.0),
+    ("doi", 1.0),
+    ("url", 1.0),
+)
+
+
+def _sqlite_json_array(value: str) -> str:
+    return (
+        f"CASE WHEN json_valid({value}) THEN "
+        f"CASE WHEN json_type({value}) = 'array' THEN {value} ELSE '[]' END ELSE '[]' END"
+    )
+
+
+def _sqlite_document(row: str) -> str:
+    """SQL expressions for the FTS5 columns of a zotero_items row"""
+    creators = (
+        "(SELECT group_concat(trim("
+        "coalesce(json_extract(creator.value, '$.name'), '') || ' ' || "
+        "coalesce(json_extract(creator.value, '$.first_name'), '') || ' ' || "
+        "coalesce(json_extract(creator.value, '$.last_name'), '')), ' ') "
+        f"FROM json_each({_sqlite_json_array(f'{row}.creators')}) AS creator)"
+    )
+    tags = (
+        "(SELECT group_concat(tag.value, ' ') "
+        f"FROM json_each({_sqlite_json_array(f'{row}.tags')}) AS tag)"
+    )
+    return ", ".join([
+        f"{row}.rowid", f"{row}.id", f"{row}.title", creators, tags, f"{row}.abstract_note",
+        f"{row}.publication_title", f"{row}.publisher", f"{row}.doi", f"{row}.url"
+    ])
+
+
+def sqlite_schema(items_table: str = "zotero_items") -> List[str]:
+    """Statements creating the FTS5 table, the triggers that keep it in step
+    with zotero_items, and indexing any items that predate them"""
+    fts_columns = ", ".join(name if weight else f"{name} UNINDEXED" for name, weight in SQLITE_FTS_COLUMNS)
+    insert_columns = "rowid, " + ", ".join(name for name, _ in SQLITE_FTS_COLUMNS)
+    indexed_fields = ", ".join(name for name, weight in SQLITE_FTS_COLUMNS if weight)
+
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+            {fts_columns},
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_insert AFTER INSERT ON {items_table} BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE} ({insert_columns}) SELECT {_sqlite_document('NEW')};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_update
+        AFTER UPDATE OF {indexed_fields} ON {items_table} BEGIN
+            DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = OLD.rowid;
+            INSERT INTO {SQLITE_FTS_TABLE} ({insert_columns}) SELECT {_sqlite_document('NEW')};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_delete AFTER DELETE ON {items_table} BEGIN
+            DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = OLD.rowid;
+        END""",
+        f"""INSERT INTO {SQLITE_FTS_TABLE} ({insert_columns})
+        SELECT {_sqlite_document(items_table)} FROM {items_table}
+        WHERE {items_table}.rowid NOT IN (SELECT rowid FROM {SQLITE_FTS_TABLE})""",
+    ]
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a search string into distinct lowercase word terms"""
+    terms = []
+    for term in re.findall(r"\w+", query.lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_SEARCH_TERMS]
+
+
+class ZoteroSearchIndex:
+    """
+    Restricts and ranks item queries through the full-text index.
+
+    Every search term must match some indexed field, either as a word or as
+    a word prefix. ``apply`` adds the match condition to a query over the
+    items table and returns it with a rank expression (higher is better), so
+    filtering, ranking and counting all run against the index.
+    """
+
+    # SQLite engines whose FTS schema has been created in this process
+    _prepared_sqlite: "weakref.WeakSet" = weakref.WeakSet()
+
+    def __init__(self, db: Session, items: Table):
+        self.db = db
+        self.items = items
+        self.dialect = db.get_bind().dialect.name
+
+    def apply(self, query, search_text: str) -> Tuple[object, Optional[object]]:
+        """Return (query restricted to matching items, rank expression or None)"""
+        terms = search_terms(search_text or "")
+        if not terms:
+            return query, None
+
+        if self.dialect == "sqlite":
+            return self._apply_sqlite(query, terms)
+        return self._apply_postgres(query, terms)
+
+    def _apply_postgres(self, query, terms: List[str]):
+        # Titles and abstracts are stemmed with the english configuration,
+        # names and identifiers are indexed as-is, so each term is matched
+        # under both configurations.
+        ts_query = None
+        for term in terms:
+            term_query = func.to_tsquery("english", f"{term}:*").op("||")(
+                func.to_tsquery("simple", f"{term}:*")
+            )
+            ts_query = term_query if ts_query is None else ts_query.op("&&")(term_query)
+
+        search_vector = literal_column(f"{self.items.fullname}.search_vector", type_=TSVECTOR)
+        rank = func.ts_rank_cd(search_vector, ts_query, POSTGRES_RANK_NORMALIZATION)
+        return query.filter(search_vector.op("@@")(ts_query)), rank
+
+    def _apply_sqlite(self, query, terms: List[str]):
+        self.ensure_sqlite_schema()
+
+        fts = table(SQLITE_FTS_TABLE, column("item_id"))
+        fts_table = literal_column(SQLITE_FTS_TABLE)
+        match = " AND ".join(f'"{term}"*' for term in terms)
+        # bm25() is lower-is-better, negate it to rank like ts_rank_cd
+        bm25 = func.bm25(fts_table, *(weight for _, weight in SQLITE_FTS_COLUMNS))
+        matches = (
+            select(fts.c.item_id, (-bm25).label("rank"))
+            .select_from(fts)
+            .where(fts_table.op("MATCH")(match))
+            .subquery("search_matches")
+        )
+        query = query.join(matches, matches.c.item_id == self.items.c.id)
+        return query, matches.c.rank
+
+    def ensure_sqlite_schema(self) -> None:
+        """Create the FTS5 table and triggers once per database.
+
+        The DDL runs in its own transaction on a separate connection, so the
+        caller's session transaction is left untouched.
+        """
+        engine = self.db.get_bind().engine
+        if engine in self._prepared_sqlite:
+            return
+
+        with engine.begin() as connection:
+            for statement in sqlite_schema(self.items.name):
+                connection.exec_driver_sql(statement)
+        self._prepared_sqlite.add(engine)
+        logger.info(f"Prepared full-text search index for {self.items.name}")
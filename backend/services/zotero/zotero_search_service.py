@@ -6,9 +6,11 @@ including full-text search, faceted search, and relevance scoring.
 """
 import logging
 import time
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Any, Union
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, text, desc, asc, case
+from sqlalchemy import and_, or_, func, text, desc, asc, case, literal, true
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import select
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -20,13 +22,29 @@ from models.zotero_models import (
 from models.zotero_schemas import (
     ZoteroSearchRequest, ZoteroSearchResponse, ZoteroItemResponse
 )
+from services.zotero.zotero_search_index import ZoteroSearchIndex
 
 logger = logging.getLogger(__name__)
 
+# Number of buckets returned per facet
+FACET_LIMITS = {
+    "item_types": 50,
+    "publication_years": 20,
+    "creators": 50,
+    "tags": 100,
+    "publishers": 30
+}
+
+# Facet results kept per (library versions, collection)
+FACET_CACHE_SIZE = 256
+
 
 class ZoteroSearchService:
     """Service for advanced search functionality in Zotero references"""
     
+    # Shared across service instances, which are created per request
+    facet_cache: "OrderedDict[Tuple[Any, ...], Dict[str, List[Dict[str, Any]]]]" = OrderedDict()
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -51,23 +69,28 @@ class ZoteroSearchService:
             # Build base query with user access control
             query = self._build_base_query(user_id)
             
-            # Apply search filters
-            query = await self._apply_search_filters(query, search_request)
+            # Apply full-text search through the search index
+            query, search_rank = await self._apply_search_filters(query, search_request)
             
             # Apply faceted filters
             query = await self._apply_faceted_filters(query, search_request)
             
-            # Get total count before pagination
-            total_count = query.count()
-            
             # Apply sorting
-            query = await self._apply_sorting(query, search_request)
-            
-            # Apply pagination
-            query = query.offset(search_request.offset).limit(search_request.limit)
-            
-            # Execute query
-            references = query.all()
+            query = await self._apply_sorting(query, search_request, search_rank)
+            
+            # Fetch the page with the total match count from the same indexed query
+            rows = query.add_columns(
+                func.count().over().label("total_count")
+            ).offset(search_request.offset).limit(search_request.limit).all()
+            
+            references = [reference for reference, _ in rows]
+            if rows:
+                total_count = rows[0][1]
+            elif search_request.offset:
+                # Page past the end, the window count is not available
+                total_count = query.count()
+            else:
+                total_count = 0
             
             # Convert to response format
             response_items = [self._convert_to_response(ref) for ref in references]
@@ -117,32 +140,30 @@ class ZoteroSearchService:
             Dictionary of facets with counts
         """
         try:
-            # Build base query
-            query = self._build_base_query(user_id)
-            
-            # Apply library filter if specified
+            # Facets only change when a sync advances a library version, so
+            # cache them per library versions in scope and collection
+            libraries = self.db.query(ZoteroLibrary.id, ZoteroLibrary.library_version).join(ZoteroConnection).filter(
+                ZoteroConnection.user_id == user_id,
+                ZoteroLibrary.is_active == True
+            )
             if library_id:
-                query = query.filter(ZoteroItem.library_id == library_id)
-            
-            # Apply collection filter if specified
-            if collection_id:
-                query = query.join(
-                    ZoteroItemCollection,
-                    ZoteroItem.id == ZoteroItemCollection.item_id
-                ).filter(ZoteroItemCollection.collection_id == collection_id)
-            
-            # Get all items for facet calculation
-            items = query.all()
-            
-            facets = {
-                "item_types": self._calculate_item_type_facets(items),
-                "publication_years": self._calculate_year_facets(items),
-                "creators": self._calculate_creator_facets(items),
-                "tags": self._calculate_tag_facets(items),
-                "publishers": self._calculate_publisher_facets(items)
-            }
+                libraries = libraries.filter(ZoteroLibrary.id == library_id)
+            
+            library_versions = tuple(sorted(
+                (str(scope_library_id), version or 0) for scope_library_id, version in libraries.all()
+            ))
+            cache_key = (library_versions, collection_id)
+            
+            facets = self.facet_cache.get(cache_key)
+            if facets is None:
+                facets = self._aggregate_facets(user_id, library_id, collection_id)
+                self.facet_cache[cache_key] = facets
+                if len(self.facet_cache) > FACET_CACHE_SIZE:
+                    self.facet_cache.popitem(last=False)
+            else:
+                self.facet_cache.move_to_end(cache_key)
             
-            return facets
+            return {name: list(buckets) for name, buckets in facets.items()}
             
         except Exception as e:
             logger.error(f"Failed to get search facets for user {user_id}: {str(e)}")
@@ -426,33 +447,15 @@ class ZoteroSearchService:
         )
     
     async def _apply_search_filters(self, query, search_request: ZoteroSearchRequest):
-        """Apply full-text search filters"""
-        if not search_request.query.strip():
-            return query
-        
-        search_terms = search_request.query.strip().split()
-        search_conditions = []
-        
-        for term in search_terms:
-            term_conditions = [
-                ZoteroItem.title.ilike(f"%{term}%"),
-                ZoteroItem.abstract_note.ilike(f"%{term}%"),
-                ZoteroItem.publication_title.ilike(f"%{term}%"),
-                ZoteroItem.publisher.ilike(f"%{term}%"),
-                ZoteroItem.doi.ilike(f"%{term}%"),
-                ZoteroItem.url.ilike(f"%{term}%"),
-                func.json_contains(func.cast(ZoteroItem.tags, text), f'"{term}"'),
-                func.json_contains(func.cast(ZoteroItem.creators, text), f'"{term}"')
-            ]
-            
-            # Combine term conditions with OR
-            search_conditions.append(or_(*term_conditions))
-        
-        # Combine all search terms with AND
-        if search_conditions:
-            query = query.filter(and_(*search_conditions))
+        """
+        Apply full-text search filters
         
-        return query
+        Returns:
+            Tuple of the query restricted to items matching every search term
+            and the index rank expression (None when there are no search terms)
+        """
+        search_index = ZoteroSearchIndex(self.db, ZoteroItem.__table__)
+        return search_index.apply(query, search_request.query)
     
     async def _apply_faceted_filters(self, query, search_request: ZoteroSearchRequest):
         """Apply faceted search filters"""
@@ -496,73 +499,16 @@ class ZoteroSearchService:
         
         return query
     
-    async def _apply_sorting(self, query, search_request: ZoteroSearchRequest):
-        """Apply sorting to the query with enhanced relevance scoring"""
+    async def _apply_sorting(self, query, search_request: ZoteroSearchRequest, search_rank=None):
+        """Apply sorting to the query, ranking by the search index for relevance"""
         sort_column = getattr(ZoteroItem, search_request.sort_by, None)
         
         if search_request.sort_by == "relevance":
-            # Enhanced relevance scoring based on multiple factors
-            if search_request.query.strip():
-                search_terms = search_request.query.strip().split()
-                relevance_score = 0
-                
-                for term in search_terms:
-                    # Title matches get highest score (exact match gets bonus)
-                    relevance_score += case(
-                        (func.lower(ZoteroItem.title) == term.lower(), 20),  # Exact title match
-                        (ZoteroItem.title.ilike(f"{term}%"), 15),  # Title starts with term
-                        (ZoteroItem.title.ilike(f"%{term}%"), 10),  # Title contains term
-                        else_=0
-                    )
-                    
-                    # Abstract matches get medium-high score
-                    relevance_score += case(
-                        (ZoteroItem.abstract_note.ilike(f"%{term}%"), 7),
-                        else_=0
-                    )
-                    
-                    # Tag matches get high score (exact match gets bonus)
-                    relevance_score += case(
-                        (func.json_contains(ZoteroItem.tags, f'"{term}"'), 12),  # Exact tag match
-                        else_=0
-                    )
-                    
-                    # Creator matches get medium score
-                    relevance_score += case(
-                        (func.json_contains(func.cast(ZoteroItem.creators, text), f'"{term}"'), 8),
-                        else_=0
-                    )
-                    
-                    # Publication title matches get medium score
-                    relevance_score += case(
-                        (ZoteroItem.publication_title.ilike(f"%{term}%"), 6),
-                        else_=0
-                    )
-                    
-                    # DOI matches get medium score
-                    relevance_score += case(
-                        (ZoteroItem.doi.ilike(f"%{term}%"), 5),
-                        else_=0
-                    )
-                
-                # Add recency bonus (newer items get slight boost)
-                current_year = datetime.now().year
-                relevance_score += case(
-                    (ZoteroItem.publication_year == current_year, 2),
-                    (ZoteroItem.publication_year >= current_year - 1, 1),
-                    else_=0
-                )
-                
-                # Add item type preference (articles typically more relevant)
-                relevance_score += case(
-                    (ZoteroItem.item_type == 'article', 1),
-                    else_=0
-                )
-                
+            if search_rank is not None:
                 if search_request.sort_order.lower() == "asc":
-                    query = query.order_by(asc(relevance_score), desc(ZoteroItem.date_modified))
+                    query = query.order_by(asc(search_rank), desc(ZoteroItem.date_modified))
                 else:
-                    query = query.order_by(desc(relevance_score), desc(ZoteroItem.date_modified))
+                    query = query.order_by(desc(search_rank), desc(ZoteroItem.date_modified))
             else:
                 # Default to date_modified for relevance without search terms
                 query = query.order_by(desc(ZoteroItem.date_modified))
@@ -610,72 +556,90 @@ class ZoteroSearchService:
         
         return filters
     
-    def _calculate_item_type_facets(self, items: List[ZoteroItem]) -> List[Dict[str, Any]]:
-        """Calculate item type facets"""
-        type_counts = {}
-        for item in items:
-            if item.item_type:
-                type_counts[item.item_type] = type_counts.get(item.item_type, 0) + 1
-        
-        return [
-            {"value": item_type, "count": count}
-            for item_type, count in sorted(type_counts.items(), key=lambda x: x[1], reverse=True)
-        ]
-    
-    def _calculate_year_facets(self, items: List[ZoteroItem]) -> List[Dict[str, Any]]:
-        """Calculate publication year facets"""
-        year_counts = {}
-        for item in items:
-            if item.publication_year:
-                year_counts[item.publication_year] = year_counts.get(item.publication_year, 0) + 1
-        
-        return [
-            {"value": year, "count": count}
-            for year, count in sorted(year_counts.items(), key=lambda x: x[0], reverse=True)
-        ][:20]  # Limit to top 20 years
+    def _aggregate_facets(
+        self,
+        user_id: str,
+        library_id: Optional[str],
+        collection_id: Optional[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Compute the top buckets of every facet with GROUP BY queries"""
+        def facet_query(value, count):
+            query = self.db.query(value, count).select_from(ZoteroItem).join(ZoteroLibrary).join(
+                ZoteroConnection
+            ).filter(
+                ZoteroConnection.user_id == user_id,
+                ZoteroLibrary.is_active == True,
+                ZoteroItem.is_deleted == False
+            )
+            if library_id:
+                query = query.filter(ZoteroItem.library_id == library_id)
+            if collection_id:
+                query = query.join(
+                    ZoteroItemCollection,
+                    ZoteroItem.id == ZoteroItemCollection.item_id
+                ).filter(ZoteroItemCollection.collection_id == collection_id)
+            return query
+        
+        def buckets(value, limit, order_by_value=False, skip_blank=True, elements=None):
+            count = func.count().label("count")
+            query = facet_query(value, count)
+            if elements is not None:
+                query = query.join(elements, true())
+            query = query.filter(value.isnot(None))
+            if skip_blank:
+                query = query.filter(value != "")
+            query = query.group_by(value)
+            if order_by_value:
+                query = query.order_by(desc(value))
+            else:
+                query = query.order_by(desc(count), asc(value))
+            return [{"value": row[0], "count": row[1]} for row in query.limit(limit).all()]
+        
+        creators = self._json_array_elements(ZoteroItem.creators)
+        tags = self._json_array_elements(ZoteroItem.tags, as_text=True)
+        
+        return {
+            "item_types": buckets(ZoteroItem.item_type, FACET_LIMITS["item_types"]),
+            "publication_years": buckets(
+                ZoteroItem.publication_year, FACET_LIMITS["publication_years"],
+                order_by_value=True, skip_blank=False
+            ),
+            "creators": buckets(self._creator_name(creators.c.value), FACET_LIMITS["creators"], elements=creators),
+            "tags": buckets(tags.c.value, FACET_LIMITS["tags"], elements=tags),
+            "publishers": buckets(ZoteroItem.publisher, FACET_LIMITS["publishers"])
+        }
     
-    def _calculate_creator_facets(self, items: List[ZoteroItem]) -> List[Dict[str, Any]]:
-        """Calculate creator facets"""
-        creator_counts = {}
-        for item in items:
-            if item.creators:
-                for creator in item.creators:
-                    name = creator.get('name')
-                    if not name and creator.get('last_name'):
-                        name = f"{creator.get('first_name', '')} {creator['last_name']}".strip()
-                    
-                    if name:
-                        creator_counts[name] = creator_counts.get(name, 0) + 1
-        
-        return [
-            {"value": creator, "count": count}
-            for creator, count in sorted(creator_counts.items(), key=lambda x: x[1], reverse=True)
-        ][:50]  # Limit to top 50 creators
+    def _is_sqlite(self) -> bool:
+        return self.db.get_bind().dialect.name == "sqlite"
     
-    def _calculate_tag_facets(self, items: List[ZoteroItem]) -> List[Dict[str, Any]]:
-        """Calculate tag facets"""
-        tag_counts = {}
-        for item in items:
-            if item.tags:
-                for tag in item.tags:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        return [
-            {"value": tag, "count": count}
-            for tag, count in sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
-        ][:100]  # Limit to top 100 tags
+    def _json_array_elements(self, column, as_text: bool = False):
+        """Table-valued expansion of a JSON array column, one row per element in ``value``"""
+        if self._is_sqlite():
+            array = case(
+                (func.json_valid(column) == 1, case((func.json_type(column) == "array", column), else_="[]")),
+                else_="[]"
+            )
+            return func.json_each(array).table_valued("value")
+        
+        array = case(
+            (func.jsonb_typeof(column) == "array", column),
+            else_=literal("[]").cast(JSONB)
+        )
+        if as_text:
+            return func.jsonb_array_elements_text(array).table_valued("value")
+        return func.jsonb_array_elements(array).table_valued("value")
     
-    def _calculate_publisher_facets(self, items: List[ZoteroItem]) -> List[Dict[str, Any]]:
-        """Calculate publisher facets"""
-        publisher_counts = {}
-        for item in items:
-            if item.publisher:
-                publisher_counts[item.publisher] = publisher_counts.get(item.publisher, 0) + 1
-        
-        return [
-            {"value": publisher, "count": count}
-            for publisher, count in sorted(publisher_counts.items(), key=lambda x: x[1], reverse=True)
-        ][:30]  # Limit to top 30 publishers
+    def _creator_name(self, creator):
+        """Display name of a creator element: its name, else first and last name"""
+        if self._is_sqlite():
+            def field(key):
+                return func.json_extract(creator, f"$.{key}")
+        else:
+            def field(key):
+                return creator.op("->>")(key)
+        
+        full_name = func.trim(func.coalesce(field("first_name"), "").op("||")(" ").op("||")(field("last_name")))
+        return func.coalesce(func.nullif(field("name"), ""), full_name)
     
     def _convert_to_response(self, reference: ZoteroItem) -> ZoteroItemResponse:
         """Convert database model to response schema"""
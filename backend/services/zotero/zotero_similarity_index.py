@@ -0,0 +1,268 @@
+"""
+Zotero Similarity Index
+In-memory, per-user matrices for scoring reference similarity in bulk
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_TYPES = ("semantic", "tfidf", "metadata")
+
+
+class ZoteroSimilarityIndex:
+    """
+    Similarity index over one user's references.
+
+    Items are added with the embeddings ZoteroSimilarityService stores in item
+    metadata. Scoring a target reproduces ``_calculate_similarity`` for every
+    candidate at once: semantic vectors are kept as L2-normalized float32
+    matrices (one per dimension), keyword and creator sets as sparse binary
+    matrices for Jaccard overlap, and metadata fields as encoded arrays. The
+    matrices are rebuilt lazily after items change.
+    """
+
+    def __init__(self):
+        self.item_ids: List[str] = []
+        self.items: List[Dict[str, Any]] = []
+        self.positions: Dict[str, int] = {}
+
+        # Change tracking used by the service to refresh the index
+        self.fingerprint: Optional[Tuple[Any, ...]] = None
+        self.updated_through: Optional[Any] = None
+
+        self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.positions
+
+    def upsert(self, item: Dict[str, Any]) -> None:
+        """Add or replace an item (dict with item_id, metadata fields and embeddings)"""
+        position = self.positions.get(item["item_id"])
+        if position is None:
+            self.positions[item["item_id"]] = len(self.item_ids)
+            self.item_ids.append(item["item_id"])
+            self.items.append(item)
+        else:
+            self.items[position] = item
+        self._dirty = True
+
+    def remove(self, item_id: str) -> None:
+        """Remove an item, moving the last item into its slot"""
+        position = self.positions.pop(item_id, None)
+        if position is None:
+            return
+
+        last_id = self.item_ids.pop()
+        last_item = self.items.pop()
+        if last_id != item_id:
+            self.item_ids[position] = last_id
+            self.items[position] = last_item
+            self.positions[last_id] = position
+        self._dirty = True
+
+    def _build(self) -> None:
+        """Rebuild the scoring matrices from the stored items"""
+        n = len(self.items)
+        self._has = {sim_type: np.zeros(n, dtype=bool) for sim_type in SIMILARITY_TYPES}
+
+        semantic_rows: Dict[int, List[int]] = {}
+        semantic_vectors: Dict[int, List[List[float]]] = {}
+        keyword_sets: List[set] = []
+        creator_sets: List[set] = []
+        item_types: List[Any] = []
+        self._years = np.zeros(n, dtype=np.float32)
+        publication_titles: List[str] = []
+        self._metadata_valid = np.zeros(n, dtype=bool)
+
+        for row, item in enumerate(self.items):
+            embeddings = item.get("embeddings") or {}
+            for sim_type in SIMILARITY_TYPES:
+                self._has[sim_type][row] = sim_type in embeddings
+
+            semantic = embeddings.get("semantic")
+            if isinstance(semantic, list):
+                semantic_rows.setdefault(len(semantic), []).append(row)
+                semantic_vectors.setdefault(len(semantic), []).append(semantic)
+
+            tfidf = embeddings.get("tfidf")
+            keyword_sets.append(set(tfidf.get("keywords", [])) if isinstance(tfidf, dict) else set())
+
+            metadata = embeddings.get("metadata")
+            if isinstance(metadata, dict):
+                self._metadata_valid[row] = True
+                item_types.append(metadata.get("item_type"))
+                self._years[row] = metadata.get("publication_year") or 0
+                creator_sets.append(set(metadata.get("creator_names", [])))
+                publication_titles.append((metadata.get("publication_title") or "").lower())
+            else:
+                item_types.append(None)
+                creator_sets.append(set())
+                publication_titles.append("")
+
+        self._semantic = {}
+        for dimension, rows in semantic_rows.items():
+            matrix = np.asarray(semantic_vectors[dimension], dtype=np.float32).reshape(len(rows), dimension)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+            self._semantic[dimension] = (np.asarray(rows, dtype=np.int64), matrix)
+
+        self._keyword_vocab, self._keywords, self._keyword_counts = self._set_matrix(keyword_sets)
+        self._creator_vocab, self._creators, self._creator_counts = self._set_matrix(creator_sets)
+
+        self._type_codes: Dict[Any, int] = {}
+        self._item_types = np.array(
+            [self._type_codes.setdefault(t, len(self._type_codes)) for t in item_types], dtype=np.int64
+        )
+        self._publication_codes: Dict[str, int] = {}
+        self._publications = np.array(
+            [self._publication_codes.setdefault(p, len(self._publication_codes)) if p else -1
+             for p in publication_titles],
+            dtype=np.int64
+        )
+
+        self._dirty = False
+
+    @staticmethod
+    def _set_matrix(sets: List[set]) -> Tuple[Dict[Any, int], sparse.csr_matrix, np.ndarray]:
+        """Encode a list of sets as a sparse binary row matrix"""
+        vocabulary: Dict[Any, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        for values in sets:
+            indices.extend(vocabulary.setdefault(value, len(vocabulary)) for value in values)
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(len(sets), max(1, len(vocabulary)))
+        )
+        return vocabulary, matrix, np.diff(matrix.indptr).astype(np.float32)
+
+    def _jaccard(
+        self,
+        target: Iterable[Any],
+        vocabulary: Dict[Any, int],
+        matrix: sparse.csr_matrix,
+        counts: np.ndarray
+    ) -> np.ndarray:
+        """Jaccard overlap between a target set and every row set"""
+        target = set(target)
+        scores = np.zeros(matrix.shape[0], dtype=np.float32)
+        if not target:
+            return scores
+
+        query = np.zeros(matrix.shape[1], dtype=np.float32)
+        known = [vocabulary[value] for value in target if value in vocabulary]
+        query[known] = 1.0
+
+        intersection = matrix @ query
+        union = counts + len(target) - intersection
+        np.divide(intersection, union, out=scores, where=counts > 0)
+        return scores
+
+    def _score_semantic(self, target: Any) -> np.ndarray:
+        scores = np.zeros(len(self.items), dtype=np.float32)
+        if not isinstance(target, list) or len(target) not in self._semantic:
+            return scores
+
+        vector = np.asarray(target, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return scores
+
+        rows, matrix = self._semantic[len(target)]
+        scores[rows] = matrix @ (vector / norm)
+        return scores
+
+    def _score_tfidf(self, target: Any) -> np.ndarray:
+        if not isinstance(target, dict):
+            return np.zeros(len(self.items), dtype=np.float32)
+        return self._jaccard(target.get("keywords", []), self._keyword_vocab, self._keywords, self._keyword_counts)
+
+    def _score_metadata(self, target: Any) -> np.ndarray:
+        n = len(self.items)
+        if not isinstance(target, dict):
+            return np.zeros(n, dtype=np.float32)
+
+        type_code = self._type_codes.get(target.get("item_type"), -1)
+        score = 0.3 * (self._item_types == type_code)
+
+        year = target.get("publication_year") or 0
+        if year > 0:
+            year_similarity = np.maximum(0, 1 - np.abs(self._years - year) / 20)
+            score = score + 0.2 * np.where(self._years > 0, year_similarity, 0)
+
+        score = score + 0.3 * self._jaccard(
+            target.get("creator_names", []), self._creator_vocab, self._creators, self._creator_counts
+        )
+
+        publication = (target.get("publication_title") or "").lower()
+        if publication in self._publication_codes:
+            score = score + 0.2 * (self._publications == self._publication_codes[publication])
+
+        return np.where(self._metadata_valid, score / 4, 0).astype(np.float32)
+
+    def top_k(
+        self,
+        target_embeddings: Dict[str, Any],
+        similarity_types: List[str],
+        k: int,
+        min_similarity: float,
+        exclude_item_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Score every item against a target and return the best k.
+
+        Each result holds the item dict plus ``overall_similarity`` (the mean
+        over the similarity types both sides have) and ``similarity_scores``.
+        """
+        if self._dirty:
+            self._build()
+
+        n = len(self.items)
+        scorers = {
+            "semantic": self._score_semantic,
+            "tfidf": self._score_tfidf,
+            "metadata": self._score_metadata
+        }
+        types = [t for t in similarity_types if t in scorers and t in target_embeddings]
+
+        totals = np.zeros(n, dtype=np.float32)
+        counts = np.zeros(n, dtype=np.int64)
+        type_scores = {}
+        for sim_type in types:
+            scores = scorers[sim_type](target_embeddings[sim_type])
+            type_scores[sim_type] = scores
+            totals += np.where(self._has[sim_type], scores, 0)
+            counts += self._has[sim_type]
+
+        overall = np.divide(totals, counts, out=np.zeros(n, dtype=np.float32), where=counts > 0)
+        eligible = (counts > 0) & (overall >= min_similarity)
+        if exclude_item_id in self.positions:
+            eligible[self.positions[exclude_item_id]] = False
+
+        candidates = np.flatnonzero(eligible)
+        if k <= 0 or candidates.size == 0:
+            return []
+        if candidates.size > k:
+            candidates = candidates[np.argpartition(-overall[candidates], k - 1)[:k]]
+        candidates = candidates[np.lexsort((candidates, -overall[candidates]))]
+
+        results = []
+        for row in candidates:
+            results.append({
+                **self.items[row],
+                "overall_similarity": round(float(overall[row]), 4),
+                "similarity_scores": {
+                    sim_type: float(type_scores[sim_type][row])
+                    for sim_type in types if self._has[sim_type][row]
+                }
+            })
+        return results
@@ -5,6 +5,7 @@ Implements vector embeddings, similarity detection, and recommendation engine
 import json
 import logging
 import numpy as np
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 import requests
@@ -18,6 +19,8 @@ import hashlib
 
 from core.config import settings
 from core.database import get_db
+from services.embedding_store import get_embedding_store
+from services.zotero.zotero_similarity_index import ZoteroSimilarityIndex
 from models.zotero_models import ZoteroItem, ZoteroLibrary, ZoteroConnection
 
 logger = logging.getLogger(__name__)
@@ -31,8 +34,11 @@ class ZoteroSimilarityService:
         self.embedding_model = settings.EMBEDDING_MODEL
         self.tfidf_vectorizer = None
         self.embedding_cache = {}
+        self.embedding_store = get_embedding_store()
         self.similarity_threshold = 0.3
         self.max_recommendations = 10
+        self.similarity_indexes: "OrderedDict[str, ZoteroSimilarityIndex]" = OrderedDict()
+        self.max_cached_indexes = 32
         
     async def generate_embeddings(
         self,
@@ -95,6 +101,11 @@ class ZoteroSimilarityService:
             # Store embeddings in item metadata
             await self._store_embeddings(db, item_id, embeddings)
             
+            # Keep the user's similarity index in step with the stored embeddings
+            index = self.similarity_indexes.get(user_id)
+            if index is not None:
+                index.upsert(self._item_embedding_entry(item, embeddings["embeddings"]))
+            
             return embeddings
             
         except Exception as e:
@@ -133,56 +144,37 @@ class ZoteroSimilarityService:
             if "error" in target_embeddings:
                 return target_embeddings
             
-            # Get all user's items for comparison
-            user_items = await self._get_user_items_with_embeddings(db, user_id, exclude_item_id=item_id)
+            # Score every item in the user's library at once, keeping the top results
+            index = await self._get_similarity_index(db, user_id)
+            matches = index.top_k(
+                target_embeddings["embeddings"],
+                similarity_types,
+                max_results,
+                min_similarity,
+                exclude_item_id=item_id
+            )
+            total_candidates = len(index) - (1 if item_id in index else 0)
             
             similarities = []
-            
-            for candidate_item in user_items:
-                candidate_embeddings = candidate_item.get("embeddings", {})
-                if not candidate_embeddings:
-                    continue
-                
-                # Calculate similarity scores for each type
-                similarity_scores = {}
-                overall_score = 0.0
-                
-                for sim_type in similarity_types:
-                    if sim_type in target_embeddings["embeddings"] and sim_type in candidate_embeddings:
-                        score = await self._calculate_similarity(
-                            target_embeddings["embeddings"][sim_type],
-                            candidate_embeddings[sim_type],
-                            sim_type
-                        )
-                        similarity_scores[sim_type] = score
-                        overall_score += score
-                
-                if similarity_scores:
-                    overall_score /= len(similarity_scores)
-                    
-                    if overall_score >= min_similarity:
-                        similarities.append({
-                            "item_id": candidate_item["item_id"],
-                            "item_title": candidate_item.get("title", ""),
-                            "item_type": candidate_item.get("item_type", ""),
-                            "publication_year": candidate_item.get("publication_year"),
-                            "creators": candidate_item.get("creators", []),
-                            "overall_similarity": round(overall_score, 4),
-                            "similarity_scores": similarity_scores,
-                            "similarity_reasons": await self._generate_similarity_reasons(
-                                target_embeddings, candidate_embeddings, similarity_scores
-                            )
-                        })
-            
-            # Sort by overall similarity and limit results
-            similarities.sort(key=lambda x: x["overall_similarity"], reverse=True)
-            similarities = similarities[:max_results]
+            for match in matches:
+                similarities.append({
+                    "item_id": match["item_id"],
+                    "item_title": match.get("title", ""),
+                    "item_type": match.get("item_type", ""),
+                    "publication_year": match.get("publication_year"),
+                    "creators": match.get("creators", []),
+                    "overall_similarity": match["overall_similarity"],
+                    "similarity_scores": match["similarity_scores"],
+                    "similarity_reasons": await self._generate_similarity_reasons(
+                        target_embeddings, match["embeddings"], match["similarity_scores"]
+                    )
+                })
             
             return {
                 "target_item_id": item_id,
                 "similarity_types": similarity_types,
                 "min_similarity": min_similarity,
-                "total_candidates": len(user_items),
+                "total_candidates": total_candidates,
                 "similar_items_found": len(similarities),
                 "similar_items": similarities,
                 "analysis_timestamp": datetime.utcnow().isoformat()
@@ -355,19 +347,27 @@ class ZoteroSimilarityService:
     
     async def _generate_semantic_embedding(self, content: str) -> List[float]:
         """Generate semantic embedding using LLM"""
+        prompt = content[:2000]  # Limit content length
+        stored = self.embedding_store.get(self.embedding_model, prompt)
+        if stored is not None:
+            return stored
+        
         try:
             response = requests.post(
                 f"{self.ollama_url}/api/embeddings",
                 json={
                     "model": self.embedding_model,
-                    "prompt": content[:2000]  # Limit content length
+                    "prompt": prompt
                 },
                 timeout=30
             )
             response.raise_for_status()
             
             result = response.json()
-            return result.get("embedding", [])
+            embedding = result.get("embedding", [])
+            if embedding:
+                self.embedding_store.put(self.embedding_model, prompt, embedding)
+            return embedding
             
         except requests.exceptions.RequestException as e:
             logger.warning(f"Failed to generate semantic embedding: {e}")
@@ -569,15 +569,9 @@ class ZoteroSimilarityService:
             )
         ).first()
     
-    async def _get_user_items_with_embeddings(
-        self,
-        db: Session,
-        user_id: str,
-        library_id: Optional[str] = None,
-        exclude_item_id: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """Get user's items that have embeddings"""
-        query = db.query(ZoteroItem).join(
+    def _user_items_query(self, db: Session, user_id: str, *columns):
+        """Query the user's non-deleted items (or the given columns of them)"""
+        return db.query(*(columns or (ZoteroItem,))).join(
             ZoteroLibrary, ZoteroItem.library_id == ZoteroLibrary.id
         ).join(
             ZoteroConnection, ZoteroLibrary.connection_id == ZoteroConnection.id
@@ -587,6 +581,27 @@ class ZoteroSimilarityService:
                 ZoteroItem.is_deleted == False
             )
         )
+    
+    def _item_embedding_entry(self, item: ZoteroItem, embeddings: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an item and its embeddings to the dict format used for comparison"""
+        return {
+            "item_id": item.id,
+            "title": item.title,
+            "item_type": item.item_type,
+            "publication_year": item.publication_year,
+            "creators": item.creators,
+            "embeddings": embeddings
+        }
+    
+    async def _get_user_items_with_embeddings(
+        self,
+        db: Session,
+        user_id: str,
+        library_id: Optional[str] = None,
+        exclude_item_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get user's items that have embeddings"""
+        query = self._user_items_query(db, user_id)
         
         if library_id:
             query = query.filter(ZoteroLibrary.id == library_id)
@@ -600,17 +615,55 @@ class ZoteroSimilarityService:
         items_with_embeddings = []
         for item in items:
             if item.item_metadata and "embeddings" in item.item_metadata:
-                items_with_embeddings.append({
-                    "item_id": item.id,
-                    "title": item.title,
-                    "item_type": item.item_type,
-                    "publication_year": item.publication_year,
-                    "creators": item.creators,
-                    "embeddings": item.item_metadata["embeddings"]["embeddings"]
-                })
+                items_with_embeddings.append(
+                    self._item_embedding_entry(item, item.item_metadata["embeddings"]["embeddings"])
+                )
         
         return items_with_embeddings
     
+    async def _get_similarity_index(self, db: Session, user_id: str) -> ZoteroSimilarityIndex:
+        """
+        Get the user's similarity index, bringing it up to date with the library
+        
+        A count/max(updated_at) fingerprint detects imports, updates and
+        deletions; only then are removed items dropped and items updated since
+        the last refresh reloaded.
+        """
+        fingerprint = tuple(self._user_items_query(
+            db, user_id, func.count(ZoteroItem.id), func.max(ZoteroItem.updated_at)
+        ).one())
+        
+        index = self.similarity_indexes.get(user_id)
+        if index is None:
+            index = ZoteroSimilarityIndex()
+            self.similarity_indexes[user_id] = index
+            while len(self.similarity_indexes) > self.max_cached_indexes:
+                self.similarity_indexes.popitem(last=False)
+        self.similarity_indexes.move_to_end(user_id)
+        
+        if index.fingerprint == fingerprint:
+            return index
+        
+        if len(index):
+            live_ids = {row[0] for row in self._user_items_query(db, user_id, ZoteroItem.id)}
+            for removed_id in [i for i in index.item_ids if i not in live_ids]:
+                index.remove(removed_id)
+        
+        query = self._user_items_query(db, user_id)
+        if index.updated_through is not None:
+            query = query.filter(ZoteroItem.updated_at >= index.updated_through)
+        
+        for item in query.all():
+            if item.item_metadata and "embeddings" in item.item_metadata:
+                index.upsert(self._item_embedding_entry(item, item.item_metadata["embeddings"]["embeddings"]))
+            else:
+                index.remove(item.id)
+        
+        index.fingerprint = fingerprint
+        index.updated_through = fingerprint[1]
+        logger.info(f"Refreshed similarity index for user {user_id} ({len(index)} items)")
+        return index
+    
     async def _get_stored_embeddings(self, db: Session, item_id: str) -> Optional[Dict[str, Any]]:
         """Get stored embeddings for an item"""
         item = db.query(ZoteroItem).filter(ZoteroItem.id == item_id).first()
@@ -15,6 +15,7 @@ from models.zotero_models import (
 )
 from models.zotero_schemas import SyncType, SyncStatus
 from services.zotero.zotero_client import ZoteroAPIClient, ZoteroAPIError
+from services.zotero.zotero_bulk_import import ZoteroItemBulkWriter, iter_item_pages, iter_items_by_key
 
 logger = logging.getLogger(__name__)
 
@@ -378,109 +379,38 @@ class ZoteroLibrarySyncService:
         library: ZoteroLibrary,
         progress: ZoteroSyncProgress
     ):
-        """Import items for a library with pagination"""
+        """Import items for a library, fetching pages ahead of the bulk writes"""
         
         try:
-            # Get items in batches
-            batch_size = 100
-            start = 0
+            writer = ZoteroItemBulkWriter(db, library, self._transform_item_data)
             total_items = 0
             
-            while True:
-                items_data = await api_client.get_items(
-                    connection.access_token,
-                    library.library_type,
-                    library.zotero_library_id,
-                    limit=batch_size,
-                    start=start
-                )
-                
-                if not items_data:
-                    break
-                
+            async for start, items_data in iter_item_pages(
+                api_client,
+                connection.access_token,
+                library.library_type,
+                library.zotero_library_id
+            ):
                 logger.info(f"Processing batch of {len(items_data)} items (start: {start})")
                 
-                for item_data in items_data:
-                    try:
-                        await self._import_single_item(
-                            db, api_client, connection, library, item_data, progress
-                        )
-                        progress.items_processed += 1
-                        total_items += 1
-                        
-                    except Exception as e:
-                        progress.add_error(
-                            f"Failed to import item: {str(e)}",
-                            {"item_key": item_data.get("key")}
-                        )
-                        continue
-                
-                # Check if we got fewer items than requested (end of results)
-                if len(items_data) < batch_size:
-                    break
+                # Written on a worker thread so prefetched pages keep arriving
+                result = await asyncio.to_thread(writer.write_page, items_data)
                 
-                start += batch_size
+                processed = len(items_data) - len(result.failed)
+                progress.items_processed += processed
+                progress.items_added += result.added
+                progress.items_updated += result.updated
+                total_items += processed
                 
-                # Commit periodically to avoid large transactions
-                if total_items % 500 == 0:
-                    db.commit()
-                    logger.info(f"Committed {total_items} items so far")
+                for item_key, error in result.failed:
+                    progress.add_error(f"Failed to import item: {error}", {"item_key": item_key})
             
-            db.commit()
             logger.info(f"Imported {total_items} items for library {library.library_name}")
             
         except Exception as e:
             progress.add_error(f"Failed to import items: {str(e)}")
             raise
     
-    async def _import_single_item(
-        self,
-        db: Session,
-        api_client: ZoteroAPIClient,
-        connection: ZoteroConnection,
-        library: ZoteroLibrary,
-        item_data: Dict[str, Any],
-        progress: ZoteroSyncProgress
-    ):
-        """Import a single item with its metadata"""
-        
-        item_key = item_data["key"]
-        item_version = item_data["version"]
-        data = item_data["data"]
-        
-        # Check if item already exists
-        existing_item = db.query(ZoteroItem).filter(
-            and_(
-                ZoteroItem.library_id == library.id,
-                ZoteroItem.zotero_item_key == item_key
-            )
-        ).first()
-        
-        # Transform Zotero data to our format
-        transformed_data = self._transform_item_data(data)
-        
-        if existing_item:
-            # Update existing item
-            if existing_item.item_version < item_version:
-                self._update_item_from_data(existing_item, transformed_data, item_version)
-                progress.items_updated += 1
-        else:
-            # Create new item
-            new_item = ZoteroItem(
-                library_id=library.id,
-                zotero_item_key=item_key,
-                item_version=item_version,
-                **transformed_data
-            )
-            db.add(new_item)
-            db.flush()  # Get the ID
-            progress.items_added += 1
-            
-            # Handle collections
-            collections = item_data.get("data", {}).get("collections", [])
-            if collections:
-                await self._link_item_to_collections(db, new_item, collections, library)
-    
     def _transform_item_data(self, zotero_data: Dict[str, Any]) -> Dict[str, Any]:
         """Transform Zotero item data to our internal format"""
         
@@ -521,12 +451,13 @@ class ZoteroLibrarySyncService:
             "date_added": self._parse_zotero_date(zotero_data.get("dateAdded")),
             "date_modified": self._parse_zotero_date(zotero_data.get("dateModified")),
             "tags": [tag["tag"] for tag in zotero_data.get("tags", [])],
+            "is_deleted": bool(zotero_data.get("deleted", False)),  # In the Zotero trash
             "extra_fields": {
                 k: v for k, v in zotero_data.items()
                 if k not in [
                     "itemType", "title", "creators", "publicationTitle", "bookTitle",
                     "publisher", "DOI", "ISBN", "ISSN", "url", "abstractNote",
-                    "dateAdded", "dateModified", "tags", "collections", "relations"
+                    "dateAdded", "dateModified", "tags", "collections", "relations", "deleted"
                 ]
             },
             "item_metadata": zotero_data
@@ -534,55 +465,6 @@ class ZoteroLibrarySyncService:
         
         return transformed
     
-    def _update_item_from_data(
-        self,
-        item: ZoteroItem,
-        transformed_data: Dict[str, Any],
-        version: int
-    ):
-        """Update existing item with new data"""
-        
-        for field, value in transformed_data.items():
-            if hasattr(item, field):
-                setattr(item, field, value)
-        
-        item.item_version = version
-        item.updated_at = datetime.now()
-    
-    async def _link_item_to_collections(
-        self,
-        db: Session,
-        item: ZoteroItem,
-        collection_keys: List[str],
-        library: ZoteroLibrary
-    ):
-        """Link an item to its collections"""
-        
-        for collection_key in collection_keys:
-            # Find the collection
-            collection = db.query(ZoteroCollection).filter(
-                and_(
-                    ZoteroCollection.library_id == library.id,
-                    ZoteroCollection.zotero_collection_key == collection_key
-                )
-            ).first()
-            
-            if collection:
-                # Check if link already exists
-                existing_link = db.query(ZoteroItemCollection).filter(
-                    and_(
-                        ZoteroItemCollection.item_id == item.id,
-                        ZoteroItemCollection.collection_id == collection.id
-                    )
-                ).first()
-                
-                if not existing_link:
-                    link = ZoteroItemCollection(
-                        item_id=item.id,
-                        collection_id=collection.id
-                    )
-                    db.add(link)
-    
     def _parse_zotero_date(self, date_str: Optional[str]) -> Optional[datetime]:
         """Parse Zotero date string to datetime"""
         if not date_str:
@@ -733,40 +615,50 @@ class ZoteroLibrarySyncService:
         library: ZoteroLibrary,
         progress: ZoteroSyncProgress
     ):
-        """Perform incremental sync for a single library"""
+        """Apply the changes made in Zotero since the library's stored version"""
+        
+        since_version = library.library_version or 0
         
-        # Get current library version from Zotero
+        # Conditional request for the versions of changed items; a library
+        # with no changes is answered with a 304 and costs nothing further
         try:
-            current_version = await api_client.get_library_version(
+            remote_versions, current_version = await api_client.get_modified_versions(
                 connection.access_token,
                 library.library_type,
-                library.zotero_library_id
+                library.zotero_library_id,
+                "items",
+                since_version,
+                include_trashed=True
             )
         except Exception as e:
-            logger.warning(f"Could not get library version, falling back to full sync: {e}")
+            logger.warning(f"Could not get modified items, falling back to full sync: {e}")
             # Fall back to full sync for this library
             await self._import_single_library(db, api_client, connection, {"id": library.zotero_library_id, "type": library.library_type, "name": library.library_name}, progress)
             return
         
-        # Check if library needs sync
-        if current_version <= library.library_version:
-            logger.info(f"Library {library.library_name} is up to date (version {library.library_version})")
+        if remote_versions is None:
+            logger.info(f"Library {library.library_name} is up to date (version {since_version})")
             return
         
-        logger.info(f"Syncing library {library.library_name} from version {library.library_version} to {current_version}")
+        logger.info(f"Syncing library {library.library_name} from version {since_version} to {current_version}")
         
-        # Get items modified since last sync
-        since_version = library.library_version
+        writer = ZoteroItemBulkWriter(db, library, self._transform_item_data)
         
         try:
-            # Sync collections first
+            # Sync collections first so item links can resolve them
+            progress.current_operation = "syncing_collections"
             await self._incremental_sync_collections(
                 db, api_client, connection, library, since_version, progress
             )
             
-            # Sync items
+            progress.current_operation = "syncing_deletions"
+            await self._sync_deletions(
+                api_client, connection, library, since_version, writer, progress
+            )
+            
+            progress.current_operation = "syncing_items"
             await self._incremental_sync_items(
-                db, api_client, connection, library, since_version, progress
+                api_client, connection, library, remote_versions, writer, progress
             )
             
             # Update library version
@@ -795,7 +687,7 @@ class ZoteroLibrarySyncService:
                 connection.access_token,
                 library.library_type,
                 library.zotero_library_id,
-                since=since_version
+                since_version=since_version
             )
             
             if not collections_data:
@@ -864,131 +756,83 @@ class ZoteroLibrarySyncService:
             progress.add_error(f"Failed to sync collections: {str(e)}")
             raise
     
-    async def _incremental_sync_items(
+    async def _sync_deletions(
         self,
-        db: Session,
         api_client: ZoteroAPIClient,
         connection: ZoteroConnection,
         library: ZoteroLibrary,
         since_version: int,
+        writer: ZoteroItemBulkWriter,
         progress: ZoteroSyncProgress
     ):
-        """Sync items modified since last sync"""
+        """Apply Zotero's deletion feed in bulk"""
         
         try:
-            # Get items modified since last sync in batches
-            batch_size = 100
-            start = 0
+            deleted = await api_client.get_deleted(
+                connection.access_token,
+                library.library_type,
+                library.zotero_library_id,
+                since_version
+            )
             
-            while True:
-                items_data = await api_client.get_items(
-                    connection.access_token,
-                    library.library_type,
-                    library.zotero_library_id,
-                    limit=batch_size,
-                    start=start,
-                    since=since_version
-                )
-                
-                if not items_data:
-                    break
-                
-                logger.info(f"Processing batch of {len(items_data)} modified items (start: {start})")
-                
-                for item_data in items_data:
-                    try:
-                        await self._sync_single_item(
-                            db, api_client, connection, library, item_data, progress
-                        )
-                        progress.items_processed += 1
-                        
-                    except Exception as e:
-                        progress.add_error(
-                            f"Failed to sync item: {str(e)}",
-                            {"item_key": item_data.get("key")}
-                        )
-                        continue
-                
-                # Check if we got fewer items than requested (end of results)
-                if len(items_data) < batch_size:
-                    break
-                
-                start += batch_size
-                
-                # Commit periodically to avoid large transactions
-                if start % 500 == 0:
-                    db.commit()
-                    logger.info(f"Committed {start} items so far")
+            deleted_collections = deleted.get("collections", [])
+            if deleted_collections:
+                removed = writer.delete_collections(deleted_collections)
+                logger.info(f"Deleted {removed} collections from library {library.library_name}")
             
-            db.commit()
+            deleted_items = deleted.get("items", [])
+            if deleted_items:
+                progress.items_deleted += writer.mark_deleted(deleted_items)
             
         except Exception as e:
-            progress.add_error(f"Failed to sync items: {str(e)}")
+            progress.add_error(f"Failed to sync deletions: {str(e)}")
             raise
     
-    async def _sync_single_item(
+    async def _incremental_sync_items(
         self,
-        db: Session,
         api_client: ZoteroAPIClient,
         connection: ZoteroConnection,
         library: ZoteroLibrary,
-        item_data: Dict[str, Any],
+        remote_versions: Dict[str, int],
+        writer: ZoteroItemBulkWriter,
         progress: ZoteroSyncProgress
     ):
-        """Sync a single item with conflict resolution"""
-        
-        item_key = item_data["key"]
-        item_version = item_data["version"]
-        data = item_data["data"]
-        
-        # Find existing item
-        existing_item = db.query(ZoteroItem).filter(
-            and_(
-                ZoteroItem.library_id == library.id,
-                ZoteroItem.zotero_item_key == item_key
-            )
-        ).first()
-        
-        # Check if item is deleted
-        if data.get("deleted", False):
-            if existing_item:
-                existing_item.is_deleted = True
-                existing_item.item_version = item_version
-                existing_item.updated_at = datetime.now()
-                progress.items_deleted += 1
-            return
+        """Fetch and store the modified items whose stored copy is older"""
         
-        # Transform Zotero data to our format
-        transformed_data = self._transform_item_data(data)
-        
-        if existing_item:
-            # Update existing item (Zotero wins conflict resolution)
-            if existing_item.item_version < item_version:
-                self._update_item_from_data(existing_item, transformed_data, item_version)
+        try:
+            # Compare the whole version vector in one query; only items that
+            # are missing or behind locally are fetched
+            local_versions = writer.local_versions(remote_versions)
+            stale_keys = [
+                item_key for item_key, version in remote_versions.items()
+                if (local_versions.get(item_key) or 0) < version
+            ]
+            
+            if not stale_keys:
+                logger.info(f"No item changes to fetch for library {library.library_name}")
+                return
+            
+            logger.info(f"Fetching {len(stale_keys)} of {len(remote_versions)} modified items for library {library.library_name}")
+            
+            async for items_data in iter_items_by_key(
+                api_client,
+                connection.access_token,
+                library.library_type,
+                library.zotero_library_id,
+                stale_keys
+            ):
+                result = await asyncio.to_thread(writer.write_page, items_data)
                 
-                # Update item collections
-                collections = data.get("collections", [])
-                await self._update_item_collections(db, existing_item, collections, library)
+                progress.items_processed += len(items_data) - len(result.failed)
+                progress.items_added += result.added
+                progress.items_updated += result.updated
                 
-                progress.items_updated += 1
-            # If versions are equal or local is newer, skip (shouldn't happen in normal sync)
-        else:
-            # Create new item
-            new_item = ZoteroItem(
-                library_id=library.id,
-                zotero_item_key=item_key,
-                item_version=item_version,
-                **transformed_data
-            )
-            db.add(new_item)
-            db.flush()  # Get the ID
-            
-            # Link to collections
-            collections = data.get("collections", [])
-            if collections:
-                await self._link_item_to_collections(db, new_item, collections, library)
+                for item_key, error in result.failed:
+                    progress.add_error(f"Failed to sync item: {error}", {"item_key": item_key})
             
-            progress.items_added += 1
+        except Exception as e:
+            progress.add_error(f"Failed to sync items: {str(e)}")
+            raise
     
     async def _handle_deleted_collection(
         self,
@@ -1051,36 +895,6 @@ class ZoteroLibrarySyncService:
                 logger.error(f"Failed to update collection hierarchy for {collection_key}: {e}")
                 continue
     
-    async def _update_item_collections(
-        self,
-        db: Session,
-        item: ZoteroItem,
-        collection_keys: List[str],
-        library: ZoteroLibrary
-    ):
-        """Update item collection associations"""
-        
-        # Remove existing associations
-        db.query(ZoteroItemCollection).filter(
-            ZoteroItemCollection.item_id == item.id
-        ).delete()
-        
-        # Add new associations
-        for collection_key in collection_keys:
-            collection = db.query(ZoteroCollection).filter(
-                and_(
-                    ZoteroCollection.library_id == library.id,
-                    ZoteroCollection.zotero_collection_key == collection_key
-                )
-            ).first()
-            
-            if collection:
-                link = ZoteroItemCollection(
-                    item_id=item.id,
-                    collection_id=collection.id
-                )
-                db.add(link)
-    
     async def detect_sync_conflicts(
         self,
         connection_id: str,
@@ -1133,7 +947,7 @@ class ZoteroLibrarySyncService:
                 async with self.client as api_client:
                     for library in libraries:
                         library_conflicts = await self._detect_library_conflicts(
-                            api_client, connection, library
+                            db, api_client, connection, library
                         )
                         
                         if library_conflicts["conflict_count"] > 0:
@@ -1154,11 +968,12 @@ class ZoteroLibrarySyncService:
     
     async def _detect_library_conflicts(
         self,
+        db: Session,
         api_client: ZoteroAPIClient,
         connection: ZoteroConnection,
         library: ZoteroLibrary
     ) -> Dict[str, Any]:
-        """Detect conflicts for a single library"""
+        """Detect conflicts for a single library by comparing version vectors"""
         
         library_conflicts = {
             "library_id": library.id,
@@ -1173,54 +988,74 @@ class ZoteroLibrarySyncService:
         }
         
         try:
-            # Get current library version
-            current_version = await api_client.get_library_version(
+            since_version = library.library_version or 0
+            remote_versions, current_version = await api_client.get_modified_versions(
                 connection.access_token,
                 library.library_type,
-                library.zotero_library_id
+                library.zotero_library_id,
+                "items",
+                since_version,
+                include_trashed=True
             )
             
-            # Check version mismatch
-            if current_version > library.library_version:
-                library_conflicts["conflict_count"] += 1
-                library_conflicts["conflict_types"]["version_mismatch"] = 1
-                library_conflicts["conflicts"].append({
-                    "type": "version_mismatch",
-                    "description": f"Library version mismatch: local {library.library_version}, remote {current_version}",
-                    "local_version": library.library_version,
-                    "remote_version": current_version
-                })
-                
-                # Get modified items since last sync
-                modified_items = await api_client.get_items(
-                    connection.access_token,
-                    library.library_type,
-                    library.zotero_library_id,
-                    since=library.library_version,
-                    limit=100  # Limit for conflict detection
-                )
-                
-                for item_data in modified_items:
-                    data = item_data["data"]
-                    if data.get("deleted", False):
-                        library_conflicts["conflict_count"] += 1
-                        library_conflicts["conflict_types"]["deleted_items"] += 1
-                        library_conflicts["conflicts"].append({
-                            "type": "deleted_item",
-                            "description": f"Item deleted in Zotero: {data.get('title', 'Untitled')}",
-                            "item_key": item_data["key"],
-                            "item_title": data.get("title", "Untitled")
-                        })
-                    else:
-                        library_conflicts["conflict_count"] += 1
-                        library_conflicts["conflict_types"]["modified_items"] += 1
-                        library_conflicts["conflicts"].append({
-                            "type": "modified_item",
-                            "description": f"Item modified in Zotero: {data.get('title', 'Untitled')}",
-                            "item_key": item_data["key"],
-                            "item_title": data.get("title", "Untitled"),
-                            "item_version": item_data["version"]
-                        })
+            # Not modified since the last sync
+            if remote_versions is None:
+                return library_conflicts
+            
+            library_conflicts["conflict_count"] += 1
+            library_conflicts["conflict_types"]["version_mismatch"] = 1
+            library_conflicts["conflicts"].append({
+                "type": "version_mismatch",
+                "description": f"Library version mismatch: local {since_version}, remote {current_version}",
+                "local_version": since_version,
+                "remote_version": current_version
+            })
+            
+            deleted = await api_client.get_deleted(
+                connection.access_token,
+                library.library_type,
+                library.zotero_library_id,
+                since_version
+            )
+            deleted_keys = set(deleted.get("items", []))
+            changed_keys = list(remote_versions) + list(deleted_keys)
+            if not changed_keys:
+                return library_conflicts
+            
+            # Compare the remote version vector with stored items in one query
+            local_items = db.query(
+                ZoteroItem.zotero_item_key,
+                ZoteroItem.item_version,
+                ZoteroItem.is_deleted,
+                ZoteroItem.title
+            ).filter(
+                ZoteroItem.library_id == library.id,
+                ZoteroItem.zotero_item_key.in_(changed_keys)
+            ).all()
+            
+            for item_key, local_version, is_deleted, title in local_items:
+                if item_key in deleted_keys:
+                    if is_deleted:
+                        continue
+                    library_conflicts["conflict_count"] += 1
+                    library_conflicts["conflict_types"]["deleted_items"] += 1
+                    library_conflicts["conflicts"].append({
+                        "type": "deleted_item",
+                        "description": f"Item deleted in Zotero: {title or 'Untitled'}",
+                        "item_key": item_key,
+                        "item_title": title or "Untitled"
+                    })
+                elif (local_version or 0) < remote_versions[item_key]:
+                    library_conflicts["conflict_count"] += 1
+                    library_conflicts["conflict_types"]["modified_items"] += 1
+                    library_conflicts["conflicts"].append({
+                        "type": "modified_item",
+                        "description": f"Item modified in Zotero: {title or 'Untitled'}",
+                        "item_key": item_key,
+                        "item_title": title or "Untitled",
+                        "item_version": remote_versions[item_key],
+                        "local_version": local_version
+                    })
                 
         except Exception as e:
             logger.error(f"Failed to detect conflicts for library {library.library_name}: {e}")
@@ -1277,454 +1112,7 @@ class ZoteroLibrarySyncService:
             result["message"] = f"Failed to resolve conflicts: {str(e)}"
             logger.error(f"Failed to resolve sync conflicts: {e}")
         
-        return resultsion = 0
-        
-        # Check if sync is needed
-        if current_version <= library.library_version:
-            logger.info(f"Library {library.library_name} is up to date (version {library.library_version})")
-            return
-        
-        logger.info(f"Syncing library {library.library_name} from version {library.library_version} to {current_version}")
-        
-        # Sync collections incrementally
-        progress.current_operation = "syncing_collections"
-        await self._incremental_sync_collections(
-            db, api_client, connection, library, progress
-        )
-        
-        # Sync items incrementally
-        progress.current_operation = "syncing_items"
-        await self._incremental_sync_items(
-            db, api_client, connection, library, progress
-        )
-        
-        # Update library version
-        library.library_version = current_version
-        library.last_sync_at = datetime.now()
-        db.commit()
-    
-    async def _incremental_sync_collections(
-        self,
-        db: Session,
-        api_client: ZoteroAPIClient,
-        connection: ZoteroConnection,
-        library: ZoteroLibrary,
-        progress: ZoteroSyncProgress
-    ):
-        """Incrementally sync collections"""
-        
-        try:
-            # Get collections modified since last sync
-            collections_data = await api_client.get_collections(
-                connection.access_token,
-                library.library_type,
-                library.zotero_library_id,
-                since_version=library.library_version
-            )
-            
-            logger.info(f"Found {len(collections_data)} modified collections")
-            
-            for collection_data in collections_data:
-                try:
-                    await self._sync_single_collection(
-                        db, collection_data, library, progress
-                    )
-                    progress.collections_processed += 1
-                    
-                except Exception as e:
-                    progress.add_error(
-                        f"Failed to sync collection: {str(e)}",
-                        {"collection_key": collection_data.get("key")}
-                    )
-                    continue
-            
-            db.commit()
-            
-        except Exception as e:
-            progress.add_error(f"Failed to sync collections: {str(e)}")
-            raise
-    
-    async def _sync_single_collection(
-        self,
-        db: Session,
-        collection_data: Dict[str, Any],
-        library: ZoteroLibrary,
-        progress: ZoteroSyncProgress
-    ):
-        """Sync a single collection with conflict resolution"""
-        
-        collection_key = collection_data["key"]
-        collection_version = collection_data["version"]
-        data = collection_data["data"]
-        
-        # Check if collection exists
-        existing_collection = db.query(ZoteroCollection).filter(
-            and_(
-                ZoteroCollection.library_id == library.id,
-                ZoteroCollection.zotero_collection_key == collection_key
-            )
-        ).first()
-        
-        if existing_collection:
-            # Handle conflict resolution - Zotero is source of truth
-            if collection_version > existing_collection.collection_version:
-                # Update existing collection
-                existing_collection.collection_name = data["name"]
-                existing_collection.collection_version = collection_version
-                existing_collection.collection_metadata = data
-                existing_collection.updated_at = datetime.now()
-                
-                logger.debug(f"Updated collection {collection_key} to version {collection_version}")
-            else:
-                logger.debug(f"Collection {collection_key} is up to date")
-        else:
-            # Create new collection
-            new_collection = ZoteroCollection(
-                library_id=library.id,
-                zotero_collection_key=collection_key,
-                collection_name=data["name"],
-                collection_version=collection_version,
-                collection_metadata=data
-            )
-            db.add(new_collection)
-            logger.debug(f"Created new collection {collection_key}")
-    
-    async def _incremental_sync_items(
-        self,
-        db: Session,
-        api_client: ZoteroAPIClient,
-        connection: ZoteroConnection,
-        library: ZoteroLibrary,
-        progress: ZoteroSyncProgress
-    ):
-        """Incrementally sync items"""
-        
-        try:
-            # Get items modified since last sync
-            batch_size = 100
-            start = 0
-            
-            while True:
-                items_data = await api_client.get_items(
-                    connection.access_token,
-                    library.library_type,
-                    library.zotero_library_id,
-                    since_version=library.library_version,
-                    limit=batch_size,
-                    start=start
-                )
-                
-                if not items_data:
-                    break
-                
-                logger.info(f"Processing batch of {len(items_data)} modified items (start: {start})")
-                
-                for item_data in items_data:
-                    try:
-                        await self._sync_single_item(
-                            db, api_client, connection, library, item_data, progress
-                        )
-                        progress.items_processed += 1
-                        
-                    except Exception as e:
-                        progress.add_error(
-                            f"Failed to sync item: {str(e)}",
-                            {"item_key": item_data.get("key")}
-                        )
-                        continue
-                
-                # Check if we got fewer items than requested (end of results)
-                if len(items_data) < batch_size:
-                    break
-                
-                start += batch_size
-                
-                # Commit periodically
-                if progress.items_processed % 100 == 0:
-                    db.commit()
-            
-            db.commit()
-            
-        except Exception as e:
-            progress.add_error(f"Failed to sync items: {str(e)}")
-            raise
-    
-    async def _sync_single_item(
-        self,
-        db: Session,
-        api_client: ZoteroAPIClient,
-        connection: ZoteroConnection,
-        library: ZoteroLibrary,
-        item_data: Dict[str, Any],
-        progress: ZoteroSyncProgress
-    ):
-        """Sync a single item with conflict resolution"""
-        
-        item_key = item_data["key"]
-        item_version = item_data["version"]
-        data = item_data["data"]
-        
-        # Check if item exists
-        existing_item = db.query(ZoteroItem).filter(
-            and_(
-                ZoteroItem.library_id == library.id,
-                ZoteroItem.zotero_item_key == item_key
-            )
-        ).first()
-        
-        # Transform Zotero data to our format
-        transformed_data = self._transform_item_data(data)
-        
-        if existing_item:
-            # Handle conflict resolution - Zotero is source of truth
-            if item_version > existing_item.item_version:
-                # Check if item was deleted in Zotero
-                if data.get("deleted", False):
-                    existing_item.is_deleted = True
-                    existing_item.item_version = item_version
-                    existing_item.updated_at = datetime.now()
-                    progress.items_deleted += 1
-                    logger.debug(f"Marked item {item_key} as deleted")
-                else:
-                    # Update existing item
-                    self._update_item_from_data(existing_item, transformed_data, item_version)
-                    progress.items_updated += 1
-                    logger.debug(f"Updated item {item_key} to version {item_version}")
-                    
-                    # Update collections
-                    collections = data.get("collections", [])
-                    await self._update_item_collections(db, existing_item, collections, library)
-            else:
-                logger.debug(f"Item {item_key} is up to date")
-        else:
-            # Create new item (unless it's deleted)
-            if not data.get("deleted", False):
-                new_item = ZoteroItem(
-                    library_id=library.id,
-                    zotero_item_key=item_key,
-                    item_version=item_version,
-                    **transformed_data
-                )
-                db.add(new_item)
-                db.flush()  # Get the ID
-                progress.items_added += 1
-                logger.debug(f"Created new item {item_key}")
-                
-                # Handle collections
-                collections = data.get("collections", [])
-                if collections:
-                    await self._link_item_to_collections(db, new_item, collections, library)
-    
-    async def _update_item_collections(
-        self,
-        db: Session,
-        item: ZoteroItem,
-        collection_keys: List[str],
-        library: ZoteroLibrary
-    ):
-        """Update item's collection associations"""
-        
-        # Remove existing associations
-        db.query(ZoteroItemCollection).filter(
-            ZoteroItemCollection.item_id == item.id
-        ).delete()
-        
-        # Add new associations
-        for collection_key in collection_keys:
-            collection = db.query(ZoteroCollection).filter(
-                and_(
-                    ZoteroCollection.library_id == library.id,
-                    ZoteroCollection.zotero_collection_key == collection_key
-                )
-            ).first()
-            
-            if collection:
-                link = ZoteroItemCollection(
-                    item_id=item.id,
-                    collection_id=collection.id
-                )
-                db.add(link)
-    
-    async def detect_sync_conflicts(
-        self,
-        connection_id: str,
-        library_ids: Optional[List[str]] = None
-    ) -> Dict[str, Any]:
-        """
-        Detect potential sync conflicts before performing sync
-        
-        Args:
-            connection_id: Zotero connection ID
-            library_ids: Specific library IDs to check
-            
-        Returns:
-            Dictionary with conflict information
-        """
-        conflicts = {
-            "has_conflicts": False,
-            "libraries": [],
-            "total_conflicts": 0,
-            "conflict_types": {
-                "version_mismatch": 0,
-                "deleted_items": 0,
-                "modified_items": 0
-            }
-        }
-        
-        try:
-            async with get_db() as db:
-                # Get connection
-                connection = db.query(ZoteroConnection).filter(
-                    ZoteroConnection.id == connection_id
-                ).first()
-                
-                if not connection:
-                    raise ValueError(f"Connection {connection_id} not found")
-                
-                # Get libraries
-                libraries_query = db.query(ZoteroLibrary).filter(
-                    ZoteroLibrary.connection_id == connection_id,
-                    ZoteroLibrary.is_active == True
-                )
-                
-                if library_ids:
-                    libraries_query = libraries_query.filter(
-                        ZoteroLibrary.zotero_library_id.in_(library_ids)
-                    )
-                
-                libraries = libraries_query.all()
-                
-                # Check each library for conflicts
-                async with self.client as api_client:
-                    for library in libraries:
-                        library_conflicts = await self._detect_library_conflicts(
-                            api_client, connection, library
-                        )
-                        
-                        if library_conflicts["conflict_count"] > 0:
-                            conflicts["has_conflicts"] = True
-                            conflicts["total_conflicts"] += library_conflicts["conflict_count"]
-                            conflicts["libraries"].append(library_conflicts)
-                            
-                            # Update conflict type counts
-                            for conflict_type, count in library_conflicts["conflict_types"].items():
-                                conflicts["conflict_types"][conflict_type] += count
-                
-        except Exception as e:
-            logger.error(f"Error detecting sync conflicts: {e}")
-            conflicts["error"] = str(e)
-        
-        return conflicts
-    
-    async def _detect_library_conflicts(
-        self,
-        api_client: ZoteroAPIClient,
-        connection: ZoteroConnection,
-        library: ZoteroLibrary
-    ) -> Dict[str, Any]:
-        """Detect conflicts for a single library"""
-        
-        library_conflicts = {
-            "library_id": library.zotero_library_id,
-            "library_name": library.library_name,
-            "conflict_count": 0,
-            "conflict_types": {
-                "version_mismatch": 0,
-                "deleted_items": 0,
-                "modified_items": 0
-            },
-            "conflicts": []
-        }
-        
-        try:
-            # Get current library version
-            current_version = await api_client.get_library_version(
-                connection.access_token,
-                library.library_type,
-                library.zotero_library_id
-            )
-            
-            if current_version > library.library_version:
-                library_conflicts["conflict_types"]["version_mismatch"] = 1
-                library_conflicts["conflict_count"] += 1
-                library_conflicts["conflicts"].append({
-                    "type": "version_mismatch",
-                    "description": f"Library version mismatch: local={library.library_version}, remote={current_version}",
-                    "local_version": library.library_version,
-                    "remote_version": current_version
-                })
-                
-                # Check for modified items
-                try:
-                    modified_items = await api_client.get_items(
-                        connection.access_token,
-                        library.library_type,
-                        library.zotero_library_id,
-                        since_version=library.library_version,
-                        limit=10  # Just check first 10 for conflict detection
-                    )
-                    
-                    for item_data in modified_items:
-                        if item_data["data"].get("deleted", False):
-                            library_conflicts["conflict_types"]["deleted_items"] += 1
-                        else:
-                            library_conflicts["conflict_types"]["modified_items"] += 1
-                        
-                        library_conflicts["conflict_count"] += 1
-                        library_conflicts["conflicts"].append({
-                            "type": "deleted_item" if item_data["data"].get("deleted", False) else "modified_item",
-                            "item_key": item_data["key"],
-                            "item_title": item_data["data"].get("title", "Untitled"),
-                            "item_version": item_data["version"]
-                        })
-                
-                except Exception as e:
-                    logger.warning(f"Could not check for modified items: {e}")
-        
-        except Exception as e:
-            logger.warning(f"Could not detect conflicts for library {library.library_name}: {e}")
-        
-        return library_conflicts
-    
-    async def resolve_sync_conflicts(
-        self,
-        connection_id: str,
-        resolution_strategy: str = "zotero_wins",
-        library_ids: Optional[List[str]] = None
-    ) -> Dict[str, Any]:
-        """
-        Resolve sync conflicts using specified strategy
-        
-        Args:
-            connection_id: Zotero connection ID
-            resolution_strategy: Strategy for conflict resolution
-                - "zotero_wins": Zotero data takes precedence (default)
-                - "local_wins": Local data takes precedence
-                - "manual": Return conflicts for manual resolution
-            library_ids: Specific library IDs to resolve
-            
-        Returns:
-            Dictionary with resolution results
-        """
-        if resolution_strategy not in ["zotero_wins", "local_wins", "manual"]:
-            raise ValueError(f"Invalid resolution strategy: {resolution_strategy}")
-        
-        # For now, we implement "zotero_wins" strategy (which is our default behavior)
-        # This is essentially the same as incremental sync
-        if resolution_strategy == "zotero_wins":
-            progress = await self.incremental_sync(connection_id, library_ids)
-            return {
-                "strategy": resolution_strategy,
-                "resolved": True,
-                "sync_result": progress.get_progress_dict()
-            }
-        else:
-            # Other strategies would be implemented here
-            return {
-                "strategy": resolution_strategy,
-                "resolved": False,
-                "message": f"Resolution strategy '{resolution_strategy}' not yet implemented"
-            }
+        return result
     
     async def cancel_sync(self, sync_id: str) -> bool:
         """Cancel an active sync"""
@@ -0,0 +1 @@
+"""Tests for RL experience memory components."""
@@ -0,0 +1,41 @@
+"""Unit tests for conversation grouping in the conversation experience buffer."""
+
+import asyncio
+from dataclasses import dataclass, field
+
+from backend.rl.memory.experience_buffer import ConversationExperienceBuffer
+
+
+@dataclass
+class State:
+    conversation_id: str
+    user_id: str
+
+
+@dataclass
+class Reward:
+    total_reward: float = 1.0
+
+
+@dataclass
+class Experience:
+    experience_id: str
+    state: State
+    reward: Reward = field(default_factory=Reward)
+
+
+def test_group_indices_stay_consistent_after_wraparound():
+    buffer = ConversationExperienceBuffer(config=None, max_size=8)
+    for i in range(29):
+        experience = Experience(f"e{i}", State(f"conv{i // 5}", "heavy" if i % 4 else f"user{i}"))
+        asyncio.run(buffer.store_experience(experience))
+
+    expected_conversations = {}
+    expected_users = {}
+    for slot in buffer.chronological_slots():
+        state = buffer.experiences[slot].state
+        expected_conversations.setdefault(state.conversation_id, []).append(slot)
+        expected_users.setdefault(state.user_id, []).append(slot)
+
+    assert {key: list(slots) for key, slots in buffer.conversation_groups.items()} == expected_conversations
+    assert {key: list(slots) for key, slots in buffer.user_experiences.items()} == expected_users
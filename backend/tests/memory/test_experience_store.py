@@ -0,0 +1,137 @@
+"""Unit tests for the columnar experience store."""
+
+import asyncio
+import os
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from backend.rl.memory.experience_buffer import ExperienceBuffer
+from backend.rl.memory.experience_store import ExperienceStore, StoredExperienceList
+
+
+@dataclass
+class Reward:
+    total_reward: float
+    safety: float = 1.0
+
+
+@dataclass
+class State:
+    conversation_id: str
+    user_id: str
+
+    def to_tensor(self):
+        return np.array([len(self.conversation_id), 1.0], dtype=np.float32)
+
+
+@dataclass
+class Action:
+    response_text: str
+
+
+@dataclass
+class Experience:
+    experience_id: str
+    state: State
+    action: Action
+    reward: Reward
+    next_state: Optional[State] = None
+    done: bool = False
+    timestamp: datetime = field(default_factory=lambda: datetime(2024, 1, 1))
+
+
+def make_experience(i):
+    return Experience(
+        experience_id=f"e{i}",
+        state=State(f"conv{i // 2}", "user"),
+        action=Action(f"response {i} ✓"),
+        reward=Reward(i / 10),
+        done=i % 3 == 0
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ExperienceStore(str(tmp_path / "main"))
+
+
+def test_appended_experiences_are_readable_by_column_and_record(store):
+    store.append([make_experience(i) for i in range(3)], priorities=[1.0, 2.0, 3.0])
+    store.append([make_experience(3)])
+
+    assert len(store) == 4
+    np.testing.assert_allclose(store.column("reward"), [0.0, 0.1, 0.2, 0.3], rtol=1e-6)
+    assert store.column("done").tolist() == [1, 0, 0, 1]
+    assert store.column("priority").tolist() == [1.0, 2.0, 3.0, 0.0]
+    assert store.texts("response_text", 1, 3) == ["response 1 ✓", "response 2 ✓"]
+    assert store.features("state").shape == (4, 2)
+    assert store.features("next_state") is None
+    assert store.read(2) == make_experience(2)
+
+
+def test_reopened_store_ignores_uncommitted_bytes(store, tmp_path):
+    store.append([make_experience(i) for i in range(2)])
+    with open(tmp_path / "main" / "reward.col", "ab") as f:
+        f.write(b"partial")
+
+    reopened = ExperienceStore(str(tmp_path / "main"))
+
+    assert len(reopened) == 2
+    assert os.path.getsize(tmp_path / "main" / "reward.col") == 8
+    assert reopened.texts("experience_id") == ["e0", "e1"]
+
+
+def test_compaction_keeps_logical_indices(store, tmp_path):
+    store.append([make_experience(i) for i in range(5)], priorities=range(5))
+
+    store.compact(keep_last=2)
+    reopened = ExperienceStore(str(tmp_path / "main"))
+
+    for compacted in (store, reopened):
+        assert (compacted.start, compacted.end) == (3, 5)
+        assert compacted.read(4).experience_id == "e4"
+        assert compacted.column("priority").tolist() == [3.0, 4.0]
+        assert compacted.texts("conversation_id") == ["conv1", "conv2"]
+        with pytest.raises(IndexError):
+            compacted.read(2)
+    assert not (tmp_path / "main.old").exists()
+
+
+def test_priorities_are_updated_in_place(store):
+    store.append([make_experience(i) for i in range(3)])
+
+    store.set_priorities(1, [0.5, 0.25])
+
+    assert store.column("priority").tolist() == [0.0, 0.5, 0.25]
+
+
+def test_stored_list_reads_lazily_and_keeps_new_entries_in_memory(store):
+    store.append([make_experience(i) for i in range(4)])
+    experiences = StoredExperienceList(store, start=1, count=3)
+
+    experiences[0] = make_experience(10)
+    experiences.append(make_experience(11))
+
+    assert len(experiences) == 4
+    assert [e.experience_id for e in experiences] == ["e10", "e2", "e3", "e11"]
+    assert experiences[-1].experience_id == "e11"
+
+
+def test_restored_buffer_can_be_sampled(store):
+    buffer = ExperienceBuffer(config=None, max_size=8)
+    for i in range(5):
+        asyncio.run(buffer.store_experience(make_experience(i)))
+    buffer.save_to(store)
+
+    restored = ExperienceBuffer(config=None, max_size=8)
+    restored.load_from(store)
+    batch = asyncio.run(restored.sample_batch(3))
+
+    assert len({e.experience_id for e in batch}) == 3
+    assert {e.experience_id for e in batch} <= {f"e{i}" for i in range(5)}
+    assert len(random.sample(restored.experiences, 5)) == 5
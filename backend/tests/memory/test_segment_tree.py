@@ -0,0 +1,62 @@
+"""Unit tests for the priority segment trees used by prioritized replay."""
+
+import numpy as np
+import pytest
+
+from backend.rl.memory.segment_tree import MinTree, SumTree
+
+
+@pytest.fixture
+def priorities():
+    return np.random.default_rng(0).random(777) + 0.01
+
+
+def filled(tree, values):
+    for index, value in enumerate(values):
+        tree[index] = value
+    return tree
+
+
+def test_single_updates_keep_totals(priorities):
+    sum_tree = filled(SumTree(1000), priorities)
+    min_tree = filled(MinTree(1000), priorities)
+
+    assert sum_tree.reduce() == pytest.approx(priorities.sum())
+    assert min_tree.reduce() == priorities.min()
+    np.testing.assert_array_equal(sum_tree[np.arange(777)], priorities)
+
+
+def test_batch_updates_match_single_updates(priorities):
+    rng = np.random.default_rng(1)
+    indices = rng.integers(0, len(priorities), 100)
+    values = rng.random(100)
+
+    batched = filled(SumTree(777), priorities)
+    batched.update(indices, values)
+    priorities[indices] = values
+    expected = filled(SumTree(777), priorities)
+
+    np.testing.assert_allclose(batched.tree, expected.tree)
+
+    min_tree = filled(MinTree(777), priorities)
+    min_tree.update(indices[:3], [0.001, 5.0, 5.0])
+    priorities[indices[:3]] = [0.001, 5.0, 5.0]
+    assert min_tree.reduce() == priorities.min()
+
+
+def test_prefix_sum_search_matches_cumulative_sums(priorities):
+    tree = filled(SumTree(len(priorities)), priorities)
+    cumulative = np.cumsum(priorities)
+    targets = np.random.default_rng(2).random(5000) * priorities.sum()
+
+    found = tree.find_prefix_sum(targets)
+
+    np.testing.assert_array_equal(found, np.searchsorted(cumulative, targets))
+
+
+def test_prefix_sum_search_never_lands_on_empty_slots():
+    tree = SumTree(8)
+    for index in range(5):
+        tree[index] = 1.0
+
+    assert tree.find_prefix_sum([0.0, 4.999999, 5.0]).tolist() == [0, 4, 4]
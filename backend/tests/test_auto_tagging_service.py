@@ -87,14 +87,11 @@ class TestAutoTaggingService:
             ]
         })
     
-    @patch('services.auto_tagging_service.requests.post')
+    @patch('services.llm_gateway.LLMGateway.generate', new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_generate_topic_tags(self, mock_post, service, mock_llm_response_topics):
+    async def test_generate_topic_tags(self, mock_generate, service, mock_llm_response_topics):
         """Test topic tag generation"""
-        mock_response = Mock()
-        mock_response.json.return_value = {"response": mock_llm_response_topics}
-        mock_response.raise_for_status.return_value = None
-        mock_post.return_value = mock_response
+        mock_generate.return_value = mock_llm_response_topics
         
         content = "Sample content about machine learning"
         tags = await service._generate_topic_tags(content)
@@ -105,14 +102,11 @@ class TestAutoTaggingService:
         assert tags[0]['confidence'] == 0.95
         assert 'explanation' in tags[0]
     
-    @patch('services.auto_tagging_service.requests.post')
+    @patch('services.llm_gateway.LLMGateway.generate', new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_generate_domain_tags(self, mock_post, service, mock_llm_response_domains):
+    async def test_generate_domain_tags(self, mock_generate, service, mock_llm_response_domains):
         """Test domain tag generation"""
-        mock_response = Mock()
-        mock_response.json.return_value = {"response": mock_llm_response_domains}
-        mock_response.raise_for_status.return_value = None
-        mock_post.return_value = mock_response
+        mock_generate.return_value = mock_llm_response_domains
         
         content = "Sample content about computer science"
         tags = await service._generate_domain_tags(content)
@@ -122,14 +116,11 @@ class TestAutoTaggingService:
         assert tags[0]['type'] == 'domain'
         assert tags[0]['confidence'] == 0.92
     
-    @patch('services.auto_tagging_service.requests.post')
+    @patch('services.llm_gateway.LLMGateway.generate', new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_generate_complexity_tags(self, mock_post, service, mock_llm_response_complexity):
+    async def test_generate_complexity_tags(self, mock_generate, service, mock_llm_response_complexity):
         """Test complexity tag generation"""
-        mock_response = Mock()
-        mock_response.json.return_value = {"response": mock_llm_response_complexity}
-        mock_response.raise_for_status.return_value = None
-        mock_post.return_value = mock_response
+        mock_generate.return_value = mock_llm_response_complexity
         
         content = "Sample technical content"
         tags = await service._generate_complexity_tags(content)
@@ -141,14 +132,11 @@ class TestAutoTaggingService:
         assert overall_tag['type'] == 'complexity'
         assert overall_tag['confidence'] == 0.85
     
-    @patch('services.auto_tagging_service.requests.post')
+    @patch('services.llm_gateway.LLMGateway.generate', new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_generate_sentiment_tags(self, mock_post, service, mock_llm_response_sentiment):
+    async def test_generate_sentiment_tags(self, mock_generate, service, mock_llm_response_sentiment):
         """Test sentiment tag generation"""
-        mock_response = Mock()
-        mock_response.json.return_value = {"response": mock_llm_response_sentiment}
-        mock_response.raise_for_status.return_value = None
-        mock_post.return_value = mock_response
+        mock_generate.return_value = mock_llm_response_sentiment
         
         content = "Sample content with neutral tone"
         tags = await service._generate_sentiment_tags(content)
@@ -158,14 +146,11 @@ class TestAutoTaggingService:
         assert any('emotional_tone_neutral' in name for name in tag_names)
         assert all(tag['type'] == 'sentiment' for tag in tags)
     
-    @patch('services.auto_tagging_service.requests.post')
+    @patch('services.llm_gateway.LLMGateway.generate', new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_generate_category_tags(self, mock_post, service, mock_llm_response_categories):
+    async def test_generate_category_tags(self, mock_generate, service, mock_llm_response_categories):
         """Test category tag generation"""
-        mock_response = Mock()
-        mock_response.json.return_value = {"response": mock_llm_response_categories}
-        mock_response.raise_for_status.return_value = None
-        mock_post.return_value = mock_response
+        mock_generate.return_value = mock_llm_response_categories
         
         content = "Sample tutorial content"
         tags = await service._generate_category_tags(content)
@@ -175,11 +160,11 @@ class TestAutoTaggingService:
         assert tags[0]['type'] == 'category'
         assert tags[0]['confidence'] == 0.90
     
-    @patch('services.auto_tagging_service.requests.post')
+    @patch('services.llm_gateway.LLMGateway.generate', new_callable=AsyncMock)
     @pytest.mark.asyncio
     async def test_generate_document_tags_integration(
         self, 
-        mock_post, 
+        mock_generate, 
         service, 
         mock_db, 
         sample_content,
@@ -199,12 +184,8 @@ class TestAutoTaggingService:
             mock_llm_response_categories
         ]
         
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_post.return_value = mock_response
-        
         # Set up side effects for multiple calls
-        mock_response.json.side_effect = [{"response": resp} for resp in responses]
+        mock_generate.side_effect = responses
         
         # Mock database operations
         mock_tag_instances = []
@@ -395,23 +376,20 @@ class TestAutoTaggingService:
         assert any("low confidence" in issue for issue in result['issues'])
         assert any("remove low-confidence" in rec for rec in result['recommendations'])
     
-    @patch('services.auto_tagging_service.requests.post')
+    @patch('services.llm_gateway.LLMGateway.generate', new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_llm_call_error_handling(self, mock_post, service):
+    async def test_llm_call_error_handling(self, mock_generate, service):
         """Test LLM call error handling"""
-        mock_post.side_effect = Exception("Connection error")
+        mock_generate.side_effect = Exception("Connection error")
         
         with pytest.raises(Exception):
             await service._call_llm("test prompt")
     
-    @patch('services.auto_tagging_service.requests.post')
+    @patch('services.llm_gateway.LLMGateway.generate', new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_tag_generation_with_json_parse_error(self, mock_post, service):
+    async def test_tag_generation_with_json_parse_error(self, mock_generate, service):
         """Test handling of invalid JSON responses from LLM"""
-        mock_response = Mock()
-        mock_response.json.return_value = {"response": "Invalid JSON response"}
-        mock_response.raise_for_status.return_value = None
-        mock_post.return_value = mock_response
+        mock_generate.return_value = "Invalid JSON response"
         
         content = "Sample content"
         tags = await service._generate_topic_tags(content)
@@ -425,12 +403,8 @@ class TestAutoTaggingService:
         # Set a high confidence threshold
         service.confidence_threshold = 0.9
         
-        with patch('services.auto_tagging_service.requests.post') as mock_post:
-            # Mock response with mixed confidence scores
-            mock_response = Mock()
-            mock_response.raise_for_status.return_value = None
-            mock_post.return_value = mock_response
-            
+        with patch('services.llm_gateway.LLMGateway.generate', new_callable=AsyncMock) as mock_generate:
+            # Mock responses with mixed confidence scores
             responses = [
                 json.dumps({"topics": [{"name": "high_conf", "confidence": 0.95}, {"name": "low_conf", "confidence": 0.5}]}),
                 json.dumps({"domains": [{"name": "domain", "confidence": 0.3}]}),
@@ -439,7 +413,7 @@ class TestAutoTaggingService:
                 json.dumps({"categories": [{"name": "category", "confidence": 0.4}]})
             ]
             
-            mock_response.json.side_effect = [{"response": resp} for resp in responses]
+            mock_generate.side_effect = responses
             
             # Mock database operations
             mock_tag_instances = []
@@ -0,0 +1,228 @@
+"""
+Tests for segmented, streaming vector store backups
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from multi_instance_arxiv_system.vector_store import backup_recovery_service
+from multi_instance_arxiv_system.vector_store.backup_recovery_service import (
+    BackupRecoveryService, BackupStatus, BackupType, MANIFEST_FILENAME
+)
+
+
+class FakeCollection:
+    def __init__(self, count=0, dimension=4):
+        self.metadata = {'embedding_model': 'all-MiniLM-L6-v2'}
+        self.records = {
+            f"doc_{i}": {
+                'document': f"document {i}",
+                'metadata': {'instance_name': 'ai_scholar', 'chunk': i},
+                'embedding': [float(i)] * dimension
+            }
+            for i in range(count)
+        }
+        self.get_calls = []
+        self.upsert_calls = 0
+        self.fail_upsert_on = None
+
+    def count(self):
+        return len(self.records)
+
+    def get(self, include=None, limit=None, offset=None):
+        self.get_calls.append((limit, offset))
+        ids = list(self.records)[offset:offset + limit]
+        result = {'ids': ids}
+        for field, key in (('documents', 'document'), ('metadatas', 'metadata'), ('embeddings', 'embedding')):
+            if field in include:
+                result[field] = [self.records[i][key] for i in ids]
+        return result
+
+    def upsert(self, ids, documents=None, metadatas=None, embeddings=None):
+        if self.fail_upsert_on and self.fail_upsert_on in ids:
+            raise RuntimeError("chroma unavailable")
+        self.upsert_calls += 1
+        for i, doc_id in enumerate(ids):
+            self.records[doc_id] = {
+                'document': documents[i] if documents else None,
+                'metadata': metadatas[i] if metadatas else None,
+                'embedding': embeddings[i] if embeddings else None
+            }
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.records.pop(doc_id, None)
+
+
+class FakeInstanceService:
+    def __init__(self, collection):
+        self.collection = collection
+        self.collection_name = "scholar_instance_ai_scholar_papers"
+
+
+class FakeVectorStoreService:
+    def __init__(self, collection):
+        self.instance_services = {'ai_scholar': FakeInstanceService(collection)}
+        self.initialized_instances = set()
+
+
+class FakeCollectionManager:
+    target = None
+
+    async def initialize(self):
+        pass
+
+    async def create_instance_collection(self, instance_name, embedding_model, description):
+        return {'created': True}
+
+    async def get_instance_collection(self, instance_name):
+        return self.target
+
+    async def delete_instance_collection(self, instance_name):
+        return True
+
+
+def make_service(tmp_path, collection, segment_size=4):
+    service = BackupRecoveryService(FakeVectorStoreService(collection), backup_directory=str(tmp_path))
+    service.backup_config['segment_size'] = segment_size
+    return service
+
+
+@pytest.fixture
+def restore_target(monkeypatch):
+    target = FakeCollection()
+    FakeCollectionManager.target = target
+    monkeypatch.setattr(backup_recovery_service, 'CollectionManager', FakeCollectionManager)
+    return target
+
+
+@pytest.mark.asyncio
+async def test_backup_is_written_in_paged_segments(tmp_path):
+    collection = FakeCollection(count=10)
+    service = make_service(tmp_path, collection)
+
+    backup = await service.create_backup('ai_scholar', BackupType.FULL)
+
+    assert backup.status == BackupStatus.COMPLETED
+    assert backup.validated, backup.validation_errors
+    assert backup.document_count == 10
+    assert all(limit == 4 for limit, _ in collection.get_calls)
+
+    manifest = json.loads((tmp_path / 'ai_scholar' / backup.backup_id / MANIFEST_FILENAME).read_text())
+    assert [s['count'] for s in manifest['segments']] == [4, 4, 2]
+    embeddings = np.load(tmp_path / 'ai_scholar' / backup.backup_id / manifest['segments'][0]['embeddings_file'])
+    assert embeddings.dtype == np.float32
+    assert embeddings.shape == (4, 4)
+
+
+@pytest.mark.asyncio
+async def test_corrupted_segment_fails_validation(tmp_path):
+    service = make_service(tmp_path, FakeCollection(count=6))
+    backup = await service.create_backup('ai_scholar', BackupType.FULL)
+
+    manifest = json.loads((tmp_path / 'ai_scholar' / backup.backup_id / MANIFEST_FILENAME).read_text())
+    segment_file = tmp_path / 'ai_scholar' / backup.backup_id / manifest['segments'][1]['embeddings_file']
+    segment_file.write_bytes(segment_file.read_bytes()[:-8])
+
+    result = await service._validate_backup(backup)
+
+    assert not result['valid']
+    assert any('Checksum mismatch' in error for error in result['errors'])
+
+
+@pytest.mark.asyncio
+async def test_restore_round_trips_segments(tmp_path, restore_target):
+    source = FakeCollection(count=9)
+    service = make_service(tmp_path, source)
+    backup = await service.create_backup('ai_scholar', BackupType.FULL)
+
+    result = await service.restore_from_backup(backup.backup_id, target_instance_name='restored')
+
+    assert result.success, result.errors_encountered
+    assert result.documents_restored == 9
+    assert restore_target.records == source.records
+
+
+@pytest.mark.asyncio
+async def test_interrupted_restore_resumes_remaining_segments(tmp_path, restore_target):
+    service = make_service(tmp_path, FakeCollection(count=12))
+    service.backup_config['restore_concurrency'] = 1
+    backup = await service.create_backup('ai_scholar', BackupType.FULL)
+
+    restore_target.fail_upsert_on = 'doc_8'
+    failed = await service.restore_from_backup(backup.backup_id, target_instance_name='restored')
+    assert not failed.success
+
+    restore_target.fail_upsert_on = None
+    calls_before_resume = restore_target.upsert_calls
+    resumed = await service.restore_from_backup(backup.backup_id, target_instance_name='restored', resume=True)
+
+    assert resumed.success, resumed.errors_encountered
+    assert restore_target.upsert_calls - calls_before_resume == 1
+    assert resumed.documents_restored == 12
+    assert len(restore_target.records) == 12
+
+
+@pytest.mark.asyncio
+async def test_incremental_backup_stores_only_changes(tmp_path):
+    collection = FakeCollection(count=10)
+    service = make_service(tmp_path, collection)
+    full = await service.create_backup('ai_scholar', BackupType.FULL)
+
+    collection.records['doc_1']['document'] = "revised document 1"
+    collection.records['doc_10'] = {'document': "new", 'metadata': {'chunk': 10}, 'embedding': [10.0] * 4}
+    del collection.records['doc_2']
+
+    delta = await service.create_backup('ai_scholar', BackupType.INCREMENTAL)
+
+    assert delta.backup_type == BackupType.INCREMENTAL
+    assert delta.parent_backup_id == full.backup_id
+    assert delta.validated, delta.validation_errors
+    assert delta.document_count == 10
+
+    manifest = json.loads(Path(delta.backup_file_path).read_text())
+    assert manifest['record_count'] == 2
+    assert manifest['deleted_ids'] == ['doc_2']
+
+
+@pytest.mark.asyncio
+async def test_incremental_without_previous_backup_is_full(tmp_path):
+    service = make_service(tmp_path, FakeCollection(count=3))
+
+    backup = await service.create_backup('ai_scholar', BackupType.INCREMENTAL)
+
+    assert backup.backup_type == BackupType.FULL
+    assert backup.parent_backup_id is None
+
+
+@pytest.mark.asyncio
+async def test_restore_replays_full_and_incremental_chain(tmp_path, restore_target):
+    source = FakeCollection(count=10)
+    service = make_service(tmp_path, source)
+    await service.create_backup('ai_scholar', BackupType.FULL)
+
+    source.records['doc_3']['metadata'] = {'chunk': 3, 'revised': True}
+    source.records['doc_11'] = {'document': "new", 'metadata': {'chunk': 11}, 'embedding': [11.0] * 4}
+    del source.records['doc_0']
+    delta = await service.create_backup('ai_scholar', BackupType.INCREMENTAL)
+
+    result = await service.restore_from_backup(delta.backup_id, target_instance_name='restored')
+
+    assert result.success, result.errors_encountered
+    assert restore_target.records == source.records
+
+
+@pytest.mark.asyncio
+async def test_cleanup_keeps_the_base_of_retained_incrementals(tmp_path):
+    collection = FakeCollection(count=5)
+    service = make_service(tmp_path, collection)
+    service.backup_config['max_backups_per_instance'] = 1
+    full = await service.create_backup('ai_scholar', BackupType.FULL)
+
+    collection.records['doc_5'] = {'document': "new", 'metadata': {'chunk': 5}, 'embedding': [5.0] * 4}
+    await service.create_backup('ai_scholar', BackupType.INCREMENTAL)
+
+    assert service._find_backup(full.backup_id) is not None
+    assert Path(full.backup_file_path).exists()
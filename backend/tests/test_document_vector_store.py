@@ -0,0 +1,161 @@
+"""
+Tests for the persistent document vector store used by relationship analysis
+"""
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from core.database import Base, Document, DocumentChunk
+from services.document_vector_store import DocumentVectorIndex, DocumentVectorStore, term_counts
+
+WORDS = ["graph", "neural", "bayes", "markov", "kernel", "sparse", "tensor", "causal", "protein", "lattice"]
+
+
+def random_texts(rng, n):
+    return [" ".join(rng.choices(WORDS[:rng.randint(3, len(WORDS))], k=rng.randint(5, 30))) for _ in range(n)]
+
+
+def reference_pairs(texts, min_similarity):
+    """All pairs above the threshold from a freshly fitted TF-IDF model"""
+    similarity = cosine_similarity(TfidfVectorizer(stop_words="english").fit_transform(texts))
+    return [
+        (i, j, similarity[i][j])
+        for i in range(len(texts)) for j in range(i + 1, len(texts))
+        if similarity[i][j] >= min_similarity
+    ]
+
+
+def build_index(texts):
+    index = DocumentVectorIndex()
+    for i, text in enumerate(texts):
+        index.upsert(f"d{i}", term_counts(text))
+    return index
+
+
+def test_similar_pairs_match_dense_tfidf_similarity():
+    rng = random.Random(7)
+    texts = random_texts(rng, 60)
+    index = build_index(texts)
+
+    pairs = index.similar_pairs(min_similarity=0.5, max_pairs=10_000, block_size=16)
+    expected = reference_pairs(texts, 0.5)
+
+    assert [(a, b) for a, b, _ in sorted(pairs)] == sorted((f"d{i}", f"d{j}") for i, j, _ in expected)
+    scores = {(a, b): score for a, b, score in pairs}
+    for i, j, score in expected:
+        assert scores[(f"d{i}", f"d{j}")] == pytest.approx(score)
+
+
+def test_similar_pairs_keep_the_strongest_pairs_in_order():
+    rng = random.Random(11)
+    texts = random_texts(rng, 40)
+    index = build_index(texts)
+
+    pairs = index.similar_pairs(min_similarity=0.1, max_pairs=25, block_size=7)
+    expected = sorted(reference_pairs(texts, 0.1), key=lambda pair: -pair[2])[:25]
+
+    assert len(pairs) == 25
+    assert np.allclose([score for _, _, score in pairs], [score for _, _, score in expected])
+    assert all(pairs[k][2] >= pairs[k + 1][2] for k in range(len(pairs) - 1))
+
+
+def test_removed_documents_leave_the_index():
+    index = build_index(["graph neural graph", "graph neural tensor", "tensor kernel"])
+
+    index.remove("d0")
+
+    assert "d0" not in index and len(index) == 2
+    assert [(a, b) for a, b, _ in index.similar_pairs(0.0, 10)] == [("d2", "d1")]
+
+
+def test_shared_terms_are_ordered_by_weight():
+    index = build_index([
+        "graph graph graph neural neural markov",
+        "graph graph graph neural kernel",
+        "tensor lattice",
+    ])
+
+    assert index.shared_terms("d0", "d1") == ["graph", "neural"]
+    assert index.shared_terms("d0", "d2") == []
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Document.__table__, DocumentChunk.__table__])
+    session = Session(engine)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def add_document(db, document_id, chunks, user_id="user-1", status="completed"):
+    now = datetime(2024, 1, 1)
+    document = Document(
+        id=document_id, user_id=user_id, name=f"{document_id}.txt", file_path="/tmp/x",
+        content_type="text/plain", size=1, status=status, created_at=now, updated_at=now
+    )
+    db.add(document)
+    for i, content in enumerate(chunks):
+        db.add(DocumentChunk(document_id=document_id, content=content, chunk_index=i))
+    db.commit()
+    return document
+
+
+def test_sync_indexes_completed_documents_and_persists_counts(db, tmp_path):
+    add_document(db, "a", ["graph neural", "network"])
+    add_document(db, "b", ["graph neural tensor"])
+    add_document(db, "c", ["graph neural tensor"], status="processing")
+    add_document(db, "d", ["graph neural"], user_id="user-2")
+
+    index, documents = DocumentVectorStore(str(tmp_path)).sync(db, "user-1")
+
+    assert sorted(index.document_ids) == ["a", "b"]
+    assert sorted(d.id for d in documents) == ["a", "b"]
+    assert index.counts[index.positions["a"]] == {"graph": 1, "neural": 1, "network": 1}
+
+    # A new process reads the stored counts instead of the chunks
+    db.query(DocumentChunk).delete()
+    db.commit()
+    index, _ = DocumentVectorStore(str(tmp_path)).sync(db, "user-1")
+    assert index.counts[index.positions["b"]] == {"graph": 1, "neural": 1, "tensor": 1}
+
+
+def test_sync_follows_updates_and_deletions(db, tmp_path):
+    store = DocumentVectorStore(str(tmp_path))
+    add_document(db, "a", ["graph neural"])
+    document = add_document(db, "b", ["graph tensor"])
+    store.sync(db, "user-1")
+
+    db.query(DocumentChunk).filter(DocumentChunk.document_id == "b").delete()
+    db.add(DocumentChunk(document_id="b", content="markov kernel", chunk_index=0))
+    document.updated_at = datetime(2024, 1, 2)
+    db.query(Document).filter(Document.id == "a").delete()
+    db.commit()
+
+    index, _ = store.sync(db, "user-1")
+
+    assert index.document_ids == ["b"]
+    assert index.counts[0] == {"markov": 1, "kernel": 1}
+    assert not any(tmp_path.rglob("*.tmp"))
+    assert len(list(tmp_path.rglob("*.json"))) == 1
+
+
+def test_index_document_updates_a_cached_index(db, tmp_path):
+    store = DocumentVectorStore(str(tmp_path))
+    add_document(db, "a", ["graph neural"])
+    index, _ = store.sync(db, "user-1")
+
+    document = add_document(db, "b", ["graph neural kernel"])
+    store.index_document(db, document)
+
+    assert "b" in index
+    assert index.version("b") == datetime(2024, 1, 1).isoformat()
+    index, _ = store.sync(db, "user-1")
+    assert sorted(index.document_ids) == ["a", "b"]
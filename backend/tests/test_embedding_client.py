@@ -0,0 +1,91 @@
+"""
+Tests for the batched async embedding client
+"""
+import asyncio
+
+import pytest
+
+from services.embedding_client import EmbeddingClient, EmbeddingError
+
+
+class FakeEmbeddingClient(EmbeddingClient):
+    """Embedding client that records requests instead of calling Ollama"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__("http://ollama.test", "test-model", *args, **kwargs)
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail = False
+
+    async def _request_embeddings(self, texts):
+        self.requests.append(list(texts))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.fail:
+                raise EmbeddingError("server down")
+            return [[float(len(text)), 1.0] for text in texts]
+        finally:
+            self.in_flight -= 1
+
+
+class TestEmbeddingClient:
+    """Test cases for EmbeddingClient"""
+
+    @pytest.mark.asyncio
+    async def test_embed_many_batches_requests(self):
+        client = FakeEmbeddingClient(max_batch_size=10)
+        texts = [f"chunk {i}" for i in range(25)]
+
+        embeddings = await client.embed_many(texts)
+
+        assert len(embeddings) == 25
+        assert embeddings[3] == [float(len("chunk 3")), 1.0]
+        assert [len(batch) for batch in client.requests] == [10, 10, 5]
+
+    @pytest.mark.asyncio
+    async def test_embed_many_empty(self):
+        client = FakeEmbeddingClient()
+        assert await client.embed_many([]) == []
+        assert client.requests == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_embed_calls_are_coalesced(self):
+        client = FakeEmbeddingClient(max_batch_size=50, max_batch_delay=0.05)
+
+        results = await asyncio.gather(*(client.embed(f"q{i}") for i in range(20)))
+
+        assert len(results) == 20
+        assert len(client.requests) == 1
+        assert client.get_stats()["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_duplicate_texts_sent_once(self):
+        client = FakeEmbeddingClient()
+
+        embeddings = await client.embed_many(["same", "same", "other"])
+
+        assert embeddings[0] == embeddings[1]
+        assert client.requests == [["same", "other"]]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        client = FakeEmbeddingClient(max_batch_size=2, max_concurrency=2)
+
+        await client.embed_many([f"t{i}" for i in range(20)])
+
+        assert client.max_in_flight <= 2
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self):
+        client = FakeEmbeddingClient(max_batch_delay=0.05)
+        client.fail = True
+
+        results = await asyncio.gather(
+            client.embed("a"), client.embed("b"), return_exceptions=True
+        )
+
+        assert all(isinstance(result, EmbeddingError) for result in results)
+        assert client.get_stats()["errors"] == 1
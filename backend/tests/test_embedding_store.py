@@ -0,0 +1,108 @@
+"""
+Tests for the content-addressed persistent embedding store
+"""
+import numpy as np
+import pytest
+
+from services.embedding_store import EmbeddingStore, content_hash
+
+
+class TestEmbeddingStore:
+    """Test cases for EmbeddingStore"""
+
+    @pytest.fixture
+    def store_dir(self, tmp_path):
+        return tmp_path / "embeddings"
+
+    def test_normalized_text_shares_hash(self):
+        assert content_hash("deep  learning\n") == content_hash("deep learning")
+        assert content_hash("deep learning") != content_hash("Deep learning")
+
+    def test_put_and_get(self, store_dir):
+        store = EmbeddingStore(str(store_dir))
+        store.put("model-a", "hello world", [0.1, 0.2, 0.3])
+
+        assert store.get("model-a", "hello world") == pytest.approx([0.1, 0.2, 0.3])
+        assert store.get("model-b", "hello world") is None
+        assert store.get("model-a", "unknown") is None
+
+    def test_persists_across_instances(self, store_dir):
+        first = EmbeddingStore(str(store_dir))
+        first.put_many("model-a", ["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+
+        second = EmbeddingStore(str(store_dir))
+        assert second.get_many("model-a", ["b", "a", "c"]) == [[0.0, 1.0], [1.0, 0.0], None]
+        assert second.get_stats()["disk_hits"] == 2
+
+    def test_sees_rows_written_by_another_store(self, store_dir):
+        reader = EmbeddingStore(str(store_dir))
+        writer = EmbeddingStore(str(store_dir))
+        writer.put("model-a", "first", [1.0, 2.0])
+        assert reader.get("model-a", "first") == [1.0, 2.0]
+
+        writer.put("model-a", "second", [3.0, 4.0])
+        assert reader.get("model-a", "second") == [3.0, 4.0]
+
+    def test_float16_storage(self, store_dir):
+        store = EmbeddingStore(str(store_dir), dtype="float16", memory_items=0)
+        store.put("model-a", "text", [0.5, 0.25])
+
+        assert store.get("model-a", "text") == [0.5, 0.25]
+        assert (store_dir.iterdir().__next__() / "vectors.bin").stat().st_size == 4
+
+    def test_cached_reads_match_stored_precision(self, store_dir):
+        store = EmbeddingStore(str(store_dir), dtype="float16")
+        store.put("model-a", "text", [0.1, 0.2])
+
+        reopened = EmbeddingStore(str(store_dir))
+        assert store.get("model-a", "text") == reopened.get("model-a", "text")
+
+    def test_reopens_after_batch_with_duplicate_digests(self, store_dir):
+        store = EmbeddingStore(str(store_dir))
+        store.put_many("model-a", ["a b", "a  b"], [[1.0, 1.0], [1.0, 1.0]])
+        store.put_many("model-a", ["c"], [[3.0, 3.0]])
+
+        reopened = EmbeddingStore(str(store_dir), memory_items=0)
+        assert reopened.get("model-a", "a b") == [1.0, 1.0]
+        assert reopened.get("model-a", "c") == [3.0, 3.0]
+        segment_dir = next(store_dir.iterdir())
+        assert (segment_dir / "index.bin").stat().st_size == 2 * 32
+
+    def test_dimension_mismatch_is_not_cached(self, store_dir):
+        store = EmbeddingStore(str(store_dir), memory_items=0)
+        store.put("model-a", "x", [1.0, 2.0])
+        store.put("model-a", "y", [1.0, 2.0, 3.0])
+
+        assert store.get("model-a", "y") is None
+
+    def test_recovers_from_orphan_vector_row(self, store_dir):
+        store = EmbeddingStore(str(store_dir))
+        store.put("model-a", "a", [1.0, 1.0])
+        segment_dir = next(store_dir.iterdir())
+        with open(segment_dir / "vectors.bin", "ab") as f:
+            f.write(np.array([9.0, 9.0], dtype=np.float32).tobytes())
+
+        reopened = EmbeddingStore(str(store_dir), memory_items=0)
+        reopened.put("model-a", "b", [2.0, 2.0])
+
+        assert reopened.get("model-a", "b") == [2.0, 2.0]
+        assert reopened.get("model-a", "a") == [1.0, 1.0]
+
+    @pytest.mark.asyncio
+    async def test_get_or_compute_only_computes_misses(self, store_dir):
+        store = EmbeddingStore(str(store_dir))
+        store.put("model-a", "cached", [1.0])
+        computed = []
+
+        async def compute(texts):
+            computed.extend(texts)
+            return [[float(len(text))] for text in texts]
+
+        result = await store.get_or_compute("model-a", ["cached", "new", "new"], compute)
+
+        assert result == [[1.0], [3.0], [3.0]]
+        assert computed == ["new"]
+
+        result = await store.get_or_compute("model-a", ["new"], compute)
+        assert result == [[3.0]]
+        assert computed == ["new"]
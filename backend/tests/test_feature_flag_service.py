@@ -0,0 +1,339 @@
+"""
+Tests for the feature flag service: compiled rule evaluation, rollout
+bucketing, buffered usage and rule table refreshes
+"""
+import asyncio
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, create_autospec, patch
+
+import pytest
+import redis
+from redis.client import PubSub
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# The service's database and Redis modules need a configured deployment
+with patch.dict(sys.modules, {
+    "backend.core.database": MagicMock(),
+}):
+    from backend.services import feature_flag_service as ff
+    from backend.services.feature_flag_service import (
+        FLAG_CHANGES_CHANNEL,
+        CompiledFlag,
+        FeatureFlagConfig,
+        FeatureFlagRule,
+        FeatureFlags,
+        FeatureFlagService,
+        FeatureFlagStatus,
+        FeatureFlagTarget,
+        FeatureFlagUsage,
+        FeatureFlagUsageBuffer,
+        rollout_bucket,
+    )
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    ff.Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    @contextmanager
+    def get_db_session():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    with patch.object(ff, "get_db_session", get_db_session):
+        yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def service(session_factory):
+    service = FeatureFlagService(flush_interval=3600)
+    service.redis_client = sync_redis()
+    # Evaluate against the database without the background workers
+    with patch.object(service, "_start_background_workers"):
+        service.start()
+    yield service
+    service.close()
+
+
+def sync_redis():
+    """Redis double with the sync client's method signatures"""
+    client = create_autospec(redis.Redis, instance=True)
+    client.pubsub.return_value = create_autospec(PubSub, instance=True)
+    return client
+
+
+def make_flag(rule_data, status=FeatureFlagStatus.PERCENTAGE):
+    return CompiledFlag("test_flag", status.value, [rule_data])
+
+
+def user_with_bucket(flag_name, below=None, at_least=None):
+    """Find a user whose rollout bucket for the flag is in the given range"""
+    for n in range(100000):
+        context = {"user_id": f"user-{n}"}
+        bucket = rollout_bucket(flag_name, context)
+        if (below is None or bucket < below) and (at_least is None or bucket >= at_least):
+            return context
+    raise AssertionError("no user in bucket range")
+
+
+class TestRuleEvaluation:
+    """Compiled rules keep the semantics stored rules have always had"""
+
+    @pytest.mark.parametrize("rule_data, context, expected", [
+        ({"target": "all_users"}, {}, True),
+        ({"target": "beta_users"}, {"is_beta_user": True}, True),
+        ({"target": "beta_users"}, {"is_beta_user": False}, False),
+        ({"target": "premium_users"}, {"is_premium_user": True}, True),
+        ({"target": "mobile_users"}, {"is_mobile": True}, True),
+        ({"target": "mobile_users"}, {"is_beta_user": True}, False),
+        ({"target": "voice_users"}, {"voice_enabled": True}, True),
+        ({"target": "specific_users", "user_ids": ["u1"]}, {"user_id": "u1"}, True),
+        ({"target": "specific_users", "user_ids": ["u1"]}, {"user_id": "u2"}, False),
+        ({"target": "specific_users", "user_ids": None}, {"user_id": "u1"}, False),
+        ({"target": "institution_users"}, {"institution_id": "mit"}, True),
+        ({"target": "institution_users", "institution_ids": ["mit"]}, {"institution_id": "mit"}, True),
+        ({"target": "institution_users", "institution_ids": ["mit"]}, {"institution_id": "cmu"}, False),
+        ({"target": "institution_users"}, {}, False),
+        # Custom conditions match users outside the target audience
+        ({"target": "beta_users", "conditions": {"plan": "team"}}, {"plan": "team"}, True),
+        ({"target": "beta_users", "conditions": {"plan": ["team", "pro"]}}, {"plan": "pro"}, True),
+        ({"target": "beta_users", "conditions": {"plan": ["team", "pro"]}}, {"plan": "free"}, False),
+        ({"target": "beta_users", "conditions": {"plan": "team", "region": "eu"}}, {"plan": "team"}, False),
+        # Environment defaults to production
+        ({"target": "all_users", "environment": "production"}, {}, True),
+        ({"target": "all_users", "environment": "staging"}, {}, False),
+        ({"target": "all_users", "environment": "staging"}, {"environment": "staging"}, True),
+        ({"target": "all_users", "percentage": 0.0}, {"user_id": "u1"}, False),
+        ({"target": "all_users", "percentage": 100.0}, {"user_id": "u1"}, True),
+    ])
+    def test_rule_targeting(self, rule_data, context, expected):
+        assert make_flag(rule_data).evaluate(context)[0] is expected
+
+    def test_schedule_window(self):
+        now = datetime.utcnow()
+        active = {"target": "all_users", "start_date": (now - timedelta(days=1)).isoformat(),
+                  "end_date": (now + timedelta(days=1)).isoformat()}
+        upcoming = {"target": "all_users", "start_date": (now + timedelta(days=1)).isoformat()}
+        expired = {"target": "all_users", "end_date": now - timedelta(days=1)}
+
+        assert make_flag(active).evaluate({})[0] is True
+        assert make_flag(upcoming).evaluate({})[0] is False
+        assert make_flag(expired).evaluate({})[0] is False
+
+    def test_status_overrides_rules(self):
+        assert make_flag({"target": "all_users"}, FeatureFlagStatus.DISABLED).evaluate({}) == (False, None)
+        assert make_flag({"target": "beta_users"}, FeatureFlagStatus.ENABLED).evaluate({}) == (True, None)
+
+    def test_first_matching_rule_is_reported(self):
+        flag = CompiledFlag("test_flag", "percentage", [
+            {"target": "beta_users"},
+            {"target": "premium_users"},
+        ])
+        assert flag.evaluate({"is_premium_user": True}) == (True, "premium_users")
+        assert flag.evaluate({}) == (False, None)
+
+    def test_audience_outside_rollout_is_not_rescued_by_conditions(self):
+        context = user_with_bucket("test_flag", at_least=5000)
+        context["is_beta_user"] = True
+        rule = {"target": "beta_users", "percentage": 50.0, "conditions": {"is_beta_user": True}}
+        assert make_flag(rule).evaluate(context)[0] is False
+
+
+class TestRolloutBucketing:
+    """Test cases for percentage rollouts"""
+
+    def test_bucket_is_stable(self):
+        context = {"user_id": "user-42", "session_id": "changes-every-visit"}
+        assert rollout_bucket("flag", context) == rollout_bucket("flag", {"user_id": "user-42"})
+        assert rollout_bucket("flag", context) == rollout_bucket("flag", dict(context))
+
+    def test_anonymous_users_bucket_by_session(self):
+        assert rollout_bucket("flag", {"session_id": "s1"}) == rollout_bucket("flag", {"session_id": "s1"})
+        buckets = {rollout_bucket("flag", {"session_id": f"s{n}"}) for n in range(50)}
+        assert len(buckets) > 1
+
+    def test_rollout_matches_bucket_threshold(self):
+        inside = user_with_bucket("test_flag", below=2500)
+        outside = user_with_bucket("test_flag", at_least=2500)
+        flag = make_flag({"target": "all_users", "percentage": 25.0})
+
+        for _ in range(3):
+            assert flag.evaluate(inside)[0] is True
+            assert flag.evaluate(outside)[0] is False
+
+    def test_raising_percentage_keeps_enabled_users(self):
+        users = [{"user_id": f"user-{n}"} for n in range(2000)]
+        quarter = make_flag({"target": "all_users", "percentage": 25.0})
+        half = make_flag({"target": "all_users", "percentage": 50.0})
+
+        in_quarter = {u["user_id"] for u in users if quarter.evaluate(u)[0]}
+        in_half = {u["user_id"] for u in users if half.evaluate(u)[0]}
+
+        assert in_quarter <= in_half
+        assert 400 < len(in_quarter) < 600
+        assert 900 < len(in_half) < 1100
+
+    def test_flags_roll_out_to_different_users(self):
+        users = [{"user_id": f"user-{n}"} for n in range(200)]
+        first = {u["user_id"] for u in users if rollout_bucket("flag_a", u) < 5000}
+        second = {u["user_id"] for u in users if rollout_bucket("flag_b", u) < 5000}
+        assert first != second
+
+
+class TestUsageBuffer:
+    """Test cases for buffered usage counts"""
+
+    def test_counts_are_aggregated(self):
+        buffer = FeatureFlagUsageBuffer()
+        for _ in range(3):
+            buffer.record("flag", {"user_id": "u1"}, True, "all_users")
+        buffer.record("flag", None, False, None)
+
+        assert buffer.drain() == {
+            ("flag", "u1", True, "all_users", "production"): 3,
+            ("flag", None, False, None, "production"): 1,
+        }
+        assert len(buffer) == 0
+
+    def test_restore_respects_key_limit(self):
+        buffer = FeatureFlagUsageBuffer(max_keys=1)
+        buffer.record("a", None, True, None)
+        buffer.restore({("a", None, True, None, "production"): 2, ("b", None, True, None, "production"): 5})
+
+        assert buffer.drain() == {("a", None, True, None, "production"): 3}
+        assert buffer.dropped == 5
+
+    def test_failed_flush_requeues_counts(self, service, session_factory):
+        service.is_enabled("educational_features", {"user_id": "u1"})
+        service.is_enabled("educational_features", {"user_id": "u1"})
+
+        @contextmanager
+        def unavailable():
+            raise RuntimeError("database unavailable")
+            yield
+
+        with patch.object(ff, "get_db_session", unavailable):
+            assert service.flush_usage() == 0
+        assert len(service.usage_buffer) == 1
+
+        service.is_enabled("educational_features", {"user_id": "u1"})
+        assert service.flush_usage() == 1
+
+        with session_factory() as db:
+            rows = db.query(FeatureFlagUsage).all()
+        assert [(row.flag_name, row.user_id, row.request_count) for row in rows] == [
+            ("educational_features", "u1", 3)
+        ]
+
+    def test_usage_stats_sum_request_counts(self, service):
+        for user_id in ("u1", "u1", "u2"):
+            service.is_enabled("mobile_accessibility", {"user_id": user_id, "is_mobile": True})
+        service.is_enabled("mobile_accessibility", {"user_id": "u3", "is_mobile": True, "environment": "staging"})
+
+        stats = service.get_usage_stats("mobile_accessibility")
+        assert stats["total_requests"] == 4
+        assert stats["enabled_requests"] == 3
+        assert stats["unique_users"] == 3
+        assert sorted(stats["environments"]) == ["production", "staging"]
+
+
+class TestFlagRefresh:
+    """Test cases for reloading the compiled rule table"""
+
+    def test_changes_apply_locally_and_are_published(self, service):
+        config = FeatureFlagConfig(
+            name="new_search",
+            description="New search",
+            status=FeatureFlagStatus.USER_LIST,
+            rules=[FeatureFlagRule(target=FeatureFlagTarget.SPECIFIC_USERS, user_ids=["u1"])],
+            created_by="tester",
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+            metadata={"ticket": 7},
+        )
+        service.create_flag(config)
+
+        assert service.is_enabled("new_search", {"user_id": "u1"}) is True
+        service.redis_client.publish.assert_called_with(FLAG_CHANGES_CHANNEL, "new_search")
+        assert service.get_flag("new_search")["metadata"] == {"ticket": 7}
+
+        service.update_flag("new_search", {"status": FeatureFlagStatus.DISABLED.value})
+        assert service.is_enabled("new_search", {"user_id": "u1"}) is False
+
+        service.delete_flag("new_search")
+        assert service.get_flag("new_search") is None
+
+    def test_published_change_reloads_rules(self, service, session_factory):
+        assert service.is_enabled("educational_features") is True
+        messages = []
+
+        def get_message(ignore_subscribe_messages=False, timeout=0.0):
+            if messages:
+                service._stop.set()
+                return None
+            # Changed by another process after this one subscribed
+            with session_factory() as db:
+                db.query(FeatureFlags).filter(FeatureFlags.name == "educational_features").update(
+                    {"status": FeatureFlagStatus.DISABLED.value}
+                )
+                db.commit()
+            messages.append({"type": "message", "channel": FLAG_CHANGES_CHANNEL, "data": "educational_features"})
+            return messages[-1]
+
+        pubsub = service.redis_client.pubsub.return_value
+        pubsub.get_message.side_effect = get_message
+        service._listen_for_changes()
+
+        pubsub.subscribe.assert_called_with(FLAG_CHANGES_CHANNEL)
+        pubsub.close.assert_called_once()
+        assert service.is_enabled("educational_features") is False
+
+    def test_changes_use_a_sync_redis_client(self):
+        service = FeatureFlagService(redis_url="redis://localhost:6379/0")
+
+        assert isinstance(service.redis_client, redis.Redis)
+        assert not asyncio.iscoroutinefunction(service.redis_client.publish)
+        assert isinstance(service.redis_client.pubsub(ignore_subscribe_messages=True), PubSub)
+        service.redis_client.close()
+
+    def test_metadata_keeps_its_column_name(self):
+        assert "metadata" in FeatureFlags.__table__.c
+        assert FeatureFlags.flag_metadata.property.columns[0].name == "metadata"
+
+
+class TestLifecycle:
+    """Test cases for starting and stopping the service"""
+
+    def test_construction_has_no_side_effects(self):
+        with patch.object(ff, "get_db_session") as get_db_session, \
+                patch.object(FeatureFlagService, "_start_background_workers") as start_workers:
+            FeatureFlagService()
+
+        get_db_session.assert_not_called()
+        start_workers.assert_not_called()
+
+    def test_first_check_starts_and_close_stops_workers(self, session_factory):
+        service = FeatureFlagService(flush_interval=3600)
+        service.redis_client = sync_redis()
+        # Subscription stays quiet until the service is closed
+        service.redis_client.pubsub.return_value.get_message.side_effect = (
+            lambda ignore_subscribe_messages=False, timeout=0.0: service._stop.wait(timeout) and None
+        )
+
+        assert service.is_enabled("educational_features") is True
+        workers = list(service._workers)
+        assert workers and all(worker.is_alive() for worker in workers)
+
+        service.close()
+        assert not any(worker.is_alive() for worker in workers)
+        assert len(service.usage_buffer) == 0
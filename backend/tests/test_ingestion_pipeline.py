@@ -0,0 +1,107 @@
+"""
+Tests for the staged multi-instance ingestion pipeline
+"""
+from functools import partial
+
+import pytest
+
+from multi_instance_arxiv_system.processors import ingestion_pipeline
+from multi_instance_arxiv_system.processors.ingestion_pipeline import IngestionJob, IngestionPipeline
+from multi_instance_arxiv_system.shared.multi_instance_data_models import ProcessingConfig
+
+
+def fake_extract_and_chunk(pdf_path, paper_builder, chunk_size, chunk_overlap):
+    """Stand-in for PDF extraction; must be importable by pool workers."""
+    if "broken" in pdf_path:
+        return {'error_type': 'pdf_processing_error', 'operation': 'pdf_extraction', 'error': 'bad pdf'}
+    paper = paper_builder({'full_text': pdf_path})
+    return {'paper': paper, 'chunks': [{'text': f"{pdf_path} chunk {i}"} for i in range(3)]}
+
+
+def build_paper(content, paper_id):
+    return {'paper_id': paper_id, 'text': content['full_text']}
+
+
+class FakeVectorStore:
+    def __init__(self, fail_writes_for=None):
+        self.embed_calls = []
+        self.write_calls = []
+        self.fail_writes_for = fail_writes_for
+
+    def prepare_instance_chunks(self, paper, chunks):
+        texts = [chunk['text'] for chunk in chunks]
+        ids = [f"{paper['paper_id']}_chunk_{i}" for i in range(len(chunks))]
+        return texts, [{'paper_id': paper['paper_id']} for _ in chunks], ids
+
+    async def embed_texts(self, texts):
+        self.embed_calls.append(len(texts))
+        return [[float(len(text))] for text in texts]
+
+    async def add_embedded_chunks(self, texts, metadatas, ids, embeddings):
+        if self.fail_writes_for and any(i.startswith(self.fail_writes_for) for i in ids):
+            raise RuntimeError("write failed")
+        assert len(texts) == len(metadatas) == len(ids) == len(embeddings)
+        self.write_calls.append(list(ids))
+
+
+def make_jobs(names):
+    return [
+        IngestionJob(pdf_path=f"/data/{name}.pdf", paper_id=name,
+                     paper_builder=partial(build_paper, paper_id=name))
+        for name in names
+    ]
+
+
+def make_pipeline(vector_store, **config):
+    succeeded, failed = [], []
+    pipeline = IngestionPipeline(
+        vector_store=vector_store,
+        processing_config=ProcessingConfig(extraction_workers=2, **config),
+        chunk_size=1000,
+        chunk_overlap=200,
+        on_success=lambda job, paper, count: succeeded.append((job.paper_id, count)),
+        on_failure=lambda job, error_type, operation, error: failed.append((job.paper_id, error_type))
+    )
+    return pipeline, succeeded, failed
+
+
+class TestIngestionPipeline:
+    """Test cases for IngestionPipeline"""
+
+    @pytest.fixture(autouse=True)
+    def fake_extraction(self, monkeypatch):
+        monkeypatch.setattr(ingestion_pipeline, 'extract_and_chunk', fake_extract_and_chunk)
+
+    @pytest.mark.asyncio
+    async def test_all_papers_flow_through_stages(self):
+        store = FakeVectorStore()
+        pipeline, succeeded, failed = make_pipeline(store)
+        metrics = await pipeline.run(make_jobs(["a", "b", "c", "d"]))
+
+        assert sorted(succeeded) == [(name, 3) for name in "abcd"]
+        assert failed == []
+        assert sum(store.embed_calls) == 12
+        assert sorted(i for call in store.write_calls for i in call) == sorted(
+            f"{name}_chunk_{i}" for name in "abcd" for i in range(3)
+        )
+        assert metrics['extraction'].items_processed == 4
+        assert metrics['writing'].chunks_processed == 12
+
+    @pytest.mark.asyncio
+    async def test_extraction_failures_are_reported(self):
+        store = FakeVectorStore()
+        pipeline, succeeded, failed = make_pipeline(store)
+        metrics = await pipeline.run(make_jobs(["ok", "broken"]))
+
+        assert succeeded == [("ok", 3)]
+        assert failed == [("broken", 'pdf_processing_error')]
+        assert metrics['extraction'].items_failed == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_write_batch_is_retried_per_paper(self):
+        store = FakeVectorStore(fail_writes_for="bad")
+        pipeline, succeeded, failed = make_pipeline(store, write_batch_size=100)
+        await pipeline.run(make_jobs(["good", "bad"]))
+
+        assert succeeded == [("good", 3)]
+        assert failed == [("bad", 'vector_store_error')]
@@ -0,0 +1,151 @@
+"""
+Tests for entity mention matching, relationship extraction and graph queries in the knowledge graph
+"""
+import asyncio
+
+import pytest
+
+from services.knowledge_graph import (
+    Entity, EntityMatcher, KnowledgeGraphBuilder, Relationship, RelationshipExtractor
+)
+
+
+def make_entity(name, entity_type="concept"):
+    return Entity(
+        id=f"id_{name.lower().replace(' ', '_')}",
+        name=name,
+        type=entity_type,
+        properties={},
+        confidence=0.9,
+        source_documents=["doc"]
+    )
+
+
+@pytest.fixture
+def entities():
+    return [
+        make_entity("neural network", "methods"),
+        make_entity("network"),
+        make_entity("BERT", "methods"),
+        make_entity("ImageNet", "datasets"),
+        make_entity("LSTM", "methods"),
+    ]
+
+
+def test_matcher_finds_overlapping_case_insensitive_mentions(entities):
+    text = "A Neural Network and BERT. Networks everywhere"
+    mentions = EntityMatcher(entities).find_mentions(text)
+
+    spans = [(entities[m.entity_index].name, text[m.start:m.end]) for m in mentions.mentions]
+    assert spans == [
+        ("neural network", "Neural Network"),
+        ("network", "Network"),
+        ("BERT", "BERT"),
+        ("network", "Network"),
+    ]
+
+
+def test_entities_in_span_requires_whole_mention(entities):
+    text = "We train a neural network on ImageNet"
+    mentions = EntityMatcher(entities).find_mentions(text)
+
+    assert [e.name for e in mentions.entities_in(0, len(text))] == ["neural network", "network", "ImageNet"]
+    assert [e.name for e in mentions.entities_in(0, text.index("work"))] == []
+    assert mentions.entities_in(len(text), len(text)) == []
+
+
+def test_cooccurrence_matches_substring_scan(entities):
+    text = (
+        "BERT outperforms the LSTM on ImageNet! A neural network, unlike BERT, "
+        "is small. Nothing here? LSTM and network."
+    )
+    extractor = RelationshipExtractor()
+
+    relationships = asyncio.run(extractor.extract_relationships(text, entities, "doc"))
+    cooccurring = [
+        (r.source_entity, r.target_entity, r.evidence[0])
+        for r in relationships if r.relationship_type == "co_occurs"
+    ]
+
+    expected = []
+    for sentence in text.replace("!", ".").replace("?", ".").split("."):
+        found = [e for e in entities if e.name.lower() in sentence.lower()]
+        for i, first in enumerate(found):
+            for second in found[i + 1:]:
+                expected.append((first.id, second.id, sentence.strip()))
+    assert cooccurring == expected
+
+
+def test_pattern_relationships_use_mentions_after_relation_phrase(entities):
+    extractor = RelationshipExtractor()
+
+    relationships = asyncio.run(
+        extractor.extract_relationships("Our BERT model outperforms a deep LSTM baseline.", entities, "doc")
+    )
+    improves = [r for r in relationships if r.relationship_type == "improves"]
+
+    assert [(r.source_entity, r.target_entity) for r in improves] == [("id_bert", "id_lstm")]
+
+
+def test_citation_relationships_use_context_window(entities):
+    text = "LSTM " + "x" * 200 + " BERT improves accuracy [3, 4]."
+    extractor = RelationshipExtractor()
+
+    relationships = asyncio.run(extractor.extract_relationships(text, entities, "doc"))
+    cites = [r for r in relationships if r.relationship_type == "cites"]
+
+    assert [(r.source_entity, r.target_entity) for r in cites] == [("id_bert", "ref_3, 4")]
+
+
+def make_relationship(source, target, evidence):
+    return Relationship(
+        id=f"rel_{source}_{target}",
+        source_entity=source,
+        target_entity=target,
+        relationship_type="uses",
+        properties={},
+        confidence=0.8,
+        evidence=[evidence]
+    )
+
+
+@pytest.fixture
+def builder(entities):
+    builder = KnowledgeGraphBuilder()
+    for entity in entities:
+        builder.add_entity(entity)
+    builder.add_relationship(make_relationship("id_bert", "id_neural_network", "BERT is a neural network"))
+    builder.add_relationship(make_relationship("id_neural_network", "id_imagenet", "trained on ImageNet"))
+    return builder
+
+
+def test_query_entities_match_word_prefixes_in_insertion_order(builder):
+    found = asyncio.run(builder._find_query_entities("Net"))
+    assert [e.name for e in found] == ["neural network", "network"]
+
+    found = asyncio.run(builder._find_query_entities("neural net"))
+    assert [e.name for e in found] == ["neural network"]
+
+    assert asyncio.run(builder._find_query_entities("transformer")) == []
+
+
+def test_relationships_need_known_endpoints(builder):
+    assert not builder.add_relationship(make_relationship("id_bert", "id_unknown", "nothing"))
+    assert "rel_id_bert_id_unknown" not in builder.relationships
+
+
+def test_supporting_evidence_follows_edges_in_both_directions(builder):
+    evidence = builder._gather_supporting_evidence(["id_imagenet", "id_neural_network", "id_bert"])
+    assert evidence == ["trained on ImageNet", "BERT is a neural network"]
+
+
+def test_connections_use_cached_neighborhoods_until_an_edge_is_added(builder):
+    connections = asyncio.run(builder.find_research_connections("BERT"))
+    assert sorted(c.entities[-1] for c in connections) == ["id_imagenet", "id_neural_network"]
+    assert asyncio.run(builder._find_nearby_entities("id_bert")) == {
+        "id_bert", "id_neural_network", "id_imagenet"
+    }
+
+    builder.add_relationship(make_relationship("id_imagenet", "id_lstm", "LSTM results on ImageNet"))
+    paths = builder._shortest_paths("id_bert", max_distance=3)
+    assert paths["id_lstm"] == ["id_bert", "id_neural_network", "id_imagenet", "id_lstm"]
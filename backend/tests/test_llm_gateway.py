@@ -0,0 +1,107 @@
+"""
+Tests for the shared async LLM gateway
+"""
+import asyncio
+
+import pytest
+
+from services.llm_gateway import (
+    LLMGateway,
+    LLMGatewayError,
+    LLMPriority,
+    LLMTimeoutError,
+    llm_deadline,
+)
+
+
+class FakeLLMGateway(LLMGateway):
+    """LLM gateway that records generations instead of calling Ollama"""
+
+    def __init__(self, *args, delay=0.02, **kwargs):
+        super().__init__("http://ollama.test", "test-model", *args, **kwargs)
+        self.delay = delay
+        self.started = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _request_generation(self, base_url, model, prompt, options):
+        self.started.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if prompt == "fail":
+                raise LLMGatewayError("Ollama API error: 500", status=500)
+            return f"answer to {prompt}"
+        finally:
+            self.in_flight -= 1
+
+
+class TestLLMGateway:
+    """Test cases for LLMGateway"""
+
+    @pytest.mark.asyncio
+    async def test_per_model_concurrency_cap(self):
+        gateway = FakeLLMGateway(default_concurrency=2, model_concurrency={"big-model": 1})
+
+        results = await asyncio.gather(*(gateway.generate(f"q{i}") for i in range(6)))
+        assert results == [f"answer to q{i}" for i in range(6)]
+        assert gateway.max_in_flight == 2
+
+        gateway.max_in_flight = 0
+        await asyncio.gather(*(gateway.generate("q", model="big-model") for _ in range(3)))
+        assert gateway.max_in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_interactive_requests_jump_the_queue(self):
+        gateway = FakeLLMGateway(default_concurrency=1)
+
+        running = asyncio.ensure_future(gateway.generate("first", priority=LLMPriority.BATCH))
+        await asyncio.sleep(0)
+        batch = [
+            asyncio.ensure_future(gateway.generate(f"batch{i}", priority=LLMPriority.BATCH))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        chat = asyncio.ensure_future(gateway.generate("chat", priority=LLMPriority.INTERACTIVE))
+
+        await asyncio.gather(running, chat, *batch)
+        assert gateway.started == ["first", "chat", "batch0", "batch1", "batch2"]
+
+    @pytest.mark.asyncio
+    async def test_deadline_covers_queue_wait(self):
+        gateway = FakeLLMGateway(default_concurrency=1, delay=0.2)
+
+        running = asyncio.ensure_future(gateway.generate("slow"))
+        await asyncio.sleep(0)
+        with llm_deadline(0.05):
+            with pytest.raises(LLMTimeoutError):
+                await gateway.generate("queued")
+
+        assert await running == "answer to slow"
+        assert gateway.started == ["slow"]
+        assert gateway.stats["timeouts"] == 1
+        assert gateway.get_stats()["models"]["http://ollama.test test-model"]["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_frees_its_slot(self):
+        gateway = FakeLLMGateway(default_concurrency=1, delay=0.05)
+
+        running = asyncio.ensure_future(gateway.generate("cancelled"))
+        await asyncio.sleep(0.01)
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+
+        assert await gateway.generate("next") == "answer to next"
+        assert gateway.stats["cancelled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_release_slot_and_propagate(self):
+        gateway = FakeLLMGateway(default_concurrency=1)
+
+        with pytest.raises(LLMGatewayError):
+            await gateway.generate("fail")
+
+        assert await gateway.generate("ok") == "answer to ok"
+        assert gateway.stats["errors"] == 1
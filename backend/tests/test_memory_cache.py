@@ -0,0 +1,104 @@
+"""
+Tests for the in-process MemoryCache eviction policies
+"""
+import time
+
+import pytest
+
+from services.caching_service import CacheStrategy, MemoryCache, _estimate_size
+
+
+class TestMemoryCache:
+    """Test cases for MemoryCache"""
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = MemoryCache(max_size=2, strategy=CacheStrategy.LRU)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert sorted(cache.cache) == ["a", "c"]
+
+    def test_lfu_evicts_least_frequently_used(self):
+        cache = MemoryCache(max_size=3, strategy=CacheStrategy.LFU)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        cache.set("d", 4)
+
+        assert sorted(cache.cache) == ["a", "b", "d"]
+
+    def test_adaptive_protects_reused_keys_from_scans(self):
+        cache = MemoryCache(max_size=4, strategy=CacheStrategy.ADAPTIVE)
+        for key in ("a", "b"):
+            cache.set(key, key)
+            cache.get(key)
+        for key in "cdefgh":
+            cache.set(key, key)
+
+        assert {"a", "b"} <= set(cache.cache)
+
+    def test_ttl_strategy_evicts_expired_first(self, monkeypatch):
+        cache = MemoryCache(max_size=2, strategy=CacheStrategy.TTL)
+        cache.set("old", 1)
+        cache.set("short", 2, ttl=60)
+        later = time.time() + 120
+        monkeypatch.setattr(time, "time", lambda: later)
+        cache.set("new", 3)
+
+        assert sorted(cache.cache) == ["new", "old"]
+        assert cache.get_stats()["expiration_count"] == 1
+
+    def test_expired_entries_are_not_served(self):
+        cache = MemoryCache()
+        cache.set("query:1", {"answer": 42}, ttl=60)
+        cache.cache["query:1"].expires_at = time.time() - 1
+
+        assert cache.get("query:1") is None
+        assert "query:1" not in cache.cache
+        assert cache.get_stats()["patterns"]["query"] == {
+            "hits": 0, "misses": 1, "evictions": 0, "expirations": 1
+        }
+
+    def test_byte_budget_limits_capacity(self):
+        vector = [0.1] * 4096
+        cache = MemoryCache(max_size=100, max_bytes=int(_estimate_size(vector) * 2.5))
+        for i in range(5):
+            cache.set(f"embeddings:{i}", list(vector))
+
+        assert len(cache.cache) == 2
+        assert cache.total_bytes <= cache.max_bytes
+        assert cache.get_stats()["patterns"]["embeddings"]["evictions"] == 3
+
+    def test_oversized_value_is_not_cached(self):
+        cache = MemoryCache(max_bytes=1024)
+        cache.set("big", [0.0] * 4096)
+
+        assert cache.get("big") is None
+        assert cache.total_bytes == 0
+
+    def test_overwrite_updates_byte_accounting(self):
+        cache = MemoryCache(strategy=CacheStrategy.LFU)
+        cache.set("k", [1.0] * 10)
+        cache.set("k", [1.0] * 100)
+
+        assert cache.total_bytes == _estimate_size([1.0] * 100)
+        assert cache.cache["k"].freq == 2
+
+    @pytest.mark.parametrize("strategy", [
+        CacheStrategy.LRU, CacheStrategy.LFU, CacheStrategy.TTL, CacheStrategy.ADAPTIVE
+    ])
+    def test_size_bound_holds_under_churn(self, strategy):
+        cache = MemoryCache(max_size=100, strategy=strategy)
+        for i in range(5000):
+            cache.set(f"p{i % 3}:{i}", i, ttl=300 if i % 2 else None)
+            cache.get(f"p{i % 3}:{i // 2}")
+            if i % 7 == 0:
+                cache.delete(f"p{i % 3}:{i - 3}")
+
+        assert len(cache.cache) == 100
+        assert cache.total_bytes == sum(entry.size for entry in cache.cache.values())
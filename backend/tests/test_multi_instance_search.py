@@ -0,0 +1,97 @@
+"""
+Tests for concurrent cross-instance search in MultiInstanceVectorStoreService
+"""
+import asyncio
+
+import pytest
+
+from multi_instance_arxiv_system.vector_store.multi_instance_vector_store_service import (
+    MultiInstanceVectorStoreService
+)
+
+
+class FakeInstanceService:
+    def __init__(self, name, scores, delay=0.0, error=None):
+        self.collection_name = f"scholar_instance_{name}_papers"
+        self.scores = scores
+        self.delay = delay
+        self.error = error
+        self.seen_filters = []
+
+    async def semantic_search(self, query, n_results, filters, include_metadata):
+        self.seen_filters.append(filters)
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [
+            {'id': f"{self.collection_name}_{i}", 'relevance_score': score}
+            for i, score in enumerate(self.scores[:n_results])
+        ]
+
+
+def make_service(**instances):
+    service = MultiInstanceVectorStoreService()
+    for name, fake in instances.items():
+        service.instance_services[name] = fake
+        service.initialized_instances.add(name)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_merges_instances_by_relevance():
+    service = make_service(
+        ai=FakeInstanceService('ai', [0.9, 0.5, 0.1]),
+        quant=FakeInstanceService('quant', [0.8, 0.7, 0.2]),
+    )
+
+    results = await service.search_all_instances("query", n_results=4)
+
+    assert [r['relevance_score'] for r in results] == [0.9, 0.8, 0.7, 0.5]
+    assert [r['global_rank'] for r in results] == [1, 2, 3, 4]
+    assert all('instance_latency_ms' in r for r in results)
+
+
+@pytest.mark.asyncio
+async def test_slow_instance_returns_partial_results():
+    service = make_service(
+        ai=FakeInstanceService('ai', [0.9, 0.5]),
+        quant=FakeInstanceService('quant', [0.99], delay=5),
+    )
+
+    report = await asyncio.wait_for(
+        service.search_all_instances_with_report("query", n_results=5, instance_timeout=0.05),
+        timeout=1
+    )
+
+    assert report['partial'] is True
+    assert report['instances']['quant']['status'] == 'timeout'
+    assert report['instances']['ai']['status'] == 'ok'
+    assert report['instances']['ai']['result_count'] == 2
+    assert {r['instance_name'] for r in report['results']} == {'ai'}
+
+
+@pytest.mark.asyncio
+async def test_failing_instance_is_reported():
+    service = make_service(
+        ai=FakeInstanceService('ai', [0.4]),
+        quant=FakeInstanceService('quant', [], error=RuntimeError("down")),
+    )
+
+    report = await service.search_all_instances_with_report("query", n_results=5)
+
+    assert report['instances']['quant']['status'] == 'error'
+    assert [r['instance_name'] for r in report['results']] == ['ai']
+
+
+@pytest.mark.asyncio
+async def test_caller_filters_are_not_shared_between_instances():
+    ai = FakeInstanceService('ai', [0.4])
+    quant = FakeInstanceService('quant', [0.3])
+    service = make_service(ai=ai, quant=quant)
+    filters = {'year': 2024}
+
+    await service.search_all_instances("query", filters=filters)
+
+    assert filters == {'year': 2024}
+    assert ai.seen_filters[0]['instance_name'] == 'ai'
+    assert quant.seen_filters[0]['instance_name'] == 'quant'
@@ -0,0 +1,88 @@
+"""
+Tests for request coalescing and early refresh in MultiLevelCache
+"""
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.caching_service import MultiLevelCache
+
+
+@pytest.fixture
+def redis_client():
+    client = AsyncMock()
+    client.get.return_value = None
+    client.set.return_value = True
+    return client
+
+
+class TestMultiLevelCache:
+    """Test cases for MultiLevelCache"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_fetch(self, redis_client):
+        cache = MultiLevelCache(redis_client)
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"answer": 42}
+
+        results = await asyncio.gather(*(cache.get("query:hot", fetch) for _ in range(20)))
+
+        assert calls == 1
+        assert results == [{"answer": 42}] * 20
+        assert cache.get_stats()["coalesced_fetches"] == 19
+        assert cache.get_stats()["inflight_fetches"] == 0
+
+    @pytest.mark.asyncio
+    async def test_sync_fetch_function(self, redis_client):
+        cache = MultiLevelCache(redis_client)
+
+        assert await cache.get("profile:1", lambda: {"name": "Ada"}) == {"name": "Ada"}
+        assert await cache.get("profile:1") == {"name": "Ada"}
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_revalidating(self, redis_client, monkeypatch):
+        cache = MultiLevelCache(redis_client, stale_while_revalidate=60)
+        await cache.set("query:q", "old", ttl=30)
+
+        later = time.time() + 45
+        monkeypatch.setattr(time, "time", lambda: later)
+        refreshed = asyncio.Event()
+
+        async def fetch():
+            refreshed.set()
+            return "new"
+
+        assert await cache.get("query:q", fetch) == "old"
+        await asyncio.wait_for(refreshed.wait(), timeout=1)
+        await asyncio.sleep(0)
+
+        assert await cache.get("query:q", fetch) == "new"
+        stats = cache.get_stats()
+        assert stats["stale_hits"] == 1
+        assert stats["background_refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_value_not_served_without_fetch_function(self, redis_client, monkeypatch):
+        cache = MultiLevelCache(redis_client)
+        await cache.set("query:q", "old", ttl=30)
+
+        later = time.time() + 45
+        monkeypatch.setattr(time, "time", lambda: later)
+
+        assert await cache.get("query:q") is None
+
+    @pytest.mark.asyncio
+    async def test_fresh_entry_is_not_refreshed_early(self, redis_client):
+        cache = MultiLevelCache(redis_client)
+        await cache.set("query:q", "value", ttl=300)
+        fetch = AsyncMock(return_value="other")
+
+        assert await cache.get("query:q", fetch) == "value"
+        fetch.assert_not_called()
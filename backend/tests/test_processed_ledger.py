@@ -0,0 +1,63 @@
+"""
+Tests for the append-only processed paper ledger
+"""
+import json
+
+from arxiv_rag_enhancement.shared.processed_ledger import BloomFilter, ProcessedPaperLedger
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, false_positive_rate=0.01)
+    keys = [f"2401.{i:05d}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"2402.{i:05d}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_marks_are_appended_and_survive_reopen(tmp_path):
+    ledger = ProcessedPaperLedger(tmp_path / "processed.ledger")
+    ledger.update(["2401.00001", "2401.00002"])
+    ledger.add("2401.00002")
+
+    assert (tmp_path / "processed.log").read_text() == "2401.00001\n2401.00002\n"
+
+    reopened = ProcessedPaperLedger(tmp_path / "processed.ledger")
+    assert "2401.00001" in reopened
+    assert "2401.00003" not in reopened
+    assert len(reopened) == 2
+
+
+def test_compaction_moves_log_into_index(tmp_path):
+    ledger = ProcessedPaperLedger(tmp_path / "processed.ledger", compact_every=3)
+    ledger.update(["a", "b", "c", "d"])
+
+    assert (tmp_path / "processed.log").read_text() == ""
+    assert len(ledger) == 4
+    assert all(paper_id in ledger for paper_id in "abcd")
+
+    ledger.add("e")
+    ledger.close()
+    reopened = ProcessedPaperLedger(tmp_path / "processed.ledger")
+    assert sorted(reopened) == ["a", "b", "c", "d", "e"]
+
+
+def test_torn_final_line_is_discarded(tmp_path):
+    (tmp_path / "processed.log").write_text("2401.00001\n2401.000")
+
+    ledger = ProcessedPaperLedger(tmp_path / "processed.ledger")
+
+    assert "2401.00001" in ledger
+    assert "2401.000" not in ledger
+    ledger.add("2401.00002")
+    assert (tmp_path / "processed.log").read_text() == "2401.00001\n2401.00002\n"
+
+
+def test_bloom_grows_with_the_index(tmp_path):
+    ledger = ProcessedPaperLedger(tmp_path / "processed.ledger", compact_every=50, expected_items=10)
+    ledger.update(str(i) for i in range(200))
+
+    assert ledger._bloom.capacity >= 100
+    assert all(str(i) in ledger for i in range(200))
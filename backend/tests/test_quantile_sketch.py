@@ -0,0 +1,108 @@
+"""
+Tests for streaming quantile sketches and the sketch-backed performance metrics
+"""
+import json
+import random
+
+import pytest
+
+from core.distributed_tracing import PerformanceMetrics
+from core.quantile_sketch import QuantileSketch, WindowedSketch
+
+
+@pytest.fixture
+def values():
+    rng = random.Random(0)
+    return [rng.lognormvariate(-3, 1.5) for _ in range(20000)]
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_quantiles_are_within_relative_accuracy(values):
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.01, 0.5, 0.95, 0.99, 0.999):
+        exact = exact_quantile(values, q)
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+    assert sketch.count == len(values)
+    assert sketch.min == min(values) and sketch.max == max(values)
+
+
+def test_merged_sketches_match_a_single_sketch(values):
+    whole = QuantileSketch()
+    parts = [QuantileSketch() for _ in range(4)]
+    for index, value in enumerate(values):
+        whole.add(value)
+        parts[index % 4].add(value)
+
+    merged = QuantileSketch.from_dict(json.loads(json.dumps(parts[0].to_dict())))
+    for part in parts[1:]:
+        merged.merge(part)
+
+    assert merged.count == whole.count
+    assert merged.sum == pytest.approx(whole.sum)
+    for q in (0.5, 0.95, 0.99):
+        assert merged.quantile(q) == whole.quantile(q)
+
+
+def test_negative_and_zero_values():
+    sketch = QuantileSketch()
+    for value in [-10.0, -1.0, 0.0, 0.0, 1.0, 10.0]:
+        sketch.add(value)
+
+    assert sketch.quantile(0) == -10.0
+    assert sketch.quantile(0.2) == pytest.approx(-1.0, rel=0.01)
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1) == 10.0
+    assert sketch.count_at_most(0) == 4
+
+
+def test_bucket_count_is_bounded():
+    sketch = QuantileSketch(max_buckets=64)
+    for exponent in range(-9, 9):
+        for _ in range(10):
+            sketch.add(10.0 ** exponent)
+
+    assert len(sketch.positive.counts) <= 64
+    assert sketch.count == 180
+    assert sketch.quantile(0.99) == pytest.approx(1e8, rel=0.01)
+
+
+def test_window_drops_expired_intervals():
+    windowed = WindowedSketch(interval_seconds=10, window_intervals=3)
+    windowed.add(1.0, now=0)
+    windowed.add(2.0, now=15)
+    windowed.add(3.0, now=25)
+
+    assert windowed.recent(now=29).count == 3
+    assert windowed.recent(now=31).count == 2
+    assert windowed.total.count == 3
+
+
+def test_performance_metrics_summary_and_prometheus():
+    metrics = PerformanceMetrics()
+    for value in (0.002, 0.02, 0.2, 2.0):
+        metrics.record_duration("span.rag.query.duration", value)
+    metrics.record_histogram("context.size", 12)
+    metrics.increment_counter("span.rag.query.count", 4)
+
+    other = PerformanceMetrics()
+    other.record_duration("span.rag.query.duration", 20.0)
+    other.increment_counter("span.rag.query.count")
+    metrics.merge_snapshot(json.loads(json.dumps(other.snapshot())))
+
+    summary = metrics.get_metrics_summary()
+    assert summary["durations"]["span.rag.query.duration"]["count"] == 5
+    assert summary["durations"]["span.rag.query.duration"]["max"] == 20.0
+    assert summary["counters"]["span.rag.query.count"] == 5
+
+    exposition = metrics.to_prometheus()
+    assert "span_rag_query_count_total 5" in exposition
+    assert 'span_rag_query_duration_bucket{le="0.025"} 2' in exposition
+    assert 'span_rag_query_duration_bucket{le="+Inf"} 5' in exposition
+    assert "# TYPE context_size summary" in exposition
@@ -0,0 +1,60 @@
+"""
+Tests for single-pass extraction in ScientificPDFProcessor
+"""
+import hashlib
+from unittest.mock import patch
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("pdfplumber")
+
+from services.scientific_pdf_processor import ScientificPDFProcessor
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    doc = fitz.open()
+    for lines in (
+        ["Deep Learning for Science", "Abstract", "We study scaling laws. See Figure 1."],
+        ["Introduction", "Prior work [1] is discussed.", "References", "[1] A. Author, 2020."],
+    ):
+        page = doc.new_page()
+        for i, line in enumerate(lines):
+            page.insert_text((72, 72 + 20 * i), line)
+    path = tmp_path / "paper.pdf"
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+class TestScientificPDFProcessor:
+    """Test cases for ScientificPDFProcessor"""
+
+    def test_document_id_is_content_hash(self, sample_pdf):
+        result = ScientificPDFProcessor().extract_comprehensive_content(str(sample_pdf))
+
+        expected = hashlib.md5(sample_pdf.read_bytes()).hexdigest()[:16]
+        assert result['document_id'] == f"doc_{expected}"
+
+    def test_extracts_text_from_all_pages(self, sample_pdf):
+        result = ScientificPDFProcessor().extract_comprehensive_content(str(sample_pdf))
+
+        assert "scaling laws" in result['full_text']
+        assert "Prior work" in result['full_text']
+        assert result['figures_tables']['figures'][0]['figure_id'] == "figure_1"
+
+    def test_file_is_read_once(self, sample_pdf):
+        processor = ScientificPDFProcessor()
+        with patch("builtins.open", wraps=open) as opened:
+            processor.extract_comprehensive_content(str(sample_pdf))
+
+        assert opened.call_count == 1
+
+    def test_pdfplumber_only_used_for_low_confidence_pages(self, sample_pdf):
+        processor = ScientificPDFProcessor()
+        with patch.object(processor, '_find_tables_pymupdf', return_value=([], True)), \
+                patch.object(processor, '_open_pdfplumber') as open_plumber:
+            processor.extract_comprehensive_content(str(sample_pdf))
+
+        open_plumber.assert_not_called()
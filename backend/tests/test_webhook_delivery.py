@@ -0,0 +1,228 @@
+"""
+Tests for pooled webhook delivery and the webhook endpoint cache
+"""
+import asyncio
+import json
+from dataclasses import asdict
+from datetime import datetime
+
+import pytest
+
+from services.webhook_delivery import DeliveryPool, EndpointCache
+
+
+class CountingLoader:
+    def __init__(self, endpoints):
+        self.endpoints = endpoints
+        self.calls = []
+
+    async def __call__(self, endpoint_id):
+        self.calls.append(endpoint_id)
+        await asyncio.sleep(0)
+        return self.endpoints.get(endpoint_id)
+
+
+def test_concurrent_misses_share_one_load():
+    loader = CountingLoader({"a": {"url": "https://a.example"}})
+    cache = EndpointCache(loader)
+
+    async def run():
+        return await asyncio.gather(*(cache.get("a") for _ in range(50)))
+
+    results = asyncio.run(run())
+
+    assert loader.calls == ["a"]
+    assert all(result == {"url": "https://a.example"} for result in results)
+
+
+def test_invalidated_endpoints_are_reloaded():
+    loader = CountingLoader({"a": 1})
+    cache = EndpointCache(loader)
+
+    async def run():
+        first = await cache.get("a")
+        loader.endpoints["a"] = 2
+        cached = await cache.get("a")
+        cache.invalidate("a")
+        return first, cached, await cache.get("a")
+
+    assert asyncio.run(run()) == (1, 1, 2)
+    assert loader.calls == ["a", "a"]
+
+
+def test_missing_endpoints_are_cached_and_expire():
+    loader = CountingLoader({})
+    cache = EndpointCache(loader, ttl=0)
+
+    async def run():
+        return await cache.get_many(["x", "y", "x"]), await cache.get("x")
+
+    found, again = asyncio.run(run())
+
+    assert found == {"x": None, "y": None}
+    assert again is None
+    assert loader.calls == ["x", "y", "x"]
+
+
+def test_failed_loads_are_not_cached():
+    async def failing(endpoint_id):
+        raise ConnectionError("redis down")
+
+    cache = EndpointCache(failing)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(cache.get("a"))
+    cache.loader = CountingLoader({"a": 1})
+    assert asyncio.run(cache.get("a")) == 1
+
+
+class FakeResponse:
+    def __init__(self, session):
+        self.session = session
+        self.status = 200
+
+    async def __aenter__(self):
+        self.session.active += 1
+        self.session.max_active = max(self.session.max_active, self.session.active)
+        await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.session.active -= 1
+
+    async def text(self):
+        return "ok"
+
+
+class FakeSession:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.closed = False
+
+    def post(self, url, data=None, headers=None):
+        return FakeResponse(self)
+
+
+def test_pool_limits_concurrency_per_host():
+    pool = DeliveryPool(per_host_limit=3)
+    session = FakeSession()
+    pool._get_session = lambda: session
+
+    async def run():
+        return await asyncio.gather(*(
+            pool.post(f"https://hooks.example/{i}", "{}", {}) for i in range(12)
+        ))
+
+    results = asyncio.run(run())
+
+    assert results == [(200, "ok")] * 12
+    assert session.max_active == 3
+
+
+class FakeRedis:
+    """The RedisClient calls made by delivery processing, yielding like the real client"""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.writes = []
+
+    async def get(self, key):
+        await asyncio.sleep(0)
+        return self.values.get(key)
+
+    async def set(self, key, value, expire=None):
+        await asyncio.sleep(0)
+        self.writes.append(key)
+        self.values[key] = value
+        return True
+
+    async def setex(self, key, seconds, value):
+        return await self.set(key, value)
+
+    async def hgetall(self, name):
+        await asyncio.sleep(0)
+        return dict(self.hashes.get(name, {}))
+
+    async def hset(self, name, mapping):
+        await asyncio.sleep(0)
+        self.writes.append(name)
+        self.hashes.setdefault(name, {}).update(mapping)
+        return True
+
+    async def hincrby(self, name, key, amount=1):
+        await asyncio.sleep(0)
+        self.writes.append(name)
+        fields = self.hashes.setdefault(name, {})
+        fields[key] = int(fields.get(key, 0)) + amount
+        return fields[key]
+
+    async def zadd(self, key, mapping):
+        return len(mapping)
+
+
+class StatusPool:
+    def __init__(self, statuses):
+        self.statuses = statuses
+
+    async def post(self, url, payload, headers):
+        await asyncio.sleep(0)
+        return self.statuses.pop(0), ""
+
+
+def delivery_service(monkeypatch, statuses):
+    import services.webhook_service as webhook_service
+
+    redis = FakeRedis()
+    monkeypatch.setattr(webhook_service, "redis_client", redis)
+    service = webhook_service.WebhookService()
+    service.delivery_pool = StatusPool(statuses)
+    endpoint = webhook_service.WebhookEndpoint(
+        id="w1", user_id="u1", url="https://hooks.example/w1", events=["e"],
+        secret="s", is_active=True, created_at=datetime(2026, 1, 1)
+    )
+    redis.values["webhooks:endpoints:w1"] = json.dumps(asdict(endpoint), default=str)
+
+    def delivery(i):
+        return webhook_service.WebhookDelivery(
+            id=f"d{i}", webhook_id="w1", event_id=f"e{i}", url=endpoint.url,
+            payload={"event": {"event_type": "e"}}, status="pending", attempts=0
+        )
+
+    return service, redis, delivery
+
+
+def test_concurrent_failures_are_all_counted(monkeypatch):
+    service, redis, delivery = delivery_service(monkeypatch, [500] * 20)
+
+    async def run():
+        cached = await service.endpoint_cache.get("w1")
+        await asyncio.gather(*(service._process_delivery(delivery(i)) for i in range(20)))
+        return cached, await service._load_endpoint("w1")
+
+    cached, stored = asyncio.run(run())
+
+    assert stored.failure_count == 20
+    assert cached.failure_count == 0
+    assert "webhooks:endpoints:w1" not in redis.writes
+
+
+def test_deliveries_do_not_overwrite_endpoint_edits(monkeypatch):
+    service, redis, delivery = delivery_service(monkeypatch, [500, 200, 200])
+
+    async def run():
+        await service.endpoint_cache.get("w1")
+        endpoint = json.loads(redis.values["webhooks:endpoints:w1"])
+        endpoint["url"] = "https://hooks.example/edited"
+        redis.values["webhooks:endpoints:w1"] = json.dumps(endpoint)
+        for i in range(3):
+            await service._process_delivery(delivery(i))
+        return await service._load_endpoint("w1")
+
+    stored = asyncio.run(run())
+
+    assert stored.url == "https://hooks.example/edited"
+    assert stored.failure_count == 0
+    assert stored.last_triggered is not None
+    assert redis.writes.count("webhooks:state:w1") == 3
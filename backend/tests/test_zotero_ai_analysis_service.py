@@ -7,6 +7,7 @@ from unittest.mock import Mock, patch, AsyncMock
 from datetime import datetime
 from sqlalchemy.orm import Session
 
+from services.llm_gateway import LLMGatewayError
 from services.zotero.zotero_ai_analysis_service import ZoteroAIAnalysisService
 from models.zotero_models import ZoteroItem, ZoteroLibrary, ZoteroConnection
 
@@ -356,28 +357,33 @@ class TestZoteroAIAnalysisService:
         prompt = "Test prompt"
         expected_response = "Test response"
         
-        mock_response = Mock()
-        mock_response.json.return_value = {"response": expected_response}
-        mock_response.raise_for_status.return_value = None
-        
-        with patch('requests.post', return_value=mock_response) as mock_post:
+        with patch(
+            'services.llm_gateway.LLMGateway._request_generation',
+            new_callable=AsyncMock,
+            return_value=expected_response
+        ) as mock_request:
             result = await ai_analysis_service._call_llm(prompt)
             
             assert result == expected_response
-            mock_post.assert_called_once()
+            mock_request.assert_called_once()
             
             # Verify request parameters
-            call_args = mock_post.call_args
-            assert call_args[1]["json"]["model"] == ai_analysis_service.model
-            assert call_args[1]["json"]["prompt"] == prompt
-            assert call_args[1]["json"]["stream"] is False
+            base_url, model, sent_prompt, options = mock_request.call_args[0]
+            assert base_url == ai_analysis_service.ollama_url.rstrip("/")
+            assert model == ai_analysis_service.model
+            assert sent_prompt == prompt
+            assert options["num_predict"] == ai_analysis_service.max_tokens
     
     @pytest.mark.asyncio
     async def test_call_llm_request_error(self, ai_analysis_service):
         """Test LLM call with request error"""
         prompt = "Test prompt"
         
-        with patch('requests.post', side_effect=Exception("Connection error")):
+        with patch(
+            'services.llm_gateway.LLMGateway._request_generation',
+            new_callable=AsyncMock,
+            side_effect=LLMGatewayError("Connection error")
+        ):
             with pytest.raises(Exception, match="LLM service unavailable"):
                 await ai_analysis_service._call_llm(prompt)
     
@@ -0,0 +1,153 @@
+"""
+Tests for pipelined Zotero item page fetching and bulk item writes
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from core.database import Base
+from models.zotero_models import (
+    ZoteroConnection, ZoteroLibrary, ZoteroCollection, ZoteroItem, ZoteroItemCollection
+)
+from services.zotero.zotero_bulk_import import (
+    ITEM_KEYS_PER_REQUEST, ZoteroItemBulkWriter, iter_item_pages, iter_items_by_key
+)
+
+
+class FakeClient:
+    def __init__(self, total_items, budget=4):
+        self.total_items = total_items
+        self.budget = budget
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def available_request_budget(self):
+        return self.budget
+
+    async def get_items(self, auth_token, library_type, library_id, limit=100, start=0, item_keys=None, **params):
+        self.requested.append(item_keys or start)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            if item_keys:
+                return [{"key": key} for key in item_keys]
+            return [{"key": f"K{i}"} for i in range(start, min(start + limit, self.total_items))]
+        finally:
+            self.in_flight -= 1
+
+
+async def collect_pages(client, **kwargs):
+    return [
+        (start, [item["key"] for item in items])
+        async for start, items in iter_item_pages(client, "token", "user", "1", page_size=10, **kwargs)
+    ]
+
+
+def test_pages_are_yielded_in_order_until_a_short_page():
+    client = FakeClient(total_items=25)
+    pages = asyncio.run(collect_pages(client))
+
+    assert [start for start, _ in pages] == [0, 10, 20]
+    assert pages[2][1] == ["K20", "K21", "K22", "K23", "K24"]
+    assert client.max_in_flight > 1
+
+
+def test_prefetch_depth_follows_request_budget():
+    client = FakeClient(total_items=50, budget=0)
+    pages = asyncio.run(collect_pages(client))
+
+    assert len(pages) == 5
+    assert client.max_in_flight == 1
+    assert client.requested == [0, 10, 20, 30, 40, 50]
+
+
+def test_empty_library_yields_nothing():
+    assert asyncio.run(collect_pages(FakeClient(total_items=0))) == []
+
+
+def test_items_by_key_are_fetched_in_key_batches():
+    client = FakeClient(total_items=0)
+    keys = [f"K{i}" for i in range(ITEM_KEYS_PER_REQUEST * 2 + 1)]
+
+    async def collect():
+        return [
+            [item["key"] for item in items]
+            async for items in iter_items_by_key(client, "token", "user", "1", keys)
+        ]
+
+    batches = asyncio.run(collect())
+
+    assert [len(batch) for batch in batches] == [ITEM_KEYS_PER_REQUEST, ITEM_KEYS_PER_REQUEST, 1]
+    assert sum(batches, []) == keys
+    assert client.max_in_flight > 1
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        model.__table__
+        for model in (ZoteroConnection, ZoteroLibrary, ZoteroCollection, ZoteroItem, ZoteroItemCollection)
+    ])
+    session = Session(engine)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def library(db):
+    connection = ZoteroConnection(user_id="user-1", zotero_user_id="z1", access_token="token")
+    db.add(connection)
+    db.flush()
+    library = ZoteroLibrary(
+        connection_id=connection.id, zotero_library_id="1", library_type="user", library_name="Mine"
+    )
+    db.add(library)
+    db.flush()
+    db.add(ZoteroCollection(library_id=library.id, zotero_collection_key="C1", collection_name="Reading"))
+    db.commit()
+    return library
+
+
+def transform(data):
+    if data.get("title") is None:
+        raise ValueError("missing title")
+    return {"item_type": data.get("itemType", "journalArticle"), "title": data["title"]}
+
+
+def api_item(key, version, title, collections=()):
+    return {"key": key, "version": version, "data": {"title": title, "collections": list(collections)}}
+
+
+def test_bulk_writer_inserts_and_only_updates_newer_versions(db, library):
+    writer = ZoteroItemBulkWriter(db, library, transform)
+
+    result = writer.write_page([
+        api_item("A", 1, "First", collections=["C1", "C1", "missing"]),
+        api_item("B", 1, "Second"),
+    ])
+    assert (result.added, result.updated, result.unchanged, result.failed) == (2, 0, 0, [])
+    assert db.query(ZoteroItemCollection).count() == 1
+
+    result = writer.write_page([api_item("A", 2, "First, revised"), api_item("B", 1, "Stale")])
+    assert (result.added, result.updated, result.unchanged) == (0, 1, 1)
+
+    titles = dict(db.execute(select(ZoteroItem.zotero_item_key, ZoteroItem.title)).all())
+    assert titles == {"A": "First, revised", "B": "Second"}
+    # A was re-written without collections, so its link to C1 is gone
+    assert db.query(ZoteroItemCollection).count() == 0
+
+
+def test_bulk_writer_reports_items_that_fail_to_transform(db, library):
+    writer = ZoteroItemBulkWriter(db, library, transform)
+
+    result = writer.write_page([api_item("A", 1, "Kept"), api_item("B", 1, None)])
+
+    assert result.added == 1
+    assert result.failed == [("B", "missing title")]
+    assert db.query(ZoteroItem).count() == 1
@@ -5,8 +5,11 @@ import pytest
 import asyncio
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
+from core.database import Base
 from services.zotero.zotero_sync_service import ZoteroLibrarySyncService, ZoteroSyncProgress
 from models.zotero_models import (
     ZoteroConnection, ZoteroLibrary, ZoteroCollection, ZoteroItem,
@@ -69,6 +72,95 @@ def sync_service():
     return ZoteroLibrarySyncService()
 
 
+@pytest.fixture
+def sqlite_db():
+    """In-memory database with the Zotero item tables, shared with worker threads"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[
+        model.__table__
+        for model in (ZoteroConnection, ZoteroLibrary, ZoteroCollection, ZoteroItem, ZoteroItemCollection)
+    ])
+    session = Session(engine)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def synced_library(sqlite_db):
+    """Library synced at version 100 holding items A (v50) and B (v100) in collection C1"""
+    connection = ZoteroConnection(
+        user_id="test-user-id", zotero_user_id="12345", access_token="test-access-token"
+    )
+    sqlite_db.add(connection)
+    sqlite_db.flush()
+    library = ZoteroLibrary(
+        connection_id=connection.id,
+        zotero_library_id="12345",
+        library_type="user",
+        library_name="Test Library",
+        library_version=100
+    )
+    sqlite_db.add(library)
+    sqlite_db.flush()
+    collection = ZoteroCollection(
+        library_id=library.id, zotero_collection_key="C1", collection_name="Reading", collection_version=90
+    )
+    sqlite_db.add(collection)
+    for key, version in (("A", 50), ("B", 100)):
+        sqlite_db.add(ZoteroItem(
+            library_id=library.id, zotero_item_key=key, item_version=version,
+            item_type="journalArticle", title=f"Item {key}"
+        ))
+    sqlite_db.flush()
+    sqlite_db.add(ZoteroItemCollection(
+        item_id=sqlite_db.query(ZoteroItem).filter(ZoteroItem.zotero_item_key == "A").one().id,
+        collection_id=collection.id
+    ))
+    sqlite_db.commit()
+    return connection, library
+
+
+def delta_api_client(remote_versions, current_version, deleted=None, trashed=(), item_collections=None, collections=()):
+    """API client serving a delta since version 100"""
+    item_collections = item_collections or {}
+    api_client = AsyncMock()
+    api_client.available_request_budget = MagicMock(return_value=4)
+    api_client.get_modified_versions.return_value = (remote_versions, current_version)
+    api_client.get_collections.return_value = list(collections)
+    api_client.get_deleted.return_value = deleted or {}
+
+    async def get_items(*args, item_keys=None, **kwargs):
+        return [
+            {
+                "key": key,
+                "version": remote_versions[key],
+                "data": {
+                    "itemType": "journalArticle",
+                    "title": f"Item {key} v{remote_versions[key]}",
+                    "collections": item_collections.get(key, []),
+                    **({"deleted": 1} if key in trashed else {})
+                }
+            }
+            for key in item_keys
+        ]
+
+    api_client.get_items.side_effect = get_items
+    return api_client
+
+
+def item_collection_keys(db, item_key):
+    """Keys of the collections an item is linked to"""
+    return {
+        collection_key for (collection_key,) in db.query(ZoteroCollection.zotero_collection_key)
+        .join(ZoteroItemCollection, ZoteroItemCollection.collection_id == ZoteroCollection.id)
+        .join(ZoteroItem, ZoteroItem.id == ZoteroItemCollection.item_id)
+        .filter(ZoteroItem.zotero_item_key == item_key)
+    }
+
+
 class TestIncrementalSync:
     """Test incremental synchronization functionality"""
     
@@ -84,9 +176,9 @@ class TestIncrementalSync:
             mock_db.query.return_value.filter.return_value.all.return_value = [mock_library]
             mock_get_db.return_value.__aenter__.return_value = mock_db
             
-            # Setup API client - library is up to date
+            # Setup API client - library not modified since its version
             mock_api_client = AsyncMock()
-            mock_api_client.get_library_version.return_value = mock_library.library_version  # Same version
+            mock_api_client.get_modified_versions.return_value = (None, mock_library.library_version)
             mock_client_enter.return_value = mock_api_client
             
             progress = await sync_service.incremental_sync("test-connection")
@@ -97,265 +189,124 @@ class TestIncrementalSync:
             assert progress.errors_count == 0
     
     @pytest.mark.asyncio
-    async def test_incremental_sync_with_updates(self, sync_service, mock_connection, mock_library, mock_existing_item):
-        """Test incremental sync with item updates"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db, \
-             patch.object(sync_service.client, '__aenter__') as mock_client_enter:
-            
-            # Setup database mock
-            mock_db = AsyncMock()
-            mock_db.query.return_value.filter.return_value.first.side_effect = [
-                mock_connection,  # Connection query
-                mock_existing_item  # Item query
-            ]
-            mock_db.query.return_value.filter.return_value.all.return_value = [mock_library]
-            mock_get_db.return_value.__aenter__.return_value = mock_db
-            
-            # Setup API client with newer version and modified items
-            mock_api_client = AsyncMock()
-            mock_api_client.get_library_version.return_value = mock_library.library_version + 10  # Newer version
-            mock_api_client.get_collections.return_value = []  # No collections
-            mock_api_client.get_items.return_value = [
-                {
-                    "key": "ITEM1234",
-                    "version": 60,  # Newer than existing item
-                    "data": {
-                        "itemType": "journalArticle",
-                        "title": "Updated Title",
-                        "creators": [],
-                        "tags": [],
-                        "collections": [],
-                        "dateAdded": "2023-01-01T10:00:00Z",
-                        "dateModified": "2023-01-01T10:00:00Z"
-                    }
-                }
-            ]
-            mock_client_enter.return_value = mock_api_client
-            
-            progress = await sync_service.incremental_sync("test-connection")
-            
-            assert progress.status == SyncStatus.COMPLETED
-            assert progress.libraries_processed == 1
-            assert progress.items_processed == 1
-            assert progress.items_updated == 1
-            assert progress.items_added == 0
-            assert progress.errors_count == 0
-            
-            # Verify item was updated
-            assert mock_existing_item.title == "Updated Title"
-            assert mock_existing_item.item_version == 60
+    async def test_unchanged_library_stops_at_not_modified(self, sync_service, sqlite_db, synced_library):
+        """Test that a 304 for the version request skips every other request"""
+        connection, library = synced_library
+        api_client = delta_api_client(None, 100)
+        progress = ZoteroSyncProgress("sync", SyncType.INCREMENTAL)
+        
+        await sync_service._incremental_sync_library(sqlite_db, api_client, connection, library, progress)
+        
+        call = api_client.get_modified_versions.call_args
+        assert call.args[3:] == ("items", 100)
+        api_client.get_collections.assert_not_called()
+        api_client.get_deleted.assert_not_called()
+        api_client.get_items.assert_not_called()
+        assert library.library_version == 100
     
     @pytest.mark.asyncio
-    async def test_incremental_sync_with_new_items(self, sync_service, mock_connection, mock_library):
-        """Test incremental sync with new items"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db, \
-             patch.object(sync_service.client, '__aenter__') as mock_client_enter:
-            
-            # Setup database mock
-            mock_db = AsyncMock()
-            mock_db.query.return_value.filter.return_value.first.side_effect = [
-                mock_connection,  # Connection query
-                None  # Item query (new item)
-            ]
-            mock_db.query.return_value.filter.return_value.all.return_value = [mock_library]
-            mock_get_db.return_value.__aenter__.return_value = mock_db
-            
-            # Setup API client
-            mock_api_client = AsyncMock()
-            mock_api_client.get_library_version.return_value = mock_library.library_version + 5
-            mock_api_client.get_collections.return_value = []
-            mock_api_client.get_items.return_value = [
-                {
-                    "key": "NEWITEM123",
-                    "version": 105,
-                    "data": {
-                        "itemType": "book",
-                        "title": "New Book",
-                        "creators": [
-                            {
-                                "creatorType": "author",
-                                "firstName": "New",
-                                "lastName": "Author"
-                            }
-                        ],
-                        "tags": [{"tag": "new"}],
-                        "collections": [],
-                        "dateAdded": "2023-01-01T10:00:00Z",
-                        "dateModified": "2023-01-01T10:00:00Z"
-                    }
-                }
-            ]
-            mock_client_enter.return_value = mock_api_client
-            
-            progress = await sync_service.incremental_sync("test-connection")
-            
-            assert progress.status == SyncStatus.COMPLETED
-            assert progress.items_processed == 1
-            assert progress.items_added == 1
-            assert progress.items_updated == 0
-            assert progress.errors_count == 0
+    async def test_delta_sync_fetches_only_stale_items(self, sync_service, sqlite_db, synced_library):
+        """Test that only items missing or older locally are fetched"""
+        connection, library = synced_library
+        api_client = delta_api_client({"A": 110, "B": 100, "C": 105}, 110)
+        progress = ZoteroSyncProgress("sync", SyncType.INCREMENTAL)
+        
+        await sync_service._incremental_sync_library(sqlite_db, api_client, connection, library, progress)
+        
+        assert api_client.get_items.call_count == 1
+        assert api_client.get_items.call_args.kwargs["item_keys"] == ["A", "C"]
+        assert progress.items_processed == 2
+        assert progress.items_updated == 1
+        assert progress.items_added == 1
+        assert library.library_version == 110
+        
+        titles = dict(sqlite_db.query(ZoteroItem.zotero_item_key, ZoteroItem.title).all())
+        assert titles == {"A": "Item A v110", "B": "Item B", "C": "Item C v105"}
     
     @pytest.mark.asyncio
-    async def test_incremental_sync_with_deleted_items(self, sync_service, mock_connection, mock_library, mock_existing_item):
-        """Test incremental sync with deleted items"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db, \
-             patch.object(sync_service.client, '__aenter__') as mock_client_enter:
-            
-            # Setup database mock
-            mock_db = AsyncMock()
-            mock_db.query.return_value.filter.return_value.first.side_effect = [
-                mock_connection,  # Connection query
-                mock_existing_item  # Item query
-            ]
-            mock_db.query.return_value.filter.return_value.all.return_value = [mock_library]
-            mock_get_db.return_value.__aenter__.return_value = mock_db
-            
-            # Setup API client with deleted item
-            mock_api_client = AsyncMock()
-            mock_api_client.get_library_version.return_value = mock_library.library_version + 5
-            mock_api_client.get_collections.return_value = []
-            mock_api_client.get_items.return_value = [
-                {
-                    "key": "ITEM1234",
-                    "version": 60,
-                    "data": {
-                        "itemType": "journalArticle",
-                        "title": "Deleted Item",
-                        "deleted": True,  # Item is deleted
-                        "creators": [],
-                        "tags": [],
-                        "collections": [],
-                        "dateAdded": "2023-01-01T10:00:00Z",
-                        "dateModified": "2023-01-01T10:00:00Z"
-                    }
-                }
-            ]
-            mock_client_enter.return_value = mock_api_client
-            
-            progress = await sync_service.incremental_sync("test-connection")
-            
-            assert progress.status == SyncStatus.COMPLETED
-            assert progress.items_processed == 1
-            assert progress.items_deleted == 1
-            assert progress.items_updated == 0
-            assert progress.errors_count == 0
-            
-            # Verify item was marked as deleted
-            assert mock_existing_item.is_deleted == True
-            assert mock_existing_item.item_version == 60
+    async def test_delta_sync_applies_deletion_feed(self, sync_service, sqlite_db, synced_library):
+        """Test that deleted items are flagged and deleted collections removed in bulk"""
+        connection, library = synced_library
+        api_client = delta_api_client({}, 120, deleted={"items": ["A", "GONE"], "collections": ["C1"]})
+        progress = ZoteroSyncProgress("sync", SyncType.INCREMENTAL)
+        
+        await sync_service._incremental_sync_library(sqlite_db, api_client, connection, library, progress)
+        
+        deleted = dict(sqlite_db.query(ZoteroItem.zotero_item_key, ZoteroItem.is_deleted).all())
+        assert deleted == {"A": True, "B": False}
+        assert progress.items_deleted == 1
+        assert sqlite_db.query(ZoteroCollection).count() == 0
+        assert sqlite_db.query(ZoteroItemCollection).count() == 0
+        api_client.get_items.assert_not_called()
+        assert library.library_version == 120
     
     @pytest.mark.asyncio
-    async def test_incremental_sync_with_collections(self, sync_service, mock_connection, mock_library):
-        """Test incremental sync with collection updates"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db, \
-             patch.object(sync_service.client, '__aenter__') as mock_client_enter:
-            
-            # Setup database mock
-            mock_db = AsyncMock()
-            mock_db.query.return_value.filter.return_value.first.side_effect = [
-                mock_connection,  # Connection query
-                None  # Collection query (new collection)
-            ]
-            mock_db.query.return_value.filter.return_value.all.return_value = [mock_library]
-            mock_get_db.return_value.__aenter__.return_value = mock_db
-            
-            # Setup API client
-            mock_api_client = AsyncMock()
-            mock_api_client.get_library_version.return_value = mock_library.library_version + 5
-            mock_api_client.get_collections.return_value = [
-                {
-                    "key": "COLL1234",
-                    "version": 105,
-                    "data": {
-                        "name": "New Collection",
-                        "parentCollection": None
-                    }
-                }
-            ]
-            mock_api_client.get_items.return_value = []
-            mock_client_enter.return_value = mock_api_client
-            
-            progress = await sync_service.incremental_sync("test-connection")
-            
-            assert progress.status == SyncStatus.COMPLETED
-            assert progress.collections_processed == 1
-            assert progress.errors_count == 0
+    async def test_delta_sync_stores_trashed_items_as_deleted(self, sync_service, sqlite_db, synced_library):
+        """Test that items moved to the Zotero trash are stored as deleted"""
+        connection, library = synced_library
+        api_client = delta_api_client({"B": 105}, 105, trashed={"B"})
+        progress = ZoteroSyncProgress("sync", SyncType.INCREMENTAL)
+        
+        await sync_service._incremental_sync_library(sqlite_db, api_client, connection, library, progress)
+        
+        item = sqlite_db.query(ZoteroItem).filter(ZoteroItem.zotero_item_key == "B").one()
+        assert item.is_deleted is True
+        assert item.item_version == 105
+
+
+    @pytest.mark.asyncio
+    async def test_incremental_sync_with_collections(self, sync_service, sqlite_db, synced_library):
+        """Test that new collections are stored before items are linked to them"""
+        connection, library = synced_library
+        api_client = delta_api_client(
+            {"A": 110}, 110,
+            item_collections={"A": ["C2"]},
+            collections=[{"key": "C2", "version": 105, "data": {"name": "New Collection", "parentCollection": None}}]
+        )
+        progress = ZoteroSyncProgress("sync", SyncType.INCREMENTAL)
+        
+        await sync_service._incremental_sync_library(sqlite_db, api_client, connection, library, progress)
+        
+        assert progress.collections_processed == 1
+        assert progress.errors_count == 0
+        assert item_collection_keys(sqlite_db, "A") == {"C2"}
 
 
 class TestConflictDetection:
     """Test conflict detection functionality"""
     
     @pytest.mark.asyncio
-    async def test_detect_no_conflicts(self, sync_service, mock_connection, mock_library):
-        """Test conflict detection when no conflicts exist"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db, \
-             patch.object(sync_service.client, '__aenter__') as mock_client_enter:
-            
-            # Setup database mock
-            mock_db = AsyncMock()
-            mock_db.query.return_value.filter.return_value.first.return_value = mock_connection
-            mock_db.query.return_value.filter.return_value.all.return_value = [mock_library]
-            mock_get_db.return_value.__aenter__.return_value = mock_db
-            
-            # Setup API client - no version difference
-            mock_api_client = AsyncMock()
-            mock_api_client.get_library_version.return_value = mock_library.library_version
-            mock_client_enter.return_value = mock_api_client
-            
-            conflicts = await sync_service.detect_sync_conflicts("test-connection")
-            
-            assert conflicts["has_conflicts"] == False
-            assert conflicts["total_conflicts"] == 0
-            assert len(conflicts["libraries"]) == 0
+    async def test_detect_no_conflicts(self, sync_service, sqlite_db, synced_library):
+        """Test conflict detection when the library is not modified"""
+        connection, library = synced_library
+        api_client = delta_api_client(None, 100)
+        
+        conflicts = await sync_service._detect_library_conflicts(sqlite_db, api_client, connection, library)
+        
+        assert conflicts["conflict_count"] == 0
+        assert conflicts["conflicts"] == []
+        api_client.get_deleted.assert_not_called()
     
     @pytest.mark.asyncio
-    async def test_detect_version_conflicts(self, sync_service, mock_connection, mock_library):
-        """Test conflict detection with version mismatches"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db, \
-             patch.object(sync_service.client, '__aenter__') as mock_client_enter:
-            
-            # Setup database mock
-            mock_db = AsyncMock()
-            mock_db.query.return_value.filter.return_value.first.return_value = mock_connection
-            mock_db.query.return_value.filter.return_value.all.return_value = [mock_library]
-            mock_get_db.return_value.__aenter__.return_value = mock_db
-            
-            # Setup API client with newer version and modified items
-            mock_api_client = AsyncMock()
-            mock_api_client.get_library_version.return_value = mock_library.library_version + 10
-            mock_api_client.get_items.return_value = [
-                {
-                    "key": "ITEM1",
-                    "version": 110,
-                    "data": {
-                        "title": "Modified Item",
-                        "deleted": False
-                    }
-                },
-                {
-                    "key": "ITEM2",
-                    "version": 111,
-                    "data": {
-                        "title": "Deleted Item",
-                        "deleted": True
-                    }
-                }
-            ]
-            mock_client_enter.return_value = mock_api_client
-            
-            conflicts = await sync_service.detect_sync_conflicts("test-connection")
-            
-            assert conflicts["has_conflicts"] == True
-            assert conflicts["total_conflicts"] == 3  # 1 version + 2 items
-            assert conflicts["conflict_types"]["version_mismatch"] == 1
-            assert conflicts["conflict_types"]["modified_items"] == 1
-            assert conflicts["conflict_types"]["deleted_items"] == 1
-            assert len(conflicts["libraries"]) == 1
-            
-            library_conflicts = conflicts["libraries"][0]
-            assert library_conflicts["library_name"] == mock_library.library_name
-            assert library_conflicts["conflict_count"] == 3
-            assert len(library_conflicts["conflicts"]) == 3
+    async def test_detect_version_conflicts(self, sync_service, sqlite_db, synced_library):
+        """Test conflict detection from one version vector comparison"""
+        connection, library = synced_library
+        api_client = delta_api_client(
+            {"A": 110, "B": 100, "NEW": 111}, 111, deleted={"items": ["B"]}
+        )
+        
+        conflicts = await sync_service._detect_library_conflicts(sqlite_db, api_client, connection, library)
+        
+        assert conflicts["conflict_count"] == 3  # 1 version + 1 modified + 1 deleted
+        assert conflicts["conflict_types"] == {
+            "version_mismatch": 1,
+            "deleted_items": 1,
+            "modified_items": 1
+        }
+        modified = next(c for c in conflicts["conflicts"] if c["type"] == "modified_item")
+        assert modified["item_key"] == "A"
+        assert (modified["local_version"], modified["item_version"]) == (50, 110)
+        api_client.get_items.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_resolve_conflicts_zotero_wins(self, sync_service, mock_connection):
@@ -396,6 +347,31 @@ class TestConflictDetection:
 class TestSyncErrorHandling:
     """Test error handling in sync operations"""
     
+    @pytest.mark.asyncio
+    async def test_incremental_sync_item_error(self, sync_service, sqlite_db, synced_library):
+        """Test that an item that fails to store is reported without failing the others"""
+        connection, library = synced_library
+        api_client = delta_api_client({"A": 110, "C": 105}, 110)
+        progress = ZoteroSyncProgress("sync", SyncType.INCREMENTAL)
+        transform = sync_service._transform_item_data
+        
+        def failing_transform(data):
+            if data["title"] == "Item C v105":
+                raise ValueError("Unsupported item")
+            return transform(data)
+        
+        with patch.object(sync_service, "_transform_item_data", side_effect=failing_transform):
+            await sync_service._incremental_sync_library(sqlite_db, api_client, connection, library, progress)
+        
+        assert progress.items_processed == 1
+        assert progress.items_updated == 1
+        assert progress.errors_count == 1
+        assert progress.error_details[0]["details"] == {"item_key": "C"}
+        assert library.library_version == 110
+        
+        titles = dict(sqlite_db.query(ZoteroItem.zotero_item_key, ZoteroItem.title).all())
+        assert titles == {"A": "Item A v110", "B": "Item B"}
+    
     @pytest.mark.asyncio
     async def test_incremental_sync_api_error(self, sync_service, mock_connection, mock_library):
         """Test incremental sync with API error"""
@@ -410,7 +386,7 @@ class TestSyncErrorHandling:
             
             # Setup API client to raise error
             mock_api_client = AsyncMock()
-            mock_api_client.get_library_version.side_effect = Exception("API Error")
+            mock_api_client.get_modified_versions.side_effect = Exception("API Error")
             mock_client_enter.return_value = mock_api_client
             
             progress = await sync_service.incremental_sync("test-connection")
@@ -419,80 +395,33 @@ class TestSyncErrorHandling:
             assert progress.errors_count > 0
             assert "API Error" in progress.error_details[0]["error"]
     
-    @pytest.mark.asyncio
-    async def test_incremental_sync_item_error(self, sync_service, mock_connection, mock_library):
-        """Test incremental sync with item processing error"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db, \
-             patch.object(sync_service.client, '__aenter__') as mock_client_enter:
-            
-            # Setup database mock
-            mock_db = AsyncMock()
-            mock_db.query.return_value.filter.return_value.first.side_effect = [
-                mock_connection,  # Connection query
-                Exception("Database error")  # Item query error
-            ]
-            mock_db.query.return_value.filter.return_value.all.return_value = [mock_library]
-            mock_get_db.return_value.__aenter__.return_value = mock_db
-            
-            # Setup API client
-            mock_api_client = AsyncMock()
-            mock_api_client.get_library_version.return_value = mock_library.library_version + 5
-            mock_api_client.get_collections.return_value = []
-            mock_api_client.get_items.return_value = [
-                {
-                    "key": "ITEM1234",
-                    "version": 105,
-                    "data": {
-                        "itemType": "article",
-                        "title": "Test Item",
-                        "creators": [],
-                        "tags": [],
-                        "collections": [],
-                        "dateAdded": "2023-01-01T10:00:00Z",
-                        "dateModified": "2023-01-01T10:00:00Z"
-                    }
-                }
-            ]
-            mock_client_enter.return_value = mock_api_client
-            
-            progress = await sync_service.incremental_sync("test-connection")
-            
-            # Sync should complete but with errors for individual items
-            assert progress.status == SyncStatus.COMPLETED
-            assert progress.errors_count > 0
-            assert progress.items_processed == 1  # Item was processed despite error
-
 
 class TestCollectionUpdates:
     """Test collection update functionality"""
     
     @pytest.mark.asyncio
-    async def test_update_item_collections(self, sync_service):
-        """Test updating item collection associations"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db:
-            # Setup database mock
-            mock_db = AsyncMock()
-            mock_item = MagicMock()
-            mock_item.id = "item-id"
-            
-            # Mock existing collection
-            mock_collection = MagicMock()
-            mock_collection.id = "collection-id"
-            mock_db.query.return_value.filter.return_value.first.return_value = mock_collection
-            
-            # Mock library
-            mock_library = MagicMock()
-            mock_library.id = "library-id"
-            
-            await sync_service._update_item_collections(
-                mock_db, mock_item, ["COLL1234"], mock_library
-            )
-            
-            # Verify old associations were deleted
-            mock_db.query.return_value.filter.return_value.delete.assert_called_once()
-            
-            # Verify new association was added
-            mock_db.add.assert_called()
+    async def test_update_item_collections(self, sync_service, sqlite_db, synced_library):
+        """Test that an updated item's collection links are replaced, not added to"""
+        connection, library = synced_library
+        sqlite_db.add(ZoteroCollection(
+            library_id=library.id, zotero_collection_key="C2", collection_name="Later", collection_version=90
+        ))
+        sqlite_db.commit()
+        progress = ZoteroSyncProgress("sync", SyncType.INCREMENTAL)
+        
+        # A moves from C1 to C2, B is added to C1
+        api_client = delta_api_client({"A": 110, "B": 110}, 110, item_collections={"A": ["C2"], "B": ["C1"]})
+        await sync_service._incremental_sync_library(sqlite_db, api_client, connection, library, progress)
+        
+        assert item_collection_keys(sqlite_db, "A") == {"C2"}
+        assert item_collection_keys(sqlite_db, "B") == {"C1"}
+        
+        # A is removed from every collection
+        api_client = delta_api_client({"A": 120}, 120)
+        await sync_service._incremental_sync_library(sqlite_db, api_client, connection, library, progress)
+        
+        assert item_collection_keys(sqlite_db, "A") == set()
+        assert item_collection_keys(sqlite_db, "B") == {"C1"}
     
     @pytest.mark.asyncio
     async def test_update_collection_hierarchy(self, sync_service):
@@ -532,110 +461,6 @@ class TestCollectionUpdates:
             assert mock_child.collection_path == "Parent Collection/Child Collection"
 
 
-class TestVersionBasedSync:
-    """Test version-based synchronization logic"""
-    
-    @pytest.mark.asyncio
-    async def test_sync_single_item_update(self, sync_service, mock_connection, mock_library, mock_existing_item):
-        """Test syncing a single updated item"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db:
-            mock_db = AsyncMock()
-            mock_db.query.return_value.filter.return_value.first.return_value = mock_existing_item
-            
-            item_data = {
-                "key": "ITEM1234",
-                "version": 60,  # Newer than existing
-                "data": {
-                    "itemType": "journalArticle",
-                    "title": "Updated Title",
-                    "creators": [],
-                    "tags": [],
-                    "collections": [],
-                    "dateAdded": "2023-01-01T10:00:00Z",
-                    "dateModified": "2023-01-01T10:00:00Z"
-                }
-            }
-            
-            progress = MagicMock()
-            progress.items_updated = 0
-            progress.items_added = 0
-            progress.items_deleted = 0
-            
-            await sync_service._sync_single_item(
-                mock_db, None, mock_connection, mock_library, item_data, progress
-            )
-            
-            # Verify item was updated
-            assert progress.items_updated == 1
-            assert mock_existing_item.title == "Updated Title"
-            assert mock_existing_item.item_version == 60
-    
-    @pytest.mark.asyncio
-    async def test_sync_single_item_delete(self, sync_service, mock_connection, mock_library, mock_existing_item):
-        """Test syncing a deleted item"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db:
-            mock_db = AsyncMock()
-            mock_db.query.return_value.filter.return_value.first.return_value = mock_existing_item
-            
-            item_data = {
-                "key": "ITEM1234",
-                "version": 60,
-                "data": {
-                    "deleted": True,
-                    "itemType": "journalArticle",
-                    "title": "Deleted Item"
-                }
-            }
-            
-            progress = MagicMock()
-            progress.items_updated = 0
-            progress.items_added = 0
-            progress.items_deleted = 0
-            
-            await sync_service._sync_single_item(
-                mock_db, None, mock_connection, mock_library, item_data, progress
-            )
-            
-            # Verify item was marked as deleted
-            assert progress.items_deleted == 1
-            assert mock_existing_item.is_deleted == True
-            assert mock_existing_item.item_version == 60
-    
-    @pytest.mark.asyncio
-    async def test_sync_single_item_no_update_needed(self, sync_service, mock_connection, mock_library, mock_existing_item):
-        """Test syncing an item that doesn't need updates"""
-        with patch('services.zotero.zotero_sync_service.get_db') as mock_get_db:
-            mock_db = AsyncMock()
-            mock_existing_item.item_version = 60  # Same as remote
-            mock_db.query.return_value.filter.return_value.first.return_value = mock_existing_item
-            
-            item_data = {
-                "key": "ITEM1234",
-                "version": 60,  # Same version
-                "data": {
-                    "itemType": "journalArticle",
-                    "title": "Same Title",
-                    "creators": [],
-                    "tags": [],
-                    "collections": []
-                }
-            }
-            
-            progress = MagicMock()
-            progress.items_updated = 0
-            progress.items_added = 0
-            progress.items_deleted = 0
-            
-            await sync_service._sync_single_item(
-                mock_db, None, mock_connection, mock_library, item_data, progress
-            )
-            
-            # Verify no updates were made
-            assert progress.items_updated == 0
-            assert progress.items_added == 0
-            assert progress.items_deleted == 0
-
-
 class TestSyncStatusTracking:
     """Test sync status and progress tracking"""
     
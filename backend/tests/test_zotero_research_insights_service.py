@@ -559,11 +559,11 @@ class TestZoteroResearchInsightsService:
         prompt = "Test prompt"
         expected_response = "Test response"
         
-        mock_response = Mock()
-        mock_response.json.return_value = {"response": expected_response}
-        mock_response.raise_for_status.return_value = None
-        
-        with patch('requests.post', return_value=mock_response):
+        with patch(
+            'services.llm_gateway.LLMGateway._request_generation',
+            new_callable=AsyncMock,
+            return_value=expected_response
+        ):
             result = await insights_service._call_llm(prompt)
             
             assert result == expected_response
@@ -573,7 +573,11 @@ class TestZoteroResearchInsightsService:
         """Test LLM call failure"""
         prompt = "Test prompt"
         
-        with patch('requests.post', side_effect=Exception("Connection error")):
+        with patch(
+            'services.llm_gateway.LLMGateway._request_generation',
+            new_callable=AsyncMock,
+            side_effect=Exception("Connection error")
+        ):
             result = await insights_service._call_llm(prompt)
             
             # Should return empty string on failure
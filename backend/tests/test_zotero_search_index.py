@@ -0,0 +1,156 @@
+"""
+Tests for the Zotero full-text search index (SQLite FTS5 path)
+"""
+import json
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, Text, create_engine, desc, func
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from services.zotero.zotero_search_index import ZoteroSearchIndex, search_terms
+
+metadata = MetaData()
+
+zotero_items = Table(
+    "zotero_items", metadata,
+    Column("id", String, primary_key=True),
+    Column("title", Text),
+    Column("creators", Text),
+    Column("tags", Text),
+    Column("abstract_note", Text),
+    Column("publication_title", Text),
+    Column("publisher", Text),
+    Column("doi", Text),
+    Column("url", Text),
+    Column("publication_year", Integer),
+)
+
+
+def make_item(item_id, title="", creators=(), tags=(), abstract_note="", **fields):
+    return {
+        "id": item_id,
+        "title": title,
+        "creators": json.dumps(list(creators)),
+        "tags": json.dumps(list(tags)),
+        "abstract_note": abstract_note,
+        "publication_title": fields.get("publication_title"),
+        "publisher": fields.get("publisher"),
+        "doi": fields.get("doi"),
+        "url": fields.get("url"),
+        "publication_year": fields.get("publication_year"),
+    }
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    session = Session(engine)
+    session.execute(zotero_items.insert(), [
+        make_item("early", title="Attention Is All You Need",
+                  creators=[{"first_name": "Ashish", "last_name": "Vaswani"}],
+                  tags=["transformers"], doi="10.5555/3295222.3295349"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def search(db, text):
+    index = ZoteroSearchIndex(db, zotero_items)
+    query, rank = index.apply(db.query(zotero_items.c.id), text)
+    if rank is not None:
+        query = query.order_by(desc(rank), zotero_items.c.id)
+    rows = query.add_columns(func.count().over()).all()
+    return [row[0] for row in rows], (rows[0][1] if rows else 0)
+
+
+def test_search_terms_split_on_words():
+    assert search_terms("Deep  learning, deep-NETWORKS!") == ["deep", "learning", "networks"]
+    assert search_terms("  ?! ") == []
+
+
+def test_items_before_index_creation_are_backfilled(db):
+    assert search(db, "vaswani") == (["early"], 1)
+    assert search(db, "3295349") == (["early"], 1)
+
+
+def test_sync_writes_are_indexed_by_triggers(db):
+    search(db, "warmup")
+
+    db.execute(zotero_items.insert(), [
+        make_item("gnn", title="Graph Neural Networks", tags=["graphs"]),
+        make_item("cnn", title="Convolutional Networks", abstract_note="We study neural networks for images."),
+    ])
+    db.commit()
+    assert search(db, "neural networks")[1] == 2
+
+    db.execute(zotero_items.update().where(zotero_items.c.id == "cnn").values(abstract_note="Image models"))
+    db.commit()
+    assert search(db, "neural networks") == (["gnn"], 1)
+
+    db.execute(zotero_items.delete().where(zotero_items.c.id == "gnn"))
+    db.commit()
+    assert search(db, "neural") == ([], 0)
+
+
+def test_prefix_matching_and_all_terms_required(db):
+    db.execute(zotero_items.insert(), [
+        make_item("a", title="Reinforcement learning for robotics"),
+        make_item("b", title="Reinforcement schedules in pigeons"),
+    ])
+    db.commit()
+
+    assert search(db, "reinforce")[1] == 2
+    assert search(db, "reinforce robot") == (["a"], 1)
+
+
+def test_title_matches_rank_above_abstract_matches(db):
+    db.execute(zotero_items.insert(), [
+        make_item("abstract", title="A survey", abstract_note="Methods for causal inference in observational data."),
+        make_item("tagged", title="Observational studies", tags=["causal"]),
+        make_item("title", title="Causal Inference"),
+    ])
+    db.commit()
+
+    ids, total = search(db, "causal")
+    assert total == 3
+    assert ids == ["title", "tagged", "abstract"]
+
+
+def test_invalid_json_fields_do_not_block_writes(db):
+    db.execute(zotero_items.insert(), [
+        {**make_item("broken", title="Bayesian optimisation"), "creators": "not json", "tags": None},
+    ])
+    db.commit()
+    assert search(db, "bayesian") == (["broken"], 1)
+
+
+def test_postgres_query_uses_search_vector():
+    session = Session()
+    session.get_bind = lambda *args, **kwargs: type("Bind", (), {"dialect": postgresql.dialect()})
+
+    index = ZoteroSearchIndex(session, zotero_items)
+    query, rank = index.apply(session.query(zotero_items.c.id), "graph nets")
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+
+    assert "zotero_items.search_vector @@" in sql
+    assert "to_tsquery" in sql
+    assert "ts_rank_cd" in str(rank.compile(dialect=postgresql.dialect()))
+
+
+def test_schema_setup_leaves_caller_transaction_open(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'zotero.db'}")
+    metadata.create_all(engine)
+    session = Session(engine)
+    try:
+        session.execute(zotero_items.select()).all()
+        transaction = session.get_transaction()
+
+        assert search(session, "anything") == ([], 0)
+        assert session.get_transaction() is transaction
+    finally:
+        session.close()
+        engine.dispose()
@@ -11,7 +11,7 @@ from sqlalchemy.orm import Session
 
 from models.zotero_models import ZoteroItem, ZoteroLibrary, ZoteroConnection
 from models.zotero_schemas import ZoteroSearchRequest, ZoteroCreator
-from services.zotero.zotero_search_service import ZoteroSearchService
+from services.zotero.zotero_search_service import ZoteroSearchService, FACET_LIMITS
 
 
 class TestZoteroSearchService:
@@ -25,6 +25,7 @@ class TestZoteroSearchService:
     @pytest.fixture
     def search_service(self, mock_db):
         """Search service instance with mocked database"""
+        ZoteroSearchService.facet_cache.clear()
         return ZoteroSearchService(mock_db)
     
     @pytest.fixture
@@ -120,11 +121,11 @@ class TestZoteroSearchService:
         mock_query.join.return_value = mock_query
         mock_query.filter.return_value = mock_query
         mock_query.options.return_value = mock_query
-        mock_query.count.return_value = len(sample_references)
         mock_query.order_by.return_value = mock_query
+        mock_query.add_columns.return_value = mock_query
         mock_query.offset.return_value = mock_query
         mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = sample_references
+        mock_query.all.return_value = [(ref, len(sample_references)) for ref in sample_references]
         
         mock_db.query.return_value = mock_query
         
@@ -161,11 +162,11 @@ class TestZoteroSearchService:
         mock_query.join.return_value = mock_query
         mock_query.filter.return_value = mock_query
         mock_query.options.return_value = mock_query
-        mock_query.count.return_value = 1
         mock_query.order_by.return_value = mock_query
+        mock_query.add_columns.return_value = mock_query
         mock_query.offset.return_value = mock_query
         mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = [sample_references[0]]  # Only the first one matches
+        mock_query.all.return_value = [(sample_references[0], 1)]  # Only the first one matches
         
         mock_db.query.return_value = mock_query
         
@@ -199,11 +200,11 @@ class TestZoteroSearchService:
         mock_query.join.return_value = mock_query
         mock_query.filter.return_value = mock_query
         mock_query.options.return_value = mock_query
-        mock_query.count.return_value = len(sample_references)
         mock_query.order_by.return_value = mock_query
+        mock_query.add_columns.return_value = mock_query
         mock_query.offset.return_value = mock_query
         mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = sample_references
+        mock_query.all.return_value = [(ref, len(sample_references)) for ref in sample_references]
         
         mock_db.query.return_value = mock_query
         
@@ -218,17 +219,32 @@ class TestZoteroSearchService:
     
     # Facets Tests
     
+    @staticmethod
+    def _facet_rows(library_version=1):
+        """Rows returned by the library version query and each facet GROUP BY query"""
+        return [
+            [("lib-123", library_version)],
+            [("article", 2), ("book", 1)],
+            [(2023, 2), (2022, 1)],
+            [("John Doe", 2), ("Jane Smith", 1)],
+            [("machine learning", 2), ("AI", 1)],
+            [("Tech Press", 1)]
+        ]
+    
     @pytest.mark.asyncio
     async def test_get_search_facets(
-        self, search_service, mock_db, sample_references
+        self, search_service, mock_db
     ):
-        """Test search facets calculation"""
+        """Test search facets are aggregated in the database"""
         # Mock the query chain
         mock_query = Mock()
         mock_query.join.return_value = mock_query
         mock_query.filter.return_value = mock_query
-        mock_query.options.return_value = mock_query
-        mock_query.all.return_value = sample_references
+        mock_query.select_from.return_value = mock_query
+        mock_query.group_by.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.all.side_effect = self._facet_rows()
         
         mock_db.query.return_value = mock_query
         
@@ -250,18 +266,24 @@ class TestZoteroSearchService:
         years = facets["publication_years"]
         assert any(facet["value"] == 2023 and facet["count"] == 2 for facet in years)
         assert any(facet["value"] == 2022 and facet["count"] == 1 for facet in years)
+        
+        # Only the top buckets are fetched
+        mock_query.limit.assert_any_call(FACET_LIMITS["tags"])
     
     @pytest.mark.asyncio
     async def test_get_search_facets_with_filters(
-        self, search_service, mock_db, sample_references
+        self, search_service, mock_db
     ):
         """Test search facets with library filter"""
         # Mock the query chain
         mock_query = Mock()
         mock_query.join.return_value = mock_query
         mock_query.filter.return_value = mock_query
-        mock_query.options.return_value = mock_query
-        mock_query.all.return_value = sample_references
+        mock_query.select_from.return_value = mock_query
+        mock_query.group_by.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.all.side_effect = self._facet_rows()
         
         mock_db.query.return_value = mock_query
         
@@ -276,6 +298,34 @@ class TestZoteroSearchService:
         assert "tags" in facets
         assert "publishers" in facets
     
+    @pytest.mark.asyncio
+    async def test_get_search_facets_cached_until_library_version_changes(
+        self, search_service, mock_db
+    ):
+        """Test facets are recomputed only when the library version changes"""
+        mock_query = Mock()
+        mock_query.join.return_value = mock_query
+        mock_query.filter.return_value = mock_query
+        mock_query.select_from.return_value = mock_query
+        mock_query.group_by.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.all.side_effect = (
+            self._facet_rows(library_version=1)
+            + [[("lib-123", 1)]]
+            + self._facet_rows(library_version=2)
+        )
+        
+        mock_db.query.return_value = mock_query
+        
+        first = await search_service.get_search_facets(user_id="user-123", library_id="lib-123")
+        second = await search_service.get_search_facets(user_id="user-123", library_id="lib-123")
+        assert second == first
+        assert mock_query.all.call_count == 7  # Second call only checked the library version
+        
+        await search_service.get_search_facets(user_id="user-123", library_id="lib-123")
+        assert mock_query.all.call_count == 13
+    
     # Suggestions Tests
     
     @pytest.mark.asyncio
@@ -373,60 +423,6 @@ class TestZoteroSearchService:
     
     # Helper Method Tests
     
-    def test_calculate_item_type_facets(self, search_service, sample_references):
-        """Test item type facet calculation"""
-        facets = search_service._calculate_item_type_facets(sample_references)
-        
-        assert len(facets) == 2
-        assert any(facet["value"] == "article" and facet["count"] == 2 for facet in facets)
-        assert any(facet["value"] == "book" and facet["count"] == 1 for facet in facets)
-        
-        # Should be sorted by count (descending)
-        assert facets[0]["count"] >= facets[1]["count"]
-    
-    def test_calculate_year_facets(self, search_service, sample_references):
-        """Test publication year facet calculation"""
-        facets = search_service._calculate_year_facets(sample_references)
-        
-        assert len(facets) == 2
-        assert any(facet["value"] == 2023 and facet["count"] == 2 for facet in facets)
-        assert any(facet["value"] == 2022 and facet["count"] == 1 for facet in facets)
-        
-        # Should be sorted by year (descending)
-        assert facets[0]["value"] >= facets[1]["value"]
-    
-    def test_calculate_creator_facets(self, search_service, sample_references):
-        """Test creator facet calculation"""
-        facets = search_service._calculate_creator_facets(sample_references)
-        
-        assert len(facets) == 3
-        creator_names = [facet["value"] for facet in facets]
-        assert "John Doe" in creator_names
-        assert "Jane Smith" in creator_names
-        assert "Bob Johnson" in creator_names
-    
-    def test_calculate_tag_facets(self, search_service, sample_references):
-        """Test tag facet calculation"""
-        facets = search_service._calculate_tag_facets(sample_references)
-        
-        # Should include all unique tags
-        tag_values = [facet["value"] for facet in facets]
-        assert "machine learning" in tag_values
-        assert "healthcare" in tag_values
-        assert "AI" in tag_values
-        assert "deep learning" in tag_values
-        assert "neural networks" in tag_values
-        assert "NLP" in tag_values
-        assert "text processing" in tag_values
-    
-    def test_calculate_publisher_facets(self, search_service, sample_references):
-        """Test publisher facet calculation"""
-        facets = search_service._calculate_publisher_facets(sample_references)
-        
-        assert len(facets) == 1  # Only one item has a publisher
-        assert facets[0]["value"] == "Tech Publishers"
-        assert facets[0]["count"] == 1
-    
     def test_convert_to_response(self, search_service, sample_references):
         """Test conversion to response format"""
         reference = sample_references[0]
@@ -488,11 +484,11 @@ class TestZoteroSearchService:
         mock_query.join.return_value = mock_query
         mock_query.filter.return_value = mock_query
         mock_query.options.return_value = mock_query
-        mock_query.count.return_value = 3
         mock_query.order_by.return_value = mock_query
+        mock_query.add_columns.return_value = mock_query
         mock_query.offset.return_value = mock_query
         mock_query.limit.return_value = mock_query
-        mock_query.all.return_value = sample_references[1:3]  # Skip first, take 2
+        mock_query.all.return_value = [(ref, 3) for ref in sample_references[1:3]]  # Skip first, take 2
         
         mock_db.query.return_value = mock_query
         
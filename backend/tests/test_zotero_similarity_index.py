@@ -0,0 +1,111 @@
+"""
+Tests for the vectorized Zotero similarity index
+"""
+import random
+
+import numpy as np
+import pytest
+
+from services.zotero.zotero_similarity_index import ZoteroSimilarityIndex
+
+
+def reference_score(target, candidate, sim_type):
+    """Pairwise scoring as done by ZoteroSimilarityService._calculate_similarity"""
+    a, b = target[sim_type], candidate[sim_type]
+    if sim_type == "semantic":
+        if len(a) != len(b):
+            return 0.0
+        na, nb = np.linalg.norm(a), np.linalg.norm(b)
+        return float(np.dot(a, b) / (na * nb)) if na > 0 and nb > 0 else 0.0
+    if sim_type == "tfidf":
+        ka, kb = set(a["keywords"]), set(b["keywords"])
+        return len(ka & kb) / len(ka | kb) if ka and kb else 0.0
+    score = 0.3 if a["item_type"] == b["item_type"] else 0.0
+    if a["publication_year"] > 0 and b["publication_year"] > 0:
+        score += max(0, 1 - abs(a["publication_year"] - b["publication_year"]) / 20) * 0.2
+    ca, cb = set(a["creator_names"]), set(b["creator_names"])
+    if ca and cb:
+        score += len(ca & cb) / len(ca | cb) * 0.3
+    pa, pb = a["publication_title"].lower(), b["publication_title"].lower()
+    if pa and pb and pa == pb:
+        score += 0.2
+    return score / 4
+
+
+def make_embeddings(rng, dimension=16):
+    words = ["graph", "neural", "bayes", "markov", "kernel", "sparse", "tensor", "causal"]
+    return {
+        "semantic": [rng.gauss(0, 1) for _ in range(dimension)],
+        "tfidf": {"keywords": rng.sample(words, rng.randint(0, 4))},
+        "metadata": {
+            "item_type": rng.choice(["journalArticle", "book"]),
+            "publication_year": rng.choice([0, 2001, 2010, 2020]),
+            "creator_names": rng.sample(["Smith", "Lee", "Garcia", "Chen"], rng.randint(0, 2)),
+            "publication_title": rng.choice(["", "Nature", "nature", "JMLR"])
+        }
+    }
+
+
+def make_index(rng, count):
+    index = ZoteroSimilarityIndex()
+    for i in range(count):
+        index.upsert({"item_id": f"item_{i}", "title": f"Paper {i}", "embeddings": make_embeddings(rng)})
+    return index
+
+
+def test_scores_match_pairwise_calculation():
+    rng = random.Random(7)
+    index = make_index(rng, 200)
+    target = make_embeddings(rng)
+    types = ["semantic", "tfidf", "metadata"]
+
+    results = index.top_k(target, types, k=200, min_similarity=-1.0)
+
+    assert len(results) == 200
+    for result in results:
+        for sim_type in types:
+            expected = reference_score(target, result["embeddings"], sim_type)
+            assert result["similarity_scores"][sim_type] == pytest.approx(expected, abs=1e-5)
+    overall = [r["overall_similarity"] for r in results]
+    assert overall == sorted(overall, reverse=True)
+
+
+def test_top_k_threshold_and_exclusion():
+    rng = random.Random(3)
+    index = make_index(rng, 100)
+    target = index.items[0]["embeddings"]
+
+    everything = index.top_k(target, ["semantic", "tfidf"], k=100, min_similarity=0.1, exclude_item_id="item_0")
+    top = index.top_k(target, ["semantic", "tfidf"], k=5, min_similarity=0.1, exclude_item_id="item_0")
+
+    assert all(r["item_id"] != "item_0" for r in everything)
+    assert all(r["overall_similarity"] >= 0.1 for r in everything)
+    assert [r["item_id"] for r in top] == [r["item_id"] for r in everything[:5]]
+
+
+def test_mixed_dimensions_and_missing_types():
+    index = ZoteroSimilarityIndex()
+    index.upsert({"item_id": "a", "embeddings": {"semantic": [1.0, 0.0]}})
+    index.upsert({"item_id": "b", "embeddings": {"semantic": [1.0, 0.0, 0.0]}})
+    index.upsert({"item_id": "c", "embeddings": {"tfidf": {"keywords": ["x"]}}})
+
+    results = index.top_k({"semantic": [2.0, 0.0]}, ["semantic", "tfidf"], k=10, min_similarity=-1.0)
+
+    by_id = {r["item_id"]: r for r in results}
+    assert by_id["a"]["overall_similarity"] == pytest.approx(1.0)
+    assert by_id["b"]["similarity_scores"] == {"semantic": 0.0}
+    assert "c" not in by_id
+
+
+def test_updates_and_removals_are_reflected():
+    index = ZoteroSimilarityIndex()
+    for item_id in "abc":
+        index.upsert({"item_id": item_id, "embeddings": {"semantic": [0.0, 1.0]}})
+    index.top_k({"semantic": [1.0, 0.0]}, ["semantic"], k=3, min_similarity=-1.0)
+
+    index.upsert({"item_id": "b", "embeddings": {"semantic": [1.0, 0.0]}})
+    index.remove("a")
+    results = index.top_k({"semantic": [1.0, 0.0]}, ["semantic"], k=3, min_similarity=-1.0)
+
+    assert [r["item_id"] for r in results] == ["b", "c"]
+    assert "a" not in index and len(index) == 2
@@ -0,0 +1,78 @@
+"""Unit tests for PPO training batch collation."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import numpy as np
+import torch
+
+from backend.rl.core.config import NetworkConfig
+from backend.rl.models.conversation_models import ActionType
+from backend.rl.training.batch_collation import BatchCollator, STRATEGIES, domain_feature_index
+
+
+@dataclass
+class Reward:
+    total_reward: float
+
+
+@dataclass
+class State:
+    conversation_id: str
+    domain_context: Optional[str] = None
+
+    def to_tensor(self):
+        return np.array([len(self.conversation_id), 1.0], dtype=np.float32)
+
+
+@dataclass
+class Action:
+    action_type: Any
+    strategy_parameters: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Experience:
+    state: State
+    action: Action
+    reward: Reward
+    next_state: Optional[State] = None
+    done: bool = False
+
+
+def collator():
+    return BatchCollator(NetworkConfig(state_dim=4, device="cpu"), torch.device("cpu"))
+
+
+def test_collate_encodes_states_and_actions():
+    action_type = list(ActionType)[-1]
+    experiences = [
+        Experience(
+            State("abc", "python"),
+            Action(action_type, {"strategy": STRATEGIES[4], "log_prob": -1.5}),
+            Reward(0.5),
+            next_state=State("abcd"),
+            done=True
+        ),
+        Experience(State("x"), Action(None), Reward(-1.0))
+    ]
+
+    states, actions, rewards, next_states, dones = collator().collate(experiences)
+
+    assert states["conversation_states"].shape == (2, 1, 4)
+    assert states["conversation_states"][:, 0].tolist() == [[3, 1, 0, 0], [1, 1, 0, 0]]
+    assert states["domain_features"][0, domain_feature_index("python")] == 1
+    assert states["domain_features"].sum().item() == 1
+    assert next_states["conversation_states"][:, 0, 0].tolist() == [4, 0]
+    assert actions["action_types"].tolist() == [len(ActionType) - 1, 0]
+    assert actions["strategies"].tolist() == [4, STRATEGIES.index("balanced_approach")]
+    assert actions["old_log_probs"][0].item() == -1.5
+    assert torch.isnan(actions["old_log_probs"][1])
+    assert rewards.tolist() == [0.5, -1.0]
+    assert dones.tolist() == [1.0, 0.0]
+
+
+def test_domain_feature_index_is_stable():
+    assert domain_feature_index("python") == domain_feature_index("python")
+    assert domain_feature_index("") is None
+    assert 0 <= domain_feature_index("machine learning") < 32